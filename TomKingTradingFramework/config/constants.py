@@ -28,12 +28,20 @@ class TradingConstants:
 
     # Time Conversion
     SECONDS_PER_HOUR = 3600  # Standard conversion factor for time calculations
+    CALENDAR_DAYS_PER_YEAR = 365  # Calendar (not trading) days, for DTE horizons
+    TRADING_DAYS_PER_YEAR = 252  # Annualisation for volatility (VIX) over trading time
+    MINUTES_PER_SESSION = 390  # 9:30 AM - 4:00 PM ET regular session
+
+    # Unit Conversion
+    FULL_PERCENTAGE = 100  # Decimal -> percent for display (0.5 -> 50%)
 
     # Trading Schedule
     MARKET_OPEN_HOUR = 9  # NYSE opens 9:30 AM ET
     MARKET_OPEN_MINUTE = 30
     MARKET_CLOSE_HOUR = 16  # NYSE closes 4:00 PM ET
     MARKET_CLOSE_MINUTE = 0
+    MARKET_EARLY_CLOSE_HOUR = 13  # NYSE early closes (Jul 3, day after Thanksgiving, Dec 24) at 1:00 PM ET
+    MARKET_EARLY_CLOSE_MINUTE = 0
     
     # Strategy Entry Times
     FRIDAY_0DTE_ENTRY_HOUR = 10
@@ -136,6 +144,41 @@ class TradingConstants:
     VIX_SPIKE_MIN_DEPLOYMENT = 5000  # Minimum $5k (protect small, accounts)
     VIX_SPIKE_MAX_DEPLOYMENT = 50000  # Maximum $50k (prevent over-concentration)
     
+    # Correlation Regime (RiskMetrics-style EWMA on monitor bars)
+    CORRELATION_EWMA_HALF_LIVES = (10, 60)  # Fast (regime detection) and slow half-lives, in bars
+    CORRELATION_EWMA_MIN_OBSERVATIONS = 20  # Returns before a symbol enters the EWMA averages
+    CORRELATION_ELEVATED_THRESHOLD = 0.60  # Average pairwise correlation: diversification degrading
+    CORRELATION_SPIKE_THRESHOLD = 0.80  # Everything moving together (August 5, 2024 pattern)
+    CORRELATION_REGIME_HYSTERESIS = 0.05  # Drop below threshold by this much before stepping down
+    # Spike regime is read on equity exposure only (groups A1/A2): VIX and cross-asset hedges
+    # move against equities in a selloff and would pull the average down exactly when it spikes
+    CORRELATION_SPIKE_UNIVERSE = ('ES', 'MES', 'NQ', 'MNQ', 'RTY', 'M2K', 'YM', 'MYM',  # A1 equity indices
+                                  'SPY', 'QQQ', 'IWM', 'DIA')  # A2 equity ETFs
+    
+    # Portfolio VaR / Expected Shortfall
+    VAR_CONFIDENCE = 0.99  # One-tailed confidence level for VaR and ES
+    VAR_HORIZON_DAYS = 1  # Holding period in trading days
+    VAR_LOOKBACK_DAYS = 252  # Daily return history for historical simulation and covariance
+    VAR_MONTE_CARLO_PATHS = 20000  # Simulated correlated paths per Monte Carlo run
+    VAR_PROCESS_POOL_MIN_PATHS = 200000  # Split Monte Carlo across worker processes from this many paths
+    VAR_PRETRADE_BUDGET_MS = 5.0  # Pre-trade VaR checks never block longer than this
+    VAR_POOL_TIMEOUT_SECONDS = 30.0  # Monte Carlo worker results; past this the run is simulated in-process
+    VAR_REFRESH_INTERVAL_MINUTES = 15  # Scheduled recompute of stale VaR/ES off the order path
+    MAX_PORTFOLIO_VAR_PCT = 0.05  # Block new risk when 1-day VaR would exceed 5% of portfolio value
+
+    # Shared exposure ledger (risk plugin group aggregates)
+    EXPOSURE_RECONCILE_MINUTES = 15  # Full Portfolio scan to correct ledger drift at most this often
+
+    # Strategy-based (Reg-T style) margin estimates
+    MARGIN_EQUITY_REG_T = 0.50  # Initial margin on stock positions
+    MARGIN_NAKED_EQUITY_PCT = 0.20  # Naked equity option: 20% of underlying less OTM amount, plus premium
+    MARGIN_NAKED_INDEX_PCT = 0.15  # Broad-based index options
+    MARGIN_NAKED_MIN_PCT = 0.10  # Floor: 10% of strike (puts) or underlying (calls), plus premium
+    MARGIN_FUTURES_FALLBACK_PCT = 0.06  # Notional fraction when a future has no specs in FuturesManager
+
+    # Streaming equity curve (shared by drawdown consumers)
+    EQUITY_CURVE_CAPACITY = 100000  # Samples kept in the ring buffer (~1 year of minute bars)
+    
     # ==================== GREEKS LIMITS ====================
     
     # Portfolio Greeks Limits
@@ -193,7 +236,14 @@ class TradingConstants:
     # Minimum/Maximum Contracts
     # Kelly Criterion - Tom King uses conservative 0.25 factor
     KELLY_FACTOR = 0.25  # Conservative Kelly factor for risk management
-    
+
+    # Observed strategy statistics (fed by the trade journal, read by Kelly sizing)
+    STRATEGY_STATS_MIN_TRADES = 20  # Closed trades before observed stats replace documented win rates
+    STRATEGY_STATS_HALF_LIFE_TRADES = None  # Exponential decay half-life in trades; None weights every trade equally
+    STRATEGY_STATS_BOOTSTRAP_WINDOW = 500  # Most recent returns kept per strategy for the bootstrap
+    STRATEGY_STATS_BOOTSTRAP_RESAMPLES = 1000  # Bootstrap resamples per confidence interval
+    STRATEGY_STATS_CONFIDENCE = 0.90  # Two-sided confidence level of the Kelly interval
+
     MIN_CONTRACTS_PER_TRADE = 1
     MAX_CONTRACTS_0DTE = 10  # Cap 0DTE risk: Limits gamma exposure
     MAX_CONTRACTS_LT112 = 5  # Cap LT112: 5 spreads = manageable assignment risk
@@ -203,6 +253,11 @@ class TradingConstants:
     MIN_CREDIT_IRON_CONDOR = 0.10  # Min $0.10: Ensures favorable risk/reward
     MIN_CREDIT_LT112 = 0.50  # Min $0.50: Tom King's minimum for profitability
     MIN_CREDIT_STRANGLE = 0.25  # Min $0.25: Covers commissions plus profit
+
+    # Strike Selection
+    FRIDAY_0DTE_WING_WIDTH = 5  # $5 wide wings on SPY 0DTE spreads and condors
+    STRIKE_SEARCH_WIDTH = 5  # Short strikes around the target delta considered per side
+    STRIKE_DELTA_BAND = 0.05  # Ranked short strikes stay within ±0.05 delta of the target
     
     # ==================== DATA & CACHING ====================
     
@@ -214,6 +269,19 @@ class TradingConstants:
     # Rolling Windows
     DAILY_RETURNS_WINDOW = 252  # 1 year of daily returns
     DRAWDOWN_HISTORY_WINDOW = 252  # 1 year of drawdown data
+
+    # OnData Work Scheduling
+    ONDATA_TIME_BUDGET_MS = 50  # Wall-clock budget per slice before deferrable work carries over
+    ONDATA_MAX_DEFERRAL_SLICES = 10  # Deferred task is forced to run after 10 skipped slices
+    ONDATA_MAX_DEFERRAL_MINUTES = 15  # ...or once it has waited 15 minutes of algorithm time
+
+    # Hot-path Logging
+    LOG_FLIGHT_RECORDER_SIZE = 512  # Suppressed records kept for dumping when an error is logged
+    LOG_FLIGHT_RECORDER_DUMP_LINES = 50  # Most recent records written out per error
+    LOG_RATE_LIMIT_PER_MINUTE = 20  # Emitted (non-error) lines per component per algorithm minute
+
+    # State Machines
+    STATE_HISTORY_SIZE = 256  # Transitions retained per strategy state machine (ring buffer)
     
     # ==================== OPTIONS UNIVERSE ====================
     
@@ -222,6 +290,10 @@ class TradingConstants:
     OPTION_STRIKE_RANGE_UPPER = 50  # 50 strikes above ATM
     OPTION_MIN_DTE = 0  # Include 0DTE options
     OPTION_MAX_DTE = 180  # Up to 180 DTE for LT112
+
+    # Futures option chains indexed before the strangle entry (Mon/Thu 10:00 AM)
+    FUTURES_OPTION_PREWARM_HOUR = 9
+    FUTURES_OPTION_PREWARM_MINUTE = 45
     
     # ==================== WARMUP & INITIALIZATION ====================
     
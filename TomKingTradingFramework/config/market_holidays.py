@@ -26,7 +26,7 @@ class MarketHolidays:
             date(2025, 12, 25): "Christmas Day"
         }
         
-        # Early close days (2:00 PM ET close)
+        # Early close days (1:00 PM ET close)
         self.early_close_2025 = {
             date(2025, 7, 3): "Day before Independence Day",
             date(2025, 11, 28): "Day after Thanksgiving",
@@ -47,6 +47,11 @@ class MarketHolidays:
             date(2026, 12, 25): "Christmas Day"
         }
         
+        self.early_close_2026 = {
+            date(2026, 11, 27): "Day after Thanksgiving",
+            date(2026, 12, 24): "Christmas Eve"
+        }
+        
         # Combine all holidays
         self.all_holidays = {
             **self.holidays_2025,
@@ -54,7 +59,8 @@ class MarketHolidays:
         }
         
         self.all_early_close = {
-            **self.early_close_2025
+            **self.early_close_2025,
+            **self.early_close_2026
         }
         
     def is_market_holiday(self, check_date: datetime) -> bool:
@@ -189,7 +195,7 @@ class MarketHolidays:
         for close_date, close_name in sorted(self.all_early_close.items()):
             if today < close_date <= end_date:
                 days_until = (close_date - today).days
-                early_closes.append(f"{close_date}: {close_name} - 2PM close ({days_until} days)")
+                early_closes.append(f"{close_date}: {close_name} - 1PM close ({days_until} days)")
                 
         if early_closes:
             algorithm.Log(f"[EARLY CLOSE] Upcoming early closures:")
@@ -7,6 +7,9 @@ Ensures all strategies follow proper parameters and phase requirements
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 from core.unified_vix_manager import UnifiedVIXManager
+from config.constants import TradingConstants
+from risk.validation_pipeline import get_validation_pipeline
+from risk.strategy_statistics import get_strategy_statistics
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -20,6 +23,10 @@ class StrategyValidator:
     Ensures proper phase requirements, BP utilization, and concentration limits
     """
     
+    # Order can_execute_strategy runs its checks in: cheapest first
+    STRATEGY_RULES = ('strategy.phase', 'strategy.total_limit', 'drawdown', 'strategy.position_limit',
+                      'strategy.vix', 'strategy.bp_utilization')
+    
     def __init__(self, algorithm):
         self.algo = algorithm
         
@@ -103,50 +110,66 @@ class StrategyValidator:
             'strategy_type': 0.40        # Max 40% BP in single strategy type
         }
         
+        self.strategy_statistics = get_strategy_statistics(algorithm)
+        # Shared per-slice inputs (VIX, drawdown gate) and per-check statistics
+        self.pipeline = get_validation_pipeline(algorithm)
+        
     def can_execute_strategy(self, strategy: str, account_phase: int, 
                             account_value: float, current_positions: Dict) -> Tuple[bool, str]:
         """
         Validate if strategy can be executed based on all requirements
         """
+        failed_rule, reason = self._first_failure(strategy, account_phase, account_value, current_positions)
+        self.pipeline.record(self.STRATEGY_RULES, failed_rule)
+        return (True, "All checks passed") if failed_rule is None else (False, reason)
+    
+    def _first_failure(self, strategy: str, account_phase: int, account_value: float,
+                       current_positions: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """(rule, reason) of the first STRATEGY_RULES check that fails, (None, None) when all pass"""
         # Check phase requirement
         min_phase = self.strategy_phase_requirements.get(strategy, 1)
         if account_phase < min_phase:
-            return False, f"{strategy} requires Phase {min_phase} (current: Phase {account_phase})"
+            return 'strategy.phase', f"{strategy} requires Phase {min_phase} (current: Phase {account_phase})"
+        
+        # Check total position limit
+        phase_key = f'phase{account_phase}'
+        phase_limits = self.max_positions_per_strategy.get(phase_key, {})
+        total_max = phase_limits.get('TOTAL', 5)
+        total_current = len(current_positions)
+        if total_current >= total_max:
+            return 'strategy.total_limit', f"Total position limit reached ({total_current}/{total_max})"
         
         # Check drawdown status
-        if hasattr(self.algo, 'drawdown_manager'):
-            can_open, reason = self.algo.drawdown_manager.should_allow_new_position()
-            if not can_open:
-                return False, f"Drawdown restriction: {reason}"
+        can_open, reason = self.pipeline.value('drawdown_gate')
+        if not can_open:
+            return 'drawdown', f"Drawdown restriction: {reason}"
         
         # Check position count limits
-        phase_key = f'phase{account_phase}'
-        max_for_strategy = self.max_positions_per_strategy.get(phase_key, {}).get(strategy, 0)
+        max_for_strategy = phase_limits.get(strategy, 0)
         current_count = self._count_strategy_positions(strategy, current_positions)
-        
         if current_count >= max_for_strategy:
-            return False, f"{strategy} position limit reached ({current_count}/{max_for_strategy})"
-        
-        # Check total position limit
-        total_max = self.max_positions_per_strategy.get(phase_key, {}).get('TOTAL', 5)
-        total_current = len(current_positions)
+            return 'strategy.position_limit', f"{strategy} position limit reached ({current_count}/{max_for_strategy})"
         
-        if total_current >= total_max:
-            return False, f"Total position limit reached ({total_current}/{total_max})"
+        # Check VIX conditions
+        reason = self._vix_reason(strategy, self.pipeline.value('vix'))
+        if reason:
+            return 'strategy.vix', reason
         
         # Check BP utilization
-        bp_check, bp_reason = self._check_bp_utilization(
-            strategy, phase_key, account_value, current_positions
-        )
+        bp_check, bp_reason = self._check_bp_utilization(strategy, phase_key, account_value, current_positions)
         if not bp_check:
-            return False, bp_reason
-        
-        # Check VIX conditions
-        vix_check, vix_reason = self._check_vix_conditions(strategy)
-        if not vix_check:
-            return False, vix_reason
+            return 'strategy.bp_utilization', bp_reason
         
-        return True, "All checks passed"
+        return None, None
+    
+    def _bp_used(self, positions: Dict) -> float:
+        return sum(pos.buying_power_used for pos in positions.values() if hasattr(pos, 'buying_power_used'))
+    
+    def _phase_bp_limit(self, account_value: float) -> float:
+        phase_config = self.algo.position_sizer.phase_limits.get(
+            self.algo.position_sizer.get_account_phase(account_value)
+        )
+        return phase_config.get('max_bp_limit', 0.80)
     
     def _count_strategy_positions(self, strategy: str, positions: Dict) -> int:
         """Count current positions for a specific strategy"""
@@ -159,21 +182,15 @@ class StrategyValidator:
     def _check_bp_utilization(self, strategy: str, phase_key: str, 
                              account_value: float, positions: Dict) -> Tuple[bool, str]:
         """Check if BP utilization allows new position"""
+        return self._bp_verdict(strategy, phase_key, account_value,
+                                self._bp_used(positions), self._phase_bp_limit(account_value))
+    
+    def _bp_verdict(self, strategy: str, phase_key: str, account_value: float,
+                    current_bp_used: float, max_bp_limit: float) -> Tuple[bool, str]:
         # Get strategy BP requirement
         strategy_bp = self.strategy_bp_limits.get(strategy, {}).get(phase_key, 0.05)
         required_bp = account_value * strategy_bp
-        
-        # Calculate current BP usage
-        current_bp_used = 0
-        for pos in positions.values():
-            if hasattr(pos, 'buying_power_used'):
-                current_bp_used += pos.buying_power_used
-        
-        # Get phase BP limit
-        phase_config = self.algo.position_sizer.phase_limits.get(
-            self.algo.position_sizer.get_account_phase(account_value)
-        )
-        max_bp = account_value * phase_config.get('max_bp_limit', 0.80)
+        max_bp = account_value * max_bp_limit
         
         if current_bp_used + required_bp > max_bp:
             usage_pct = (current_bp_used / account_value) * 100
@@ -186,19 +203,25 @@ class StrategyValidator:
         if not hasattr(self.algo, 'vix_manager'):
             return True, "No VIX manager"
         
-        current_vix = self.algo.vix_manager.get_current_vix()
+        reason = self._vix_reason(strategy, self.algo.vix_manager.get_current_vix())
+        return (False, reason) if reason else (True, "VIX check passed")
+    
+    @staticmethod
+    def _vix_reason(strategy: str, current_vix: Optional[float]) -> Optional[str]:
+        """Strategy-specific VIX requirements; None passes (also when no VIX manager)"""
+        if current_vix is None:
+            return None
         
-        # Strategy-specific VIX requirements
         if strategy == '0DTE' and current_vix < 22:  # Tom King rule - trade when VIX HIGH
-            return False, f"VIX too low for 0DTE ({current_vix:.2f} < 22)"
+            return f"VIX too low for 0DTE ({current_vix:.2f} < 22)"
         
         if strategy == 'STRANGLE' and current_vix < 12:
-            return False, f"VIX too low for strangles ({current_vix:.2f} < 12)"
+            return f"VIX too low for strangles ({current_vix:.2f} < 12)"
         
         if strategy == 'LT112' and current_vix > 35:
-            return False, f"VIX too high for LT112 ({current_vix:.2f} > 35)"
+            return f"VIX too high for LT112 ({current_vix:.2f} > 35)"
         
-        return True, "VIX check passed"
+        return None
     
     def get_ticker_concentration(self, positions: Dict) -> Dict:
         """Calculate concentration by ticker and correlation group"""
@@ -339,6 +362,9 @@ class StrategyValidator:
     def get_strategy_performance_metrics(self, strategy: str) -> Dict:
         """
         Get expected performance metrics for strategy validation
+        
+        Documented targets, plus the strategy's observed trade statistics under
+        'observed' (None before its first closed trade)
         """
         # Tom King documented win rates and targets
         metrics = {
@@ -372,13 +398,18 @@ class StrategyValidator:
             }
         }
         
-        return metrics.get(strategy, {
+        result = dict(metrics.get(strategy, {
             'win_rate_target': 0.70,
             'profit_target': 0.50,
             'stop_loss': 2.00,
             'expected_monthly_return': 0.05,
             'max_drawdown': 0.20
-        })
+        }))
+        
+        # Running figures from the trade journal; the interval refresh is deferred when stale
+        self.strategy_statistics.confidence_interval(strategy)
+        result['observed'] = self.strategy_statistics.get_summary(strategy)
+        return result
     
     def validate_expected_credit(self, strategy: str, expected_credit: float, 
                                 max_risk: float, contracts: int = 1) -> Tuple[bool, str]:
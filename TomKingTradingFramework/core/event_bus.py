@@ -1,9 +1,10 @@
 # region imports
 from AlgorithmImports import *
 from enum import Enum
-from typing import Dict, List, Callable, Any, Optional
+from typing import Dict, List, Callable, Any, Optional, Tuple
 from datetime import datetime
 import threading
+import uuid
 from collections import deque
 from core.dependency_container import IManager
 from core.unified_vix_manager import UnifiedVIXManager
@@ -71,29 +72,70 @@ class EventType(Enum):
 class Event:
     """Event data structure with metadata and circular dependency tracking"""
     
+    # (event_type value, source) -> bit index shared by every event chain.
+    # Interning keeps loop checks O(1) regardless of chain length.
+    _chain_key_ids: Dict[Tuple[str, str], int] = {}
+    _chain_key_lock = threading.Lock()
+    
     def __init__(self, event_type: EventType, data: Dict[str, Any], source: str, 
                  timestamp: datetime = None, correlation_id: str = None):
         self.event_type = event_type
         self.data = data
         self.source = source
-        self.timestamp = timestamp or datetime.now()
-        self.processed_by = set()  # Track which handlers processed this event
         self.created_at = datetime.now()
+        self.timestamp = timestamp or self.created_at
+        self.processed_by = set()  # Track which handlers processed this event
         
         # PHASE 6: Circular dependency tracking
         self.correlation_id = correlation_id or self._generate_correlation_id()
-        self.event_chain = []  # Track event chain for loop detection
+        self.chain_mask = 0  # Bitset of interned (type, source) ids already in the chain
+        self._chain_link = None  # Immutable (entry, parent_link) list shared with parent events
         self.hop_count = 0  # Prevent infinite chains
         self.max_hops = 10  # Maximum allowed hops in event chain
         
     def _generate_correlation_id(self) -> str:
         """Generate unique correlation ID for event chain tracking"""
-        import uuid
-        return str(uuid.uuid4())[:8]
+        return uuid.uuid4().hex[:8]
+    
+    @classmethod
+    def _chain_key_id(cls, event_type: EventType, source: str) -> int:
+        """Interned bit index for an (event type, source) pair"""
+        key = (event_type.value, source)
+        key_id = cls._chain_key_ids.get(key)
+        if key_id is None:
+            with cls._chain_key_lock:
+                key_id = cls._chain_key_ids.setdefault(key, len(cls._chain_key_ids))
+        return key_id
+    
+    @property
+    def event_chain(self) -> List[Tuple[str, str]]:
+        """Chain as (event_type value, source) tuples, oldest first - built on demand for logging"""
+        chain = []
+        link = self._chain_link
+        while link is not None:
+            chain.append(link[0])
+            link = link[1]
+        chain.reverse()
+        return chain
+    
+    @event_chain.setter
+    def event_chain(self, chain: List[Tuple[str, str]]):
+        self.chain_mask = 0
+        self._chain_link = None
+        for event_type_value, source in chain:
+            self.chain_mask |= 1 << self._chain_key_id(EventType(event_type_value), source)
+            self._chain_link = ((event_type_value, source), self._chain_link)
+    
+    def inherit_chain(self, parent: 'Event'):
+        """Continue the parent's chain - O(1), the chain structure is shared, not copied"""
+        self.chain_mask = parent.chain_mask
+        self._chain_link = parent._chain_link
+        self.hop_count = parent.hop_count
     
     def add_to_chain(self, event_type: EventType, source: str):
         """Add event to chain for circular dependency detection"""
-        self.event_chain.append((event_type.value, source))
+        self.chain_mask |= 1 << self._chain_key_id(event_type, source)
+        self._chain_link = ((event_type.value, source), self._chain_link)
         self.hop_count += 1
     
     def would_create_loop(self, new_event_type: EventType, new_source: str) -> bool:
@@ -101,20 +143,9 @@ class Event:
         # FIXED: Proper loop detection - check hop count first to prevent infinite cycles
         if self.hop_count >= self.max_hops:
             return True
-            
-        new_entry = (new_event_type.value, new_source)
         
-        # FIXED: More sophisticated loop detection - check full path, not just immediate duplicate
-        if new_entry in self.event_chain:
-            return True
-            
-        # FIXED: Check for potential indirect cycles by examining chain history
-        if len(self.event_chain) > 3:  # Only check for cycles in longer chains
-            recent_events = list(self.event_chain)[-3:]  # Check last 3 events for patterns
-            if recent_events.count(new_entry) > 0:  # Event appeared in recent history
-                return True
-                
-        return False
+        # Any repeat of (type, source) anywhere in the path is a cycle - single bit test
+        return bool((self.chain_mask >> self._chain_key_id(new_event_type, new_source)) & 1)
     
     def __repr__(self):
         return f"Event({self.event_type.value}, source={self.source}, correlation={self.correlation_id}, hops={self.hop_count})"
@@ -156,9 +187,14 @@ class EventBus(IManager):
         self.active_event_chains = {}  # correlation_id -> Event
         self.loop_detection_enabled = True
         self.max_concurrent_chains = 50
+        self.chain_cleanup_interval = 64  # Publishes between stale chain/request sweeps
+        self._publishes_since_cleanup = 0
         self.request_response_timeout = 5  # seconds
         self.pending_requests = {}  # correlation_id -> (callback, timestamp)
         
+        # Optional persistent journal (see core/event_journal.py) - disabled by default
+        self.journal = None
+        
         # Event type relationships for loop detection
         self.circular_prone_events = {
             EventType.GREEKS_CALCULATED: [EventType.PERFORMANCE_THRESHOLD_BREACH],
@@ -243,6 +279,9 @@ class EventBus(IManager):
             self.event_history.append(event)
             self.stats['events_published'] += 1
             
+            if self.journal is not None:
+                self.journal.record(event)
+            
             # Get handlers for this event type
             handlers = self.handlers.get(event_type, [])
             
@@ -385,6 +424,7 @@ class EventBus(IManager):
         
         stats['handler_statistics'] = handler_stats
         stats['event_history_size'] = len(self.event_history)
+        stats['journal'] = self.journal.get_statistics() if self.journal is not None else None
         stats['registered_event_types'] = len(self.handlers)
         
         return stats
@@ -406,7 +446,33 @@ class EventBus(IManager):
         
         if sorted_handlers:
             top_events = sorted_handlers[:3]
-            self.algorithm.Debug(f"[EventBus] Top events: {', '.join([f'{k}: {v['total_calls']}' for k, v in top_events])}")
+            top_summary = ', '.join(f"{k}: {v['total_calls']}" for k, v in top_events)
+            self.algorithm.Debug(f"[EventBus] Top events: {top_summary}")
+    
+    def enable_journal(self, store=None, **journal_kwargs):
+        """
+        Record every published event to an append-only EventJournal
+        
+        Args:
+            store: Segment store (defaults to the QuantConnect ObjectStore)
+            journal_kwargs: Passed through to EventJournal (segment size, flush interval)
+            
+        Returns:
+            EventJournal: The attached journal
+        """
+        
+        from core.event_journal import EventJournal
+        
+        self.journal = EventJournal(self.algorithm, store=store, **journal_kwargs)
+        self.algorithm.Debug(f"[EventBus] Event journal enabled (session {self.journal.session_id})")
+        return self.journal
+    
+    def disable_journal(self):
+        """Flush and detach the event journal"""
+        
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
     
     def unsubscribe(self, event_type: EventType, source: str):
         """Remove handler by source name"""
@@ -453,20 +519,21 @@ class EventBus(IManager):
         
         # Check for circular dependency
         if parent_event:
-            # Copy chain from parent and check for loops
-            event.event_chain = parent_event.event_chain.copy()
-            event.hop_count = parent_event.hop_count
+            # Share chain with parent (no copy) and check for loops
+            event.inherit_chain(parent_event)
             
             if event.would_create_loop(event_type, source):
                 self.stats['circular_loops_prevented'] += 1
+                event_chain = event.event_chain
+                chain_summary = ' -> '.join(f"{t}({s})" for t, s in event_chain)
                 self.algorithm.Log(f"[EventBus] CIRCULAR DEPENDENCY PREVENTED: {event_type.value} from {source}")
-                self.algorithm.Log(f"[EventBus] Event chain: {' -> '.join([f'{t}({s})' for t, s in event.event_chain])}")
+                self.algorithm.Log(f"[EventBus] Event chain: {chain_summary}")
                 
                 # Publish circular dependency detected event
                 self.publish(EventType.CIRCULAR_DEPENDENCY_DETECTED, {
                     'blocked_event_type': event_type.value,
                     'blocked_source': source,
-                    'event_chain': event.event_chain,
+                    'event_chain': event_chain,
                     'hop_count': event.hop_count
                 }, source="event_bus_loop_detector")
                 
@@ -478,8 +545,11 @@ class EventBus(IManager):
         # Track active event chain
         self.active_event_chains[event.correlation_id] = event
         
-        # Clean up old chains periodically
-        self._cleanup_stale_chains()
+        # Clean up old chains periodically (amortised - not on every publish)
+        self._publishes_since_cleanup += 1
+        if (self._publishes_since_cleanup >= self.chain_cleanup_interval or
+                len(self.active_event_chains) > self.max_concurrent_chains):
+            self._cleanup_stale_chains()
         
         # Publish the event normally
         success = self._publish_event(event)
@@ -500,6 +570,9 @@ class EventBus(IManager):
             self.event_history.append(event)
             self.stats['events_published'] += 1
             
+            if self.journal is not None:
+                self.journal.record(event)
+            
             # Get handlers for this event type
             handlers = self.handlers.get(event.event_type, [])
             
@@ -616,6 +689,7 @@ class EventBus(IManager):
     def _cleanup_stale_chains(self):
         """Clean up stale event chains and pending requests"""
         
+        self._publishes_since_cleanup = 0
         current_time = datetime.now()
         
         # Clean up stale pending requests
@@ -631,13 +705,9 @@ class EventBus(IManager):
         
         # Limit concurrent active chains
         if len(self.active_event_chains) > self.max_concurrent_chains:
-            # Remove oldest chains
-            sorted_chains = sorted(self.active_event_chains.items(), 
-                                 key=lambda x: x[1].created_at)
-            
+            # Remove oldest chains (dict preserves insertion order, so no sort needed)
             chains_to_remove = len(self.active_event_chains) - self.max_concurrent_chains
-            for i in range(chains_to_remove):
-                correlation_id, event = sorted_chains[i]
+            for correlation_id in list(self.active_event_chains)[:chains_to_remove]:
                 self.algorithm.Log(f"[EventBus] Removed stale event chain: {correlation_id}")
                 del self.active_event_chains[correlation_id]
     
@@ -650,6 +720,7 @@ class EventBus(IManager):
             'pending_requests': len(self.pending_requests),
             'request_response_pairs': self.stats['request_response_pairs'],
             'loop_detection_enabled': self.loop_detection_enabled,
+            'interned_chain_keys': len(Event._chain_key_ids),
             'circular_prone_event_types': len(self.circular_prone_events)
         }
     
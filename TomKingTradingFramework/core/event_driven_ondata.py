@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 from core.event_bus import EventBus, EventType
 from core.unified_vix_manager import UnifiedVIXManager
+from core.slice_ingestion import SliceIngestor
 # endregion
 
 
@@ -40,8 +41,8 @@ class EventDrivenOnData:
         self.batch_size_threshold = 5     # Batch process when >= 5 updates
         self.performance_log_interval = timedelta(minutes=30)
         
-        # Data change tracking
-        self.last_prices = {}
+        # Data change tracking - vectorized, shared with the optimizer so each slice is scanned once
+        self.slice_ingestor = getattr(event_optimizer, 'slice_ingestor', None) or SliceIngestor(algorithm)
         self.significant_changes = []
         
         self.algorithm.Debug("[EventDrivenOnData] Initialized event-driven OnData processing")
@@ -57,10 +58,14 @@ class EventDrivenOnData:
         self.ondata_calls += 1
         
         try:
-            optimization_result = self.event_optimizer.optimize_ondata_performance(data)
-        except Exception as e:
-
+            # Single pass over the slice; optimizer and the checks below read the same vectors
+            self.slice_ingestor.ingest(data)
+            
+            # Risk plugins see every slice's prices, skipped slices included (correlation returns, VIX regime)
+            self._forward_prices_to_risk()
+            
             # PHASE 5 OPTIMIZATION: Use event-driven optimizer
+            optimization_result = self.event_optimizer.optimize_ondata_performance(data)
             
             # Check if processing can be skipped
             if not self._should_process_data(data):
@@ -70,6 +75,7 @@ class EventDrivenOnData:
             
             # Extract and filter significant market updates
             market_updates = self._extract_significant_updates(data)
+            self.significant_changes = list(market_updates.keys())
             
             if market_updates:
                 # Publish market data events (event-driven)
@@ -94,6 +100,13 @@ class EventDrivenOnData:
             self.algorithm.Error(f"[EventDrivenOnData] Error in OnData processing: {e}")
             return {'error': str(e), 'optimizations': []}
     
+    def _forward_prices_to_risk(self):
+        """Feed the ingested slice to the unified risk manager's plugins"""
+        
+        risk_manager = getattr(self.algorithm, 'unified_risk_manager', None)
+        if risk_manager is not None:
+            risk_manager.on_slice_prices(self.slice_ingestor.prices_by_symbol())
+    
     def _should_process_data(self, data) -> bool:
         """Determine if OnData processing is necessary"""
         
@@ -101,76 +114,41 @@ class EventDrivenOnData:
         if self.algorithm.IsWarmingUp:
             return True
         
-        # Check for significant data changes
-        has_significant_changes = False
+        ingestor = self.slice_ingestor
+        ingestor.ingest(data)
         
-        for symbol in data.Keys:
-            current_price = None
-            
-            # Extract current price based on data type
-            if symbol in data.Bars:
-                current_price = data.Bars[symbol].Close
-            elif symbol in data.QuoteBars:
-                current_price = data.QuoteBars[symbol].Close
-            elif symbol in data.Ticks:
-                if data.Ticks[symbol]:
-                    current_price = data.Ticks[symbol][-1].Price
-            
-            if current_price is not None:
-                symbol_str = str(symbol)
-                last_price = self.last_prices.get(symbol_str)
-                
-                if last_price is not None:
-                    change_pct = abs(current_price - last_price) / last_price if last_price > 0 else 0
-                    if change_pct >= self.min_price_change_pct:
-                        has_significant_changes = True
-                        break
-                else:
-                    # First time seeing this symbol
-                    has_significant_changes = True
-                
-                self.last_prices[symbol_str] = current_price
-        
-        return has_significant_changes
+        # First time seeing a symbol, or a significant move vs its last observed price
+        if ingestor.first_seen_mask().any():
+            return True
+        return ingestor.significant_slots(self.min_price_change_pct).size > 0
     
     def _extract_significant_updates(self, data) -> Dict[str, Dict]:
         """Extract significant price updates from data"""
         
-        updates = {}
+        ingestor = self.slice_ingestor
+        ingestor.ingest(data)
         
-        for symbol in data.Keys:
-            symbol_str = str(symbol)
-            last_price = self.last_prices.get(symbol_str)
-            current_price = None
-            change_pct = 0
-            
-            # Extract price based on data type
-            if symbol in data.Bars:
-                bar = data.Bars[symbol]
-                current_price = bar.Close
-                volume = bar.Volume if hasattr(bar, 'Volume') else 0
-            elif symbol in data.QuoteBars:
-                quote = data.QuoteBars[symbol]
-                current_price = quote.Close
-                volume = quote.LastBidSize + quote.LastAskSize if hasattr(quote, 'LastBidSize') else 0
-            elif symbol in data.Ticks:
-                if data.Ticks[symbol]:
-                    tick = data.Ticks[symbol][-1]
-                    current_price = tick.Price
-                    volume = getattr(tick, 'Quantity', 0)
-            
-            if current_price is not None and last_price is not None:
-                change_pct = (current_price - last_price) / last_price if last_price > 0 else 0
-                
-                # Only include if significant change
-                if abs(change_pct) >= self.min_price_change_pct:
-                    updates[symbol_str] = {
-                        'price': current_price,
-                        'previous_price': last_price,
-                        'change_pct': change_pct,
-                        'volume': volume,
-                        'timestamp': self.algorithm.Time
-                    }
+        slots = ingestor.significant_slots(self.min_price_change_pct)
+        if slots.size == 0:
+            return {}
+        
+        change_pct = ingestor.change_pct()
+        timestamp = self.algorithm.Time
+        updates = {}
+        for slot, price, previous_price, change, volume in zip(
+            slots.tolist(),
+            ingestor.price[slots].tolist(),
+            ingestor.previous_price[slots].tolist(),
+            change_pct[slots].tolist(),
+            ingestor.volume[slots].tolist()
+        ):
+            updates[ingestor.symbol_strs[slot]] = {
+                'price': price,
+                'previous_price': previous_price,
+                'change_pct': change,
+                'volume': volume,
+                'timestamp': timestamp
+            }
         
         return updates
     
@@ -221,7 +199,7 @@ class EventDrivenOnData:
         # This allows the event-driven architecture to determine what actually needs updating
         
         # Trigger VIX regime check (only if VIX data changed)
-        if 'VIX' in [str(s) for s in self.significant_changes]:
+        if 'VIX' in self.significant_changes:
             self.event_bus.publish(
                 EventType.VIX_REGIME_CHANGE,
                 {'trigger': 'vix_data_update'},
@@ -289,6 +267,7 @@ class EventDrivenOnData:
                 'total_processing_time_ms': self.total_processing_time
             },
             'optimization_results': optimizer_stats,
+            'slice_ingestion': self.slice_ingestor.get_statistics(),
             'event_bus_stats': self.event_bus.get_statistics(),
             'performance_targets': {
                 'target_improvement_pct': 20.0,
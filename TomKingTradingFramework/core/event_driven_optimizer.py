@@ -5,6 +5,7 @@ from typing import Dict, List, Callable, Any, Optional
 from core.base_component import BaseComponent
 from core.event_bus import EventBus, EventType, Event
 from core.central_greeks_service import CentralGreeksService
+from core.slice_ingestion import SliceIngestor
 # endregion
 
 class EventDrivenOptimizer(BaseComponent):
@@ -49,6 +50,9 @@ class EventDrivenOptimizer(BaseComponent):
         self.pending_risk_checks = []
         self.last_batch_process = algorithm.Time
         
+        # Shared Slice -> vector ingestion (one pass per slice, reused by EventDrivenOnData)
+        self.slice_ingestor = SliceIngestor(algorithm)
+        
         # Performance baselines (to measure improvement)
         self.baseline_metrics = {
             'avg_ondata_time_ms': 0.0,
@@ -280,6 +284,7 @@ class EventDrivenOptimizer(BaseComponent):
         
         start_time = datetime.now()
         optimizations_applied = []
+        self.slice_ingestor.ingest(data)
         
         # 1. Skip processing if no significant data changes
         if not self._has_significant_data_changes(data):
@@ -318,33 +323,15 @@ class EventDrivenOptimizer(BaseComponent):
     def _has_significant_data_changes(self, data) -> bool:
         """Check if data contains significant changes worth processing"""
         
-        # Check for significant price movements
-        significant_changes = 0
-        for symbol in data.Keys:
-            if symbol in data.Bars:
-                bar = data.Bars[symbol]
-                # Simple volatility check
-                if hasattr(bar, 'Open') and hasattr(bar, 'Close'):
-                    change_pct = abs(bar.Close - bar.Open) / bar.Open if bar.Open > 0 else 0
-                    if change_pct > 0.001:  # 0.1% change threshold
-                        significant_changes += 1
-        
-        return significant_changes > 0
+        # Intrabar move (|Close - Open| / Open) over the ingested TradeBars
+        self.slice_ingestor.ingest(data)
+        return bool((self.slice_ingestor.intrabar_change_pct() > 0.001).any())  # 0.1% change threshold
     
     def _extract_market_updates(self, data) -> Dict[str, float]:
         """Extract market price updates from data"""
         
-        updates = {}
-        for symbol in data.Keys:
-            if symbol in data.Bars:
-                updates[str(symbol)] = data.Bars[symbol].Close
-            elif symbol in data.QuoteBars:
-                updates[str(symbol)] = data.QuoteBars[symbol].Close
-            elif symbol in data.Ticks:
-                if data.Ticks[symbol]:
-                    updates[str(symbol)] = data.Ticks[symbol][-1].Price
-        
-        return updates
+        self.slice_ingestor.ingest(data)
+        return self.slice_ingestor.prices_by_symbol()
     
     def _batch_market_updates(self, market_updates: Dict[str, float]):
         """Batch process market updates for efficiency"""
@@ -390,18 +377,15 @@ class EventDrivenOptimizer(BaseComponent):
             if holding.Type == SecurityType.Option and holding.Invested:
                 underlying_symbols.add(str(holding.Symbol.Underlying))
         
-        significant_underlying_changes = 0
-        for symbol in data.Keys:
-            symbol_str = str(symbol)
-            if symbol_str in underlying_symbols:
-                # Check for significant change
-                if symbol in data.Bars:
-                    bar = data.Bars[symbol]
-                    change_pct = abs(bar.Close - bar.Open) / bar.Open if bar.Open > 0 else 0
-                    if change_pct > 0.005:  # 0.5% change
-                        significant_underlying_changes += 1
-        
-        return significant_underlying_changes > 0
+        ingestor = self.slice_ingestor
+        ingestor.ingest(data)
+        underlying_slots = [ingestor.slot_for_symbol_str(s) for s in underlying_symbols]
+        underlying_slots = [slot for slot in underlying_slots if slot is not None]
+        if not underlying_slots:
+            return False
+        
+        # 0.5% intrabar change on any held underlying
+        return bool((ingestor.intrabar_change_pct()[underlying_slots] > 0.005).any())
     
     def _update_baseline_metrics(self, processing_time_ms: float, optimizations: List[str]):
         """Update baseline performance metrics"""
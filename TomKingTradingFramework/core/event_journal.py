@@ -0,0 +1,465 @@
+# region imports
+from AlgorithmImports import *
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+from datetime import datetime, date, timedelta
+from enum import Enum
+import base64
+import json
+import os
+import struct
+import time
+import uuid
+import zlib
+from core.event_bus import Event, EventType
+# endregion
+
+
+class JournalRecord:
+    """Decoded journal entry - one published event"""
+
+    __slots__ = ('timestamp', 'event_type', 'source', 'correlation_id', 'hop_count', 'data')
+
+    def __init__(self, timestamp: datetime, event_type: str, source: str,
+                 correlation_id: str, hop_count: int, data: Dict[str, Any]):
+        self.timestamp = timestamp
+        self.event_type = event_type  # EventType.value
+        self.source = source
+        self.correlation_id = correlation_id
+        self.hop_count = hop_count
+        self.data = data
+
+    def __repr__(self):
+        return f"JournalRecord({self.event_type}, source={self.source}, correlation={self.correlation_id}, ts={self.timestamp})"
+
+
+class EventJournalCodec:
+    """
+    Compact binary encoding for journal segments
+
+    Segment layout: MAGIC, then a stream of records.
+    - String record: kind(1) | id(u16) | len(u16) | utf-8 bytes
+      Event types and sources are interned per segment so each event only
+      carries two small integer ids.
+    - Event record: kind(2|3) | ts_us(i64) | hops(u8) | type_id(u16) | source_id(u16)
+      | corr_len(u8) | payload_len(u32) | correlation id | payload
+      Kind 3 marks a zlib-compressed JSON payload.
+
+    Every segment is self-contained (its own string table), so any single
+    segment can be replayed without the ones before it.
+    """
+
+    MAGIC = b'TKEJ\x01'
+    KIND_STRING = 1
+    KIND_EVENT = 2
+    KIND_EVENT_COMPRESSED = 3
+
+    _STRING_HEADER = struct.Struct('<BHH')
+    _EVENT_HEADER = struct.Struct('<BqBHHBI')
+
+    EPOCH = datetime(1970, 1, 1)
+    COMPRESS_THRESHOLD_BYTES = 512
+
+    def __init__(self):
+        self._string_ids = {}
+        self._strings = []
+
+    def reset(self):
+        """Start a new segment (string table is per segment)"""
+        self._string_ids = {}
+        self._strings = []
+
+    def _intern(self, value: str, out: bytearray) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            encoded = value.encode('utf-8')
+            self._string_ids[value] = string_id
+            self._strings.append(value)
+            out += self._STRING_HEADER.pack(self.KIND_STRING, string_id, len(encoded))
+            out += encoded
+        return string_id
+
+    def encode(self, timestamp: datetime, event_type: str, source: str,
+               correlation_id: str, hop_count: int, data: Dict[str, Any]) -> bytes:
+        """Encode a single event, including any new string-table entries"""
+
+        out = bytearray()
+        type_id = self._intern(event_type, out)
+        source_id = self._intern(source or "", out)
+
+        payload = json.dumps(data or {}, separators=(',', ':'), default=_encode_value).encode('utf-8')
+        kind = self.KIND_EVENT
+        if len(payload) >= self.COMPRESS_THRESHOLD_BYTES:
+            payload = zlib.compress(payload)
+            kind = self.KIND_EVENT_COMPRESSED
+
+        correlation = (correlation_id or "").encode('ascii', 'replace')[:255]
+        ts_us = _to_epoch_us(timestamp, self.EPOCH)
+
+        out += self._EVENT_HEADER.pack(kind, ts_us, min(hop_count, 255), type_id, source_id,
+                                       len(correlation), len(payload))
+        out += correlation
+        out += payload
+        return bytes(out)
+
+    @classmethod
+    def decode_segment(cls, blob: bytes) -> Iterator[JournalRecord]:
+        """Decode every event in a segment, tolerating a truncated tail"""
+
+        if not blob.startswith(cls.MAGIC):
+            raise ValueError("Not an event journal segment (bad magic)")
+
+        strings = {}
+        view = memoryview(blob)
+        offset = len(cls.MAGIC)
+        end = len(blob)
+
+        while offset < end:
+            kind = blob[offset]
+
+            if kind == cls.KIND_STRING:
+                if offset + cls._STRING_HEADER.size > end:
+                    return  # Truncated tail (crash mid-write)
+                _, string_id, length = cls._STRING_HEADER.unpack_from(view, offset)
+                offset += cls._STRING_HEADER.size
+                if offset + length > end:
+                    return
+                strings[string_id] = bytes(view[offset:offset + length]).decode('utf-8')
+                offset += length
+
+            elif kind in (cls.KIND_EVENT, cls.KIND_EVENT_COMPRESSED):
+                if offset + cls._EVENT_HEADER.size > end:
+                    return
+                _, ts_us, hops, type_id, source_id, corr_len, payload_len = \
+                    cls._EVENT_HEADER.unpack_from(view, offset)
+                offset += cls._EVENT_HEADER.size
+                if offset + corr_len + payload_len > end:
+                    return
+                correlation_id = bytes(view[offset:offset + corr_len]).decode('ascii')
+                offset += corr_len
+                payload = bytes(view[offset:offset + payload_len])
+                offset += payload_len
+
+                if kind == cls.KIND_EVENT_COMPRESSED:
+                    payload = zlib.decompress(payload)
+
+                yield JournalRecord(
+                    timestamp=cls.EPOCH + timedelta(microseconds=ts_us),
+                    event_type=strings[type_id],
+                    source=strings[source_id],
+                    correlation_id=correlation_id,
+                    hop_count=hops,
+                    data=json.loads(payload.decode('utf-8'), object_hook=_decode_value)
+                )
+            else:
+                raise ValueError(f"Corrupt event journal segment: unknown record kind {kind} at offset {offset}")
+
+
+def _to_epoch_us(timestamp, epoch: datetime) -> int:
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.now()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None)
+    delta = timestamp - epoch
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _encode_value(value):
+    """JSON fallback for values commonly found in event data"""
+    if isinstance(value, datetime):
+        return {'__dt__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'__td__': value.total_seconds()}
+    if isinstance(value, Enum):
+        return value.value if isinstance(value.value, (str, int, float)) else value.name
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)  # Symbols and other QC objects
+
+
+def _decode_value(obj: Dict):
+    if len(obj) == 1:
+        if '__dt__' in obj:
+            return datetime.fromisoformat(obj['__dt__'])
+        if '__date__' in obj:
+            return date.fromisoformat(obj['__date__'])
+        if '__td__' in obj:
+            return timedelta(seconds=obj['__td__'])
+    return obj
+
+
+class FileSegmentStore:
+    """Append-only journal segments as files in a directory (offline/research use)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, segment_name: str, chunk: bytes):
+        with open(os.path.join(self.directory, segment_name), 'ab') as handle:
+            handle.write(chunk)
+
+    def read(self, segment_name: str) -> bytes:
+        with open(os.path.join(self.directory, segment_name), 'rb') as handle:
+            return handle.read()
+
+    def segments(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.tkej'))
+
+
+class ObjectStoreSegmentStore:
+    """
+    Journal segments in the QuantConnect ObjectStore
+
+    ObjectStore keys can't be appended to, so the open segment is kept in memory
+    and re-saved on each flush. The journal rolls segments at MAX_SEGMENT_BYTES
+    for this store, so a save never rewrites more than one small segment and
+    sealed segments are never rewritten.
+    """
+
+    MAX_SEGMENT_BYTES = 64 * 1024
+
+    def __init__(self, algorithm, key_prefix: str = "event_journal"):
+        self.algo = algorithm
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}/index"
+        self._open_segments = {}  # segment_name -> bytearray
+        self._index = self._load_index()
+
+    def _load_index(self) -> List[str]:
+        try:
+            if self.algo.ObjectStore.ContainsKey(self.index_key):
+                return json.loads(self.algo.ObjectStore.Read(self.index_key))
+        except Exception as e:
+            self.algo.Error(f"[EventJournal] Failed to load segment index: {e}")
+        return []
+
+    def append(self, segment_name: str, chunk: bytes):
+        buffer = self._open_segments.get(segment_name)
+        if buffer is None:
+            buffer = bytearray()
+            self._open_segments[segment_name] = buffer
+            self._index.append(segment_name)
+            self.algo.ObjectStore.Save(self.index_key, json.dumps(self._index))
+        buffer += chunk
+        self.algo.ObjectStore.Save(f"{self.key_prefix}/{segment_name}",
+                                   base64.b64encode(bytes(buffer)).decode('ascii'))
+
+    def seal(self, segment_name: str):
+        """Drop the in-memory copy of a finished segment"""
+        self._open_segments.pop(segment_name, None)
+
+    def read(self, segment_name: str) -> bytes:
+        if segment_name in self._open_segments:
+            return bytes(self._open_segments[segment_name])
+        return base64.b64decode(self.algo.ObjectStore.Read(f"{self.key_prefix}/{segment_name}"))
+
+    def segments(self) -> List[str]:
+        return list(self._index)
+
+
+class EventJournal:
+    """
+    Append-only binary journal of every event published on the EventBus
+
+    Unlike EventBus.event_history (a 1000-entry deque lost on restart), the journal
+    survives restarts and can be fed back through a fresh bus with EventReplayDriver
+    to reproduce production incidents or to profile subscribers offline.
+
+    Records are buffered and written every `flush_every` events; segments rotate at
+    `max_segment_bytes`, capped by the store's MAX_SEGMENT_BYTES when it re-saves
+    whole segments. Journal failures never propagate into EventBus.publish.
+    """
+
+    def __init__(self, algorithm, store=None, max_segment_bytes: int = 2 * 1024 * 1024,
+                 flush_every: int = 256, session_id: str = None):
+        self.algo = algorithm
+        self.store = store if store is not None else ObjectStoreSegmentStore(algorithm)
+        self.max_segment_bytes = min(max_segment_bytes, getattr(self.store, 'MAX_SEGMENT_BYTES', max_segment_bytes))
+        self.flush_every = max(1, flush_every)
+
+        if session_id is None:
+            # Algorithm time keeps segments in replay order; the suffix keeps a
+            # rerun of the same backtest from reusing the previous run's names
+            now = algorithm.Time if hasattr(algorithm, 'Time') else datetime.now()
+            session_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.session_id = session_id
+        self._existing_segments = set(self.store.segments())
+
+        self.codec = EventJournalCodec()
+        self.segment_sequence = 0
+        self.current_segment = None
+        self.current_segment_bytes = 0
+        self._pending = bytearray()
+        self._pending_count = 0
+        self.enabled = True
+
+        self.stats = {
+            'events_recorded': 0,
+            'bytes_written': 0,
+            'segments_written': 0,
+            'flushes': 0,
+            'record_errors': 0
+        }
+
+        self._open_new_segment()
+
+    def _open_new_segment(self):
+        if self.current_segment is not None and hasattr(self.store, 'seal'):
+            self.store.seal(self.current_segment)
+
+        # Never append to a segment an earlier session wrote: a second MAGIC
+        # header mid-file would make the whole segment undecodable
+        self.segment_sequence += 1
+        while f"{self.session_id}_{self.segment_sequence:05d}.tkej" in self._existing_segments:
+            self.segment_sequence += 1
+        self.current_segment = f"{self.session_id}_{self.segment_sequence:05d}.tkej"
+        self.current_segment_bytes = len(EventJournalCodec.MAGIC)
+        self.codec.reset()
+        self._pending = bytearray(EventJournalCodec.MAGIC)
+        self._pending_count = 0
+        self.stats['segments_written'] += 1
+
+    def record(self, event: Event):
+        """Append a published event to the journal"""
+
+        if not self.enabled:
+            return
+
+        try:
+            encoded = self.codec.encode(
+                event.timestamp, event.event_type.value, event.source,
+                event.correlation_id, event.hop_count, event.data
+            )
+
+            # Rotate before this record would overflow the segment
+            if (self.current_segment_bytes + len(encoded) > self.max_segment_bytes
+                    and self.current_segment_bytes > len(EventJournalCodec.MAGIC)):
+                self.flush()
+                self._open_new_segment()
+                encoded = self.codec.encode(
+                    event.timestamp, event.event_type.value, event.source,
+                    event.correlation_id, event.hop_count, event.data
+                )
+
+            self._pending += encoded
+            self._pending_count += 1
+            self.current_segment_bytes += len(encoded)
+            self.stats['events_recorded'] += 1
+
+            if self._pending_count >= self.flush_every:
+                self.flush()
+
+        except Exception as e:
+            self.stats['record_errors'] += 1
+            if self.stats['record_errors'] <= 5:  # Avoid flooding logs if storage is down
+                self.algo.Error(f"[EventJournal] Failed to record {event.event_type.value}: {e}")
+
+    def flush(self):
+        """Write buffered records to the current segment"""
+
+        if not self._pending:
+            return
+
+        chunk = bytes(self._pending)
+        self._pending = bytearray()
+        self._pending_count = 0
+
+        try:
+            self.store.append(self.current_segment, chunk)
+            self.stats['bytes_written'] += len(chunk)
+            self.stats['flushes'] += 1
+        except Exception as e:
+            self.stats['record_errors'] += 1
+            self.algo.Error(f"[EventJournal] Failed to flush segment {self.current_segment}: {e}")
+
+    def close(self):
+        """Flush and stop recording"""
+        self.flush()
+        self.enabled = False
+
+    def read_records(self, segments: List[str] = None) -> Iterator[JournalRecord]:
+        """Iterate recorded events in publish order"""
+
+        self.flush()
+        for segment_name in (segments if segments is not None else self.store.segments()):
+            yield from EventJournalCodec.decode_segment(self.store.read(segment_name))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['current_segment'] = self.current_segment
+        stats['current_segment_bytes'] = self.current_segment_bytes
+        stats['avg_bytes_per_event'] = (
+            stats['bytes_written'] / stats['events_recorded'] if stats['events_recorded'] else 0.0
+        )
+        return stats
+
+
+class EventReplayDriver:
+    """
+    Feeds a recorded journal back through a fresh EventBus at full speed
+
+    Handlers see the original timestamps, sources and correlation ids. Wire the
+    managers under test to `event_bus` before calling replay(). Set advance_clock
+    for offline algorithm stand-ins whose Time attribute is writable, so handlers
+    that read algorithm.Time observe the recorded clock.
+    """
+
+    def __init__(self, event_bus, advance_clock: bool = False):
+        self.event_bus = event_bus
+        self.advance_clock = advance_clock
+
+    def replay(self, records: Iterable[JournalRecord], event_types: List[EventType] = None,
+               limit: int = None) -> Dict[str, Any]:
+        """Replay records in order and return throughput/handler statistics"""
+
+        wanted = {t.value for t in event_types} if event_types else None
+        algorithm = self.event_bus.algorithm
+        errors_before = self.event_bus.stats['handler_errors']
+
+        replayed = 0
+        skipped = 0
+        failed = 0
+        by_type = {}
+        start = time.perf_counter()
+
+        for record in records:
+            if limit is not None and replayed >= limit:
+                break
+
+            if wanted is not None and record.event_type not in wanted:
+                skipped += 1
+                continue
+
+            try:
+                event_type = EventType(record.event_type)
+            except ValueError:
+                skipped += 1  # Event type no longer exists in this build
+                continue
+
+            event = Event(event_type, record.data, record.source,
+                          record.timestamp, record.correlation_id)
+            event.hop_count = record.hop_count
+
+            if self.advance_clock:
+                algorithm.Time = record.timestamp
+
+            if not self.event_bus._publish_event(event):
+                failed += 1
+
+            replayed += 1
+            by_type[record.event_type] = by_type.get(record.event_type, 0) + 1
+
+        elapsed = time.perf_counter() - start
+
+        return {
+            'events_replayed': replayed,
+            'events_skipped': skipped,
+            'events_with_handler_failures': failed,
+            'handler_errors': self.event_bus.stats['handler_errors'] - errors_before,
+            'elapsed_seconds': elapsed,
+            'events_per_second': replayed / elapsed if elapsed > 0 else 0.0,
+            'events_by_type': by_type
+        }
@@ -0,0 +1,208 @@
+# region imports
+from AlgorithmImports import *
+from collections import deque
+from enum import IntEnum
+from typing import Dict, Any, Optional
+from config.constants import TradingConstants
+# endregion
+
+
+class LogLevel(IntEnum):
+    """Log levels - a record is emitted when its level >= the component threshold"""
+    TRACE = 5
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
+class LogPipeline:
+    """
+    Level-gated, rate-limited logging facade for hot paths
+
+    Messages use %-style arguments and are only formatted when emitted, so a
+    record below the threshold costs one tuple in the flight recorder and no
+    string work. Emitted lines are rate limited per component per algorithm
+    minute (errors are never limited); the number suppressed is reported when the
+    window rolls over.
+
+    The flight recorder is a fixed-size ring of recent records at every level.
+    When an error is logged the most recent records are formatted and written out
+    after it, so quiet backtests still show what led up to a failure.
+
+    Defaults to WARNING in backtests and INFO live; per-component thresholds
+    override the global level (e.g. set_level(LogLevel.DEBUG, 'COORDINATOR')).
+    """
+
+    def __init__(self, algorithm, level: Optional[LogLevel] = None,
+                 recorder_size: int = TradingConstants.LOG_FLIGHT_RECORDER_SIZE,
+                 dump_lines: int = TradingConstants.LOG_FLIGHT_RECORDER_DUMP_LINES,
+                 rate_limit_per_minute: int = TradingConstants.LOG_RATE_LIMIT_PER_MINUTE):
+        self.algo = algorithm
+        if level is None:
+            level = LogLevel.INFO if getattr(algorithm, 'LiveMode', False) else LogLevel.WARNING
+        self.level = level
+        self.component_levels = {}
+        self.dump_lines = dump_lines
+        self.rate_limit_per_minute = rate_limit_per_minute
+
+        # (time, level, component, message, args) - formatted only when dumped
+        self._recorder = deque(maxlen=recorder_size)
+
+        # component -> [minute_key, emitted_in_window, suppressed_in_window]
+        self._rate_windows = {}
+
+        self.stats = {
+            'records': 0,
+            'emitted': 0,
+            'gated': 0,
+            'rate_limited': 0,
+            'recorder_dumps': 0
+        }
+
+    # Configuration
+
+    def set_level(self, level: LogLevel, component: Optional[str] = None):
+        if component is None:
+            self.level = level
+        else:
+            self.component_levels[component] = level
+
+    def is_enabled(self, level: LogLevel, component: Optional[str] = None) -> bool:
+        """Cheap guard for callers that need to build expensive arguments"""
+        return level >= self.component_levels.get(component, self.level)
+
+    def bind(self, component: str) -> 'ComponentLog':
+        return ComponentLog(self, component)
+
+    # Logging
+
+    def log(self, level: LogLevel, component: str, message: str, *args):
+        self.stats['records'] += 1
+        self._recorder.append((self.algo.Time, level, component, message, args))
+
+        if level < self.component_levels.get(component, self.level):
+            self.stats['gated'] += 1
+            return
+
+        if level >= LogLevel.ERROR:
+            self._write(level, component, message, args)
+            self.dump_flight_recorder(exclude_last=True)
+        elif self._within_rate_limit(component):
+            self._write(level, component, message, args)
+
+    def trace(self, component: str, message: str, *args):
+        self.log(LogLevel.TRACE, component, message, *args)
+
+    def debug(self, component: str, message: str, *args):
+        self.log(LogLevel.DEBUG, component, message, *args)
+
+    def info(self, component: str, message: str, *args):
+        self.log(LogLevel.INFO, component, message, *args)
+
+    def warning(self, component: str, message: str, *args):
+        self.log(LogLevel.WARNING, component, message, *args)
+
+    def error(self, component: str, message: str, *args):
+        self.log(LogLevel.ERROR, component, message, *args)
+
+    def dump_flight_recorder(self, exclude_last: bool = False):
+        """Write out the most recent records and clear the recorder"""
+
+        records = list(self._recorder)
+        if exclude_last and records:
+            records.pop()
+        self._recorder.clear()
+        if not records:
+            return
+
+        records = records[-self.dump_lines:]
+        self.stats['recorder_dumps'] += 1
+        self.algo.Log(f"[FlightRecorder] Last {len(records)} records:")
+        for at, level, component, message, args in records:
+            self.algo.Log(f"[FlightRecorder] {at} {level.name} [{component}] {self._format(message, args)}")
+
+    # Internals
+
+    def _within_rate_limit(self, component: str) -> bool:
+        now = self.algo.Time
+        minute_key = now.toordinal() * 1440 + now.hour * 60 + now.minute
+
+        window = self._rate_windows.get(component)
+        if window is None:
+            window = [minute_key, 0, 0]
+            self._rate_windows[component] = window
+        elif window[0] != minute_key:
+            if window[2]:
+                self.algo.Debug(f"[{component}] {window[2]} log lines suppressed by rate limit")
+            window[0], window[1], window[2] = minute_key, 0, 0
+
+        if window[1] >= self.rate_limit_per_minute:
+            window[2] += 1
+            self.stats['rate_limited'] += 1
+            return False
+        window[1] += 1
+        return True
+
+    def _write(self, level: LogLevel, component: str, message: str, args: tuple):
+        self.stats['emitted'] += 1
+        line = f"[{component}] {self._format(message, args)}"
+        if level >= LogLevel.ERROR:
+            self.algo.Error(line)
+        elif level >= LogLevel.INFO:
+            self.algo.Log(line)
+        else:
+            self.algo.Debug(line)
+
+    @staticmethod
+    def _format(message: str, args: tuple) -> str:
+        if not args:
+            return message
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return f"{message} {args}"
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['level'] = self.level.name
+        stats['recorder_depth'] = len(self._recorder)
+        return stats
+
+
+class ComponentLog:
+    """LogPipeline bound to one component name"""
+
+    __slots__ = ('pipeline', 'component')
+
+    def __init__(self, pipeline: LogPipeline, component: str):
+        self.pipeline = pipeline
+        self.component = component
+
+    def is_enabled(self, level: LogLevel) -> bool:
+        return self.pipeline.is_enabled(level, self.component)
+
+    def trace(self, message: str, *args):
+        self.pipeline.log(LogLevel.TRACE, self.component, message, *args)
+
+    def debug(self, message: str, *args):
+        self.pipeline.log(LogLevel.DEBUG, self.component, message, *args)
+
+    def info(self, message: str, *args):
+        self.pipeline.log(LogLevel.INFO, self.component, message, *args)
+
+    def warning(self, message: str, *args):
+        self.pipeline.log(LogLevel.WARNING, self.component, message, *args)
+
+    def error(self, message: str, *args):
+        self.pipeline.log(LogLevel.ERROR, self.component, message, *args)
+
+
+def get_log_pipeline(algorithm) -> LogPipeline:
+    """The algorithm's shared LogPipeline, created on first use"""
+
+    pipeline = getattr(algorithm, 'log_pipeline', None)
+    if not isinstance(pipeline, LogPipeline):
+        pipeline = LogPipeline(algorithm)
+        algorithm.log_pipeline = pipeline
+    return pipeline
@@ -95,6 +95,7 @@ class ManagerFactory:
         from core.event_bus import EventBus
         from core.central_greeks_service import CentralGreeksService
         from core.event_driven_optimizer import EventDrivenOptimizer
+        from core.schedule_wheel import ScheduleWheel
         
         # PHASE 6: 5-STAGE INITIALIZATION SYSTEM (Circular Dependency Safe)
         # Stage 1: Independent components (no dependencies)
@@ -186,6 +187,18 @@ class ManagerFactory:
                 tier=2
             ),
             
+            # Central schedule wheel for periodic OnData work (replaces Time.minute % N polling)
+            'schedule_wheel': ManagerConfig(
+                name='schedule_wheel',
+                class_type=ScheduleWheel,
+                dependencies=['event_bus'],  # Stage 2: Central timing for periodic OnData work
+                required_methods=['every', 'cron', 'tick', 'get_statistics'],
+                initialization_args=(self.algo,),
+                initialization_kwargs={'event_bus': 'event_bus'},
+                critical=True,
+                tier=2
+            ),
+            
             'unified_risk_manager': ManagerConfig(
                 name='unified_risk_manager',
                 class_type=UnifiedRiskManager,
@@ -0,0 +1,144 @@
+# region imports
+from AlgorithmImports import *
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping
+# endregion
+
+
+@dataclass(frozen=True)
+class MarketContext:
+    """
+    Immutable per-slice market snapshot shared by every strategy
+
+    Built once per slice by MarketContextBuilder and handed to
+    BaseStrategyWithState.execute(), so VIX, regime, account phase, buying power
+    and underlying prices are read once per slice instead of once per strategy.
+    Mapping fields are read-only views.
+
+    Portfolio Greeks and Securities price fallbacks are resolved lazily on first
+    use and memoized for the rest of the slice; the memo is the only mutable
+    state and is never visible through the public fields.
+    """
+
+    time: datetime
+    vix: float
+    vix_regime: Optional[str]
+    account_phase: Optional[Any]
+    portfolio_value: float
+    buying_power: float
+    underlying_prices: Mapping[str, float]
+    option_chains: Mapping[str, Any]
+    futures_chains: Mapping[str, Any]
+    is_warming_up: bool
+    data: Any = field(default=None, repr=False, compare=False)
+
+    # Lazy per-slice memo (Greeks, Securities price fallbacks)
+    _algorithm: Any = field(default=None, repr=False, compare=False)
+    _memo: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def price(self, symbol) -> float:
+        """Underlying price from the slice, falling back to Securities (memoized)"""
+
+        symbol_str = str(symbol)
+        price = self.underlying_prices.get(symbol_str)
+        if price is not None:
+            return price
+
+        key = 'price:' + symbol_str
+        if key not in self._memo:
+            self._memo[key] = self._algorithm.Securities[symbol].Price
+        return self._memo[key]
+
+    def chain(self, canonical_symbol) -> Optional[Any]:
+        """Option chain handle for this slice (None if not present)"""
+        return self.option_chains.get(str(canonical_symbol))
+
+    @property
+    def portfolio_greeks(self) -> Dict[str, float]:
+        if 'portfolio_greeks' not in self._memo:
+            greeks_service = getattr(self._algorithm, 'greeks_monitor', None)
+            greeks = greeks_service.get_portfolio_greeks() if greeks_service is not None else {}
+            self._memo['portfolio_greeks'] = MappingProxyType(dict(greeks or {}))
+        return self._memo['portfolio_greeks']
+
+
+class MarketContextBuilder:
+    """Builds (and caches) the MarketContext for the current slice"""
+
+    def __init__(self, algorithm):
+        self.algo = algorithm
+        self._current = None
+        self._current_time = None
+
+        self.stats = {
+            'contexts_built': 0,
+            'context_reuses': 0
+        }
+
+    def build(self, data, vix: Optional[float] = None, regime: Optional[str] = None) -> MarketContext:
+        """
+        Snapshot for the current slice. Repeated calls within the same slice return
+        the same instance; vix/regime already fetched by the caller are reused.
+        """
+
+        now = self.algo.Time
+        if self._current is not None and self._current_time == now:
+            self.stats['context_reuses'] += 1
+            return self._current
+
+        vix_manager = getattr(self.algo, 'vix_manager', None)
+        if vix is None and vix_manager is not None:
+            vix = vix_manager.get_current_vix()
+        if regime is None and vix_manager is not None and hasattr(vix_manager, 'get_market_regime'):
+            regime = vix_manager.get_market_regime()
+        account_phase = None
+        if vix_manager is not None and hasattr(vix_manager, 'get_account_phase'):
+            account_phase = vix_manager.get_account_phase()
+
+        portfolio = self.algo.Portfolio
+
+        self._current = MarketContext(
+            time=now,
+            vix=vix or 0.0,
+            vix_regime=regime,
+            account_phase=account_phase,
+            portfolio_value=portfolio.TotalPortfolioValue,
+            buying_power=portfolio.MarginRemaining,
+            underlying_prices=MappingProxyType(self._extract_prices(data)),
+            option_chains=MappingProxyType(self._extract_chains(data, 'OptionChains')),
+            futures_chains=MappingProxyType(self._extract_chains(data, 'FutureChains')),
+            is_warming_up=self.algo.IsWarmingUp,
+            data=data,
+            _algorithm=self.algo
+        )
+        self._current_time = now
+        self.stats['contexts_built'] += 1
+        return self._current
+
+    def _extract_prices(self, data) -> Dict[str, float]:
+        if data is None:
+            return {}
+
+        # Reuse the vectorized slice ingestion when the optimizer already scanned this slice
+        optimizer = getattr(self.algo, 'event_driven_optimizer', None)
+        ingestor = getattr(optimizer, 'slice_ingestor', None)
+        if ingestor is not None:
+            ingestor.ingest(data)
+            return ingestor.prices_by_symbol()
+
+        prices = {}
+        for symbol, bar in data.Bars.items():
+            prices[str(symbol)] = bar.Close
+        return prices
+
+    @staticmethod
+    def _extract_chains(data, attribute: str) -> Dict[str, Any]:
+        chains = getattr(data, attribute, None) if data is not None else None
+        if not chains:
+            return {}
+        return {str(symbol): chain for symbol, chain in chains.items()}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return self.stats.copy()
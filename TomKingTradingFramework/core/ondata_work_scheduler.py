@@ -0,0 +1,208 @@
+# region imports
+from AlgorithmImports import *
+from datetime import timedelta
+from enum import Enum
+from typing import Dict, List, Callable, Any, Optional
+import time
+from config.constants import TradingConstants
+# endregion
+
+
+class WorkPriority(Enum):
+    """OnData work priority - lower value runs first"""
+    CRITICAL = 0     # Risk/safety work - always runs this slice, never deferred
+    NORMAL = 1       # Runs this slice if budget allows, otherwise carried over
+    DEFERRABLE = 2   # Maintenance, analytics, logging, dashboard - fills quiet slices
+
+
+class WorkItem:
+    """A unit of OnData work waiting for a slice with enough budget"""
+
+    __slots__ = ('name', 'callback', 'priority', 'submitted_at', 'submitted_slice', 'deferrals')
+
+    def __init__(self, name: str, callback: Callable[[], Any], priority: WorkPriority,
+                 submitted_at, submitted_slice: int):
+        self.name = name
+        self.callback = callback
+        self.priority = priority
+        self.submitted_at = submitted_at
+        self.submitted_slice = submitted_slice
+        self.deferrals = 0
+
+
+class OnDataWorkScheduler:
+    """
+    Time-budgeted OnData work scheduler
+
+    Each slice gets a wall-clock budget. Work submitted during the slice is run in
+    priority order: CRITICAL always runs, everything else runs while the budget
+    (less the task's observed average cost) allows and is otherwise carried over to
+    the next slice. Re-submitting a pending task by name replaces the queued
+    callback instead of stacking duplicates, so periodic work that is already
+    waiting does not pile up during busy periods.
+
+    Starvation guarantee: a task that has been deferred for max_deferral_slices
+    slices, or has waited max_deferral_time of algorithm time, is promoted and
+    runs on the next slice regardless of budget.
+    """
+
+    def __init__(self, algorithm,
+                 budget_ms: float = TradingConstants.ONDATA_TIME_BUDGET_MS,
+                 max_deferral_slices: int = TradingConstants.ONDATA_MAX_DEFERRAL_SLICES,
+                 max_deferral_time: timedelta = timedelta(minutes=TradingConstants.ONDATA_MAX_DEFERRAL_MINUTES)):
+        self.algorithm = algorithm
+        self.budget_ms = budget_ms
+        self.max_deferral_slices = max_deferral_slices
+        self.max_deferral_time = max_deferral_time
+
+        self.pending = {}  # name -> WorkItem (insertion order = FIFO within a priority)
+        self.slice_number = 0
+        self._slice_start = None  # perf_counter at the top of OnData (set by begin_slice)
+
+        # Exponentially weighted average run time per task name, used to avoid
+        # starting work that would blow through the remaining budget
+        self.cost_estimates_ms = {}
+        self.cost_alpha = 0.2
+
+        self.stats = {
+            'slices': 0,
+            'tasks_run': 0,
+            'tasks_deferred': 0,
+            'tasks_forced': 0,
+            'tasks_coalesced': 0,
+            'task_errors': 0,
+            'budget_overruns': 0,
+            'max_slice_ms': 0.0,
+            'total_slice_ms': 0.0,
+            'max_deferrals_observed': 0
+        }
+
+    def submit(self, name: str, callback: Callable[[], Any],
+               priority: WorkPriority = WorkPriority.NORMAL) -> bool:
+        """
+        Queue work for the current slice
+
+        Returns:
+            bool: False if a pending task with the same name was replaced
+        """
+
+        existing = self.pending.get(name)
+        if existing is not None:
+            # Keep the original wait time so coalescing never resets starvation tracking
+            existing.callback = callback
+            if priority.value < existing.priority.value:
+                existing.priority = priority
+            self.stats['tasks_coalesced'] += 1
+            return False
+
+        self.pending[name] = WorkItem(name, callback, priority, self.algorithm.Time, self.slice_number)
+        return True
+
+    def begin_slice(self):
+        """Start the slice clock; call first thing in OnData so the budget covers the whole slice"""
+        self._slice_start = time.perf_counter()
+
+    def run_slice(self) -> Dict[str, Any]:
+        """Run queued work within whatever is left of the slice budget"""
+
+        self.slice_number += 1
+        self.stats['slices'] += 1
+
+        # Measured from begin_slice when OnData called it, otherwise from now
+        start = self._slice_start if self._slice_start is not None else time.perf_counter()
+        self._slice_start = None
+        deadline = start + self.budget_ms / 1000.0
+        now = self.algorithm.Time
+
+        ran = []
+        deferred = []
+
+        for item in self._ordered_items(now):
+            forced = self._is_starved(item, now)
+
+            if item.priority is not WorkPriority.CRITICAL and not forced:
+                remaining_ms = (deadline - time.perf_counter()) * 1000.0
+                if remaining_ms <= self.cost_estimates_ms.get(item.name, 0.0):
+                    item.deferrals += 1
+                    deferred.append(item.name)
+                    continue
+
+            del self.pending[item.name]
+            if forced and item.priority is not WorkPriority.CRITICAL:
+                self.stats['tasks_forced'] += 1
+            self._run_item(item)
+            ran.append(item.name)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.stats['tasks_run'] += len(ran)
+        self.stats['tasks_deferred'] += len(deferred)
+        self.stats['total_slice_ms'] += elapsed_ms
+        self.stats['max_slice_ms'] = max(self.stats['max_slice_ms'], elapsed_ms)
+        if elapsed_ms > self.budget_ms:
+            self.stats['budget_overruns'] += 1
+        if self.pending:
+            self.stats['max_deferrals_observed'] = max(
+                self.stats['max_deferrals_observed'],
+                max(item.deferrals for item in self.pending.values())
+            )
+
+        return {'ran': ran, 'deferred': deferred, 'elapsed_ms': elapsed_ms}
+
+    def _ordered_items(self, now) -> List[WorkItem]:
+        """Critical first, then starved work, then by priority; FIFO within each"""
+
+        return sorted(
+            self.pending.values(),
+            key=lambda item: (
+                item.priority is not WorkPriority.CRITICAL,
+                not self._is_starved(item, now),
+                item.priority.value
+            )
+        )
+
+    def _is_starved(self, item: WorkItem, now) -> bool:
+        return (item.deferrals >= self.max_deferral_slices or
+                (now - item.submitted_at) >= self.max_deferral_time)
+
+    def _run_item(self, item: WorkItem):
+        task_start = time.perf_counter()
+        try:
+            item.callback()
+        except Exception as e:
+            self.stats['task_errors'] += 1
+            self.algorithm.Error(f"[OnDataScheduler] Task '{item.name}' failed: {e}")
+        finally:
+            cost_ms = (time.perf_counter() - task_start) * 1000.0
+            previous = self.cost_estimates_ms.get(item.name)
+            self.cost_estimates_ms[item.name] = (
+                cost_ms if previous is None
+                else self.cost_alpha * cost_ms + (1 - self.cost_alpha) * previous
+            )
+
+    def get_pending_work_report(self) -> Dict[str, Any]:
+        """Snapshot of deferred work still waiting for budget"""
+
+        now = self.algorithm.Time
+        tasks = []
+        for item in self.pending.values():
+            tasks.append({
+                'name': item.name,
+                'priority': item.priority.name,
+                'deferrals': item.deferrals,
+                'waiting_seconds': (now - item.submitted_at).total_seconds(),
+                'estimated_cost_ms': self.cost_estimates_ms.get(item.name, 0.0)
+            })
+
+        return {
+            'pending_tasks': len(tasks),
+            'estimated_pending_ms': sum(t['estimated_cost_ms'] for t in tasks),
+            'oldest_waiting_seconds': max((t['waiting_seconds'] for t in tasks), default=0.0),
+            'tasks': tasks
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['budget_ms'] = self.budget_ms
+        stats['avg_slice_ms'] = stats['total_slice_ms'] / stats['slices'] if stats['slices'] else 0.0
+        stats['pending_tasks'] = len(self.pending)
+        return stats
@@ -0,0 +1,341 @@
+# region imports
+from AlgorithmImports import *
+from datetime import datetime, timedelta
+from typing import Dict, List, Callable, Any, Optional, Iterable, Tuple
+from config.constants import TradingConstants
+from config.market_holidays import MarketHolidays
+from core.ondata_work_scheduler import WorkPriority
+# endregion
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class ScheduledJob:
+    """A registered job and the rule that produces its next due time"""
+
+    __slots__ = ('name', 'callback', 'priority', 'next_due_after', 'due', 'offset_minutes',
+                 'day_pattern', 'fire_count', 'coalesced_count', 'active')
+
+    def __init__(self, name: str, callback: Callable[[], Any], priority: WorkPriority,
+                 next_due_after: Callable[[datetime, int], datetime]):
+        self.name = name
+        self.callback = callback
+        self.priority = priority
+        self.next_due_after = next_due_after  # (after, offset_minutes) -> first due time strictly after
+        self.due = None
+        self.offset_minutes = 0
+        self.day_pattern = []  # minutes-of-day this job fires on over the next 24h (jitter accounting)
+        self.fire_count = 0
+        self.coalesced_count = 0  # periods missed during data gaps and folded into one firing
+        self.active = True
+
+
+class ScheduleWheel:
+    """
+    Central minute-resolution timing wheel for OnData-driven periodic work
+
+    Replaces per-component `Time.minute % N` checks and `last_*` timestamp
+    comparisons. Components register jobs once:
+
+        every()              fixed interval aligned to midnight (minute % N semantics)
+        cron()               minute / hour / weekday field sets
+        at_market_open()     N minutes after the open, trading days only
+        before_market_close() N minutes before the actual close, trading days only
+
+    Jobs sit in one of 1440 minute buckets. tick() is called once per slice and
+    returns immediately unless the clock has moved to a new minute; it then only
+    visits the buckets for the minutes that elapsed. A job that missed several
+    periods during a data gap (overnight, weekends) fires once and is
+    rescheduled from the current time.
+
+    Jitter control: jobs registered with jitter_minutes > 0 are shifted by up to
+    that many minutes onto the least loaded bucket, so unrelated maintenance
+    does not pile onto the same minute as risk checks or entries.
+
+    Market-relative jobs follow the exchange calendar: they skip exchange
+    holidays and time pre-close work from the session's real close on early
+    close days. Sessions come from the LEAN exchange hours (explicit, or the
+    algorithm's SPY security once it is added) and fall back to the
+    MarketHolidays table with the regular/early close constants.
+
+    Due jobs are handed to the OnDataWorkScheduler when the algorithm has one
+    (so they respect the slice budget and priority) and run inline otherwise.
+    """
+
+    def __init__(self, algorithm, event_bus=None, exchange_hours=None):
+        self.algorithm = algorithm
+        self.event_bus = event_bus
+        self.work_scheduler = getattr(algorithm, 'ondata_scheduler', None)
+        self.exchange_hours = exchange_hours  # LEAN SecurityExchangeHours; None resolves from algorithm.spy
+        self.market_holidays = MarketHolidays()
+
+        self.buckets = [[] for _ in range(MINUTES_PER_DAY)]  # minute-of-day -> [ScheduledJob]
+        self.jobs = {}  # name -> ScheduledJob
+        self.minute_load = [0] * MINUTES_PER_DAY  # registered firings per minute-of-day
+        # Absolute minute index of the last processed tick; starts at construction so
+        # jobs due before the first slice are picked up by it
+        self.last_tick_minute = self._absolute_minute(algorithm.Time) - 1
+
+        self.stats = {
+            'ticks': 0,
+            'ticks_same_minute': 0,
+            'buckets_visited': 0,
+            'jobs_fired': 0,
+            'periods_coalesced': 0,
+            'job_errors': 0
+        }
+
+    # ----- registration -----
+
+    def every(self, name: str, interval: timedelta, callback: Callable[[], Any],
+              priority: WorkPriority = WorkPriority.NORMAL, offset_minutes: int = 0,
+              jitter_minutes: int = 0) -> ScheduledJob:
+        """Run every `interval`, aligned to midnight plus offset (minute % N == offset)"""
+
+        interval_minutes = max(1, int(interval.total_seconds() // 60))
+
+        def next_due_after(after: datetime, offset: int) -> datetime:
+            day_start = after.replace(hour=0, minute=0, second=0, microsecond=0)
+            minute_of_day = (after - day_start).total_seconds() / 60.0
+            periods = int((minute_of_day - offset) // interval_minutes) + 1
+            return day_start + timedelta(minutes=periods * interval_minutes + offset)
+
+        return self._register(ScheduledJob(name, callback, priority, next_due_after),
+                              offset_minutes, jitter_minutes)
+
+    def cron(self, name: str, callback: Callable[[], Any],
+             minutes: Optional[Iterable[int]] = None, hours: Optional[Iterable[int]] = None,
+             weekdays: Optional[Iterable[int]] = None,
+             priority: WorkPriority = WorkPriority.NORMAL, jitter_minutes: int = 0) -> ScheduledJob:
+        """
+        Cron-like job. None means every value for that field; weekdays use
+        datetime.weekday() (Monday=0).
+        """
+
+        minute_set = sorted(set(minutes)) if minutes is not None else list(range(60))
+        hour_set = sorted(set(hours)) if hours is not None else list(range(24))
+        weekday_set = set(weekdays) if weekdays is not None else set(range(7))
+        times_of_day = [h * 60 + m for h in hour_set for m in minute_set]
+
+        def next_due_after(after: datetime, offset: int) -> datetime:
+            base = after - timedelta(minutes=offset)
+            day_start = base.replace(hour=0, minute=0, second=0, microsecond=0)
+            for day in range(8):
+                day_date = day_start + timedelta(days=day)
+                if day_date.weekday() not in weekday_set:
+                    continue
+                for minute_of_day in times_of_day:
+                    candidate = day_date + timedelta(minutes=minute_of_day)
+                    if candidate > base:
+                        return candidate + timedelta(minutes=offset)
+            return None
+
+        return self._register(ScheduledJob(name, callback, priority, next_due_after), 0, jitter_minutes)
+
+    def at_market_open(self, name: str, callback: Callable[[], Any], minutes_after: int = 0,
+                       priority: WorkPriority = WorkPriority.NORMAL) -> ScheduledJob:
+        """Trading days, `minutes_after` the session open"""
+
+        return self._session_job(name, callback, priority,
+                                 lambda market_open, market_close: market_open + timedelta(minutes=minutes_after))
+
+    def before_market_close(self, name: str, callback: Callable[[], Any], minutes_before: int = 15,
+                            priority: WorkPriority = WorkPriority.NORMAL) -> ScheduledJob:
+        """Trading days, `minutes_before` the session close (early closes included)"""
+
+        return self._session_job(name, callback, priority,
+                                 lambda market_open, market_close: market_close - timedelta(minutes=minutes_before))
+
+    def _session_job(self, name: str, callback: Callable[[], Any], priority: WorkPriority,
+                     due_in_session: Callable[[datetime, datetime], datetime]) -> ScheduledJob:
+        def next_due_after(after: datetime, offset: int) -> datetime:
+            day = after.replace(hour=0, minute=0, second=0, microsecond=0)
+            for _ in range(8):  # long weekends and holiday Mondays/Fridays included
+                session = self.market_session(day)
+                if session is not None:
+                    due = due_in_session(*session) + timedelta(minutes=offset)
+                    if due > after:
+                        return due
+                day += timedelta(days=1)
+            return None
+
+        return self._register(ScheduledJob(name, callback, priority, next_due_after), 0, 0)
+
+    def market_session(self, day: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """(open, close) of the regular session on `day`, None when the exchange is closed"""
+
+        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        hours = self._resolve_exchange_hours()
+        if hours is not None:
+            if not hours.IsDateOpen(day_start):
+                return None
+            market_open = hours.GetNextMarketOpen(day_start, False)
+            if market_open.date() != day_start.date():
+                return None
+            return market_open, hours.GetNextMarketClose(market_open, False)
+
+        if not self.market_holidays.is_trading_day(day_start):
+            return None
+        market_open = day_start.replace(hour=TradingConstants.MARKET_OPEN_HOUR,
+                                        minute=TradingConstants.MARKET_OPEN_MINUTE)
+        if self.market_holidays.is_early_close(day_start):
+            market_close = day_start.replace(hour=TradingConstants.MARKET_EARLY_CLOSE_HOUR,
+                                             minute=TradingConstants.MARKET_EARLY_CLOSE_MINUTE)
+        else:
+            market_close = day_start.replace(hour=TradingConstants.MARKET_CLOSE_HOUR,
+                                             minute=TradingConstants.MARKET_CLOSE_MINUTE)
+        return market_open, market_close
+
+    def _resolve_exchange_hours(self):
+        if self.exchange_hours is None:
+            security = getattr(self.algorithm, 'spy', None)
+            exchange = getattr(security, 'Exchange', None)
+            self.exchange_hours = getattr(exchange, 'Hours', None)
+        return self.exchange_hours
+
+    def cancel(self, name: str) -> bool:
+        job = self.jobs.pop(name, None)
+        if job is None:
+            return False
+        job.active = False  # lazily dropped from its bucket on the next visit
+        for minute_of_day in job.day_pattern:
+            self.minute_load[minute_of_day] -= 1
+        return True
+
+    def _register(self, job: ScheduledJob, offset_minutes: int, jitter_minutes: int) -> ScheduledJob:
+        if job.name in self.jobs:
+            self.cancel(job.name)
+
+        now = self.algorithm.Time
+        job.offset_minutes = offset_minutes
+
+        if jitter_minutes > 0:
+            # Pick the offset whose firings over the next day land on the least loaded minutes
+            best_offset, best_load = offset_minutes, None
+            for offset in range(offset_minutes, offset_minutes + jitter_minutes + 1):
+                load = sum(self.minute_load[m] for m in self._day_pattern(job, now, offset))
+                if best_load is None or load < best_load:
+                    best_offset, best_load = offset, load
+            job.offset_minutes = best_offset
+
+        job.day_pattern = self._day_pattern(job, now, job.offset_minutes)
+        for minute_of_day in job.day_pattern:
+            self.minute_load[minute_of_day] += 1
+
+        self.jobs[job.name] = job
+        self._schedule(job, now)
+        return job
+
+    # ----- wheel -----
+
+    @staticmethod
+    def _minute_of_day(moment: datetime) -> int:
+        return moment.hour * 60 + moment.minute
+
+    @staticmethod
+    def _absolute_minute(moment: datetime) -> int:
+        return moment.toordinal() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+    def _day_pattern(self, job: ScheduledJob, start: datetime, offset: int) -> List[int]:
+        pattern = []
+        end = start + timedelta(days=1)
+        due = job.next_due_after(start, offset)
+        while due is not None and due <= end and len(pattern) < MINUTES_PER_DAY:
+            pattern.append(self._minute_of_day(due))
+            due = job.next_due_after(due, offset)
+        return pattern
+
+    def _schedule(self, job: ScheduledJob, after: datetime):
+        job.due = job.next_due_after(after, job.offset_minutes)
+        if job.due is not None:
+            self.buckets[self._minute_of_day(job.due)].append(job)
+
+    def tick(self, now: datetime = None) -> List[str]:
+        """
+        Advance the wheel to `now` (default algorithm.Time) and dispatch due jobs
+
+        Returns:
+            List[str]: names of jobs that fired
+        """
+
+        now = now or self.algorithm.Time
+        self.stats['ticks'] += 1
+
+        current_minute = self._absolute_minute(now)
+        if current_minute <= self.last_tick_minute:
+            self.stats['ticks_same_minute'] += 1
+            return []
+
+        elapsed = min(current_minute - self.last_tick_minute, MINUTES_PER_DAY)
+        self.last_tick_minute = current_minute
+
+        due_jobs = []
+        minute_of_day = self._minute_of_day(now)
+        for step in range(elapsed):
+            bucket_index = (minute_of_day - step) % MINUTES_PER_DAY
+            bucket = self.buckets[bucket_index]
+            if not bucket:
+                continue
+            self.stats['buckets_visited'] += 1
+
+            remaining = []
+            for job in bucket:
+                if not job.active or self.jobs.get(job.name) is not job:
+                    continue
+                if job.due <= now:
+                    due_jobs.append(job)
+                else:
+                    remaining.append(job)  # due on a later day
+            self.buckets[bucket_index] = remaining
+
+        fired = []
+        for job in due_jobs:
+            # Fold every period missed during a data gap into this single firing
+            missed = 0
+            next_due = job.next_due_after(job.due, job.offset_minutes)
+            while next_due is not None and next_due <= now and missed < MINUTES_PER_DAY:
+                missed += 1
+                next_due = job.next_due_after(next_due, job.offset_minutes)
+            job.coalesced_count += missed
+            self.stats['periods_coalesced'] += missed
+
+            self._dispatch(job)
+            fired.append(job.name)
+            self._schedule(job, now)
+
+        return fired
+
+    def _dispatch(self, job: ScheduledJob):
+        job.fire_count += 1
+        self.stats['jobs_fired'] += 1
+
+        if self.work_scheduler is not None:
+            self.work_scheduler.submit(job.name, job.callback, job.priority)
+            return
+
+        try:
+            job.callback()
+        except Exception as e:
+            self.stats['job_errors'] += 1
+            self.algorithm.Error(f"[ScheduleWheel] Job '{job.name}' failed: {e}")
+
+    # ----- reporting -----
+
+    def get_schedule(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'next_due': job.due,
+                'priority': job.priority.name,
+                'offset_minutes': job.offset_minutes,
+                'fire_count': job.fire_count,
+                'coalesced_count': job.coalesced_count
+            }
+            for name, job in self.jobs.items()
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['registered_jobs'] = len(self.jobs)
+        stats['dispatch_mode'] = 'work_scheduler' if self.work_scheduler is not None else 'inline'
+        return stats
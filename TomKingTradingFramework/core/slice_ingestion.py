@@ -0,0 +1,212 @@
+# region imports
+from AlgorithmImports import *
+from typing import Dict, List, Optional, Any
+import numpy as np
+# endregion
+
+
+class SliceIngestor:
+    """
+    Single-pass Slice -> NumPy ingestion shared by the OnData pipeline
+
+    Every symbol gets a stable integer slot the first time it appears; its string
+    form is computed once, at slot creation. Each slice is scanned exactly once
+    (TradeBars, then QuoteBars, then Ticks - first source wins, matching the
+    previous per-symbol probe order) and the results land in preallocated
+    vectors. Significance checks, change percentages and market update
+    extraction in EventDrivenOnData and EventDrivenOptimizer all read these
+    vectors instead of re-walking data.Keys.
+
+    Vectors (indexed by slot):
+        price           latest price seen for the symbol
+        previous_price  price before the latest update (last observed, any slice)
+        open            bar open for TradeBar updates this slice (NaN otherwise)
+        volume          bar volume / quote sizes / tick quantity this slice
+        present         symbol updated in the current slice
+        has_previous    previous_price is valid
+    """
+
+    def __init__(self, algorithm, initial_capacity: int = 64):
+        self.algorithm = algorithm
+        self.capacity = max(1, initial_capacity)
+
+        self.slot_by_symbol = {}  # Symbol -> slot
+        self.slot_by_symbol_str = {}  # str(Symbol) -> slot
+        self.symbols = []  # slot -> Symbol
+        self.symbol_strs = []  # slot -> str(Symbol)
+
+        self.price = np.zeros(self.capacity)
+        self.previous_price = np.zeros(self.capacity)
+        self.open = np.full(self.capacity, np.nan)
+        self.volume = np.zeros(self.capacity)
+        self.present = np.zeros(self.capacity, dtype=bool)
+        self.has_previous = np.zeros(self.capacity, dtype=bool)
+        self._seen = np.zeros(self.capacity, dtype=bool)
+
+        # Per-slice state
+        self.slice_time = None
+        self._slice_id = None
+        self.present_slots = np.empty(0, dtype=np.int64)
+        self._change_pct = None
+
+        self.stats = {
+            'slices_ingested': 0,
+            'duplicate_ingest_calls': 0,
+            'symbols_tracked': 0
+        }
+
+    # ----- slot management -----
+
+    def _slot_for(self, symbol) -> int:
+        slot = self.slot_by_symbol.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot >= self.capacity:
+                self._grow()
+            symbol_str = str(symbol)
+            self.slot_by_symbol[symbol] = slot
+            self.slot_by_symbol_str[symbol_str] = slot
+            self.symbols.append(symbol)
+            self.symbol_strs.append(symbol_str)
+            self.stats['symbols_tracked'] = len(self.symbols)
+        return slot
+
+    def _grow(self):
+        new_capacity = self.capacity * 2
+
+        def extend(array, fill):
+            grown = np.full(new_capacity, fill, dtype=array.dtype)
+            grown[:self.capacity] = array
+            return grown
+
+        self.price = extend(self.price, 0.0)
+        self.previous_price = extend(self.previous_price, 0.0)
+        self.open = extend(self.open, np.nan)
+        self.volume = extend(self.volume, 0.0)
+        self.present = extend(self.present, False)
+        self.has_previous = extend(self.has_previous, False)
+        self._seen = extend(self._seen, False)
+        self.capacity = new_capacity
+
+    def slot_for_symbol_str(self, symbol_str: str) -> Optional[int]:
+        return self.slot_by_symbol_str.get(symbol_str)
+
+    # ----- ingestion -----
+
+    def ingest(self, data) -> bool:
+        """
+        Fill the vectors from a Slice. Safe to call from several consumers -
+        only the first call per slice does any work.
+
+        Returns:
+            bool: True if this call ingested the slice
+        """
+
+        slice_time = getattr(data, 'Time', None)
+        if self._slice_id == id(data) and self.slice_time == slice_time:
+            self.stats['duplicate_ingest_calls'] += 1
+            return False
+
+        slots = []
+        prices = []
+        opens = []
+        volumes = []
+        claimed = set()
+
+        for symbol, bar in data.Bars.items():
+            slot = self._slot_for(symbol)
+            claimed.add(slot)
+            slots.append(slot)
+            prices.append(bar.Close)
+            opens.append(bar.Open)
+            volumes.append(getattr(bar, 'Volume', 0))
+
+        for symbol, quote in data.QuoteBars.items():
+            slot = self._slot_for(symbol)
+            if slot in claimed:
+                continue
+            claimed.add(slot)
+            slots.append(slot)
+            prices.append(quote.Close)
+            opens.append(np.nan)
+            volumes.append(quote.LastBidSize + quote.LastAskSize if hasattr(quote, 'LastBidSize') else 0)
+
+        for symbol, ticks in data.Ticks.items():
+            if not ticks:
+                continue
+            slot = self._slot_for(symbol)
+            if slot in claimed:
+                continue
+            claimed.add(slot)
+            tick = ticks[-1]
+            slots.append(slot)
+            prices.append(tick.Price)
+            opens.append(np.nan)
+            volumes.append(getattr(tick, 'Quantity', 0))
+
+        # Vectorized commit of the whole slice
+        self.present[:] = False
+        self.open[:] = np.nan
+        self.volume[:] = 0.0
+
+        index = np.fromiter(slots, dtype=np.int64, count=len(slots))
+        if index.size:
+            self.previous_price[index] = self.price[index]
+            self.has_previous[index] = self._seen[index]
+            self.price[index] = np.asarray(prices, dtype=float)
+            self.open[index] = np.asarray(opens, dtype=float)
+            self.volume[index] = np.asarray(volumes, dtype=float)
+            self.present[index] = True
+            self._seen[index] = True
+
+        self.present_slots = index
+        self.slice_time = slice_time
+        self._slice_id = id(data)
+        self._change_pct = None
+        self.stats['slices_ingested'] += 1
+        return True
+
+    # ----- vector queries (current slice) -----
+
+    def change_pct(self) -> np.ndarray:
+        """Signed change vs previous observed price for every slot (0 where undefined)"""
+        if self._change_pct is None:
+            n = len(self.symbols)
+            change = np.zeros(n)
+            valid = self.present[:n] & self.has_previous[:n] & (self.previous_price[:n] > 0)
+            change[valid] = (self.price[:n][valid] - self.previous_price[:n][valid]) / self.previous_price[:n][valid]
+            self._change_pct = change
+        return self._change_pct
+
+    def first_seen_mask(self) -> np.ndarray:
+        """Symbols updated this slice that had no earlier price"""
+        n = len(self.symbols)
+        return self.present[:n] & ~self.has_previous[:n]
+
+    def significant_slots(self, min_change_pct: float) -> np.ndarray:
+        """Slots with |change| >= threshold against a known previous price"""
+        n = len(self.symbols)
+        mask = self.present[:n] & self.has_previous[:n] & (np.abs(self.change_pct()) >= min_change_pct)
+        return np.flatnonzero(mask)
+
+    def intrabar_change_pct(self) -> np.ndarray:
+        """|Close - Open| / Open for TradeBar updates this slice (0 elsewhere)"""
+        n = len(self.symbols)
+        opens = self.open[:n]
+        change = np.zeros(n)
+        valid = ~np.isnan(opens) & (opens > 0)
+        change[valid] = np.abs(self.price[:n][valid] - opens[valid]) / opens[valid]
+        return change
+
+    def prices_by_symbol(self, slots: np.ndarray = None) -> Dict[str, float]:
+        """str(Symbol) -> price for the given slots (default: everything in this slice)"""
+        if slots is None:
+            slots = self.present_slots
+        symbol_strs = self.symbol_strs
+        return {symbol_strs[slot]: float(price) for slot, price in zip(slots.tolist(), self.price[slots].tolist())}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['capacity'] = self.capacity
+        stats['symbols_in_last_slice'] = int(self.present_slots.size)
+        return stats
@@ -6,8 +6,10 @@ from enum import Enum, auto
 from typing import Dict, Optional, Callable, Any, List, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
+from collections import deque, namedtuple
 import json
 from config.constants import TradingConstants
+from core.log_pipeline import get_log_pipeline
 
 class StrategyState(Enum):
     """Universal strategy states for all trading strategies"""
@@ -73,6 +75,24 @@ class TransitionTrigger(Enum):
     SYSTEM_ERROR = auto()
     DATA_STALE = auto()
     EMERGENCY_EXIT = auto()
+    RESET = auto()               # Recover from ERROR back to READY
+
+# Dense integer indexes for the compiled transition table and handler dispatch.
+# auto() numbers members 1..N in declaration order.
+STATE_COUNT = len(StrategyState)
+TRIGGER_COUNT = len(TransitionTrigger)
+
+
+def state_index(state: StrategyState) -> int:
+    return state.value - 1
+
+
+def trigger_index(trigger: TransitionTrigger) -> int:
+    return trigger.value - 1
+
+
+# Lightweight state_history entry (StateContext is only built when callbacks need it)
+StateRecord = namedtuple('StateRecord', ['timestamp', 'previous_state', 'current_state', 'trigger'])
 
 @dataclass
 class StateContext:
@@ -113,16 +133,26 @@ class StrategyStateMachine:
     """
     State machine for managing strategy lifecycle
     Ensures clean, predictable state transitions
+    
+    Transitions are compiled into a dense STATE_COUNT x TRIGGER_COUNT table so
+    trigger() is a single list index; the table is rebuilt lazily after
+    add_transition(). state_history is a bounded ring of StateRecords.
     """
     
     def __init__(self, algorithm, strategy_name: str):
         self.algorithm = algorithm
         self.strategy_name = strategy_name
+        self.log = get_log_pipeline(algorithm).bind('StateMachine')
         self.current_state = StrategyState.INITIALIZING
-        self.state_history = []
+        self.state_history = deque(maxlen=TradingConstants.STATE_HISTORY_SIZE)
+        self.transition_count = 0
         self.transitions = {}
         self.state_actions = {}
         
+        # Compiled (state, trigger) -> candidate transitions, flattened row-major
+        self._table = [None] * (STATE_COUNT * TRIGGER_COUNT)
+        self._table_dirty = True
+        
         # State entry/exit callbacks
         self.on_enter_callbacks = {}
         self.on_exit_callbacks = {}
@@ -241,12 +271,12 @@ class StrategyStateMachine:
         # Error recovery transition
         self.add_transition(
             StrategyState.ERROR,
-            StrategyState.IDLE,
+            StrategyState.READY,
             TransitionTrigger.RESET
         )
         
         # Suspension transitions (from operational states)
-        for state in [StrategyState.IDLE, StrategyState.ANALYZING, StrategyState.PENDING_ENTRY]:
+        for state in [StrategyState.READY, StrategyState.ANALYZING, StrategyState.PENDING_ENTRY]:
             self.add_transition(
                 state,
                 StrategyState.SUSPENDED,
@@ -274,6 +304,15 @@ class StrategyStateMachine:
         self.transitions[key].append(StateTransition(
             from_state, to_state, trigger, condition, action
         ))
+        self._table_dirty = True
+    
+    def _compile(self):
+        """Rebuild the dense transition table from self.transitions"""
+        table = [None] * (STATE_COUNT * TRIGGER_COUNT)
+        for (from_state, trigger), transitions in self.transitions.items():
+            table[state_index(from_state) * TRIGGER_COUNT + trigger_index(trigger)] = tuple(transitions)
+        self._table = table
+        self._table_dirty = False
     
     def trigger(self, trigger: TransitionTrigger, data: Dict[str, Any] = None) -> bool:
         """
@@ -281,19 +320,18 @@ class StrategyStateMachine:
         Returns True if transition successful
         """
         
-        key = (self.current_state, trigger)
+        if self._table_dirty:
+            self._compile()
+        
+        from_state = self.current_state
+        possible_transitions = self._table[state_index(from_state) * TRIGGER_COUNT + trigger_index(trigger)]
         
         # Check if transition exists
-        if key not in self.transitions:
-            self.algorithm.Debug(
-                f"[StateMachine] No transition from {self.current_state.name} "
-                f"with trigger {trigger.name}"
-            )
+        if possible_transitions is None:
+            self.log.trace("%s: No transition from %s with trigger %s",
+                           self.strategy_name, from_state.name, trigger.name)
             return False
         
-        # Get possible transitions
-        possible_transitions = self.transitions[key]
-        
         # Find valid transition (check conditions)
         valid_transition = None
         for transition in possible_transitions:
@@ -301,67 +339,60 @@ class StrategyStateMachine:
                 valid_transition = transition
                 break
         
-        if not valid_transition:
-            self.algorithm.Debug(
-                f"[StateMachine] No valid transition from {self.current_state.name} "
-                f"with trigger {trigger.name} (conditions not met)"
-            )
+        if valid_transition is None:
+            self.log.trace("%s: No valid transition from %s with trigger %s (conditions not met)",
+                           self.strategy_name, from_state.name, trigger.name)
             return False
         
-        # Create context
-        context = StateContext(
-            timestamp=self.algorithm.Time,
-            previous_state=self.current_state,
-            current_state=valid_transition.to_state,
-            trigger=trigger,
-            data=data or {},
-            message=f"Transition: {self.current_state.name} -> {valid_transition.to_state.name}"
-        )
+        to_state = valid_transition.to_state
+        exit_callback = self.on_exit_callbacks.get(from_state)
+        enter_callback = self.on_enter_callbacks.get(to_state)
+        
+        # Context is only materialized when something consumes it
+        context = None
+        if exit_callback is not None or enter_callback is not None or valid_transition.action:
+            context = StateContext(
+                timestamp=self.algorithm.Time,
+                previous_state=from_state,
+                current_state=to_state,
+                trigger=trigger,
+                data=data or {},
+                message=f"Transition: {from_state.name} -> {to_state.name}"
+            )
         
         # Execute exit callback for current state
-        if self.current_state in self.on_exit_callbacks:
+        if exit_callback is not None:
             try:
-                pass
+                exit_callback(context)
             except Exception as e:
-
-                self.on_exit_callbacks[self.current_state](context)
-            except Exception as e:
-                self.algorithm.Error(f"[StateMachine] Exit callback error: {e}")
+                self.log.error("Exit callback error: %s", e)
         
         # Execute transition action if defined
         if valid_transition.action:
             try:
-                pass
-            except Exception as e:
-
                 valid_transition.action(context)
             except Exception as e:
-                self.algorithm.Error(f"[StateMachine] Transition action error: {e}")
+                self.log.error("Transition action error: %s", e)
                 self.error_count += 1
                 if self.error_count >= self.max_errors:
                     self._force_error_state()
                 return False
         
         # Update state
-        previous_state = self.current_state
-        self.current_state = valid_transition.to_state
+        self.current_state = to_state
         
         # Execute enter callback for new state
-        if self.current_state in self.on_enter_callbacks:
+        if enter_callback is not None:
             try:
-                pass
-            except Exception as e:
-
-                self.on_enter_callbacks[self.current_state](context)
+                enter_callback(context)
             except Exception as e:
-                self.algorithm.Error(f"[StateMachine] Enter callback error: {e}")
+                self.log.error("Enter callback error: %s", e)
         
-        # Log transition
-        self.state_history.append(context)
-        self.algorithm.Debug(
-            f"[StateMachine] {self.strategy_name}: {previous_state.name} -> "
-            f"{self.current_state.name} (trigger: {trigger.name})"
-        )
+        # Record transition
+        self.state_history.append(StateRecord(self.algorithm.Time, from_state, to_state, trigger))
+        self.transition_count += 1
+        self.log.debug("%s: %s -> %s (trigger: %s)",
+                       self.strategy_name, from_state.name, to_state.name, trigger.name)
         
         return True
     
@@ -383,8 +414,9 @@ class StrategyStateMachine:
     
     def can_transition(self, trigger: TransitionTrigger) -> bool:
         """Check if a transition is possible with given trigger"""
-        key = (self.current_state, trigger)
-        return key in self.transitions
+        if self._table_dirty:
+            self._compile()
+        return self._table[state_index(self.current_state) * TRIGGER_COUNT + trigger_index(trigger)] is not None
     
     def get_state_duration(self) -> timedelta:
         """Get duration in current state"""
@@ -396,16 +428,13 @@ class StrategyStateMachine:
     
     def _force_error_state(self):
         """Force transition to error state"""
+        previous_state = self.current_state
         self.current_state = StrategyState.ERROR
         self.error_state_entry_time = self.algorithm.Time  # Track entry time for auto-recovery
-        context = StateContext(
-            timestamp=self.algorithm.Time,
-            previous_state=self.current_state,
-            current_state=StrategyState.ERROR,
-            trigger=TransitionTrigger.SYSTEM_ERROR,
-            message=f"Forced error state after {self.max_errors} errors"
-        )
-        self.state_history.append(context)
+        self.state_history.append(StateRecord(
+            self.algorithm.Time, previous_state, StrategyState.ERROR, TransitionTrigger.SYSTEM_ERROR
+        ))
+        self.transition_count += 1
         self.algorithm.Error(f"[StateMachine] {self.strategy_name} forced to ERROR state - will auto-recover in 30 minutes")
     
     def check_error_recovery(self):
@@ -416,8 +445,8 @@ class StrategyStateMachine:
             if time_in_error >= self.error_recovery_timeout:
                 self.algorithm.Log(f"[StateMachine] {self.strategy_name} auto-recovering from ERROR state after {time_in_error}")
                 
-                # Transition to IDLE state
-                self.transition(TransitionTrigger.RESET)
+                # Transition back to READY
+                self.trigger(TransitionTrigger.RESET)
                 self.error_count = 0  # Reset error count
                 self.error_state_entry_time = None
                 
@@ -429,7 +458,8 @@ class StrategyStateMachine:
     def reset(self):
         """Reset state machine to initial state"""
         self.current_state = StrategyState.INITIALIZING
-        self.state_history = []
+        self.state_history.clear()
+        self.transition_count = 0
         self.error_count = 0
         self.error_state_entry_time = None
         self.algorithm.Debug(f"[StateMachine] {self.strategy_name} reset to INITIALIZING")
@@ -439,19 +469,18 @@ class StrategyStateMachine:
         stats = {
             'current_state': self.current_state.name,
             'state_duration': str(self.get_state_duration()),
-            'total_transitions': len(self.state_history),
+            'total_transitions': self.transition_count,
             'error_count': self.error_count
         }
         
-        # Count time in each state
+        # Count time in each state (over the retained history window)
         state_times = {}
-        for i, transition in enumerate(self.state_history):
-            if i > 0:
-                duration = transition.timestamp - self.state_history[i-1].timestamp
-                state = self.state_history[i-1].current_state
-                if state not in state_times:
-                    state_times[state] = timedelta(0)
-                state_times[state] += duration
+        previous = None
+        for record in self.state_history:
+            if previous is not None:
+                state = previous.current_state
+                state_times[state] = state_times.get(state, timedelta(0)) + (record.timestamp - previous.timestamp)
+            previous = record
         
         stats['state_times'] = {
             state.name: str(time) for state, time in state_times.items()
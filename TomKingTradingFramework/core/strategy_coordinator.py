@@ -6,6 +6,8 @@ from typing import Dict, List, Optional, Set
 from datetime import datetime, timedelta
 from enum import Enum
 from core.unified_vix_manager import UnifiedVIXManager
+from core.market_context import MarketContextBuilder
+from core.log_pipeline import get_log_pipeline
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -29,6 +31,7 @@ class StrategyCoordinator:
     
     def __init__(self, algorithm):
         self.algo = algorithm
+        self.log = get_log_pipeline(algorithm).bind('COORDINATOR')
         
         # Strategy registration
         self.registered_strategies = {}
@@ -77,6 +80,9 @@ class StrategyCoordinator:
         self.execution_history = []
         self.conflict_log = []
         
+        # One immutable MarketContext per slice, shared by every strategy
+        self.context_builder = MarketContextBuilder(algorithm)
+        
     def register_strategy(self, name: str, priority: StrategyPriority = StrategyPriority.MEDIUM):
         """Register a strategy with the coordinator"""
         
@@ -141,8 +147,6 @@ class StrategyCoordinator:
         
         # Execute callback
         try:
-            })
-        except Exception as e:
             result = callback_func()
             # Record execution
             self.execution_history.append({
@@ -151,6 +155,7 @@ class StrategyCoordinator:
                 'priority': self.registered_strategies[strategy_name]['priority'].name,
                 'exclusive': exclusive,
                 'success': True
+            })
             # Update strategy info
             self.registered_strategies[strategy_name]['executions'] += 1
             self.registered_strategies[strategy_name]['last_execution'] = self.algo.Time
@@ -285,29 +290,29 @@ class StrategyCoordinator:
     def get_execution_order(self) -> List[str]:
         """Get recommended execution order based on priority"""
         
-        self.algo.Error(f"[COORDINATOR] GET_EXECUTION_ORDER START - Registered strategies: {list(self.registered_strategies.keys())}")
-        self.algo.Error(f"[COORDINATOR] Blocked strategies: {list(self.blocked_strategies)}")
+        self.log.trace("GET_EXECUTION_ORDER START - Registered strategies: %s", self.registered_strategies.keys())
+        self.log.trace("Blocked strategies: %s", self.blocked_strategies)
         
         order = []
         
         for priority in [StrategyPriority.CRITICAL, StrategyPriority.HIGH, 
                         StrategyPriority.MEDIUM, StrategyPriority.LOW]:
-            self.algo.Error(f"[COORDINATOR] Checking priority {priority}")
+            self.log.trace("Checking priority %s", priority)
             
             for name, info in self.registered_strategies.items():
-                self.algo.Error(f"[COORDINATOR] Strategy {name}: priority={info['priority']}, blocked={name in self.blocked_strategies}")
+                self.log.trace("Strategy %s: priority=%s, blocked=%s", name, info['priority'], name in self.blocked_strategies)
                 
                 if info['priority'] == priority and name not in self.blocked_strategies:
                     in_window = self.is_in_execution_window(name)
-                    self.algo.Error(f"[COORDINATOR] Strategy {name}: in_execution_window={in_window}")
+                    self.log.trace("Strategy %s: in_execution_window=%s", name, in_window)
                     
                     if in_window:
                         order.append(name)
-                        self.algo.Error(f"[COORDINATOR] ADDED {name} to execution order")
+                        self.log.trace("ADDED %s to execution order", name)
                     else:
-                        self.algo.Error(f"[COORDINATOR] BLOCKED {name} - outside execution window")
+                        self.log.trace("BLOCKED %s - outside execution window", name)
                         
-        self.algo.Error(f"[COORDINATOR] FINAL EXECUTION ORDER: {order}")
+        self.log.debug("FINAL EXECUTION ORDER: %s", order)
         return order
         
     def should_throttle_strategy(self, strategy_name: str, 
@@ -405,7 +410,6 @@ class StrategyCoordinator:
             self.registered_strategies[strategy_name]['executions'] += 1
             self.registered_strategies[strategy_name]['last_execution'] = self.algo.Time
             self.registered_strategies[strategy_name]['status'] = 'COMPLETED'
-        except Exception as e:
             
             # Log execution
             self.execution_history.append({
@@ -416,7 +420,7 @@ class StrategyCoordinator:
                 'success': True
             })
             
-            self.algo.Debug(f"[Coordinator] Recorded execution for {strategy_name}")
+            self.log.trace("Recorded execution for %s", strategy_name)
             
         except Exception as e:
             self.algo.Error(f"[Coordinator] Error recording execution for {strategy_name}: {e}")
@@ -434,50 +438,55 @@ class StrategyCoordinator:
             context: Context dict with VIX, regime, time, etc.
         """
         
-        self.algo.Debug(f"[COORDINATOR] === EXECUTING STRATEGIES ===")
-        self.algo.Debug(f"[COORDINATOR] Context: VIX={context.get('vix', 'N/A')}, Regime={context.get('regime', 'N/A')}, Time={context.get('time', 'N/A')}")
+        self.log.debug("=== EXECUTING STRATEGIES ===")
+        self.log.debug("Context: VIX=%s, Regime=%s, Time=%s",
+                       context.get('vix', 'N/A'), context.get('regime', 'N/A'), context.get('time', 'N/A'))
         
         # Get execution order by priority
         execution_order = self.get_execution_order()
         
         if not execution_order:
-            self.algo.Debug("[COORDINATOR] No strategies ready for execution")
+            self.log.debug("No strategies ready for execution")
             return
             
-        self.algo.Debug(f"[COORDINATOR] Executing {len(execution_order)} strategies in order: {execution_order}")
+        self.log.debug("Executing %d strategies in order: %s", len(execution_order), execution_order)
+        
+        # Build the shared slice snapshot once, reusing what the caller already fetched
+        market_context = self.context_builder.build(data, vix=context.get('vix'), regime=context.get('regime'))
         
         executed_count = 0
+        due_count = 0
         
         for strategy_name in execution_order:
             try:
-            except Exception as e:
-                self.algo.Debug(f"[COORDINATOR] === EXECUTING {strategy_name} ===")
+                self.log.trace("=== EXECUTING %s ===", strategy_name)
                 # Check if strategy should be throttled
                 if self.should_throttle_strategy(strategy_name):
-                    self.algo.Debug(f"[COORDINATOR] {strategy_name} throttled - too soon since last execution")
+                    self.log.debug("%s throttled - too soon since last execution", strategy_name)
                     continue
+                due_count += 1
                 # Get strategy instance from main algorithm
                 if not hasattr(self.algo, 'strategies') or strategy_name not in self.algo.strategies:
-                    self.algo.Error(f"[COORDINATOR] Strategy {strategy_name} not found in algo.strategies")
+                    self.log.error("Strategy %s not found in algo.strategies", strategy_name)
                     continue
                 strategy_instance = self.algo.strategies[strategy_name]
                 # Check if strategy has execute method
                 if not hasattr(strategy_instance, 'execute'):
-                    self.algo.Error(f"[COORDINATOR] Strategy {strategy_name} missing execute() method")
+                    self.log.error("Strategy %s missing execute() method", strategy_name)
                     continue
                 # Set strategy as active
                 if strategy_name not in self.active_strategies:
                     self.active_strategies.add(strategy_name)
                 self.registered_strategies[strategy_name]['status'] = 'EXECUTING'
                 # Execute strategy with error handling
-                self.algo.Debug(f"[COORDINATOR] Calling {strategy_name}.execute()")
-                strategy_instance.execute()
+                self.log.trace("Calling %s.execute()", strategy_name)
+                strategy_instance.execute(market_context)
                 # Record successful execution
                 self.record_execution(strategy_name)
                 executed_count += 1
-                self.algo.Debug(f"[COORDINATOR] {strategy_name} executed successfully")
+                self.log.trace("%s executed successfully", strategy_name)
             except Exception as e:
-                self.algo.Error(f"[COORDINATOR] EXECUTION ERROR in {strategy_name}: {e}")
+                self.log.error("EXECUTION ERROR in %s: %s", strategy_name, e)
                 
                 # Record failed execution
                 self.execution_history.append({
@@ -505,11 +514,11 @@ class StrategyCoordinator:
                     self.registered_strategies[strategy_name]['status'] != 'ERROR'):
                     self.registered_strategies[strategy_name]['status'] = 'IDLE'
         
-        self.algo.Debug(f"[COORDINATOR] === EXECUTION COMPLETE: {executed_count}/{len(execution_order)} strategies executed ===")
+        self.log.debug("=== EXECUTION COMPLETE: %d/%d strategies executed ===", executed_count, len(execution_order))
         
-        # Log status if no strategies executed
-        if executed_count == 0:
-            self.algo.Error("[COORDINATOR] *** CRITICAL: NO STRATEGIES EXECUTED! ***")
+        # Log status if strategies were due but none executed (all throttled is the normal steady state)
+        if executed_count == 0 and due_count:
+            self.log.error("*** CRITICAL: NO STRATEGIES EXECUTED! ***")
             self.log_detailed_status()
     
     def log_detailed_status(self):
@@ -43,6 +43,11 @@ class UnifiedPositionSizer:
         # Kelly factor from Tom King methodology
         self.kelly_factor = KELLY_FACTOR  # 0.25
         
+        # Observed win rates and averages per strategy, fed by the trade journal
+        # (imported here: the risk package imports this module)
+        from risk.strategy_statistics import get_strategy_statistics
+        self.strategy_statistics = get_strategy_statistics(algorithm)
+        
         # Strategy-specific limits
         self.max_contracts = {
             '0DTE': MAX_CONTRACTS_0DTE,           # 10
@@ -99,6 +104,9 @@ class UnifiedPositionSizer:
             avg_loss: Average loss amount
             override_kelly: Override Kelly factor if needed
         
+        win_rate, avg_win and avg_loss are replaced by the strategy's observed
+        statistics once it has enough closed trades.
+        
         Returns:
             Number of contracts to trade
         """
@@ -107,6 +115,11 @@ class UnifiedPositionSizer:
             # Get account value through centralized method
             account_value = self.get_portfolio_value()
             
+            # Observed trade statistics take over from the documented win rates
+            observed = self.strategy_statistics.kelly_inputs(strategy_name)
+            if observed is not None:
+                win_rate, avg_win, avg_loss = observed
+            
             # Calculate base Kelly size
             kelly_size = self._calculate_kelly_size(
                 account_value, win_rate, avg_win, avg_loss, override_kelly
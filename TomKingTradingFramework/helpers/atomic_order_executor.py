@@ -83,6 +83,16 @@ class AtomicOrderGroup:
             self.algo.Error(f"[Atomic-{self.group_id}] Algorithm order methods not available")
             return False
         
+        # Portfolio VaR with the whole group added, before any leg is placed; fails closed
+        try:
+            can_open, reason = self._check_var_limit()
+        except Exception as e:
+            can_open, reason = False, f"VaR check failed: {e!r}"
+        if not can_open:
+            self.algo.Error(f"[Atomic-{self.group_id}] Blocked by VaR limit: {reason}")
+            self.status = OrderGroupStatus.FAILED
+            return False
+        
         self.status = OrderGroupStatus.PLACING
         self.algo.Debug(f"[Atomic-{self.group_id}] Executing {len(self.target_legs)} legs")
         
@@ -110,6 +120,19 @@ class AtomicOrderGroup:
             self._rollback()
             return False
     
+    def _check_var_limit(self) -> tuple:
+        """
+        Incremental VaR of the target legs (approved without a risk manager)
+        
+        The strategies' allocation requests carry only delta and contract
+        counts; the concrete contracts are first known here. Plugin checks
+        already ran on that request, so only the VaR limit runs again.
+        """
+        risk_manager = getattr(self.algo, 'unified_risk_manager', None)
+        if risk_manager is None or not hasattr(risk_manager, 'check_var_limit'):
+            return True, "No risk manager"
+        return risk_manager.check_var_limit(risk_manager.var_service.order_legs(self.target_legs))
+    
     def _place_smart_order(self, symbol, quantity: int):
         """Place order with smart routing and live execution delegation"""
         
@@ -0,0 +1,244 @@
+# region imports
+from AlgorithmImports import *
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, List, Optional
+from config.constants import TradingConstants
+# endregion
+
+
+class ExpiryClass(Enum):
+    """Listing classification of an option expiration"""
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    LEAP = "leap"
+
+
+def is_standard_monthly(expiry_date) -> bool:
+    """Third Friday of the month"""
+    return expiry_date.weekday() == 4 and 15 <= expiry_date.day <= 21
+
+
+class ExpirationIndex:
+    """
+    Sorted expirations for one underlying with the contracts listed on each,
+    split by right and sorted by strike.
+
+    Rebuilt in a single pass whenever the chain is refreshed; queries are binary
+    searches over the expiry list and the per-expiry strike lists.
+    """
+
+    __slots__ = ('expiries', 'strikes', 'symbols', 'monthly', 'listed', 'refreshed')
+
+    def __init__(self):
+        self.expiries = []   # sorted expiry datetimes
+        self.strikes = {}    # (expiry, right) -> sorted strikes
+        self.symbols = {}    # (expiry, right) -> symbols aligned with strikes
+        self.monthly = set()
+        self.listed = {}     # expiry -> first date the expiry was seen in the chain
+        self.refreshed = None
+
+    def rebuild(self, contracts, today):
+        """Re-index from a full contract list; listing dates survive across rebuilds"""
+
+        grouped = {}
+        for contract in contracts:
+            key = (contract.ID.Date, contract.ID.OptionRight)
+            grouped.setdefault(key, []).append((contract.ID.StrikePrice, contract))
+
+        self.strikes.clear()
+        self.symbols.clear()
+        for key, entries in grouped.items():
+            entries.sort(key=lambda e: e[0])
+            self.strikes[key] = [e[0] for e in entries]
+            self.symbols[key] = [e[1] for e in entries]
+
+        self.expiries = sorted({expiry for expiry, _ in grouped})
+        listed_dates = {expiry.date() for expiry in self.expiries}
+        self.monthly = set()
+        for expiry in self.expiries:
+            self.listed.setdefault(expiry, today)
+            day = expiry.date()
+            # Third Friday, or the Thursday before it when that Friday is an exchange holiday
+            if is_standard_monthly(day) or (
+                    day.weekday() == 3 and is_standard_monthly(day + timedelta(days=1))
+                    and (day + timedelta(days=1)) not in listed_dates):
+                self.monthly.add(expiry)
+
+        # Forget listing dates of expiries that have rolled off
+        for expiry in [e for e in self.listed if e not in grouped and e.date() < today]:
+            del self.listed[expiry]
+        self.refreshed = today
+
+    def in_band(self, earliest: datetime, latest: Optional[datetime] = None) -> List[datetime]:
+        """Expiries in [earliest, latest] (latest=None: no upper bound)"""
+        lo = bisect_left(self.expiries, earliest)
+        hi = len(self.expiries) if latest is None else bisect_right(self.expiries, latest)
+        return self.expiries[lo:hi]
+
+    def nearest(self, target: datetime, earliest: datetime = None, latest: datetime = None) -> Optional[datetime]:
+        """Expiry closest to target, optionally restricted to [earliest, latest]"""
+        lo = 0 if earliest is None else bisect_left(self.expiries, earliest)
+        hi = len(self.expiries) if latest is None else bisect_right(self.expiries, latest)
+        if lo >= hi:
+            return None
+        i = bisect_left(self.expiries, target, lo, hi)
+        if i == lo:
+            return self.expiries[lo]
+        if i == hi:
+            return self.expiries[hi - 1]
+        before, after = self.expiries[i - 1], self.expiries[i]
+        return after if after - target < target - before else before
+
+    def contracts(self, expiry: datetime, right=None) -> List:
+        rights = (OptionRight.Put, OptionRight.Call) if right is None else (right,)
+        result = []
+        for r in rights:
+            result.extend(self.symbols.get((expiry, r), ()))
+        return result
+
+    def closest_strike(self, expiry: datetime, right, strike: float):
+        """(distance, symbol) of the listed strike closest to `strike`, or None"""
+        strikes = self.strikes.get((expiry, right))
+        if not strikes:
+            return None
+        i = bisect_left(strikes, strike)
+        if i >= len(strikes) or (i > 0 and strike - strikes[i - 1] <= strikes[i] - strike):
+            i -= 1
+        return abs(strikes[i] - strike), self.symbols[(expiry, right)][i]
+
+    def contracts_between(self, earliest: datetime, latest: Optional[datetime] = None, right=None) -> List:
+        """All contracts expiring in [earliest, latest]"""
+        result = []
+        for expiry in self.in_band(earliest, latest):
+            result.extend(self.contracts(expiry, right))
+        return result
+
+    def closest_contract(self, right, strike: float, earliest: datetime, latest: Optional[datetime] = None):
+        """Contract closest to `strike` across every expiry in the band (earliest expiry wins ties)"""
+        best = None
+        for expiry in self.in_band(earliest, latest):
+            found = self.closest_strike(expiry, right, strike)
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+        return best[1] if best else None
+
+
+class ExpirationCalendar:
+    """
+    Per-underlying expiration index shared by the LEAP, IPMCC and other
+    strategies that search option chains by days-to-expiry.
+
+    Each underlying's index is refreshed from OptionChainProvider at most once
+    per trading day (listings only change overnight) or fed directly from a
+    slice chain via update(). "Nearest expiry in a DTE band" and "closest strike
+    within the band" are then binary searches instead of full chain scans.
+    """
+
+    def __init__(self, algorithm):
+        self.algo = algorithm
+        self.indexes: Dict = {}
+
+        self.stats = {
+            'refreshes': 0,
+            'queries': 0,
+            'contracts_indexed': 0
+        }
+
+    def update(self, underlying, contracts) -> ExpirationIndex:
+        """Re-index an underlying from a contract list (e.g. the current slice's chain)"""
+        index = self.indexes.get(underlying)
+        if index is None:
+            index = self.indexes[underlying] = ExpirationIndex()
+        contracts = list(contracts)
+        index.rebuild(contracts, self.algo.Time.date())
+        self.stats['refreshes'] += 1
+        self.stats['contracts_indexed'] += len(contracts)
+        return index
+
+    def index(self, underlying) -> ExpirationIndex:
+        """Index for an underlying, refreshed on the first query of each day"""
+        self.stats['queries'] += 1
+        index = self.indexes.get(underlying)
+        if index is None or index.refreshed != self.algo.Time.date():
+            index = self.update(underlying,
+                                self.algo.OptionChainProvider.GetOptionContractList(underlying, self.algo.Time))
+        return index
+
+    def expiries_in_band(self, underlying, min_dte: int, max_dte: int = None) -> List[datetime]:
+        now = self.algo.Time
+        latest = None if max_dte is None else now + timedelta(days=max_dte)
+        return self.index(underlying).in_band(now + timedelta(days=min_dte), latest)
+
+    def contracts_in_band(self, underlying, min_dte: int, max_dte: int = None, right=None) -> List:
+        """All contracts expiring between min_dte and max_dte days from now"""
+        now = self.algo.Time
+        latest = None if max_dte is None else now + timedelta(days=max_dte)
+        return self.index(underlying).contracts_between(now + timedelta(days=min_dte), latest, right)
+
+    def nearest_expiry(self, underlying, target_dte: int, min_dte: int = None,
+                       max_dte: int = None) -> Optional[datetime]:
+        now = self.algo.Time
+        return self.index(underlying).nearest(
+            now + timedelta(days=target_dte),
+            None if min_dte is None else now + timedelta(days=min_dte),
+            None if max_dte is None else now + timedelta(days=max_dte)
+        )
+
+    def closest_contract(self, underlying, right, strike: float, min_dte: int, max_dte: int = None):
+        """Contract closest to `strike` across every expiry in the band (earliest expiry wins ties)"""
+        now = self.algo.Time
+        latest = None if max_dte is None else now + timedelta(days=max_dte)
+        return self.index(underlying).closest_contract(right, strike, now + timedelta(days=min_dte), latest)
+
+    def classify(self, underlying, expiry: datetime) -> ExpiryClass:
+        """LEAP if at least a year out, else monthly (third Friday) or weekly"""
+        if (expiry - self.algo.Time).days >= TradingConstants.CALENDAR_DAYS_PER_YEAR:
+            return ExpiryClass.LEAP
+        index = self.indexes.get(underlying)
+        monthly = expiry in index.monthly if index is not None else is_standard_monthly(expiry.date())
+        return ExpiryClass.MONTHLY if monthly else ExpiryClass.WEEKLY
+
+    def listing_date(self, underlying, expiry: datetime):
+        index = self.indexes.get(underlying)
+        return index.listed.get(expiry) if index is not None else None
+
+    def next_weekly_expiry(self, underlying=None) -> datetime:
+        """
+        First listed Friday (or holiday-shifted Thursday) expiry after today's
+        close; falls back to the calendar Friday when the chain is unavailable
+        """
+        now = self.algo.Time
+        after_close = now.hour >= TradingConstants.MARKET_CLOSE_HOUR
+        if underlying is not None:
+            index = self.index(underlying)
+            earliest = datetime(now.year, now.month, now.day) + timedelta(days=1 if after_close else 0)
+            window = index.in_band(earliest, earliest + timedelta(days=8))
+            listed_dates = {expiry.date() for expiry in window}
+            for expiry in window:
+                # Friday, or Thursday when that Friday is an exchange holiday
+                if expiry.weekday() == 4 or (expiry.weekday() == 3 and
+                                             (expiry + timedelta(days=1)).date() not in listed_dates):
+                    return expiry
+
+        days_until_friday = (4 - now.weekday()) % 7
+        if days_until_friday == 0 and after_close:
+            days_until_friday = 7
+        return now + timedelta(days=days_until_friday)
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['underlyings'] = len(self.indexes)
+        stats['expiries'] = sum(len(i.expiries) for i in self.indexes.values())
+        return stats
+
+
+def get_expiration_calendar(algorithm) -> ExpirationCalendar:
+    """The algorithm's shared ExpirationCalendar, created on first use"""
+
+    calendar = getattr(algorithm, 'expiration_calendar', None)
+    if not isinstance(calendar, ExpirationCalendar):
+        calendar = ExpirationCalendar(algorithm)
+        algorithm.expiration_calendar = calendar
+    return calendar
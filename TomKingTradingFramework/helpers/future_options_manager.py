@@ -6,6 +6,7 @@ from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
+from helpers.futures_option_chain_store import get_futures_option_chain_store
 
 class FutureOptionStatus(Enum):
     """Status of future option support for underlying futures"""
@@ -85,6 +86,9 @@ class FutureOptionsManager:
         self.option_chain_cache: Dict[str, Tuple[datetime, any]] = {}
         self.cache_ttl = timedelta(minutes=5 if self.is_backtest else 1)
         
+        # Contract lists per contract month, shared with the futures strategies
+        self.chain_store = get_futures_option_chain_store(algorithm)
+        
         if not self.is_backtest:
             self.algo.Debug("[FutureOptions] Production-grade manager initialized")
     
@@ -117,6 +121,10 @@ class FutureOptionsManager:
         if future_symbol in self.option_support_status:
             existing_info = self.option_support_status[future_symbol]
             
+            # Already subscribed - avoid re-adding the future option universe
+            if existing_info.status == FutureOptionStatus.SUPPORTED:
+                return existing_info
+            
             if (existing_info.retry_after and 
                 existing_info.retry_after > self.algo.Time):
                 # Still in retry delay period
@@ -124,27 +132,26 @@ class FutureOptionsManager:
         
         # Attempt to add future option with robust error handling
         try:
-                )
-                try:
-                    pass
-            )
-        except Exception as e:
             if not self.is_backtest:
                 self.algo.Debug(f"[FutureOptions] Attempting to add options for {future_symbol}")
+            
             # Try to add the future option
             future_option = self.algo.AddFutureOption(future_symbol, Resolution.Minute)
             if future_option is None:
                 return self._handle_future_option_failure(
                     future_symbol, 
                     "AddFutureOption returned None"
+                )
+            
             # Set the option filter if provided
             if option_filter_func:
-                except Exception as e:
+                try:
                     future_option.SetFilter(option_filter_func)
                 except Exception as filter_error:
                     if not self.is_backtest:
                         self.algo.Debug(f"[FutureOptions] Filter error for {future_symbol}: {filter_error}")
                     # Continue without filter rather than failing completely
+            
             # Success! Update tracking
             self.option_successes += 1
             info = FutureOptionInfo(
@@ -152,11 +159,15 @@ class FutureOptionsManager:
                 underlying=future_option.Symbol.Underlying,
                 status=FutureOptionStatus.SUPPORTED,
                 last_tested=self.algo.Time
+            )
             self.option_support_status[future_symbol] = info
             self.known_supported.add(future_symbol)  # Learn for future
+            
             if not self.is_backtest:
                 self.algo.Debug(f"[FutureOptions] Successfully added options for {future_symbol}")
+            
             return info
+            
         except Exception as e:
             return self._handle_future_option_failure(future_symbol, str(e))
     
@@ -219,8 +230,10 @@ class FutureOptionsManager:
         Get option chain with caching and error handling
         """
         
-        # Check cache first
-        cache_key = f"chain_{future_symbol}"
+        # Check cache first (keyed by contract month so a roll never serves the old chain)
+        info = self.option_support_status.get(future_symbol)
+        contract = self.chain_store.current_contract(info.underlying) if info and info.underlying else None
+        cache_key = f"chain_{future_symbol}_{contract}"
         if cache_key in self.option_chain_cache:
             cache_time, cached_chain = self.option_chain_cache[cache_key]
             if self.algo.Time - cache_time < self.cache_ttl:
@@ -238,7 +251,6 @@ class FutureOptionsManager:
         
         # Try to get option chain
         try:
-        except Exception as e:
             if info.symbol in self.algo.CurrentSlice.OptionChains:
                 option_chain = self.algo.CurrentSlice.OptionChains[info.symbol]
                 # Cache the result
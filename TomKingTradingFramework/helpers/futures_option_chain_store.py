@@ -0,0 +1,145 @@
+# region imports
+from AlgorithmImports import *
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from helpers.expiration_calendar import ExpirationIndex
+# endregion
+
+
+class FuturesOptionChainEntry:
+    """Indexed option chain on one futures contract month"""
+
+    __slots__ = ('root', 'contract', 'index', 'fetched', 'stale')
+
+    def __init__(self, root: str, contract, index: ExpirationIndex, fetched: datetime):
+        self.root = root
+        self.contract = contract    # mapped futures contract (or contract-month key)
+        self.index = index
+        self.fetched = fetched
+        self.stale = False
+
+
+class FuturesOptionChainStore:
+    """
+    Futures-option chains keyed by continuous root and contract month
+
+    Unlike equity chains, a futures-option chain only changes when the
+    continuous contract rolls to a new month or the exchange lists a new
+    expiry, so entries are not time-limited:
+    - roll: the root's mapped contract no longer matches the cached entry
+    - new listing: on_securities_changed() sees a futures option whose expiry
+      the cached chain does not contain
+
+    Band and closest-strike queries run on the cached ExpirationIndex.
+    prewarm() fetches every registered root ahead of the strangle entry.
+    """
+
+    def __init__(self, algorithm):
+        self.algo = algorithm
+        self.entries: Dict[str, FuturesOptionChainEntry] = {}
+        self.roots: Dict[str, object] = {}  # root -> continuous future Symbol
+
+        self.stats = {
+            'hits': 0,
+            'fetches': 0,
+            'roll_invalidations': 0,
+            'listing_invalidations': 0,
+            'prewarmed': 0
+        }
+
+    def register_future(self, root: str, future_symbol):
+        """Remember the continuous future subscribed for a root (used by prewarm)"""
+        self.roots[root] = future_symbol
+
+    def _root_of(self, future_symbol) -> str:
+        root = future_symbol.ID.Symbol if hasattr(future_symbol, 'ID') else str(future_symbol)
+        return root.lstrip('/')
+
+    def current_contract(self, future_symbol):
+        """Front contract the continuous future is mapped to; month key when unmapped"""
+        if future_symbol in self.algo.Securities:
+            mapped = getattr(self.algo.Securities[future_symbol], 'Mapped', None)
+            if mapped is not None:
+                return mapped
+        return self.algo.Time.strftime('%Y%m')
+
+    def get_index(self, future_symbol) -> ExpirationIndex:
+        """Indexed option chain for the future's current contract month"""
+
+        root = self._root_of(future_symbol)
+        contract = self.current_contract(future_symbol)
+        entry = self.entries.get(root)
+
+        if entry is not None and not entry.stale and entry.contract == contract:
+            self.stats['hits'] += 1
+            return entry.index
+
+        if entry is not None and entry.contract != contract:
+            self.stats['roll_invalidations'] += 1
+
+        chain_symbol = contract if hasattr(contract, 'ID') else future_symbol
+        index = ExpirationIndex()
+        index.rebuild(self.algo.OptionChainProvider.GetOptionContractList(chain_symbol, self.algo.Time),
+                      self.algo.Time.date())
+        self.entries[root] = FuturesOptionChainEntry(root, contract, index, self.algo.Time)
+        self.stats['fetches'] += 1
+        return index
+
+    def contracts_in_band(self, future_symbol, min_dte: int, max_dte: int = None, right=None) -> List:
+        now = self.algo.Time
+        latest = None if max_dte is None else now + timedelta(days=max_dte)
+        return self.get_index(future_symbol).contracts_between(now + timedelta(days=min_dte), latest, right)
+
+    def closest_contract(self, future_symbol, right, strike: float, min_dte: int, max_dte: int = None):
+        now = self.algo.Time
+        latest = None if max_dte is None else now + timedelta(days=max_dte)
+        return self.get_index(future_symbol).closest_contract(right, strike, now + timedelta(days=min_dte), latest)
+
+    def on_securities_changed(self, changes):
+        """Invalidate a root's chain when a futures option with an unseen expiry is added"""
+
+        for security in changes.AddedSecurities:
+            symbol = security.Symbol
+            if symbol.SecurityType != SecurityType.FutureOption:
+                continue
+            entry = self.entries.get(self._root_of(symbol.Underlying))
+            if entry is not None and not entry.stale and symbol.ID.Date not in entry.index.listed:
+                entry.stale = True
+                self.stats['listing_invalidations'] += 1
+
+    def invalidate(self, root: str = None):
+        if root is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(root.lstrip('/'), None)
+
+    def prewarm(self, roots=None) -> int:
+        """Fetch and index chains for registered roots (all by default); returns the number warmed"""
+
+        warmed = 0
+        for root in roots or list(self.roots):
+            future_symbol = self.roots.get(root)
+            if future_symbol is None:
+                continue
+            try:
+                self.get_index(future_symbol)
+                warmed += 1
+            except Exception as e:
+                self.algo.Debug(f"[FuturesOptionChains] Prewarm failed for {root}: {e}")
+        self.stats['prewarmed'] += warmed
+        return warmed
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['cached_roots'] = len(self.entries)
+        return stats
+
+
+def get_futures_option_chain_store(algorithm) -> FuturesOptionChainStore:
+    """The algorithm's shared FuturesOptionChainStore, created on first use"""
+
+    store = getattr(algorithm, 'futures_option_chains', None)
+    if not isinstance(store, FuturesOptionChainStore):
+        store = FuturesOptionChainStore(algorithm)
+        algorithm.futures_option_chains = store
+    return store
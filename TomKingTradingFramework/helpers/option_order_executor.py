@@ -2,6 +2,7 @@
 # Only what's absolutely needed for trading
 
 from AlgorithmImports import *
+from risk.margin_engine import MarginLeg, get_margin_engine
 
 class OptionOrderExecutor:
     """
@@ -97,7 +98,6 @@ class OptionOrderExecutor:
         for order in orders:
             if order is not None:
                 try:
-                except Exception as e:
                     if order.Status == OrderStatus.Submitted:
                         order.Cancel()
                     elif order.Status == OrderStatus.Filled:
@@ -110,7 +110,12 @@ class OptionOrderExecutor:
         """
         Simple margin calculation for credit spreads
         """
-        spread_width = abs(long_strike - short_strike)
-        margin = spread_width * quantity * multiplier
-        return margin
+        # Long wing above the short strike means a call spread, below it a put spread
+        is_call = long_strike > short_strike
+        contracts = abs(quantity)
+        legs = [
+            MarginLeg('SPREAD', -contracts, short_strike, multiplier=multiplier, strike=short_strike, is_call=is_call),
+            MarginLeg('SPREAD', contracts, short_strike, multiplier=multiplier, strike=long_strike, is_call=is_call)
+        ]
+        return get_margin_engine(self.algo).requirement(legs)
 
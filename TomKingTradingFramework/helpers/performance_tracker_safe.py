@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 from decimal import Decimal, ROUND_HALF_UP
 import numpy as np
 from core.unified_state_manager import UnifiedStateManager
+from risk.equity_curve import EquityCurve
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -36,6 +37,9 @@ class SafePerformanceTracker:
         self.trade_history = []
         self.MAX_HISTORY = 1000
         
+        # Cumulative P&L curve: O(1) peak and drawdown over every trade, not just the window
+        self.pnl_curve = EquityCurve(self.MAX_HISTORY)
+        
         # Checkpoints for recovery
         self.checkpoints = []
         self.last_checkpoint = None
@@ -51,7 +55,6 @@ class SafePerformanceTracker:
             pnl_decimal = Decimal(str(pnl))
             fees_decimal = Decimal(str(fees))
             slippage_decimal = Decimal(str(slippage))
-        except Exception as e:
             
             # Check individual values first
             if abs(pnl_decimal) > self.MAX_VALUE:
@@ -84,6 +87,7 @@ class SafePerformanceTracker:
             # Maintain rolling window
             if len(self.pnl_history) > self.MAX_HISTORY:
                 self.pnl_history.pop(0)
+            self.pnl_curve.update(float(new_cumulative), self.algo.Time)
                 
             return True
             
@@ -122,30 +126,13 @@ class SafePerformanceTracker:
     def calculate_max_drawdown(self) -> Dict:
         """Calculate maximum drawdown with overflow protection"""
         
-        if not self.pnl_history:
+        if not self.pnl_curve.samples:
             return {'max_dd': 0, 'current_dd': 0, 'peak': 0}
             
-        cumulative_values = [h['cumulative'] for h in self.pnl_history]
-        
-        peak = cumulative_values[0]
-        max_dd = 0
-        current_dd = 0
-        
-        for value in cumulative_values:
-            # Update peak
-            if value > peak:
-                peak = value
-                
-            # Calculate drawdown
-            if peak > 0:
-                dd = (peak - value) / peak
-                max_dd = max(max_dd, dd)
-                current_dd = dd
-                
         return {
-            'max_dd': max_dd,
-            'current_dd': current_dd,
-            'peak': peak
+            'max_dd': self.pnl_curve.max_drawdown,
+            'current_dd': self.pnl_curve.current_drawdown,
+            'peak': self.pnl_curve.peak
         }
         
     def calculate_win_rate(self) -> Dict:
@@ -242,10 +229,8 @@ class SafePerformanceTracker:
         """
         
         try:
-            current_value = self.algo.Portfolio.TotalPortfolioValue
-        except Exception as e:
-
             # Get current portfolio value
+            current_value = self.algo.Portfolio.TotalPortfolioValue
             
             # Calculate current unrealized P&L if we have a baseline
             if hasattr(self, '_last_portfolio_value'):
@@ -274,9 +259,6 @@ class SafePerformanceTracker:
         """
         
         try:
-                }
-                # Maintain rolling window
-        except Exception as e:
             if hasattr(order_event, 'FillPrice') and hasattr(order_event, 'FillQuantity'):
                 # QuantConnect provides fill details for complete trade tracking
                 fill_value = float(order_event.FillPrice * order_event.FillQuantity)
@@ -287,6 +269,8 @@ class SafePerformanceTracker:
                     'quantity': order_event.FillQuantity,
                     'price': order_event.FillPrice,
                     'value': fill_value
+                }
+                # Maintain rolling window
                 self.trade_history.append(trade_record)
                 if len(self.trade_history) > self.MAX_HISTORY:
                     self.trade_history.pop(0)
@@ -0,0 +1,281 @@
+# region imports
+from AlgorithmImports import *
+from typing import Dict, List, Optional
+import numpy as np
+# endregion
+
+
+def _norm_cdf(x):
+    """Vectorized standard normal CDF (Abramowitz & Stegun 7.1.26, |error| < 1.5e-7)"""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.where(x >= 0, erf, -erf))
+
+
+class ChainSide:
+    """One option right of a ChainSnapshot, sorted by strike"""
+
+    __slots__ = ('symbols', 'strikes', 'bids', 'asks', 'deltas')
+
+    def __init__(self, symbols: List, strikes, bids, asks, deltas):
+        order = np.argsort(strikes, kind='stable')
+        self.symbols = [symbols[i] for i in order]
+        self.strikes = np.asarray(strikes, dtype=np.float64)[order]
+        self.bids = np.asarray(bids, dtype=np.float64)[order]
+        self.asks = np.asarray(asks, dtype=np.float64)[order]
+        self.deltas = np.asarray(deltas, dtype=np.float64)[order]  # absolute delta
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def nearest(self, strike: float) -> Optional[int]:
+        """Index of the strike closest to `strike` (binary search)"""
+        if not self.symbols:
+            return None
+        i = int(np.searchsorted(self.strikes, strike))
+        if i == 0:
+            return 0
+        if i >= len(self.strikes):
+            return len(self.strikes) - 1
+        return i if self.strikes[i] - strike < strike - self.strikes[i - 1] else i - 1
+
+
+class ChainSnapshot:
+    """
+    Indexed single-expiry option chain: strike-sorted arrays of quotes and
+    deltas per right, built in one pass over the contracts.
+
+    Quotes come from subscribed Securities (NaN when not subscribed). Deltas
+    come from the chain's Greeks when present, otherwise they are estimated from
+    moneyness with the VIX as volatility over the remaining session.
+    """
+
+    __slots__ = ('underlying_price', 'expiry', 'puts', 'calls')
+
+    def __init__(self, underlying_price: float, expiry, puts: ChainSide, calls: ChainSide):
+        self.underlying_price = underlying_price
+        self.expiry = expiry
+        self.puts = puts
+        self.calls = calls
+
+    @classmethod
+    def from_contracts(cls, algorithm, contracts: List, underlying_price: float,
+                       volatility: float, years_to_expiry: float) -> 'ChainSnapshot':
+        """
+        Args:
+            contracts: option Symbols for a single expiry (OptionChainProvider list)
+            volatility: annualised volatility as a decimal (VIX / 100)
+            years_to_expiry: remaining time, e.g. session minutes left / (390 * 252)
+        """
+
+        sides = {OptionRight.Put: ([], [], [], []), OptionRight.Call: ([], [], [], [])}
+        securities = algorithm.Securities
+        expiry = None
+
+        for contract in contracts:
+            symbols, strikes, bids, asks = sides[contract.ID.OptionRight]
+            symbols.append(contract)
+            strikes.append(contract.ID.StrikePrice)
+            if expiry is None:
+                expiry = contract.ID.Date
+            if contract in securities:
+                security = securities[contract]
+                bids.append(security.BidPrice)
+                asks.append(security.AskPrice)
+            else:
+                bids.append(np.nan)
+                asks.append(np.nan)
+
+        sigma_t = max(volatility, 1e-4) * np.sqrt(max(years_to_expiry, 1e-6))
+        built = {}
+        for right, (symbols, strikes, bids, asks) in sides.items():
+            strike_array = np.asarray(strikes, dtype=np.float64)
+            d1 = np.log(underlying_price / strike_array) / sigma_t + 0.5 * sigma_t if len(strikes) else strike_array
+            call_delta = _norm_cdf(d1)
+            deltas = call_delta if right == OptionRight.Call else 1.0 - call_delta
+            built[right] = ChainSide(symbols, strike_array, bids, asks, deltas)
+
+        return cls(underlying_price, expiry, built[OptionRight.Put], built[OptionRight.Call])
+
+    @classmethod
+    def from_option_chain(cls, chain, underlying_price: float) -> 'ChainSnapshot':
+        """Build from a slice OptionChain (quotes and Greeks carried on each contract)"""
+
+        sides = {OptionRight.Put: ([], [], [], [], []), OptionRight.Call: ([], [], [], [], [])}
+        expiry = None
+        for contract in chain:
+            symbols, strikes, bids, asks, deltas = sides[contract.Right]
+            symbols.append(contract.Symbol)
+            strikes.append(contract.Strike)
+            bids.append(contract.BidPrice)
+            asks.append(contract.AskPrice)
+            deltas.append(abs(contract.Greeks.Delta))
+            if expiry is None:
+                expiry = contract.Expiry
+
+        return cls(underlying_price, expiry,
+                   ChainSide(*sides[OptionRight.Put]), ChainSide(*sides[OptionRight.Call]))
+
+
+class SpreadCandidate:
+    """A priced vertical spread or iron condor"""
+
+    __slots__ = ('structure', 'legs', 'strikes', 'credit', 'max_risk', 'credit_to_risk', 'short_deltas')
+
+    def __init__(self, structure: str, legs: Dict, strikes: Dict, credit: float, max_risk: float,
+                 short_deltas: Dict):
+        self.structure = structure
+        self.legs = legs
+        self.strikes = strikes
+        self.credit = credit          # natural credit per share (sell at bid, buy at ask)
+        self.max_risk = max_risk      # per share
+        self.credit_to_risk = credit / max_risk if max_risk > 0 else 0.0
+        self.short_deltas = short_deltas
+
+
+class SpreadConstructionEngine:
+    """
+    Ranks credit spreads and iron condors on a ChainSnapshot in one vectorized pass
+
+    For each side, the `search_width` strikes nearest the target (by delta, or by
+    strike when a target strike is given) are paired with the strike one wing
+    width further out, priced at the natural (short bid - long ask) and ranked by
+    credit / max risk. Delta targets keep only shorts within `delta_band` of the
+    target (always including the nearest), so the ranking cannot drift toward
+    the money for a richer ratio. Condors combine the best put and call spreads
+    with a single broadcast; condor risk is the wider wing less the total credit.
+    """
+
+    def __init__(self, algorithm, wing_width: float = 5.0, search_width: int = 5,
+                 min_credit: float = 0.05, max_candidates: int = 5, delta_band: float = 0.05):
+        self.algo = algorithm
+        self.wing_width = wing_width
+        self.search_width = search_width
+        self.delta_band = delta_band
+        self.min_credit = min_credit
+        self.max_candidates = max_candidates
+
+        self.stats = {
+            'snapshots_ranked': 0,
+            'spreads_priced': 0,
+            'condors_priced': 0
+        }
+
+    def put_spreads(self, snapshot: ChainSnapshot, target_delta: float = None,
+                    target_strike: float = None, wing_width: float = None) -> List[SpreadCandidate]:
+        return self._rank_verticals(snapshot.puts, 'put_spread', -1.0, target_delta, target_strike,
+                                    wing_width or self.wing_width)
+
+    def call_spreads(self, snapshot: ChainSnapshot, target_delta: float = None,
+                     target_strike: float = None, wing_width: float = None) -> List[SpreadCandidate]:
+        return self._rank_verticals(snapshot.calls, 'call_spread', 1.0, target_delta, target_strike,
+                                    wing_width or self.wing_width)
+
+    def iron_condors(self, snapshot: ChainSnapshot, put_delta: float, call_delta: float,
+                     wing_width: float = None) -> List[SpreadCandidate]:
+        """Best iron condors by credit/risk from the top put and call spreads"""
+
+        self.stats['snapshots_ranked'] += 1
+        width = wing_width or self.wing_width
+        puts = self._price_verticals(snapshot.puts, -1.0, put_delta, None, width)
+        calls = self._price_verticals(snapshot.calls, 1.0, call_delta, None, width)
+        if puts is None or calls is None:
+            return []
+
+        p_short, p_long, p_credit, p_width = puts
+        c_short, c_long, c_credit, c_width = calls
+
+        credit = p_credit[:, None] + c_credit[None, :]
+        risk = np.maximum(p_width[:, None], c_width[None, :]) - credit
+        valid = (credit >= self.min_credit) & (risk > 0)
+        ratio = np.where(valid, credit / np.where(risk > 0, risk, 1.0), -np.inf)
+        self.stats['condors_priced'] += ratio.size
+
+        flat = np.argsort(-ratio, axis=None, kind='stable')[:self.max_candidates]
+        candidates = []
+        for index in flat:
+            i, j = np.unravel_index(index, ratio.shape)
+            if not np.isfinite(ratio[i, j]):
+                break
+            ps, pl, cs, cl = p_short[i], p_long[i], c_short[j], c_long[j]
+            candidates.append(SpreadCandidate(
+                'iron_condor',
+                legs={'short_put': snapshot.puts.symbols[ps], 'long_put': snapshot.puts.symbols[pl],
+                      'short_call': snapshot.calls.symbols[cs], 'long_call': snapshot.calls.symbols[cl]},
+                strikes={'short_put': snapshot.puts.strikes[ps], 'long_put': snapshot.puts.strikes[pl],
+                         'short_call': snapshot.calls.strikes[cs], 'long_call': snapshot.calls.strikes[cl]},
+                credit=float(credit[i, j]),
+                max_risk=float(risk[i, j]),
+                short_deltas={'put': float(snapshot.puts.deltas[ps]), 'call': float(snapshot.calls.deltas[cs])}
+            ))
+        return candidates
+
+    def _rank_verticals(self, side: ChainSide, structure: str, direction: float, target_delta,
+                        target_strike, width: float) -> List[SpreadCandidate]:
+        self.stats['snapshots_ranked'] += 1
+        priced = self._price_verticals(side, direction, target_delta, target_strike, width)
+        if priced is None:
+            return []
+
+        short_idx, long_idx, credit, wing = priced
+        risk = wing - credit
+        valid = (credit >= self.min_credit) & (risk > 0)
+        ratio = np.where(valid, credit / np.where(risk > 0, risk, 1.0), -np.inf)
+
+        prefix = structure.split('_')[0]
+        candidates = []
+        for k in np.argsort(-ratio, kind='stable')[:self.max_candidates]:
+            if not np.isfinite(ratio[k]):
+                break
+            s, l = short_idx[k], long_idx[k]
+            candidates.append(SpreadCandidate(
+                structure,
+                legs={f'short_{prefix}': side.symbols[s], f'long_{prefix}': side.symbols[l]},
+                strikes={f'short_{prefix}': side.strikes[s], f'long_{prefix}': side.strikes[l]},
+                credit=float(credit[k]),
+                max_risk=float(risk[k]),
+                short_deltas={prefix: float(side.deltas[s])}
+            ))
+        return candidates
+
+    def _price_verticals(self, side: ChainSide, direction: float, target_delta, target_strike,
+                         width: float):
+        """
+        Short/long index pairs with natural credit and wing width for the strikes
+        nearest the target. direction is -1 for puts (long wing below), +1 for calls.
+        """
+
+        count = len(side)
+        if count < 2:
+            return None
+
+        # Short candidates: nearest strikes to the target
+        distance = (np.abs(side.deltas - target_delta) if target_strike is None
+                    else np.abs(side.strikes - target_strike))
+        k = min(self.search_width, count)
+        short_idx = np.argpartition(distance, k - 1)[:k]
+        if target_strike is None and self.delta_band is not None:
+            # Shorts off the target delta by more than the band are not ranked
+            nearest = distance[short_idx].min()
+            short_idx = short_idx[distance[short_idx] <= max(self.delta_band, nearest)]
+
+        # Long wing: nearest listed strike to short +/- width, strictly further OTM
+        wing_strikes = side.strikes[short_idx] + direction * width
+        long_idx = np.clip(np.searchsorted(side.strikes, wing_strikes), 1, count - 1)
+        lower = long_idx - 1
+        closer_lower = (wing_strikes - side.strikes[lower]) < (side.strikes[long_idx] - wing_strikes)
+        long_idx = np.where(closer_lower, lower, long_idx)
+
+        wing = (side.strikes[long_idx] - side.strikes[short_idx]) * direction
+        credit = side.bids[short_idx] - side.asks[long_idx]
+        keep = (wing > 0) & np.isfinite(credit)
+        if not keep.any():
+            return None
+
+        self.stats['spreads_priced'] += int(keep.sum())
+        return short_idx[keep], long_idx[keep], credit[keep], wing[keep]
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
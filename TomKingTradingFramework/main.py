@@ -52,6 +52,9 @@ from core.event_bus import EventBus, EventType
 from core.central_greeks_service import CentralGreeksService
 from core.event_driven_optimizer import EventDrivenOptimizer
 from core.event_driven_ondata import EventDrivenOnData
+from core.ondata_work_scheduler import OnDataWorkScheduler, WorkPriority
+from core.log_pipeline import LogPipeline
+from helpers.futures_option_chain_store import get_futures_option_chain_store
 
 class TomKingTradingIntegrated(QCAlgorithm):
     """
@@ -74,6 +77,9 @@ class TomKingTradingIntegrated(QCAlgorithm):
         # Performance optimization flags
         self.is_backtest = not self.LiveMode
         
+        # Level-gated hot-path logging (WARNING in backtests, INFO live) with error flight recorder
+        self.log_pipeline = LogPipeline(self)
+        
         # Initialize performance optimizations
         self.initialize_performance_optimizations()
         
@@ -159,6 +165,11 @@ class TomKingTradingIntegrated(QCAlgorithm):
         self.option_executor = self.manager_factory.get_manager('option_executor')
         self.future_options_manager = self.manager_factory.get_manager('future_options_manager')
         
+        # Periodic OnData work runs off the central schedule wheel
+        self.schedule_wheel = self.manager_factory.get_manager('schedule_wheel')
+        self._register_scheduled_jobs()
+        
+        
         # TastyTrade Integration (Live Mode Only)
         self.tastytrade_client = None
         self.tastytrade_integration = None
@@ -218,6 +229,9 @@ class TomKingTradingIntegrated(QCAlgorithm):
         iwm_options.SetFilter(-20, 20, timedelta(0), timedelta(days=60))
         iwm_options.SetFeeModel(TastyTradeFeeModel())
         
+        # Portfolio VaR keeps daily history loaded for the equity option underlyings
+        self.unified_risk_manager.var_service.watch("SPY", "QQQ", "IWM")
+        
         # Add core futures for futures strangles
         es_future = self.AddFuture("ES", Resolution.Minute)
         es_future.SetFilter(timedelta(0), timedelta(days=90))
@@ -238,6 +252,16 @@ class TomKingTradingIntegrated(QCAlgorithm):
             lambda u: u.Strikes(-10, 10).Expiration(timedelta(0), timedelta(days=90))
             )
         
+        # Futures option chains are cached per contract month; index them
+        # before the strangle entry window on Mondays and Thursdays
+        self.futures_option_chains = get_futures_option_chain_store(self)
+        self.futures_option_chains.register_future("ES", es_future.Symbol)
+        self.futures_option_chains.register_future("NQ", nq_future.Symbol)
+        self.schedule_wheel.cron('futures_option_prewarm', self.futures_option_chains.prewarm,
+                                 minutes=[TradingConstants.FUTURES_OPTION_PREWARM_MINUTE],
+                                 hours=[TradingConstants.FUTURES_OPTION_PREWARM_HOUR],
+                                 weekdays=[0, 3])  # Monday, Thursday
+        
         # ======================
         # STRATEGY INITIALIZATION
         # ======================
@@ -311,25 +335,15 @@ class TomKingTradingIntegrated(QCAlgorithm):
             if not self.is_backtest:
                 # Only enable scheduling in live mode - disabled in backtests for performance
                 safety_check_interval = 5  # 5 minutes in live mode only
-                self.Schedule.On(
-                    self.DateRules.EveryDay("SPY"),
-                        self.TimeRules.Every(timedelta(minutes=safety_check_interval)),
-                        self.SafetyCheck
-                    )
+                self.schedule_wheel.every('safety_check', timedelta(minutes=safety_check_interval),
+                                          self.SafetyCheck, WorkPriority.DEFERRABLE)
 
-            # Schedule state persistence at end of day
-            self.Schedule.On(
-                self.DateRules.EveryDay("SPY"),
-                self.TimeRules.At(15, 45),  # End of day persistence
-            self.PersistStates
-            )
-
-            # Schedule EOD reconciliation
-            self.Schedule.On(
-                self.DateRules.EveryDay("SPY"),
-                self.TimeRules.At(15, 45),
-            self.EndOfDayReconciliation
-            )
+            # State persistence and EOD reconciliation 15 minutes before the
+            # session's actual close (12:45 on early close days)
+            self.schedule_wheel.before_market_close('persist_states', self.PersistStates,
+                                                    minutes_before=15, priority=WorkPriority.CRITICAL)
+            self.schedule_wheel.before_market_close('eod_reconciliation', self.EndOfDayReconciliation,
+                                                    minutes_before=15)
 
             # CRITICAL FIX #2: Schedule SPY allocation cleanup to prevent resource starvation
             # This addresses the documented critical issue where crashed strategies
@@ -406,6 +420,12 @@ class TomKingTradingIntegrated(QCAlgorithm):
     
     def initialize_performance_optimizations(self):
         """Initialize all performance optimization systems"""
+
+        # Time-budgeted OnData work: critical risk work first, maintenance carried to quiet slices.
+        # Created outside the cache try: OnData relies on it even when cache setup fails
+        self.ondata_scheduler = OnDataWorkScheduler(self)
+        self.cache_maintenance_interval = timedelta(minutes=15)
+
         try:
             # UNIFIED INTELLIGENT CACHE SYSTEM - CONSOLIDATION
             # Replaces HighPerformanceCache + PositionAwareCache + MarketDataCache
@@ -424,10 +444,6 @@ class TomKingTradingIntegrated(QCAlgorithm):
             self.position_cache = self.unified_cache
             self.market_cache = self.unified_cache
 
-            # Performance tracking flags
-            self.last_cache_maintenance = self.Time
-            self.cache_maintenance_interval = timedelta(minutes=15)
-
             if not self.is_backtest:
                 self.Debug("[MAIN]  High-performance caching systems initialized")
 
@@ -782,6 +798,25 @@ class TomKingTradingIntegrated(QCAlgorithm):
 
             return False
 
+    def OnEndOfAlgorithm(self):
+        """Flush and close the event journal so the last segment is written"""
+        
+        if getattr(self.event_bus, 'journal', None) is not None:
+            self.event_bus.disable_journal()
+    
+    def OnSecuritiesChanged(self, changes):
+        """Newly listed futures option expiries invalidate that root's cached chain"""
+        if hasattr(self, 'futures_option_chains'):
+            self.futures_option_chains.on_securities_changed(changes)
+
+    def OnOrderEvent(self, order_event):
+        """Fills reach the risk manager: verdict/VaR invalidation and position open/close notifications"""
+        try:
+            if hasattr(self, 'unified_risk_manager'):
+                self.unified_risk_manager.on_order_event(order_event)
+        except Exception as e:
+            self.Error(f"[MAIN]  Error forwarding order event to risk manager: {e}")
+
     def OnData(self, data):
             """
             PHASE 5: Event-Driven OnData Processing
@@ -790,6 +825,9 @@ class TomKingTradingIntegrated(QCAlgorithm):
             for 20%+ performance improvement through intelligent filtering and batching
             """
 
+            # Slice budget covers everything OnData does, not just the queued work
+            self.ondata_scheduler.begin_slice()
+
             # PHASE 5 OPTIMIZATION: Use event-driven OnData processor
             try:
                 # Process through event-driven architecture with performance optimization
@@ -813,13 +851,17 @@ class TomKingTradingIntegrated(QCAlgorithm):
                     self._fallback_ondata_processing(data)
                     return
                 
-                # Traditional risk management and maintenance (not event-driven yet)
-                self._perform_traditional_risk_checks()
-                
             except Exception as e:
                 self.Error(f"[MAIN]  Critical error in event-driven OnData: {e}")
                 # Emergency fallback to traditional processing
                 self._fallback_ondata_processing(data)
+                
+            finally:
+                # Risk checks and due/deferred work run on every slice, skipped and fallback ones included
+                try:
+                    self._perform_traditional_risk_checks()
+                except Exception as e:
+                    self.Error(f"[MAIN]  Slice risk checks/scheduled work failed: {e}")
     
     def _fallback_ondata_processing(self, data):
         """Emergency fallback to traditional OnData processing"""
@@ -842,39 +884,50 @@ class TomKingTradingIntegrated(QCAlgorithm):
             'time': self.Time
         })
         
-        # Risk management
-        self.check_circuit_breakers()
+        # Circuit breakers run from OnData's finally with the rest of the slice's risk work
     
-    def _perform_traditional_risk_checks(self):
-        """Traditional risk management checks (not yet event-driven)"""
+    def _register_scheduled_jobs(self):
+        """Register periodic OnData work with the schedule wheel (replaces Time.minute % N polling)"""
+        
+        wheel = self.schedule_wheel
         
-        # Periodic cache maintenance
-        if hasattr(self, 'last_cache_maintenance'):
-            if (self.Time - self.last_cache_maintenance) > self.cache_maintenance_interval:
-                self.maintain_caches()
-                self.last_cache_maintenance = self.Time
+        # Risk work stays on its exact boundaries
+        wheel.every('correlation_limits', timedelta(minutes=30),
+                    lambda: self.correlation_limiter.check_and_enforce_limits(), WorkPriority.CRITICAL)
+        self.unified_risk_manager.register_scheduled_jobs(wheel)
+        
+        # Monitoring and maintenance may drift a few minutes to keep off busy minutes
+        wheel.every('greeks_monitoring', timedelta(minutes=15), self._monitor_portfolio_greeks,
+                    WorkPriority.NORMAL, jitter_minutes=2)
+        wheel.every('cache_maintenance', self.cache_maintenance_interval, self.maintain_caches,
+                    WorkPriority.DEFERRABLE, jitter_minutes=5)
+    
+    def _perform_traditional_risk_checks(self):
+        """Traditional risk management checks (not yet event-driven), run within the slice budget"""
         
         # Circuit breakers
-        self.check_circuit_breakers()
+        self.ondata_scheduler.submit('circuit_breakers', self.check_circuit_breakers, WorkPriority.CRITICAL)
         
-        # Greeks monitoring (now event-driven but kept for compatibility)
-        if self.Time.minute % 15 == 0:
-            portfolio_greeks = self.greeks_monitor.get_portfolio_greeks()
-            warnings, risk_analysis = self.greeks_monitor.monitor_greeks_thresholds()
-            
-            if warnings:
-                for warning in warnings:
-                    self.Log(f"[MAIN]  {warning}")
-            
-            self.event_bus.publish_greeks_event(
-                EventType.GREEKS_CALCULATED,
-                portfolio_greeks,
-                risk_analysis=risk_analysis
-            )
+        # Due periodic jobs are queued onto the same slice budget
+        self.schedule_wheel.tick()
+        
+        self.ondata_scheduler.run_slice()
+    
+    def _monitor_portfolio_greeks(self):
+        """Portfolio Greeks threshold check and GREEKS_CALCULATED publication"""
         
-        # Correlation limits
-        if self.Time.minute % 30 == 0:
-            self.correlation_limiter.check_and_enforce_limits()
+        portfolio_greeks = self.greeks_monitor.get_portfolio_greeks()
+        warnings, risk_analysis = self.greeks_monitor.monitor_greeks_thresholds()
+        
+        if warnings:
+            for warning in warnings:
+                self.Log(f"[MAIN]  {warning}")
+        
+        self.event_bus.publish_greeks_event(
+            EventType.GREEKS_CALCULATED,
+            portfolio_greeks,
+            risk_analysis=risk_analysis
+        )
     
     def maintain_caches(self):
         """Perform cache maintenance for optimal performance"""
@@ -891,24 +944,24 @@ class TomKingTradingIntegrated(QCAlgorithm):
         except Exception as e:
             self.Error(f"[MAIN]  Maintenance error: {e}")
 
-        def check_circuit_breakers(self):
-            """Check all circuit breaker conditions"""
-            # Rapid drawdown check
-            if self.performance_tracker.get_current_drawdown() < self.circuit_breakers['rapid_drawdown']['threshold']:
-                self.state_manager.halt_all_trading("Rapid drawdown detected")
+    def check_circuit_breakers(self):
+        """Check all circuit breaker conditions"""
+        # Rapid drawdown check
+        if self.performance_tracker.get_current_drawdown() < self.circuit_breakers['rapid_drawdown']['threshold']:
+            self.state_manager.halt_all_trading("Rapid drawdown detected")
 
-            # Margin spike check
-            margin_usage = self.margin_manager.get_margin_usage()
-            if margin_usage > self.circuit_breakers['margin_spike']['threshold']:
-                self.state_manager.halt_all_trading("Margin usage too high")
+        # Margin spike check
+        margin_usage = self.margin_manager.get_margin_usage()
+        if margin_usage > self.circuit_breakers['margin_spike']['threshold']:
+            self.state_manager.halt_all_trading("Margin usage too high")
 
-            # Correlation spike check
-            max_correlation = self.correlation_limiter.get_max_correlation()
-            if max_correlation > self.circuit_breakers['correlation_spike']['threshold']:
-                self.state_manager.halt_all_trading("Correlation spike detected")
+        # Correlation spike check
+        max_correlation = self.correlation_limiter.get_max_correlation()
+        if max_correlation > self.circuit_breakers['correlation_spike']['threshold']:
+            self.state_manager.halt_all_trading("Correlation spike detected")
 
-        def SafetyCheck(self):
-            """Regular safety check routine with conditional logging"""
+    def SafetyCheck(self):
+        """Regular safety check routine with conditional logging"""
 
         # Conditional logging for performance
         if not self.is_backtest or self.Time.minute % 30 == 0:
@@ -940,15 +993,15 @@ class TomKingTradingIntegrated(QCAlgorithm):
         else:
             self.Debug("Margin manager: get_margin_status method not available")
 
-            # Check correlations (defensive programming)
-            if hasattr(self.correlation_limiter, 'get_max_correlation'):
-                try:
-                    max_corr = self.correlation_limiter.get_max_correlation()
-                    self.Debug(f"Max correlation: {max_corr:.2f}")
-                except Exception as e:
-                    self.Debug(f"Correlation check error: {e}")
-            else:
-                self.Debug("Correlation limiter: get_max_correlation method not available")
+        # Check correlations (defensive programming)
+        if hasattr(self.correlation_limiter, 'get_max_correlation'):
+            try:
+                max_corr = self.correlation_limiter.get_max_correlation()
+                self.Debug(f"Max correlation: {max_corr:.2f}")
+            except Exception as e:
+                self.Debug(f"Correlation check error: {e}")
+        else:
+            self.Debug("Correlation limiter: get_max_correlation method not available")
         
         # Check hierarchical state system (defensive programming)
         try:
@@ -977,6 +1030,11 @@ class TomKingTradingIntegrated(QCAlgorithm):
         """Persist all state machines"""
         
         self.state_manager.save_all_states()
+        
+        # Flush any buffered event journal records alongside state
+        if getattr(self.event_bus, 'journal', None) is not None:
+            self.event_bus.journal.flush()
+        
         self.Debug("States persisted to ObjectStore")
     
     def EndOfDayReconciliation(self):
@@ -995,6 +1053,23 @@ class TomKingTradingIntegrated(QCAlgorithm):
             except Exception as e:
                 self.Debug(f"Performance summary error: {e}")
 
+            # OnData budget and deferred work summary
+            if hasattr(self, 'ondata_scheduler'):
+                scheduler_stats = self.ondata_scheduler.get_statistics()
+                pending = self.ondata_scheduler.get_pending_work_report()
+                self.Debug(f"OnData budget: avg {scheduler_stats['avg_slice_ms']:.1f}ms, "
+                           f"max {scheduler_stats['max_slice_ms']:.1f}ms, "
+                           f"{scheduler_stats['budget_overruns']} overruns, {scheduler_stats['tasks_deferred']} deferrals")
+                self.Debug(f"Deferred work pending: {pending['pending_tasks']} tasks, "
+                           f"~{pending['estimated_pending_ms']:.1f}ms, oldest {pending['oldest_waiting_seconds']:.0f}s")
+
+            # Hot-path logging summary
+            if hasattr(self, 'log_pipeline'):
+                log_stats = self.log_pipeline.get_statistics()
+                self.Debug(f"Logging ({log_stats['level']}): {log_stats['emitted']} emitted, "
+                           f"{log_stats['gated']} gated, {log_stats['rate_limited']} rate limited, "
+                           f"{log_stats['recorder_dumps']} flight recorder dumps")
+
             # Position summary
             positions = 0
             for symbol, holding in self.Portfolio.items():
@@ -5,14 +5,27 @@ Real-time correlation tracking with rolling windows and alerts
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from collections import deque
+from typing import Callable, Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 
+from config.constants import TradingConstants
+from optimization.streaming_correlation import (
+    StreamingCorrelationEngine, EWMACovarianceEstimator, CorrelationSpikeDetector
+)
+
 class DynamicCorrelationMonitor:
     """
     Advanced correlation monitoring with real-time updates
     Tracks correlations between positions and market factors
+
+    Returns feed a StreamingCorrelationEngine: prices received at the same
+    algorithm time form one bar, and the rolling correlation matrix is read
+    from the engine's running sums instead of per-pair corrcoef calls.
+
+    Every committed bar also updates the EWMA covariance and feeds the fast
+    half-life average pairwise correlation of the equity symbols (groups
+    A1/A2, see spike_universe) to the spike detector; regime transitions are
+    pushed to the registered spike listeners.
     """
     
     def __init__(self, algorithm, window_size: int = 20, update_frequency: int = 30):
@@ -20,9 +33,22 @@ class DynamicCorrelationMonitor:
         self.window_size = window_size  # Rolling window for correlation calculation
         self.update_frequency = update_frequency  # Minutes between updates
         
-        # Price history for correlation calculation
-        self.price_history: Dict[str, deque] = {}
-        self.returns_history: Dict[str, deque] = {}
+        # Rolling returns for correlation calculation
+        self.engine = StreamingCorrelationEngine(window_size)
+        self._bar_time = None
+        
+        # EWMA covariance and correlation-spike regime
+        self.ewma = EWMACovarianceEstimator(TradingConstants.CORRELATION_EWMA_HALF_LIVES,
+                                            TradingConstants.CORRELATION_EWMA_MIN_OBSERVATIONS)
+        self.fast_half_life = TradingConstants.CORRELATION_EWMA_HALF_LIVES[0]
+        self.spike_detector = CorrelationSpikeDetector(TradingConstants.CORRELATION_ELEVATED_THRESHOLD,
+                                                       TradingConstants.CORRELATION_SPIKE_THRESHOLD,
+                                                       TradingConstants.CORRELATION_REGIME_HYSTERESIS)
+        # Tickers whose average correlation drives the regime; None: every tracked symbol
+        self.spike_universe: Optional[Tuple[str, ...]] = TradingConstants.CORRELATION_SPIKE_UNIVERSE
+        self._spike_symbols: Optional[List[str]] = None
+        self._spike_symbols_key = None
+        self.spike_listeners: List[Callable[[Dict], None]] = []
         
         # Correlation matrices
         self.correlation_matrix: Dict[Tuple[str, str], float] = {}
@@ -45,17 +71,58 @@ class DynamicCorrelationMonitor:
         
     def update_price_data(self, symbol: str, price: float):
         """Update price data for correlation calculation"""
-        if symbol not in self.price_history:
-            self.price_history[symbol] = deque(maxlen=self.window_size + 1)
-            self.returns_history[symbol] = deque(maxlen=self.window_size)
-        
-        # Add new price
-        self.price_history[symbol].append(price)
+        # A new timestamp (or a second price for the same symbol) closes the open bar
+        if self._bar_time != self.algo.Time or self.engine.is_staged(symbol):
+            self._commit_bar()
+            self._bar_time = self.algo.Time
+        self.engine.stage(symbol, price)
+    
+    def update_prices(self, prices: Dict[str, float]):
+        """Feed one complete bar of prices"""
+        self._commit_bar()
+        for symbol, price in prices.items():
+            self.engine.stage(symbol, price)
+        self._commit_bar()
+        self._bar_time = None
+    
+    def add_spike_listener(self, listener: Callable[[Dict], None]):
+        """Call listener(spike) on every correlation regime transition"""
+        self.spike_listeners.append(listener)
+    
+    def _commit_bar(self):
+        if not self.engine.commit():
+            return
+        self.ewma.update(self.engine.last_returns())
+        average = self.ewma.average_correlation(self.fast_half_life, self._spike_symbol_list())
+        transition = self.spike_detector.update(average)
+        if transition is None:
+            return
         
-        # Calculate return if we have enough data
-        if len(self.price_history[symbol]) >= 2:
-            return_val = (self.price_history[symbol][-1] / self.price_history[symbol][-2] - 1)
-            self.returns_history[symbol].append(return_val)
+        spike = {
+            'old_regime': transition[0],
+            'new_regime': transition[1],
+            'average_correlation': average,
+            'half_life': self.fast_half_life,
+            'timestamp': self.algo.Time
+        }
+        self.algo.Log(f"[CORRELATION] Regime {transition[0]} -> {transition[1]} "
+                      f"(average correlation {average:.3f})")
+        for listener in self.spike_listeners:
+            try:
+                listener(spike)
+            except Exception as e:
+                self.algo.Error(f"[CORRELATION] Spike listener failed: {e}")
+    
+    def _spike_symbol_list(self) -> Optional[List[str]]:
+        """Tracked symbols in the spike universe, matched on ticker (rebuilt when symbols are added)"""
+        if self.spike_universe is None:
+            return None
+        key = (self.spike_universe, len(self.ewma.symbols))
+        if key != self._spike_symbols_key:
+            wanted = set(self.spike_universe)
+            self._spike_symbols = [s for s in self.ewma.symbols if str(s).split(' ')[0].lstrip('/') in wanted]
+            self._spike_symbols_key = key
+        return self._spike_symbols
     
     def calculate_correlations(self) -> Dict[Tuple[str, str], float]:
         """Calculate correlation matrix for all tracked symbols"""
@@ -64,17 +131,15 @@ class DynamicCorrelationMonitor:
             return self.correlation_matrix
         
         self.last_update = self.algo.Time
-        symbols_with_data = [s for s in self.returns_history 
-                            if len(self.returns_history[s]) >= self.window_size]
+        symbols, matrix = self.engine.correlation_matrix()
         
-        # Calculate pairwise correlations
+        # Pairwise view of the engine's matrix (symbols with a full window only)
         new_correlations = {}
-        for i, symbol1 in enumerate(symbols_with_data):
-            for symbol2 in symbols_with_data[i+1:]:
-                corr = self._calculate_correlation(symbol1, symbol2)
-                if corr is not None:
-                    new_correlations[(symbol1, symbol2)] = corr
-                    new_correlations[(symbol2, symbol1)] = corr
+        rows, cols = np.triu_indices(len(symbols), k=1)
+        for i, j, corr in zip(rows.tolist(), cols.tolist(), matrix[rows, cols].tolist()):
+            if corr == corr:  # skip NaN (zero variance or too few shared observations)
+                new_correlations[(symbols[i], symbols[j])] = corr
+                new_correlations[(symbols[j], symbols[i])] = corr
         
         self.correlation_matrix = new_correlations
         
@@ -86,18 +151,7 @@ class DynamicCorrelationMonitor:
     def _calculate_correlation(self, symbol1: str, symbol2: str) -> Optional[float]:
         """Calculate correlation between two symbols"""
         try:
-            # Calculate correlation between symbols
-            returns1 = np.array(list(self.returns_history[symbol1]))
-            returns2 = np.array(list(self.returns_history[symbol2]))
-            
-            if len(returns1) != len(returns2) or len(returns1) < self.window_size:
-                return None
-            
-            # Calculate correlation coefficient
-            correlation = np.corrcoef(returns1, returns2)[0, 1]
-            
-            return correlation
-            
+            return self.engine.correlation(symbol1, symbol2)
         except Exception as e:
             self.algo.Debug(f"Error calculating correlation between {symbol1} and {symbol2}: {e}")
             return None
@@ -214,7 +268,7 @@ class DynamicCorrelationMonitor:
         """Generate comprehensive correlation report"""
         report = {
             'timestamp': self.algo.Time,
-            'symbols_tracked': len(self.returns_history),
+            'symbols_tracked': len(self.engine.symbols),
             'correlations_calculated': len(self.correlation_matrix),
             'high_correlations': [],
             'extreme_correlations': [],
@@ -270,8 +324,10 @@ class DynamicCorrelationMonitor:
         vix_correlations = []
         spy_correlation = None
         
-        if 'VIX' in self.returns_history and 'SPY' in self.returns_history:
-            if ('VIX', 'SPY') in self.correlation_matrix:
+        if 'VIX' in self.engine.slot_by_symbol and 'SPY' in self.engine.slot_by_symbol:
+            # Fast EWMA reacts within a few bars; fall back to the rolling window
+            spy_correlation = self.ewma.correlation('VIX', 'SPY', self.fast_half_life)
+            if spy_correlation is None and ('VIX', 'SPY') in self.correlation_matrix:
                 spy_correlation = self.correlation_matrix[('VIX', 'SPY')]
         
         # Determine regime
@@ -285,4 +341,14 @@ class DynamicCorrelationMonitor:
             else:
                 return "CRISIS"  # Positive VIX-SPY correlation
         
-        return "UNKNOWN"
\ No newline at end of file
+        return "UNKNOWN"
+
+
+def get_correlation_monitor(algorithm) -> DynamicCorrelationMonitor:
+    """The algorithm's shared DynamicCorrelationMonitor, created on first use"""
+
+    monitor = getattr(algorithm, 'correlation_monitor', None)
+    if not isinstance(monitor, DynamicCorrelationMonitor):
+        monitor = DynamicCorrelationMonitor(algorithm)
+        algorithm.correlation_monitor = monitor
+    return monitor
@@ -6,16 +6,21 @@ Eliminates O(n²) algorithms with indexed lookups
 
 from typing import Dict, List, Set, Optional, Tuple
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
 class FastPositionLookup:
     """
     Optimized position lookup system using multiple indexes
     Reduces position search from O(n) to O(1) for most operations
+
+    When given a PositionBook (PositionStateManagerQC.book) lookups read the
+    book's indexes, which are maintained on every mutation; index_position()
+    and rebuild_indexes() are then no-ops.
     """
     
-    def __init__(self, algorithm):
+    def __init__(self, algorithm, book=None):
         self.algo = algorithm
+        self.book = book
         
         # Multiple indexes for fast lookup
         self.positions_by_symbol: Dict[str, Set[str]] = defaultdict(set)
@@ -33,6 +38,8 @@ class FastPositionLookup:
         
     def index_position(self, position_id: str, position):
         """Index a position for fast lookup - O(1) operation"""
+        if self.book is not None:
+            return
         # Index by symbol
         self.positions_by_symbol[position.symbol].add(position_id)
         
@@ -57,6 +64,8 @@ class FastPositionLookup:
     
     def remove_position_index(self, position_id: str, position):
         """Remove position from all indexes - O(1) operation"""
+        if self.book is not None:
+            return
         # Remove from symbol index
         if position.symbol in self.positions_by_symbol:
             self.positions_by_symbol[position.symbol].discard(position_id)
@@ -83,6 +92,9 @@ class FastPositionLookup:
     def find_positions_by_symbol(self, symbol: str) -> Set[str]:
         """Find all positions for a symbol - O(1) operation"""
         self.lookup_count += 1
+        if self.book is not None:
+            self.index_hits += 1
+            return set(self.book.positions_by_symbol.get(symbol, ()))
         if symbol in self.positions_by_symbol:
             self.index_hits += 1
         return self.positions_by_symbol.get(symbol, set())
@@ -90,6 +102,9 @@ class FastPositionLookup:
     def find_positions_by_strategy(self, strategy: str) -> Set[str]:
         """Find all positions for a strategy - O(1) operation"""
         self.lookup_count += 1
+        if self.book is not None:
+            self.index_hits += 1
+            return set(self.book.positions_by_strategy.get(strategy, ()))
         if strategy in self.positions_by_strategy:
             self.index_hits += 1
         return self.positions_by_strategy.get(strategy, set())
@@ -98,6 +113,8 @@ class FastPositionLookup:
         """Find all active positions - O(1) operation"""
         self.lookup_count += 1
         self.index_hits += 1
+        if self.book is not None:
+            return {pid for pid, p in self.book.positions.items() if p.status == "ACTIVE"}
         return self.positions_by_status.get("ACTIVE", set())
     
     def find_positions_expiring_soon(self, days: int = 21) -> Set[str]:
@@ -106,6 +123,11 @@ class FastPositionLookup:
         expiring_positions = set()
         current_date = self.algo.Time.date()
         
+        if self.book is not None:
+            self.index_hits += 1
+            latest = datetime.combine(current_date + timedelta(days=days), time.max)
+            return {pid for pid, _ in self.book.components_expiring_between(None, latest, refs=True)}
+        
         for expiry, position_ids in self.positions_by_expiry.items():
             if (expiry.date() - current_date).days <= days:
                 expiring_positions.update(position_ids)
@@ -118,6 +140,10 @@ class FastPositionLookup:
         self.lookup_count += 1
         components = []
         
+        if self.book is not None:
+            self.index_hits += 1
+            return self.book.components_in_strike_range(min_strike, max_strike, refs=True)
+        
         for strike, component_refs in self.components_by_strike.items():
             if min_strike <= strike <= max_strike:
                 components.extend(component_refs)
@@ -127,6 +153,8 @@ class FastPositionLookup:
     
     def rebuild_indexes(self, position_manager):
         """Rebuild all indexes from position manager - O(n) operation"""
+        if self.book is not None:
+            return
         # Clear existing indexes
         self.positions_by_symbol.clear()
         self.positions_by_strategy.clear()
@@ -148,9 +176,9 @@ class FastPositionLookup:
             'total_lookups': self.lookup_count,
             'index_hits': self.index_hits,
             'hit_rate': hit_rate,
-            'symbol_index_size': len(self.positions_by_symbol),
-            'strategy_index_size': len(self.positions_by_strategy),
-            'expiry_index_size': len(self.positions_by_expiry)
+            'symbol_index_size': len(self.book.positions_by_symbol if self.book else self.positions_by_symbol),
+            'strategy_index_size': len(self.book.positions_by_strategy if self.book else self.positions_by_strategy),
+            'expiry_index_size': len(self.book.components_by_expiry if self.book else self.positions_by_expiry)
         }
 
 
@@ -161,9 +189,16 @@ class BatchOperationOptimizer:
     
     def __init__(self, algorithm):
         self.algo = algorithm
+        self._securities = {}  # contract symbol -> Security, resolved once
         
     def batch_calculate_pnl(self, positions: Dict) -> Dict[str, float]:
-        """Calculate P&L for all positions in a single pass - O(n) instead of O(n²)"""
+        """
+        Calculate P&L for all positions in a single pass - O(n) instead of O(n²)
+        
+        Positions registered in a PositionBook are marked through the book, so
+        only legs whose contract price moved are revalued and totals are read
+        from its running per-position P&L.
+        """
         pnl_results = {}
         
         # Pre-fetch all current prices in one batch
@@ -175,8 +210,15 @@ class BatchOperationOptimizer:
         # Batch fetch prices
         current_prices = self._batch_fetch_prices(symbols_to_fetch)
         
+        books = {id(p.book): p.book for p in positions.values() if getattr(p, 'book', None) is not None}
+        for book in books.values():
+            book.mark_many(current_prices)
+        
         # Calculate P&L using cached prices
         for position_id, position in positions.items():
+            if getattr(position, 'book', None) is not None:
+                pnl_results[position_id] = position.book.position_pnl[position_id]
+                continue
             total_pnl = 0
             for component in position.components.values():
                 if component.contract_symbol in current_prices:
@@ -196,14 +238,20 @@ class BatchOperationOptimizer:
         prices = {}
         
         for symbol in symbols:
-            if symbol in self.algo.Securities:
-                prices[symbol] = float(self.algo.Securities[symbol].Price)
-            else:
-                # Symbol not in Securities, default to 0
-                prices[symbol] = 0.0
+            security = self._securities.get(symbol)
+            if security is None and symbol in self.algo.Securities:
+                security = self._securities[symbol] = self.algo.Securities[symbol]
+            # Symbol not in Securities: no price, so its legs keep their last mark
+            if security is not None:
+                prices[symbol] = float(security.Price)
         
         return prices
     
+    def on_securities_changed(self, changes):
+        """Drop cached Security references for removed contracts"""
+        for security in changes.RemovedSecurities:
+            self._securities.pop(security.Symbol, None)
+    
     def batch_check_exit_conditions(self, positions: Dict, exit_manager) -> List[Dict]:
         """Check exit conditions for all positions in a single pass"""
         exit_actions = []
@@ -212,6 +260,7 @@ class BatchOperationOptimizer:
         pnl_data = self.batch_calculate_pnl(positions)
         
         # Check exits using pre-calculated data
+        position_infos = []
         for position_id, position in positions.items():
             position_info = {
                 'position_id': position_id,
@@ -224,6 +273,11 @@ class BatchOperationOptimizer:
                 'components': position.components
             }
             
+            # Exit managers with a vectorized path evaluate the whole book at once
+            if hasattr(exit_manager, 'check_exits_batch'):
+                position_infos.append(position_info)
+                continue
+            
             should_exit, reason, action = exit_manager.check_exits(position_info)
             
             if should_exit:
@@ -234,4 +288,13 @@ class BatchOperationOptimizer:
                     'pnl': pnl_data.get(position_id, 0)
                 })
         
+        if position_infos:
+            for exit_action in exit_manager.check_exits_batch(position_infos):
+                exit_actions.append({
+                    'position_id': exit_action['position_id'],
+                    'reason': exit_action['reason'],
+                    'action': exit_action['action'],
+                    'pnl': pnl_data.get(exit_action['position_id'], 0)
+                })
+        
         return exit_actions
\ No newline at end of file
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Position Book
+Multi-leg positions with symbol, strategy, contract, expiry and strike
+indexes that are updated on every add/remove, so lookups never scan the book,
+and streaming mark-to-market with running P&L totals
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class PositionBook:
+    """
+    Owns the position dict of PositionStateManagerQC and keeps its indexes in step
+
+    Positions register through add_position()/remove_position(); components
+    register themselves through MultiLegPosition.add_component()/remove_component()
+    once the position is in the book. Component indexes are keyed by
+    (position_id, component_id), matching FastPositionLookup's references.
+
+    Expiry and strike range queries bisect a sorted key list, so every lookup
+    is O(log k + result) instead of a pass over all positions.
+
+    Marks are streamed per contract: mark() skips a contract whose price has
+    not moved and otherwise revalues only the legs on that contract, applying
+    the P&L delta to running per-position, per-strategy and book totals, which
+    are then read in O(1). Component P&L written from outside (portfolio sync)
+    must go through set_pnl() to keep the totals consistent.
+    """
+
+    def __init__(self):
+        self.positions: Dict[str, object] = {}
+
+        self.positions_by_symbol: Dict[str, Dict[str, object]] = {}
+        self.positions_by_strategy: Dict[str, Dict[str, object]] = {}
+        self.components_by_contract: Dict[str, Dict[Tuple[str, str], object]] = {}
+        self.components_by_expiry: Dict[datetime, Dict[Tuple[str, str], object]] = {}
+        self.components_by_strike: Dict[float, Dict[Tuple[str, str], object]] = {}
+        self._expiries: List[datetime] = []  # sorted keys of components_by_expiry
+        self._strikes: List[float] = []      # sorted keys of components_by_strike
+
+        # Mark-to-market state
+        self.marks: Dict[str, float] = {}  # contract -> last marked price
+        self.position_pnl: Dict[str, float] = {}
+        self.strategy_pnl: Dict[str, float] = {}
+        self.book_pnl = 0.0
+
+        self.stats = {
+            'positions_added': 0,
+            'positions_removed': 0,
+            'components_indexed': 0,
+            'components_unindexed': 0,
+            'lookups': 0,
+            'marks': 0,
+            'marks_unchanged': 0,
+            'legs_revalued': 0
+        }
+
+    # ================================
+    # MUTATION
+    # ================================
+
+    def add_position(self, position):
+        """Add (or replace) a position and index its existing components"""
+        if position.position_id in self.positions:
+            self.remove_position(position.position_id)
+
+        self.positions[position.position_id] = position
+        self.positions_by_symbol.setdefault(position.symbol, {})[position.position_id] = position
+        self.positions_by_strategy.setdefault(position.strategy, {})[position.position_id] = position
+        self.position_pnl[position.position_id] = 0.0
+        self.strategy_pnl.setdefault(position.strategy, 0.0)
+        position.book = self
+        for component in position.components.values():
+            self.index_component(position, component)
+        self.stats['positions_added'] += 1
+
+    def remove_position(self, position_id: str):
+        """Remove a position and all of its components from the book; returns it or None"""
+        position = self.positions.get(position_id)
+        if position is None:
+            return None
+
+        for component in position.components.values():
+            self.unindex_component(position, component)
+        del self.positions[position_id]
+        self._discard(self.positions_by_symbol, position.symbol, position_id)
+        self._discard(self.positions_by_strategy, position.strategy, position_id)
+        del self.position_pnl[position_id]
+        if position.strategy not in self.positions_by_strategy:
+            del self.strategy_pnl[position.strategy]
+        if not self.positions:
+            self.book_pnl = 0.0  # drop accumulated rounding once the book is flat
+        position.book = None
+        self.stats['positions_removed'] += 1
+        return position
+
+    def index_component(self, position, component):
+        key = (position.position_id, component.component_id)
+        contract = str(component.contract_symbol)
+        self.components_by_contract.setdefault(contract, {})[key] = component
+        if contract in self.marks:
+            self._revalue(component, self.marks[contract])
+        self._apply_pnl_delta(position.position_id, component.pnl)
+        if component.expiry is not None:
+            if component.expiry not in self.components_by_expiry:
+                self.components_by_expiry[component.expiry] = {}
+                insort(self._expiries, component.expiry)
+            self.components_by_expiry[component.expiry][key] = component
+        if component.strike is not None:
+            if component.strike not in self.components_by_strike:
+                self.components_by_strike[component.strike] = {}
+                insort(self._strikes, component.strike)
+            self.components_by_strike[component.strike][key] = component
+        self.stats['components_indexed'] += 1
+
+    def unindex_component(self, position, component):
+        key = (position.position_id, component.component_id)
+        self._apply_pnl_delta(position.position_id, -component.pnl)
+        if self._discard(self.components_by_contract, str(component.contract_symbol), key):
+            self.marks.pop(str(component.contract_symbol), None)
+        if self._discard(self.components_by_expiry, component.expiry, key):
+            del self._expiries[bisect_left(self._expiries, component.expiry)]
+        if self._discard(self.components_by_strike, component.strike, key):
+            del self._strikes[bisect_left(self._strikes, component.strike)]
+        self.stats['components_unindexed'] += 1
+
+    @staticmethod
+    def _discard(index: Dict, bucket_key, key) -> bool:
+        """Drop key from a bucket; True when the bucket became empty and was removed"""
+        bucket = index.get(bucket_key)
+        if bucket is None:
+            return False
+        bucket.pop(key, None)
+        if not bucket:
+            del index[bucket_key]
+            return True
+        return False
+
+    # ================================
+    # LOOKUPS
+    # ================================
+
+    def positions_for_symbol(self, symbol: str, strategy: str = None) -> List:
+        self.stats['lookups'] += 1
+        positions = self.positions_by_symbol.get(symbol, {})
+        if strategy is None:
+            return list(positions.values())
+        return [p for p in positions.values() if p.strategy == strategy]
+
+    def positions_for_strategy(self, strategy: str) -> List:
+        self.stats['lookups'] += 1
+        return list(self.positions_by_strategy.get(strategy, {}).values())
+
+    def components_for_contract(self, contract_symbol) -> List:
+        self.stats['lookups'] += 1
+        return list(self.components_by_contract.get(str(contract_symbol), {}).values())
+
+    def components_expiring_between(self, earliest: Optional[datetime] = None,
+                                    latest: Optional[datetime] = None, refs: bool = False) -> List:
+        """
+        Components expiring in [earliest, latest] (None: unbounded), soonest first;
+        (position_id, component_id) references instead when refs=True
+        """
+        self.stats['lookups'] += 1
+        lo = 0 if earliest is None else bisect_left(self._expiries, earliest)
+        hi = len(self._expiries) if latest is None else bisect_right(self._expiries, latest)
+        return self._collect(self.components_by_expiry, self._expiries[lo:hi], refs)
+
+    def components_in_strike_range(self, min_strike: float, max_strike: float, refs: bool = False) -> List:
+        """Components struck in [min_strike, max_strike], lowest strike first"""
+        self.stats['lookups'] += 1
+        lo, hi = bisect_left(self._strikes, min_strike), bisect_right(self._strikes, max_strike)
+        return self._collect(self.components_by_strike, self._strikes[lo:hi], refs)
+
+    @staticmethod
+    def _collect(index: Dict, bucket_keys: List, refs: bool) -> List:
+        if refs:
+            return [key for bucket_key in bucket_keys for key in index[bucket_key]]
+        return [c for bucket_key in bucket_keys for c in index[bucket_key].values()]
+
+    # ================================
+    # MARK-TO-MARKET
+    # ================================
+
+    def mark(self, contract_symbol, price: float) -> int:
+        """Mark one contract; returns the number of legs revalued (0 when the price is unchanged)"""
+        contract = str(contract_symbol)
+        self.stats['marks'] += 1
+        bucket = self.components_by_contract.get(contract)
+        if bucket is None:
+            return 0
+        if self.marks.get(contract) == price:
+            self.stats['marks_unchanged'] += 1
+            return 0
+
+        self.marks[contract] = price
+        for (position_id, _), component in bucket.items():
+            old_pnl = component.pnl
+            self._revalue(component, price)
+            self._apply_pnl_delta(position_id, component.pnl - old_pnl)
+        self.stats['legs_revalued'] += len(bucket)
+        return len(bucket)
+
+    def mark_many(self, prices: Dict) -> int:
+        """Mark a batch of contract -> price updates; returns the number of legs revalued"""
+        return sum(self.mark(contract, price) for contract, price in prices.items())
+
+    def revalue(self, position, component):
+        """Recompute a leg against its last mark after its entry price or quantity changed"""
+        contract = str(component.contract_symbol)
+        if contract in self.marks:
+            old_pnl = component.pnl
+            self._revalue(component, self.marks[contract])
+            self._apply_pnl_delta(position.position_id, component.pnl - old_pnl)
+
+    def set_pnl(self, position, component, pnl: float):
+        """Overwrite a leg's P&L from an external source (e.g. portfolio holdings)"""
+        self._apply_pnl_delta(position.position_id, pnl - component.pnl)
+        component.pnl = pnl
+
+    def _revalue(self, component, price: float):
+        component.current_price = price
+        component.pnl = (price - component.entry_price) * component.quantity * component.multiplier
+
+    def _apply_pnl_delta(self, position_id: str, delta: float):
+        if delta:
+            self.position_pnl[position_id] += delta
+            self.strategy_pnl[self.positions[position_id].strategy] += delta
+            self.book_pnl += delta
+
+    # ================================
+    # AGGREGATES
+    # ================================
+
+    def total_pnl(self, symbol: str = None, strategy: str = None) -> float:
+        """
+        P&L over the positions matching symbol and/or strategy (whole book when
+        neither given); O(1) by strategy or for the book, O(positions) by symbol
+        """
+        if symbol is not None:
+            return sum(self.position_pnl[p.position_id] for p in self.positions_for_symbol(symbol, strategy))
+        if strategy is not None:
+            return self.strategy_pnl.get(strategy, 0.0)
+        return self.book_pnl
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['positions'] = len(self.positions)
+        stats['components'] = sum(len(bucket) for bucket in self.components_by_contract.values())
+        stats['expiries'] = len(self._expiries)
+        stats['strikes'] = len(self._strikes)
+        stats['marked_contracts'] = len(self.marks)
+        stats['book_pnl'] = self.book_pnl
+        return stats
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Streaming Correlation Engine
+Rolling-window return covariance/correlation over a preallocated ring buffer,
+updated incrementally per bar, plus EWMA covariance and a correlation-spike
+regime detector driven by the same bars
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+class StreamingCorrelationEngine:
+    """
+    Rolling correlation matrix for a growing symbol universe
+
+    Returns are held in a (window x capacity) ring buffer with one column per
+    symbol and a matching presence mask. Prices are staged per symbol and
+    committed as one bar row; a symbol's return is its price change since its
+    previous price, and a symbol without a new price in a bar is masked out of
+    that row (not treated as an unchanged price). Each commit adds the new row
+    and evicts the oldest from running pairwise sums - cross-products, sums and
+    squares over the rows where both symbols were observed, and the count of
+    those rows - so the pairwise-complete covariance and correlation matrices
+    cost O(n^2) per bar with no per-pair work. A symbol is ready once it has
+    been tracked for a full window of bars; a pair is defined once both are
+    ready and share at least `min_periods` observed rows in the window. The
+    running sums are re-derived from the buffer every `resync_interval` bars
+    to bound floating-point drift.
+    """
+
+    def __init__(self, window_size: int = 20, initial_capacity: int = 32, resync_interval: int = None,
+                 min_periods: int = None):
+        self.window_size = window_size
+        self.min_periods = max(2, min_periods if min_periods is not None else window_size // 2)
+        self.capacity = max(1, initial_capacity)
+        self.resync_interval = resync_interval or max(window_size * 10, 100)
+
+        self.slot_by_symbol: Dict[str, int] = {}
+        self.symbols: List[str] = []
+
+        self.returns = np.zeros((window_size, self.capacity))  # ring buffer rows (0 where masked)
+        self.observed = np.zeros((window_size, self.capacity))  # 1.0 where the row has the symbol's return
+        self.last_price = np.full(self.capacity, np.nan)
+        self.return_count = np.zeros(self.capacity, dtype=np.int64)  # bars since the symbol's first price
+        self._staged = np.full(self.capacity, np.nan)                # prices for the open bar
+        self._contributed = np.zeros(self.capacity, dtype=bool)      # symbols observed in the last row
+        self._row = np.zeros(self.capacity)
+        self._mask = np.zeros(self.capacity)
+        self._scratch = np.zeros((self.capacity, self.capacity))
+
+        # Pairwise running sums over co-observed rows: [i, j] sums symbol i's values where j is observed
+        self._cross = np.zeros((self.capacity, self.capacity))   # sum r_i r_j
+        self._sum = np.zeros((self.capacity, self.capacity))     # sum r_i m_j
+        self._square = np.zeros((self.capacity, self.capacity))  # sum r_i^2 m_j
+        self._count = np.zeros((self.capacity, self.capacity))   # sum m_i m_j
+        self.bars = 0  # committed rows
+        self._pending = False
+
+        self.stats = {
+            'bars': 0,
+            'resyncs': 0,
+            'symbols': 0,
+            'masked_returns': 0
+        }
+
+    # ----- slot management -----
+
+    def _slot_for(self, symbol: str) -> int:
+        slot = self.slot_by_symbol.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot >= self.capacity:
+                self._grow()
+            self.slot_by_symbol[symbol] = slot
+            self.symbols.append(symbol)
+            self.stats['symbols'] = len(self.symbols)
+        return slot
+
+    def _grow(self):
+        old, new = self.capacity, self.capacity * 2
+
+        def extend(array, fill):
+            grown = np.full(array.shape[:-1] + (new,), fill, dtype=array.dtype)
+            grown[..., :old] = array
+            return grown
+
+        def extend_square(array):
+            grown = np.zeros((new, new))
+            grown[:old, :old] = array
+            return grown
+
+        self.returns = extend(self.returns, 0.0)
+        self.observed = extend(self.observed, 0.0)
+        self.last_price = extend(self.last_price, np.nan)
+        self.return_count = extend(self.return_count, 0)
+        self._staged = extend(self._staged, np.nan)
+        self._contributed = extend(self._contributed, False)
+        self._row = np.zeros(new)
+        self._mask = np.zeros(new)
+        self._scratch = np.zeros((new, new))
+        self._cross = extend_square(self._cross)
+        self._sum = extend_square(self._sum)
+        self._square = extend_square(self._square)
+        self._count = extend_square(self._count)
+        self.capacity = new
+
+    # ----- updates -----
+
+    def stage(self, symbol: str, price: float):
+        """Record a symbol's price for the bar currently being built"""
+        slot = self._slot_for(symbol)  # may grow (and replace) the arrays
+        self._staged[slot] = price
+        self._pending = True
+
+    def is_staged(self, symbol: str) -> bool:
+        slot = self.slot_by_symbol.get(symbol)
+        return slot is not None and not np.isnan(self._staged[slot])
+
+    def update_bar(self, prices: Dict[str, float]):
+        """Stage a full bar of prices and commit it"""
+        for symbol, price in prices.items():
+            self.stage(symbol, price)
+        self.commit()
+
+    def _accumulate(self, row: np.ndarray, mask: np.ndarray, sign: float):
+        """Add (sign=1) or remove (sign=-1) one row's contribution to the pairwise sums"""
+        n = len(row)
+        scratch = self._scratch[:n, :n]
+        for total, left, right in ((self._cross, row, row), (self._sum, row, mask),
+                                   (self._square, row * row, mask), (self._count, mask, mask)):
+            np.multiply(left[:, None], right[None, :], out=scratch)
+            if sign > 0:
+                total[:n, :n] += scratch
+            else:
+                total[:n, :n] -= scratch
+
+    def commit(self) -> bool:
+        """Close the open bar: one return row enters the window, the oldest leaves"""
+        if not self._pending:
+            return False
+        self._pending = False
+
+        n = len(self.symbols)
+        staged, last = self._staged[:n], self.last_price[:n]
+        row, mask = self._row[:n], self._mask[:n]
+        row.fill(0.0)
+        moved = ~np.isnan(staged) & ~np.isnan(last)
+        np.divide(staged, last, out=row, where=moved)
+        row[moved] -= 1.0
+        mask[:] = moved
+        # Symbols seen before this bar are tracked for it; only those with a new price are observed
+        tracked = ~np.isnan(last)
+        self.return_count[:n][tracked] += 1
+        self._contributed[:n] = moved
+        self.stats['masked_returns'] += int(tracked.sum() - moved.sum())
+
+        priced = ~np.isnan(staged)
+        last[priced] = staged[priced]
+        staged.fill(np.nan)
+        if not tracked.any():
+            return False  # first prices only; no return row yet
+
+        slot = self.bars % self.window_size
+        if self.bars >= self.window_size:
+            self._accumulate(self.returns[slot, :n], self.observed[slot, :n], -1.0)
+        self.returns[slot, :n] = row
+        self.observed[slot, :n] = mask
+        self._accumulate(row, mask, 1.0)
+
+        self.bars += 1
+        self.stats['bars'] = self.bars
+        if self.bars % self.resync_interval == 0:
+            self._resync()
+        return True
+
+    def _resync(self):
+        n = len(self.symbols)
+        rows = min(self.bars, self.window_size)
+        returns, observed = self.returns[:rows, :n], self.observed[:rows, :n]
+        self._cross[:n, :n] = returns.T @ returns
+        self._sum[:n, :n] = returns.T @ observed
+        self._square[:n, :n] = (returns * returns).T @ observed
+        self._count[:n, :n] = observed.T @ observed
+        self.stats['resyncs'] += 1
+
+    # ----- queries -----
+
+    def ready_mask(self) -> np.ndarray:
+        """Symbols (by slot) tracked for a full window of bars"""
+        return self.return_count[:len(self.symbols)] >= self.window_size
+
+    def ready_symbols(self) -> List[str]:
+        return [self.symbols[i] for i in np.flatnonzero(self.ready_mask())]
+
+    def _pairwise(self, index) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(count, covariance, variance of i, variance of j) over co-observed rows for slots `index`"""
+        block = np.ix_(index, index)
+        count = self._count[block]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self._sum[block] / count  # [i, j]: mean of i over rows where j is observed
+            cov = self._cross[block] / count - mean * mean.T
+            var = self._square[block] / count - mean * mean
+        return count, cov, var, var.T
+
+    def covariance_matrix(self) -> np.ndarray:
+        """Pairwise-complete population covariance of window returns (rows/cols by slot); NaN without overlap"""
+        count, cov, _, _ = self._pairwise(np.arange(len(self.symbols)))
+        return np.where(count > 0, cov, np.nan)
+
+    def correlation_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """(symbols, correlation) over ready symbols; NaN for pairs short of min_periods or with zero variance"""
+        ready = np.flatnonzero(self.ready_mask())
+        count, cov, var_i, var_j = self._pairwise(ready)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[(count < self.min_periods) | ~(var_i > 0) | ~(var_j > 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return [self.symbols[i] for i in ready], corr
+
+    def last_returns(self) -> Dict[str, float]:
+        """Returns of the symbols observed in the most recently committed bar"""
+        if self.bars == 0:
+            return {}
+        row = self.returns[(self.bars - 1) % self.window_size]
+        return {self.symbols[i]: float(row[i]) for i in np.flatnonzero(self._contributed[:len(self.symbols)])}
+
+    def correlation(self, symbol1: str, symbol2: str) -> Optional[float]:
+        """Single pair from the running sums; None until both are ready with min_periods shared rows"""
+        i, j = self.slot_by_symbol.get(symbol1), self.slot_by_symbol.get(symbol2)
+        if i is None or j is None or min(self.return_count[i], self.return_count[j]) < self.window_size:
+            return None
+        count = self._count[i, j]
+        if count < self.min_periods:
+            return None
+        mean_i, mean_j = self._sum[i, j] / count, self._sum[j, i] / count
+        cov = self._cross[i, j] / count - mean_i * mean_j
+        var_i = self._square[i, j] / count - mean_i * mean_i
+        var_j = self._square[j, i] / count - mean_j * mean_j
+        if var_i <= 0 or var_j <= 0:
+            return None
+        return float(max(-1.0, min(1.0, cov / np.sqrt(var_i * var_j))))
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['ready_symbols'] = int(self.ready_mask().sum())
+        stats['capacity'] = self.capacity
+        return stats
+
+
+class EWMACovarianceEstimator:
+    """
+    RiskMetrics-style exponentially weighted covariance, one matrix per half-life
+
+    Each update applies cov = lambda * cov + (1 - lambda) * r r^T in place
+    (zero-mean returns, lambda = 0.5 ** (1 / half_life)) over the symbols in
+    the bar only, so every half-life costs O(m^2) for the m symbols observed.
+    A symbol missing from a bar is skipped: its variance and covariances hold
+    their last values instead of decaying toward a zero return. Symbols join
+    with a zero row/column; a symbol is ready once it has min_observations
+    returns, and correlations between ready symbols only combine observations
+    both have seen.
+    """
+
+    def __init__(self, half_lives: Tuple[int, ...], min_observations: int = 20, initial_capacity: int = 32):
+        self.half_lives = tuple(half_lives)
+        self.decay = np.array([0.5 ** (1.0 / h) for h in self.half_lives])
+        self.min_observations = min_observations
+        self.capacity = max(1, initial_capacity)
+
+        self.slot_by_symbol: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.observations = np.zeros(self.capacity, dtype=np.int64)
+        self.cov = np.zeros((len(self.half_lives), self.capacity, self.capacity))
+        self.updates = 0
+
+    def _slot_for(self, symbol: str) -> int:
+        slot = self.slot_by_symbol.get(symbol)
+        if slot is None:
+            slot = len(self.symbols)
+            if slot >= self.capacity:
+                self._grow()
+            self.slot_by_symbol[symbol] = slot
+            self.symbols.append(symbol)
+        return slot
+
+    def _grow(self):
+        old, new = self.capacity, self.capacity * 2
+        cov = np.zeros((len(self.half_lives), new, new))
+        cov[:, :old, :old] = self.cov
+        self.cov = cov
+        observations = np.zeros(new, dtype=np.int64)
+        observations[:old] = self.observations
+        self.observations = observations
+        self.capacity = new
+
+    def update(self, returns: Dict[str, float]):
+        """Fold one bar of returns in; symbols missing from the bar are skipped, not read as zero returns"""
+        if not returns:
+            return
+        slots = np.array([self._slot_for(symbol) for symbol in returns], dtype=np.int64)
+        values = np.fromiter(returns.values(), dtype=float, count=len(slots))
+        self.observations[slots] += 1
+
+        # Only pairs observed together decay and update; other entries keep their last value
+        block = np.ix_(slots, slots)
+        outer = np.multiply.outer(values, values)
+        for k, decay in enumerate(self.decay):
+            cov = self.cov[k]
+            cov[block] = decay * cov[block] + (1.0 - decay) * outer
+        self.updates += 1
+
+    def _index(self, half_life: int = None) -> int:
+        return 0 if half_life is None else self.half_lives.index(half_life)
+
+    def ready_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.observations[:len(self.symbols)] >= self.min_observations)
+
+    def correlation_matrix(self, half_life: int = None, symbols: List[str] = None) -> Tuple[List[str], np.ndarray]:
+        """(symbols, correlation) over ready symbols (optionally restricted to `symbols`)"""
+        ready = self.ready_slots()
+        if symbols is not None:
+            wanted = {self.slot_by_symbol[s] for s in symbols if s in self.slot_by_symbol}
+            ready = np.array([slot for slot in ready if slot in wanted], dtype=np.int64)
+        cov = self.cov[self._index(half_life)][np.ix_(ready, ready)]
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.clip(cov / np.outer(std, std), -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return [self.symbols[i] for i in ready], corr
+
+    def correlation(self, symbol1: str, symbol2: str, half_life: int = None) -> Optional[float]:
+        i, j = self.slot_by_symbol.get(symbol1), self.slot_by_symbol.get(symbol2)
+        if i is None or j is None or min(self.observations[i], self.observations[j]) < self.min_observations:
+            return None
+        cov = self.cov[self._index(half_life)]
+        if cov[i, i] <= 0 or cov[j, j] <= 0:
+            return None
+        return float(max(-1.0, min(1.0, cov[i, j] / np.sqrt(cov[i, i] * cov[j, j]))))
+
+    def average_correlation(self, half_life: int = None, symbols: List[str] = None) -> Optional[float]:
+        """Mean off-diagonal correlation across ready symbols; None with fewer than two"""
+        names, corr = self.correlation_matrix(half_life, symbols)
+        n = len(names)
+        if n < 2:
+            return None
+        off_diagonal = corr[~np.eye(n, dtype=bool)]
+        off_diagonal = off_diagonal[~np.isnan(off_diagonal)]
+        return float(off_diagonal.mean()) if off_diagonal.size else None
+
+
+class CorrelationSpikeDetector:
+    """
+    Online regime detector on average pairwise correlation
+
+    NORMAL -> ELEVATED -> SPIKE as the average crosses the thresholds upward;
+    stepping back down requires falling `hysteresis` below the threshold so the
+    regime does not flap around a boundary. update() returns the transition
+    (old, new) when the regime changes, else None.
+    """
+
+    NORMAL = 'NORMAL'
+    ELEVATED = 'ELEVATED'
+    SPIKE = 'SPIKE'
+
+    def __init__(self, elevated_threshold: float, spike_threshold: float, hysteresis: float = 0.05):
+        self.elevated_threshold = elevated_threshold
+        self.spike_threshold = spike_threshold
+        self.hysteresis = hysteresis
+        self.regime = self.NORMAL
+        self.average_correlation = None
+        self.transitions = 0
+
+    def _target(self, value: float) -> str:
+        if value >= self.spike_threshold or (
+                self.regime == self.SPIKE and value > self.spike_threshold - self.hysteresis):
+            return self.SPIKE
+        if value >= self.elevated_threshold or (
+                self.regime != self.NORMAL and value > self.elevated_threshold - self.hysteresis):
+            return self.ELEVATED
+        return self.NORMAL
+
+    def update(self, average_correlation: Optional[float]) -> Optional[Tuple[str, str]]:
+        if average_correlation is None:
+            return None
+        self.average_correlation = average_correlation
+        target = self._target(average_correlation)
+        if target == self.regime:
+            return None
+        transition = (self.regime, target)
+        self.regime = target
+        self.transitions += 1
+        return transition
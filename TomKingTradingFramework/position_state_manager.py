@@ -8,31 +8,30 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import json
 
+from optimization.position_book import PositionBook
+
 # Import from AlgorithmImports or define if running standalone
 try:
     from AlgorithmImports import *
 except ImportError:
     # Define minimal stubs for standalone testing
-    pass
-    
-class OptionRight:
-    
-    Call = 0
-    
-Put = 1
+    class OptionRight:
+        Call = 0
+        Put = 1
 
-    
-class OrderStatus:
-    
-    Filled = 0
-    
-    PartiallyFilled = 1
-    
-    Canceled = 2
+    class OrderStatus:
+        Filled = 0
+        PartiallyFilled = 1
+        Canceled = 2
 
     
 class PositionComponent:
     """Represents a single component of a multi-legged position"""
+
+    __slots__ = ('component_id', 'strategy', 'symbol', 'leg_type', 'contract_symbol', 'quantity',
+                 'strike', 'expiry', 'right', 'multiplier', 'entry_time', 'entry_price',
+                 'current_price', 'status', 'pnl', 'days_held', 'order_ticket', 'qc_symbol',
+                 'actual_fill_price', 'actual_quantity', 'fill_time', 'commission', 'order_status')
     
     def __init__(self, component_id: str, strategy: str, symbol: str, 
                  leg_type: str, contract_symbol: str, quantity: int, 
@@ -102,10 +101,16 @@ class MultiLegPosition:
         self.status = "BUILDING"  # BUILDING, ACTIVE, PARTIALLY_CLOSED, CLOSED
         self.total_pnl = 0.0
         self.metadata = {}  # Strategy-specific metadata
+        self.book = None  # PositionBook this position is registered in
         
     def add_component(self, component: PositionComponent):
         """Add a component to this position"""
+        previous = self.components.get(component.component_id)
+        if self.book is not None and previous is not None:
+            self.book.unindex_component(self, previous)
         self.components[component.component_id] = component
+        if self.book is not None:
+            self.book.index_component(self, component)
         if self.status == "BUILDING" and self._is_complete():
             self.status = "ACTIVE"
             
@@ -113,6 +118,8 @@ class MultiLegPosition:
         """Remove and return a component"""
         if component_id in self.components:
             component = self.components.pop(component_id)
+            if self.book is not None:
+                self.book.unindex_component(self, component)
             component.status = "CLOSED"
             self._update_status()
             return component
@@ -145,7 +152,10 @@ class MultiLegPosition:
             
     def calculate_total_pnl(self) -> float:
         """Calculate total position P&L"""
-        self.total_pnl = sum(c.pnl for c in self.components.values())
+        if self.book is not None:
+            self.total_pnl = self.book.position_pnl[self.position_id]
+        else:
+            self.total_pnl = sum(c.pnl for c in self.components.values())
         return self.total_pnl
         
     def to_dict(self) -> Dict:
@@ -169,8 +179,13 @@ class PositionStateManagerQC:
     
     def __init__(self, algorithm):
         self.algo = algorithm
-        self.positions: Dict[str, MultiLegPosition] = {}
-        self.components_by_symbol: Dict[str, List[str]] = {}  # Symbol -> component_ids
+        # The book owns the positions dict and indexes it on every add/remove
+        self.book = PositionBook()
+        self.positions: Dict[str, MultiLegPosition] = self.book.positions
+        
+        event_bus = getattr(algorithm, 'event_bus', None)
+        if event_bus is not None:
+            self.subscribe_market_data(event_bus)
         
     # ================================
     # IPMCC SPECIFIC METHODS
@@ -181,21 +196,19 @@ class PositionStateManagerQC:
         # Early exit pattern - find first match quickly
         min_leap_expiry = self.algo.Time + timedelta(days=90)
         
-        for position in self.positions.values():
-            if position.strategy == "IPMCC" and position.symbol == symbol:
-                # Direct search for active LEAP instead of getting all then filtering
-                for component in position.components:
-                    if (component.component_type == "LEAP_CALL" and 
-                        component.status == "OPEN" and 
-                        component.expiry > min_leap_expiry):
-                        return component
+        for position in self.book.positions_for_symbol(symbol, "IPMCC"):
+            for component in position.components.values():
+                if (component.leg_type == "LEAP_CALL" and 
+                    component.status == "OPEN" and 
+                    component.expiry > min_leap_expiry):
+                    return component
         return None
         
     def create_ipmcc_position(self, symbol: str) -> str:
         """Create new IPMCC position structure"""
         position_id = f"IPMCC_{symbol}_{self.algo.Time.strftime('%Y%m%d')}"
         position = MultiLegPosition(position_id, "IPMCC", symbol)
-        self.positions[position_id] = position
+        self.book.add_position(position)
         return position_id
         
     def add_ipmcc_leap(self, position_id: str, leap_contract: str, quantity: int, 
@@ -221,9 +234,9 @@ class PositionStateManagerQC:
                              strike: float, expiry: datetime) -> Optional[str]:
         """Add weekly call to existing IPMCC position with LEAP"""
         # Find position with active LEAP for this symbol
-        for position_id, position in self.positions.items():
-            if (position.strategy == "IPMCC" and position.symbol == symbol and 
-                position.get_components_by_type("LEAP_CALL")):
+        for position in self.book.positions_for_symbol(symbol, "IPMCC"):
+            if position.get_components_by_type("LEAP_CALL"):
+                position_id = position.position_id
                 
                 # Create unique component ID for this weekly
                 weekly_count = len([c for c in position.components.values() 
@@ -249,12 +262,11 @@ class PositionStateManagerQC:
         
     def close_ipmcc_weekly_call(self, symbol: str, component_id: str) -> bool:
         """Close specific weekly call component"""
-        for position in self.positions.values():
-            if position.strategy == "IPMCC" and position.symbol == symbol:
-                component = position.remove_component(component_id)
-                if component:
-                    self.algo.Log(f"[WARNING] Closed IPMCC weekly call: {component_id}")
-                    return True
+        for position in self.book.positions_for_symbol(symbol, "IPMCC"):
+            component = position.remove_component(component_id)
+            if component:
+                self.algo.Log(f"[WARNING] Closed IPMCC weekly call: {component_id}")
+                return True
         return False
         
     # ================================
@@ -306,7 +318,7 @@ class PositionStateManagerQC:
         position.add_component(naked_put)
         position.metadata = {'tom_king_structure': '1-1-2_put_ratio'}
         
-        self.positions[position_id] = position
+        self.book.add_position(position)
         self.algo.Log(f"[WARNING] Created complete LT112 position: {position_id}")
         return position_id
         
@@ -337,29 +349,35 @@ class PositionStateManagerQC:
     # ================================
     
     def get_positions_for_symbol(self, symbol: str, strategy: str = None) -> List[MultiLegPosition]:
-        """Get all positions for a symbol, optionally filtered by strategy (optimized)"""
-        # Single pass filter instead of double pass
-        if strategy:
-            return [p for p in self.positions.values() 
-                   if p.symbol == symbol and p.strategy == strategy]
-        else:
-            return [p for p in self.positions.values() if p.symbol == symbol]
-        
-    def update_component_prices(self, updates: Dict[str, float]):
-        """Update current prices for all components (optimized for frequent calls)"""
-        # Convert updates keys to set for O(1) lookup instead of O(n)
-        update_symbols = set(updates.keys())
+        """Get all positions for a symbol, optionally filtered by strategy (indexed)"""
+        return self.book.positions_for_symbol(symbol, strategy or None)
         
-        for position in self.positions.values():
-            for component in position.components.values():
-                symbol_str = str(component.contract_symbol)
-                if symbol_str in update_symbols:  # O(1) lookup instead of O(n)
-                    component.current_price = updates[symbol_str]
-                    # Calculate P&L (simplified)
-                    if component.quantity > 0:  # Long position
-                        component.pnl = (component.current_price - component.entry_price) * component.quantity * 100
-                    else:  # Short position  
-                        component.pnl = (component.entry_price - component.current_price) * abs(component.quantity) * 100
+    def update_component_prices(self, updates: Dict[str, float]) -> int:
+        """Mark contracts to market; only legs on contracts whose price moved are revalued"""
+        return self.book.mark_many(updates)
+    
+    def subscribe_market_data(self, event_bus):
+        """Stream MARKET_DATA_UPDATED prices into the book's marks"""
+        from core.event_bus import EventType
+        event_bus.subscribe(EventType.MARKET_DATA_UPDATED, self._on_market_data, "position_state_manager")
+    
+    def _on_market_data(self, event):
+        """Single {'symbol', 'price'} updates and batched {'updates': [(symbol, price), ...]} events"""
+        updates = event.data.get('updates')
+        if updates is not None:
+            self.book.mark_many({symbol: float(price) for symbol, price in dict(updates).items()})
+            return
+        price = event.data.get('price')
+        if price is not None:
+            self.book.mark(event.data['symbol'], float(price))
+    
+    def get_position_pnl(self, position_id: str) -> float:
+        """Running P&L of a position (O(1))"""
+        return self.book.position_pnl.get(position_id, 0.0)
+    
+    def get_strategy_pnl(self, strategy: str = None) -> float:
+        """Running P&L of a strategy, or of every position when strategy is None (O(1))"""
+        return self.book.total_pnl(strategy=strategy)
     
     def get_position_current_value(self, position_id: str) -> float:
         """Get current value of all components in a position"""
@@ -408,7 +426,7 @@ class PositionStateManagerQC:
                     self.algo.Liquidate(component.contract_symbol, f"Closing {position.strategy} position")
 
             # Remove position from tracking
-            del self.positions[position_id]
+            self.book.remove_position(position_id)
 
             self.algo.Log(f"[WARNING] Closed multi-legged position {position_id} ({position.strategy})")
             return True
@@ -416,12 +434,12 @@ class PositionStateManagerQC:
             self.algo.Log(f"[ERROR] Failed to close position {position_id}: {e}")
             return False
 
-        # ================================
-        # ORDER EXECUTION INTEGRATION
-        # ================================
+    # ================================
+    # ORDER EXECUTION INTEGRATION
+    # ================================
 
-        def link_order_to_component(self, order_ticket, position_id: str, component_id: str):
-            """Link QuantConnect order ticket to position component"""
+    def link_order_to_component(self, order_ticket, position_id: str, component_id: str):
+        """Link QuantConnect order ticket to position component"""
         if position_id in self.positions:
             position = self.positions[position_id]
             if component_id in position.components:
@@ -436,6 +454,7 @@ class PositionStateManagerQC:
                     component.fill_time = self.algo.Time
                     component.order_status = "FILLED"
                     component.entry_price = order_ticket.AverageFillPrice
+                    self.book.revalue(position, component)
                     self.algo.Log(f"[ORDER] Linked filled order to {component_id}: Price={component.actual_fill_price}, Qty={component.actual_quantity}")
                 else:
                     component.order_status = str(order_ticket.Status)
@@ -535,6 +554,7 @@ class PositionStateManagerQC:
                         component.actual_quantity = ticket.Quantity
                         component.fill_time = ticket.Time
                         component.entry_price = ticket.AverageFillPrice
+                        self.book.revalue(position, component)
                         
                         # Calculate commission if available
                         if hasattr(ticket, 'OrderEvents') and ticket.OrderEvents:
@@ -564,7 +584,7 @@ class PositionStateManagerQC:
                     
                     # Update current values from portfolio
                     component.current_price = float(holding.Price)
-                    component.pnl = float(holding.UnrealizedProfit)
+                    self.book.set_pnl(position, component, float(holding.UnrealizedProfit))
                     
                     # Check for discrepancies
                     if holding.Quantity != component.quantity and component.order_status == "FILLED":
@@ -655,7 +675,7 @@ class PositionStateManagerQC:
 
                     position.add_component(component)
 
-                self.positions[pos_id] = position
+                self.book.add_position(position)
 
             self.algo.Log(f"[PERSISTENCE] Restored {len(self.positions)} multi-legged positions")
         except Exception as e:
@@ -4,6 +4,7 @@ from AlgorithmImports import *
 from datetime import datetime, timedelta
 import json
 from core.unified_vix_manager import UnifiedVIXManager
+from risk.strategy_statistics import get_strategy_statistics
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -35,9 +36,16 @@ class PerformanceTracker:
             'IPMCC': {'wins': 0, 'losses': 0, 'total_pnl': 0},
             'LEAP_PUT_LADDERS': {'wins': 0, 'losses': 0, 'total_pnl': 0}
         }
+        
+        # Running per-strategy win rates and return moments read by the Kelly sizers
+        self.strategy_statistics = get_strategy_statistics(algorithm)
     
     def RecordTrade(self, trade_info: dict):
-        """Record completed trade for analysis"""
+        """Record completed trade for analysis
+        
+        Trades that carry a strategy and pnl_pct (return on capital at risk,
+        0.5 = +50%) also update the shared strategy statistics.
+        """
         trade = {
             'entry_time': trade_info.get('entry_time'),
             'exit_time': self.algo.Time,
@@ -59,6 +67,8 @@ class PerformanceTracker:
         
         # Update strategy performance
         strategy = trade['strategy']
+        if strategy and 'pnl_pct' in trade_info:
+            self.strategy_statistics.record(strategy, trade['pnl_pct'])
         if strategy in self.strategy_performance:
             if trade['win']:
                 self.strategy_performance[strategy]['wins'] += 1
@@ -136,6 +136,9 @@ class TradingDashboard:
         summary.append(f"   Total Value: ${total_value:,.2f}")
         summary.append(f"   Margin Used: ${total_margin:,.2f}")
         summary.append(f"   Available: ${available:,.2f}")
+        position_state_manager = getattr(self.algo, 'position_state_manager', None)
+        if position_state_manager is not None:
+            summary.append(f"   Open P&L: ${position_state_manager.get_strategy_pnl():,.2f}")
         
         # Strategy performance
         summary.append(f"\nSTRATEGY PERFORMANCE:")
@@ -143,6 +146,10 @@ class TradingDashboard:
             open_positions = sum(1 for p in self.positions_by_strategy[strategy] if p['status'] == 'OPEN')
             summary.append(f"\n   {strategy}:")
             summary.append(f"      Open Positions: {open_positions}")
+            unrealized = self._book_unrealized_pnl(strategy)
+            if unrealized is not None:
+                perf['unrealized_pnl'] = unrealized
+                summary.append(f"      Unrealized P&L: ${unrealized:,.2f}")
             summary.append(f"      Realized P&L: ${perf['realized_pnl']:,.2f}")
             summary.append(f"      Win Rate: {perf['win_rate']*100:.1f}%")
             summary.append(f"      Total Trades: {perf['trades']}")
@@ -206,9 +213,21 @@ class TradingDashboard:
                 
                 view[strategy]['total_margin'] += pos.get('margin_used', 0)
                 view[strategy]['unrealized_pnl'] += unrealized
+            
+            # Strategy total from the position book's running P&L when it tracks the strategy
+            book_unrealized = self._book_unrealized_pnl(strategy)
+            if book_unrealized is not None:
+                view[strategy]['unrealized_pnl'] = book_unrealized
         
         return view
     
+    def _book_unrealized_pnl(self, strategy: str):
+        """Running open P&L of a strategy in the shared position book, None when the book holds none"""
+        position_state_manager = getattr(self.algo, 'position_state_manager', None)
+        if position_state_manager is None or strategy not in position_state_manager.book.strategy_pnl:
+            return None
+        return position_state_manager.get_strategy_pnl(strategy)
+    
     def get_concentration_view(self) -> Dict:
         """
         Get concentration analysis
@@ -253,9 +253,16 @@ class August2024CorrelationLimiter:
     def calculate_crisis_portfolio_var(self):
         """Calculate portfolio VaR using August 5, 2024 correlation matrix"""
         if not self.active_positions_by_group:
-            self.algo.Debug("No positions for VaR calculation")
+            self.algorithm.Debug("No positions for VaR calculation")
             return 0
         
+        # Full-revaluation VaR as a fraction of portfolio value when the unified service is running
+        risk_manager = getattr(self.algorithm, 'unified_risk_manager', None)
+        if risk_manager is not None and hasattr(risk_manager, 'get_portfolio_var'):
+            result = risk_manager.get_portfolio_var()
+            if result is not None:
+                return result.var / max(float(self.algorithm.Portfolio.TotalPortfolioValue), 1.0)
+        
         # Simplified VaR calculation
         portfolio_var = 0
         
@@ -6,7 +6,10 @@ Implements 10%/15%/20% drawdown protocols with appropriate responses
 
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from collections import deque
 from enum import Enum
+from config.constants import TradingConstants
+from risk.equity_curve import get_equity_curve
 
 class DrawdownLevel(Enum):
     """Drawdown severity levels per Tom King methodology"""
@@ -31,9 +34,8 @@ class DrawdownManager:
             'emergency': 0.20   # 20% - Consider closing positions
         }
         
-        # Track peak values
-        self.peak_value = 0.0
-        self.peak_date = None
+        # Peak and drawdown come from the shared streaming equity curve
+        self.equity_curve = get_equity_curve(algorithm)
         self.current_drawdown = 0.0
         self.current_level = DrawdownLevel.NORMAL
         
@@ -42,28 +44,25 @@ class DrawdownManager:
         self.response_start_date = None
         self.positions_reduced = False
         
-        # Historical tracking
-        self.drawdown_history = []
-        self.max_historical_drawdown = 0.0
+        # Level transitions only; the equity samples live in the curve's ring buffer
+        self.drawdown_history = deque(maxlen=500)
+        
+    @property
+    def peak_value(self) -> float:
+        return self.equity_curve.peak or 0.0
+        
+    @property
+    def peak_date(self) -> Optional[datetime]:
+        return self.equity_curve.peak_time
+        
+    @property
+    def max_historical_drawdown(self) -> float:
+        return self.equity_curve.max_drawdown
         
     def update_drawdown(self) -> Dict:
         """Update drawdown calculations and trigger responses"""
         current_value = float(self.algo.Portfolio.TotalPortfolioValue)
-        
-        # Update peak if new high
-        if current_value > self.peak_value:
-            self.peak_value = current_value
-            self.peak_date = self.algo.Time
-            
-        # Calculate current drawdown
-        if self.peak_value > 0:
-            self.current_drawdown = (self.peak_value - current_value) / self.peak_value
-        else:
-            self.current_drawdown = 0.0
-            
-        # Update historical max
-        if self.current_drawdown > self.max_historical_drawdown:
-            self.max_historical_drawdown = self.current_drawdown
+        self.current_drawdown = self.equity_curve.update(current_value, self.algo.Time)
             
         # Determine drawdown level
         previous_level = self.current_level
@@ -74,15 +73,16 @@ class DrawdownManager:
         if self.current_level != previous_level:
             response_action = self._trigger_response(previous_level, self.current_level)
             
-        # Record history
-        self.drawdown_history.append({
-            'timestamp': self.algo.Time,
-            'value': current_value,
-            'peak_value': self.peak_value,
-            'drawdown': self.current_drawdown,
-            'level': self.current_level,
-            'response': response_action
-        })
+        # Record level transitions
+        if self.current_level != previous_level:
+            self.drawdown_history.append({
+                'timestamp': self.algo.Time,
+                'value': current_value,
+                'peak_value': self.peak_value,
+                'drawdown': self.current_drawdown,
+                'level': self.current_level,
+                'response': response_action
+            })
         
         return {
             'current_drawdown': self.current_drawdown,
@@ -193,7 +193,19 @@ class DrawdownManager:
         """Close positions with losses > TradingConstants.FULL_PERCENTAGE%"""
         positions_closed = 0
         
-        if hasattr(self.algo, 'position_manager'):
+        position_state_manager = getattr(self.algo, 'position_state_manager', None)
+        if position_state_manager is not None:
+            # Running per-position P&L from the position book; only losing positions are costed
+            losing = [pid for pid, pnl in position_state_manager.book.position_pnl.items() if pnl < 0]
+            for position_id in losing:
+                position = position_state_manager.positions[position_id]
+                cost = sum(abs(c.entry_price * c.quantity * c.multiplier) for c in position.components.values())
+                pnl_pct = position_state_manager.get_position_pnl(position_id) / cost * 100 if cost else 0.0
+                if pnl_pct < -TradingConstants.FULL_PERCENTAGE:  # Loss > TradingConstants.FULL_PERCENTAGE%
+                    self.algo.Log(f"[EMERGENCY] Closing position {position_id} with {pnl_pct:.1f}% loss")
+                    position_state_manager.close_position(position_id)
+                    positions_closed += 1
+        elif hasattr(self.algo, 'position_manager'):
             for position_id, position in self.algo.position_manager.positions.items():
                 if position.status == "ACTIVE":
                     pnl_pct = position.get_pnl_percentage()
@@ -258,9 +270,18 @@ class DrawdownManager:
             'positions_allowed': self.current_level == DrawdownLevel.NORMAL or self.current_level == DrawdownLevel.WARNING,
             'size_multiplier': self.get_position_size_multiplier(),
             'thresholds': self.thresholds,
+            'open_pnl_by_strategy': self._open_pnl_by_strategy(),
             'recommendations': self._get_recommendations()
         }
         
+    def _open_pnl_by_strategy(self) -> Dict[str, float]:
+        """Running open P&L per strategy from the position book (O(strategies))"""
+        position_state_manager = getattr(self.algo, 'position_state_manager', None)
+        if position_state_manager is None:
+            return {}
+        return {strategy: position_state_manager.get_strategy_pnl(strategy)
+                for strategy in position_state_manager.book.strategy_pnl}
+        
     def _get_recommendations(self) -> List[str]:
         """Get action recommendations based on current state"""
         recommendations = []
@@ -5,6 +5,7 @@ from AlgorithmImports import *
 from typing import Dict, Optional
 from core.base_component import BaseComponent
 from core.unified_vix_manager import UnifiedVIXManager
+from risk.margin_engine import MarginLeg, get_margin_engine
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -54,6 +55,9 @@ class DynamicMarginManager(BaseComponent):
         self.margin_breaches = 0
         self.last_expansion_time = None
         
+        # Shared vectorized estimator for position and what-if requirements
+        self.margin_engine = get_margin_engine(algorithm)
+        
     def calculate_required_margin_buffer(self) -> float:
         """
         Calculate total required margin buffer based on all factors
@@ -243,23 +247,38 @@ class DynamicMarginManager(BaseComponent):
         Includes dynamic buffer
         """
         
-        # Simplified margin calculation (would use broker's actual formula)
-        if option_type == 'NAKED_PUT':
-            # Naked put margin: 20% of underlying - OTM amount + premium
-            otm_amount = max(0, underlying_price - strike)
-            base_margin = (0.20 * underlying_price - otm_amount) * 100 * abs(quantity)
-        elif option_type == 'SPREAD':
-            # Spread margin: difference in strikes
-            base_margin = abs(strike) * 100 * abs(quantity)  # Simplified
+        legs = self._position_legs('POSITION', quantity, option_type, strike, underlying_price)
+        if legs:
+            base_margin = self.margin_engine.requirement(legs)
         else:
             # Conservative estimate
             base_margin = 0.15 * underlying_price * 100 * abs(quantity)
-            
+        
         # Apply dynamic buffer
         buffer = self.calculate_required_margin_buffer()
         buffered_margin = base_margin * (1 + buffer)
         
         return buffered_margin
+    
+    def _position_legs(self, symbol: str, quantity: int, option_type: str,
+                       strike: float, underlying_price: float) -> list:
+        """Margin engine legs for a position-dict style description (empty when not modelled)"""
+        contracts = abs(quantity)
+        if option_type == 'NAKED_PUT':
+            return [MarginLeg(symbol, -contracts, underlying_price, strike=strike, is_call=False)]
+        if option_type == 'SPREAD':
+            # `strike` carries the spread width: a put credit spread struck at the money
+            return [
+                MarginLeg(symbol, -contracts, underlying_price, strike=underlying_price, is_call=False),
+                MarginLeg(symbol, contracts, underlying_price, strike=underlying_price - abs(strike), is_call=False)
+            ]
+        return []
+    
+    def what_if_margin(self, proposed_legs: list) -> Dict:
+        """Portfolio requirement now and after proposed legs, with the buffered delta"""
+        result = self.margin_engine.what_if(proposed_legs)
+        result['buffered_delta'] = max(0.0, result['delta']) * (1 + self.calculate_required_margin_buffer())
+        return result
         
     def should_reduce_positions(self) -> bool:
         """Determine if positions should be reduced for margin safety"""
@@ -372,8 +391,6 @@ class DynamicMarginManager(BaseComponent):
             float: Available buying power in USD, adjusted for required margin buffers
         """
         try:
-        except Exception as e:
-            portfolio = self.algorithm.Portfolio
             # Get current margin remaining
             margin_remaining = self.get_buying_power()  # Use inherited BaseComponent method
             total_value = self.get_portfolio_value()  # Use inherited BaseComponent method
@@ -400,7 +417,9 @@ class DynamicMarginManager(BaseComponent):
         """Calculate required margin for a list of positions
         
         Essential method for pre-trade validation - estimates margin requirements
-        for proposed positions including dynamic buffers.
+        for proposed positions including dynamic buffers. All positions are
+        margined together in one vectorized pass, so positions on the same
+        symbol (and optional 'expiry') offset each other.
         
         Args:
             positions: List of position dictionaries with structure:
@@ -412,23 +431,29 @@ class DynamicMarginManager(BaseComponent):
         """
         try:
             if not positions:
-            total_margin = 0.0
-            for position in positions:
-                    quantity=position['quantity'],
-                )
-                total_margin += position_margin
-        except Exception as e:
                 return 0.0
+            legs = []
+            unmodelled_margin = 0.0
+            for position in positions:
                 # Validate position structure
                 required_fields = ['symbol', 'quantity', 'option_type', 'strike', 'underlying_price']
                 if not all(field in position for field in required_fields):
                     self.error(f"[DynamicMargin] Invalid position structure: {position}")  # Use inherited method
                     continue
-                # Calculate margin for this position
-                position_margin = self.calculate_position_margin_impact(
+                position_legs = self._position_legs(
+                    str(position['symbol']),
+                    quantity=position['quantity'],
                     option_type=position['option_type'], 
                     strike=position['strike'],
                     underlying_price=position['underlying_price']
+                )
+                if not position_legs:
+                    unmodelled_margin += 0.15 * position['underlying_price'] * 100 * abs(position['quantity'])
+                for leg in position_legs:
+                    leg.expiry = position.get('expiry')
+                legs.extend(position_legs)
+            base_margin = self.margin_engine.requirement(legs) + unmodelled_margin
+            total_margin = base_margin * (1 + self.calculate_required_margin_buffer())
             # Add portfolio-wide buffer for complex positions
             if len(positions) > 1:
                 # Add 5% buffer for multi-position complexity
@@ -439,4 +464,4 @@ class DynamicMarginManager(BaseComponent):
             self.error(f"[DynamicMargin] Error calculating required margin: {e}")  # Use inherited method
             # Return conservative estimate if calculation fails
             return sum(pos.get('underlying_price', 100) * 100 * abs(pos.get('quantity', 1)) * 0.2 
-                      for pos in positions if isinstance(pos, dict))
\ No newline at end of file
+                      for pos in positions if isinstance(pos, dict))
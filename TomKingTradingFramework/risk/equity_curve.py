@@ -0,0 +1,148 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Streaming Equity Curve with O(1) drawdown tracking"""
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+from config.constants import TradingConstants
+
+
+class EquityCurve:
+    """
+    Equity samples in a fixed-size NumPy ring buffer with running drawdown
+
+    Peak, current drawdown and maximum drawdown are updated per sample in
+    O(1) and cover every sample ever seen, not just the ones still in the
+    buffer. Named rolling windows keep a monotonic deque of (time, value)
+    so the window high, and the drawdown from it, are amortised O(1) too.
+    """
+
+    def __init__(self, capacity: int = None):
+        self.capacity = int(capacity or TradingConstants.EQUITY_CURVE_CAPACITY)
+        self._values = np.zeros(self.capacity)
+        self._times = np.zeros(self.capacity, dtype='datetime64[us]')
+        self._head = 0       # next write position
+        self._size = 0       # samples in the buffer
+        self.samples = 0     # samples ever recorded
+
+        self.current = None
+        self.last_time = None
+        self.peak = None
+        self.peak_time = None
+        self.current_drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.max_drawdown_time = None
+
+        # name -> (length, deque of (time, value) with strictly decreasing values)
+        self.windows: Dict[str, tuple] = {}
+
+    # ================================
+    # UPDATES
+    # ================================
+
+    def update(self, value: float, time: datetime) -> float:
+        """Record one sample and return the current drawdown from peak"""
+        value = float(value)
+        if time == self.last_time and value == self.current:
+            return self.current_drawdown  # same sample reported by another consumer
+
+        self._values[self._head] = value
+        self._times[self._head] = np.datetime64(time, 'us')
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.samples += 1
+        self.current, self.last_time = value, time
+
+        if self.peak is None or value > self.peak:
+            self.peak, self.peak_time = value, time
+        self.current_drawdown = (self.peak - value) / self.peak if self.peak > 0 else 0.0
+        if self.current_drawdown > self.max_drawdown:
+            self.max_drawdown, self.max_drawdown_time = self.current_drawdown, time
+
+        for length, window in self.windows.values():
+            while window and window[-1][1] <= value:
+                window.pop()
+            window.append((time, value))
+            self._expire(window, length, time)
+        return self.current_drawdown
+
+    # ================================
+    # ROLLING WINDOWS
+    # ================================
+
+    def add_window(self, name: str, length: timedelta):
+        """Track the high of the samples within `length` of the latest one"""
+        if name not in self.windows:
+            window = deque()
+            if self.current is not None:
+                window.append((self.last_time, self.current))
+            self.windows[name] = (length, window)
+
+    def reset_window(self, name: str):
+        """Restart a window from the latest sample (e.g. the intraday high at the open)"""
+        length, window = self.windows[name]
+        window.clear()
+        if self.current is not None:
+            window.append((self.last_time, self.current))
+
+    def window_high(self, name: str) -> Optional[float]:
+        _, window = self.windows[name]
+        return window[0][1] if window else None
+
+    def window_drawdown(self, name: str) -> float:
+        high = self.window_high(name)
+        if not high or high <= 0:
+            return 0.0
+        return (high - self.current) / high
+
+    @staticmethod
+    def _expire(window: deque, length: timedelta, now: datetime):
+        while window and now - window[0][0] > length:
+            window.popleft()
+
+    # ================================
+    # HISTORY
+    # ================================
+
+    def __len__(self) -> int:
+        return self._size
+
+    def values(self) -> np.ndarray:
+        """Buffered values, oldest first"""
+        if self._size < self.capacity:
+            return self._values[:self._size].copy()
+        return np.roll(self._values, -self._head)
+
+    def times(self) -> np.ndarray:
+        if self._size < self.capacity:
+            return self._times[:self._size].copy()
+        return np.roll(self._times, -self._head)
+
+    def get_statistics(self) -> Dict:
+        return {
+            'samples': self.samples,
+            'buffered': self._size,
+            'capacity': self.capacity,
+            'current': self.current,
+            'peak': self.peak,
+            'peak_time': self.peak_time,
+            'current_drawdown': self.current_drawdown,
+            'max_drawdown': self.max_drawdown,
+            'max_drawdown_time': self.max_drawdown_time,
+            'windows': {name: self.window_high(name) for name in self.windows}
+        }
+
+
+def get_equity_curve(algorithm) -> EquityCurve:
+    """The algorithm's shared portfolio-value EquityCurve, created on first use"""
+
+    curve = getattr(algorithm, 'equity_curve', None)
+    if not isinstance(curve, EquityCurve):
+        curve = EquityCurve()
+        algorithm.equity_curve = curve
+    return curve
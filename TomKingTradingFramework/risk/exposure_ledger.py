@@ -0,0 +1,311 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Shared Exposure Ledger for risk plugins"""
+
+from collections import deque
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from config.constants import TradingConstants
+
+
+class GroupExposure:
+    """Running totals for one group of one grouping scheme"""
+
+    __slots__ = ('delta', 'notional', 'count', 'strategies', 'symbols')
+
+    def __init__(self):
+        self.delta = 0.0      # sum of |delta| over open lots
+        self.notional = 0.0   # sum of |notional| over open lots
+        self.count = 0        # open lots
+        self.strategies: Dict[str, int] = {}  # strategy -> open lots
+        self.symbols: Dict[str, int] = {}     # symbol -> open lots
+
+    def apply(self, symbol: str, strategy: str, delta: float, notional: float, sign: int):
+        self.delta += sign * abs(delta)
+        self.notional += sign * abs(notional)
+        self.count += sign
+        for counts, key in ((self.strategies, strategy), (self.symbols, symbol)):
+            remaining = counts.get(key, 0) + sign
+            if remaining > 0:
+                counts[key] = remaining
+            else:
+                counts.pop(key, None)
+        if self.count == 0:
+            self.delta = self.notional = 0.0  # drop accumulated rounding once the group is flat
+
+
+class ExposureLedger:
+    """
+    Open lots with running per-group delta, notional and count totals
+
+    Every plugin registers a grouping scheme: a classifier mapping a symbol to
+    its group (or None) and, optionally, a measure returning (delta, notional)
+    for a lot. A lot is classified and measured once, when it is opened, so
+    closing it subtracts exactly what it added and every group query is O(1).
+
+    The ledger has a single writer (the first object to claim() it, normally
+    UnifiedRiskManager) so plugins receiving the same open/close events do not
+    count them twice. reconcile() compares the lots with Portfolio holdings on
+    a slow schedule, or as soon as the number of held symbols reported by
+    note_fill() differs from the ledger's.
+    """
+
+    UNKNOWN_STRATEGY = 'unknown'
+    RECONCILE_INTERVAL = timedelta(minutes=TradingConstants.EXPOSURE_RECONCILE_MINUTES)
+
+    def __init__(self, algorithm):
+        self.algo = algorithm
+        self.writer = None
+
+        self.schemes: Dict[str, Tuple[Callable, Optional[Callable]]] = {}
+        self.totals: Dict[str, Dict[str, GroupExposure]] = {}
+
+        # (strategy, symbol) -> open lots, oldest first; a lot maps scheme -> (group, delta, notional)
+        self.lots: Dict[Tuple[str, str], deque] = {}
+        self.lots_by_symbol: Dict[str, Dict[str, int]] = {}  # symbol -> strategy -> open lots
+
+        self.last_reconcile = None  # None: reconcile on the next call
+        self.held_count = None      # symbols held per fills since the last full reconcile (None: unknown)
+        self.stats = {
+            'opens': 0,
+            'closes': 0,
+            'unmatched_closes': 0,
+            'reconciliations': 0,
+            'reconcile_removed': 0,
+            'reconcile_added': 0,
+            'reconcile_resized': 0,
+            'resizes': 0
+        }
+
+    # ================================
+    # SETUP
+    # ================================
+
+    def claim(self, owner) -> bool:
+        """Make owner the ledger's writer if nobody has; True when owner is the writer"""
+        if self.writer is None:
+            self.writer = owner
+        return self.writer is owner
+
+    def is_writer(self, owner) -> bool:
+        return self.writer is owner
+
+    def register_scheme(self, name: str, classify: Callable[[str], Optional[str]],
+                        measure: Callable = None):
+        """
+        Add a grouping scheme; measure(symbol, quantity, fill_price) -> (delta, notional).
+        Lots already open are classified immediately.
+        """
+        if name in self.schemes:
+            return
+        self.schemes[name] = (classify, measure)
+        self.totals[name] = {}
+        for (strategy, symbol), lots in self.lots.items():
+            for lot in lots:
+                self._measure_into(lot, name)
+                self._apply(name, lot, symbol, strategy, +1)
+
+    # ================================
+    # MUTATION
+    # ================================
+
+    def open(self, symbol, quantity: float, fill_price: float = 0.0, strategy: str = None):
+        """Add a lot; classifiers and measures see the original symbol object"""
+        lot = {'_symbol': symbol, '_quantity': quantity, '_price': fill_price, '_opened': self.algo.Time}
+        symbol, strategy = str(symbol), strategy or self.UNKNOWN_STRATEGY
+        for name in self.schemes:
+            self._measure_into(lot, name)
+            self._apply(name, lot, symbol, strategy, +1)
+
+        self.lots.setdefault((strategy, symbol), deque()).append(lot)
+        by_strategy = self.lots_by_symbol.setdefault(symbol, {})
+        by_strategy[strategy] = by_strategy.get(strategy, 0) + 1
+        self.stats['opens'] += 1
+
+    def close(self, symbol, strategy: str = None) -> bool:
+        """
+        Retire the oldest open lot of (strategy, symbol), or of the symbol when
+        that strategy holds none; False when the symbol has no open lot
+        """
+        symbol = str(symbol)
+        by_strategy = self.lots_by_symbol.get(symbol)
+        if not by_strategy:
+            self.stats['unmatched_closes'] += 1
+            return False
+        if strategy not in by_strategy:
+            strategy = next(iter(by_strategy))
+
+        lot = self.lots[(strategy, symbol)].popleft()
+        for name in self.schemes:
+            self._apply(name, lot, symbol, strategy, -1)
+        self._forget(strategy, symbol)
+        self.stats['closes'] += 1
+        return True
+
+    def resize(self, symbol, quantity: float):
+        """
+        Re-measure the open lots of a symbol for a new total quantity, scaled in
+        proportion to each lot's share (split evenly when the lots net to zero)
+        """
+        key = str(symbol)
+        by_strategy = self.lots_by_symbol.get(key)
+        if not by_strategy:
+            return False
+        lots = [(strategy, lot) for strategy in by_strategy for lot in self.lots[(strategy, key)]]
+        total = sum(lot['_quantity'] for _, lot in lots)
+        for strategy, lot in lots:
+            for name in self.schemes:
+                self._apply(name, lot, key, strategy, -1)
+            lot['_quantity'] = lot['_quantity'] * quantity / total if total else quantity / len(lots)
+            for name in self.schemes:
+                self._measure_into(lot, name)
+                self._apply(name, lot, key, strategy, +1)
+        self.stats['resizes'] += 1
+        return True
+
+    def lot_quantity(self, symbol) -> float:
+        """Net quantity of a symbol's open lots"""
+        key = str(symbol)
+        return sum(lot['_quantity'] for strategy in self.lots_by_symbol.get(key, ())
+                   for lot in self.lots[(strategy, key)])
+
+    def _measure_into(self, lot: Dict, scheme: str):
+        classify, measure = self.schemes[scheme]
+        group = classify(lot['_symbol'])
+        delta, notional = (0.0, 0.0)
+        if group and measure:
+            delta, notional = measure(lot['_symbol'], lot['_quantity'], lot['_price'])
+        lot[scheme] = (group, delta, notional)
+
+    def _apply(self, scheme: str, lot: Dict, symbol: str, strategy: str, sign: int):
+        group, delta, notional = lot[scheme]
+        if group is None:
+            return
+        totals = self.totals[scheme]
+        exposure = totals.get(group)
+        if exposure is None:
+            exposure = totals[group] = GroupExposure()
+        exposure.apply(symbol, strategy, delta, notional, sign)
+        if exposure.count == 0:
+            del totals[group]
+
+    def _forget(self, strategy: str, symbol: str):
+        if not self.lots[(strategy, symbol)]:
+            del self.lots[(strategy, symbol)]
+        by_strategy = self.lots_by_symbol[symbol]
+        by_strategy[strategy] -= 1
+        if not by_strategy[strategy]:
+            del by_strategy[strategy]
+        if not by_strategy:
+            del self.lots_by_symbol[symbol]
+
+    # ================================
+    # QUERIES (O(1))
+    # ================================
+
+    def group(self, scheme: str, group: str) -> Optional[GroupExposure]:
+        return self.totals[scheme].get(group)
+
+    def count(self, scheme: str, group: str) -> int:
+        exposure = self.totals[scheme].get(group)
+        return exposure.count if exposure else 0
+
+    def delta(self, scheme: str, group: str) -> float:
+        exposure = self.totals[scheme].get(group)
+        return exposure.delta if exposure else 0.0
+
+    def notional(self, scheme: str, group: str) -> float:
+        exposure = self.totals[scheme].get(group)
+        return exposure.notional if exposure else 0.0
+
+    def strategy_count(self, scheme: str, group: str) -> int:
+        exposure = self.totals[scheme].get(group)
+        return len(exposure.strategies) if exposure else 0
+
+    def has_strategy(self, scheme: str, group: str, strategy: str) -> bool:
+        exposure = self.totals[scheme].get(group)
+        return exposure is not None and strategy in exposure.strategies
+
+    def total_count(self, scheme: str) -> int:
+        return sum(exposure.count for exposure in self.totals[scheme].values())
+
+    def symbols_by_group(self, scheme: str) -> Dict[str, List[str]]:
+        """group -> symbols, one entry per open lot (reporting only)"""
+        return {group: [symbol for symbol, lots in exposure.symbols.items() for _ in range(lots)]
+                for group, exposure in self.totals[scheme].items()}
+
+    # ================================
+    # RECONCILIATION
+    # ================================
+
+    def reconcile(self, force: bool = False) -> Dict[str, List[str]]:
+        """
+        Align lots with Portfolio holdings: drop lots for symbols no longer
+        held, re-measure held symbols whose quantity changed, and open an
+        unknown-strategy lot for holdings the ledger never saw. Runs at most
+        once per RECONCILE_INTERVAL unless the fill-tracked held count differs
+        from the ledger's symbol count (a fill it was not told about)
+        """
+        result = {'removed': [], 'added': [], 'resized': []}
+        if not force and self.last_reconcile is not None and \
+                self.algo.Time - self.last_reconcile < self.RECONCILE_INTERVAL and \
+                self.held_count == len(self.lots_by_symbol):
+            return result
+        self.last_reconcile = self.algo.Time
+        self.stats['reconciliations'] += 1
+
+        held = {}
+        for holding in self.algo.Portfolio.Values:
+            if holding.Invested:
+                held[str(holding.Symbol)] = holding
+        self.held_count = len(held)
+
+        for symbol in [s for s in self.lots_by_symbol if s not in held]:
+            while symbol in self.lots_by_symbol:
+                self.close(symbol, next(iter(self.lots_by_symbol[symbol])))
+                result['removed'].append(symbol)
+
+        for symbol, holding in held.items():
+            quantity = float(holding.Quantity)
+            if symbol not in self.lots_by_symbol:
+                self.open(holding.Symbol, quantity, float(holding.AveragePrice or 0.0))
+                result['added'].append(symbol)
+            elif abs(self.lot_quantity(symbol) - quantity) > 1e-9:
+                self.resize(symbol, quantity)
+                result['resized'].append(symbol)
+
+        self.stats['reconcile_removed'] += len(result['removed'])
+        self.stats['reconcile_added'] += len(result['added'])
+        self.stats['reconcile_resized'] += len(result['resized'])
+        return result
+
+    def note_fill(self, before: float, after: float):
+        """Track the held symbol count from a fill's position change (checked by reconcile())"""
+        if self.held_count is None:
+            return
+        if not before and after:
+            self.held_count += 1
+        elif before and not after:
+            self.held_count -= 1
+
+    def mark_stale(self):
+        """Run the next reconcile() regardless of the interval (fills the ledger may not have seen)"""
+        self.last_reconcile = None
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['open_lots'] = sum(len(lots) for lots in self.lots.values())
+        stats['symbols'] = len(self.lots_by_symbol)
+        stats['schemes'] = list(self.schemes)
+        return stats
+
+
+def get_exposure_ledger(algorithm) -> ExposureLedger:
+    """The algorithm's shared ExposureLedger, created on first use"""
+
+    ledger = getattr(algorithm, 'exposure_ledger', None)
+    if not isinstance(ledger, ExposureLedger):
+        ledger = ExposureLedger(algorithm)
+        algorithm.exposure_ledger = ledger
+    return ledger
@@ -6,8 +6,8 @@ from AlgorithmImports import *
 import numpy as np
 from core.unified_vix_manager import UnifiedVIXManager
 from core.unified_position_sizer import UnifiedPositionSizer
-from risk.kelly_criterion import KellyCriterionCalculator
 from config.constants import TradingConstants
+from risk.strategy_statistics import get_strategy_statistics
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -33,6 +33,7 @@ class KellyCriterion:
     def __init__(self, algorithm):
         self.algo = algorithm
         self.kelly_fraction = TradingConstants.KELLY_FACTOR  # Use 25% Kelly for safety (Tom King approach)
+        self.strategy_statistics = get_strategy_statistics(algorithm)
     
     def calculate_kelly_size(self, win_rate, avg_win_pct, avg_loss_pct, confidence=1.0):
         """
@@ -69,6 +70,10 @@ class KellyCriterion:
         """
         Calculate recommended sizes for each Tom King strategy
         
+        Documented win rates and averages are used until a strategy has
+        enough closed trades in the trade journal; from then on its observed
+        win rate and average win/loss replace them.
+        
         Returns:
             Dictionary of strategy names to recommended position sizes
         """
@@ -109,16 +114,20 @@ class KellyCriterion:
         
         position_sizes = {}
         for strategy, params in strategies.items():
+            observed = self.strategy_statistics.kelly_inputs(strategy)
+            win_rate, avg_win, avg_loss = observed or (params['win_rate'], params['avg_win'], params['avg_loss'])
             kelly_pct = self.calculate_kelly_size(
-                params['win_rate'],
-                params['avg_win'],
-                params['avg_loss'],
+                win_rate,
+                avg_win,
+                avg_loss,
                 params['confidence']
             )
             position_sizes[strategy] = {
                 'percentage': kelly_pct,
                 'dollar_amount': account_value * kelly_pct,
-                'description': f"{kelly_pct*TradingConstants.FULL_PERCENTAGE:.1f}% of account (${account_value * kelly_pct:,.0f})"
+                'description': f"{kelly_pct*TradingConstants.FULL_PERCENTAGE:.1f}% of account (${account_value * kelly_pct:,.0f})",
+                'source': 'observed' if observed else 'documented',
+                'kelly_interval': self.strategy_statistics.confidence_interval(strategy) if observed else None
             }
         
         return position_sizes
@@ -0,0 +1,320 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Vectorized Portfolio Margin Engine"""
+
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.constants import TradingConstants
+from risk.portfolio_var import OPTION_SECURITY_TYPES
+
+
+ASSET_CLASSES = ('equity', 'index', 'future')
+EQUITY, INDEX, FUTURE = range(3)
+
+
+@dataclass
+class MarginLeg:
+    """One position leg for margining; option fields are ignored for stock/futures legs"""
+    underlying: str
+    quantity: float                          # signed shares/contracts, negative = short
+    underlying_price: float
+    multiplier: float = 100.0
+    strike: Optional[float] = None
+    expiry: Optional[datetime] = None
+    is_call: bool = True
+    premium: float = 0.0                     # option mark per unit of underlying
+    asset_class: str = 'equity'              # 'equity', 'index' or 'future'
+    futures_margin: Optional[float] = None   # initial margin per contract of the underlying future
+
+    @property
+    def is_option(self) -> bool:
+        return self.strike is not None
+
+
+def _run_ranks(keys: np.ndarray) -> np.ndarray:
+    """Position of every element inside its run of equal (already sorted) keys"""
+    index = np.arange(len(keys))
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return index - starts[np.searchsorted(starts, index, side='right') - 1]
+
+
+def _match(left_keys: np.ndarray, right_keys: np.ndarray):
+    """(left positions, right positions) where keys agree; right_keys sorted and unique"""
+    if not len(right_keys) or not len(left_keys):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    position = np.searchsorted(right_keys, left_keys)
+    clipped = np.minimum(position, len(right_keys) - 1)
+    found = (position < len(right_keys)) & (right_keys[clipped] == left_keys)
+    return np.flatnonzero(found), clipped[found]
+
+
+def scenario_requirements(legs: Sequence[MarginLeg], scenario_ids: Sequence[int], n_scenarios: int) -> np.ndarray:
+    """
+    Strategy-based margin requirement of every scenario's book in one pass
+
+    Legs of one scenario net against each other (a closing order cancels its
+    position). Per underlying and expiry, short options are paired with longs
+    of the same right into spreads (strike-sorted, charged their width), the
+    remaining naked puts and calls are paired into strangles (greater side
+    plus the other side's premium), and the total is capped at the bucket's
+    maximum loss at expiry when that loss is bounded. Stock is charged Reg-T,
+    futures their per-contract initial margin.
+    """
+    result = np.zeros(n_scenarios)
+    if not legs:
+        return result
+
+    # One pass over the legs into a row per leg, then columns
+    names, expiries = {}, {None: -1}
+    rows = np.array([
+        (leg.underlying_price, leg.multiplier, leg.quantity, leg.premium,
+         np.nan if leg.futures_margin is None else leg.futures_margin,
+         names.setdefault(leg.underlying, len(names)), ASSET_CLASSES.index(leg.asset_class),
+         *((expiries.setdefault(leg.expiry, len(expiries)), leg.strike, leg.is_call)
+           if leg.strike is not None else (-1, 0.0, -1)))
+        for leg in legs
+    ], dtype=float)
+    spot, mult, qty, premium, futures_margin, und, asset, exp, strike, call = rows.T
+    scen = np.asarray(scenario_ids, dtype=float)
+    option = call >= 0
+    asset = asset.astype(np.int64)
+    futures_margin = np.where(np.isnan(futures_margin),
+                              TradingConstants.MARGIN_FUTURES_FALLBACK_PCT * spot * mult, futures_margin)
+
+    # Net identical contracts within each scenario
+    keys = np.column_stack([scen, und, exp, strike, call])
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    new_run = np.r_[True, (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)]
+    run = np.cumsum(new_run) - 1
+    net = np.bincount(run, weights=qty[order])
+    first = order[new_run]
+    live = np.rint(net) != 0
+    unique, first, net = sorted_keys[new_run][live], first[live], np.rint(net[live])
+    contract_scen = unique[:, 0].astype(np.int64)
+    is_option = option[first]
+
+    # Stock and futures
+    linear = ~is_option
+    if linear.any():
+        f = first[linear]
+        charge = np.where(asset[f] == FUTURE, futures_margin[f] * np.abs(net[linear]),
+                          TradingConstants.MARGIN_EQUITY_REG_T * np.abs(net[linear]) * spot[f] * mult[f])
+        np.add.at(result, contract_scen[linear], charge)
+
+    if not is_option.any():
+        return result
+
+    # ---- options, one row per netted contract ----
+    f = first[is_option]
+    q, K, S, m = net[is_option], strike[f], spot[f], mult[f]
+    is_call, prem = call[f] > 0, premium[f] * mult[f]
+    # contracts are sorted by (scenario, underlying, expiry, ...), so buckets are runs
+    bucket_keys = unique[is_option][:, :3]
+    bucket = np.cumsum(np.r_[True, (bucket_keys[1:] != bucket_keys[:-1]).any(axis=1)]) - 1
+    n_buckets = int(bucket[-1]) + 1
+    bucket_scen = np.zeros(n_buckets, dtype=np.int64)
+    bucket_scen[bucket] = contract_scen[is_option]
+
+    base_pct = np.where(asset[f] == INDEX, TradingConstants.MARGIN_NAKED_INDEX_PCT,
+                        TradingConstants.MARGIN_NAKED_EQUITY_PCT)
+    min_pct = np.full(len(f), TradingConstants.MARGIN_NAKED_MIN_PCT)
+    on_future = asset[f] == FUTURE
+    futures_pct = futures_margin[f] / np.maximum(S * m, 1e-9)  # the future's own margin rate
+    base_pct = np.where(on_future, futures_pct, base_pct)
+    min_pct = np.where(on_future, futures_pct * TradingConstants.MARGIN_NAKED_MIN_PCT /
+                       TradingConstants.MARGIN_NAKED_EQUITY_PCT, min_pct)
+    otm = np.where(is_call, np.maximum(K - S, 0.0), np.maximum(S - K, 0.0))
+    naked_each = np.maximum(base_pct * S - otm, min_pct * np.where(is_call, S, K)) * m + prem
+
+    # Expand to single contracts: shorts pair with longs of the same bucket and right
+    units = np.repeat(np.arange(len(q)), np.abs(q).astype(np.int64))
+    short = q[units] < 0
+    group = bucket[units] * 2 + is_call[units]
+    sort_strike = np.where(is_call[units], K[units], -K[units])  # puts: highest strike first
+    order = np.lexsort((sort_strike, short, group))
+    units, short, group = units[order], short[order], group[order]
+    span = len(units) + 1
+    rank_key = _run_ranks(group * 2 + short) + group * span
+
+    short_units, long_units = units[short], units[~short]
+    paired_short, paired_long = _match(rank_key[short], rank_key[~short])
+    ks, kl = K[short_units[paired_short]], K[long_units[paired_long]]
+    width = np.where(is_call[short_units[paired_short]], np.maximum(kl - ks, 0.0), np.maximum(ks - kl, 0.0))
+    strategy_based = np.zeros(n_buckets)
+    np.add.at(strategy_based, bucket[short_units[paired_short]], width * m[short_units[paired_short]])
+
+    # Naked shorts: puts and calls of one bucket pair into strangles, largest first
+    naked_mask = np.ones(len(short_units), dtype=bool)
+    naked_mask[paired_short] = False
+    naked = short_units[naked_mask]
+    if len(naked):
+        requirement = naked_each[naked]
+        np.add.at(strategy_based, bucket[naked], requirement)
+        order = np.lexsort((-requirement, is_call[naked], bucket[naked]))
+        naked, requirement = naked[order], requirement[order]
+        rank_key = _run_ranks(bucket[naked] * 2 + is_call[naked]) + bucket[naked] * span
+        puts, calls = ~is_call[naked], is_call[naked]
+        paired_put, paired_call = _match(rank_key[puts], rank_key[calls])
+        put_req, call_req = requirement[puts][paired_put], requirement[calls][paired_call]
+        put_prem, call_prem = prem[naked[puts][paired_put]], prem[naked[calls][paired_call]]
+        strangle = np.where(put_req >= call_req, put_req + call_prem, call_req + put_prem)
+        np.subtract.at(strategy_based, bucket[naked[puts][paired_put]], put_req + call_req - strangle)
+
+    # Maximum loss at expiry: the payoff is piecewise linear with kinks at 0 and the
+    # strikes, evaluated at every strike from per-bucket running sums in strike order
+    order = np.lexsort((K, bucket))
+    b, k = bucket[order], K[order]
+    size = (q * m)[order]
+    calls = is_call[order]
+    running = np.cumsum(np.column_stack([size * calls, size * k * calls, size * ~calls, size * k * ~calls]), axis=0)
+    bucket_end = np.r_[np.flatnonzero(b[1:] != b[:-1]), len(b) - 1]
+    before_bucket = np.vstack([np.zeros(4), running[bucket_end[:-1]]])
+    totals = running[bucket_end] - before_bucket
+    within = running - before_bucket[b]
+    # calls struck at or below k pay k - K; puts struck at or above k pay K - k
+    payoff = (k * within[:, 0] - within[:, 1]) + \
+             ((totals[b, 3] - within[:, 3]) - k * (totals[b, 2] - within[:, 2]))
+    worst = np.minimum(0.0, totals[:, 3])  # at zero only the puts pay
+    np.minimum.at(worst, b, payoff)
+    max_loss = -worst
+    max_loss[totals[:, 0] < 0] = np.inf  # net short calls: unbounded
+
+    np.add.at(result, bucket_scen, np.minimum(strategy_based, max_loss))
+    return result
+
+
+class MarginEngine:
+    """
+    Portfolio margin requirement and what-if deltas for proposed orders
+
+    The open book is read from Portfolio once per call and margined together
+    with the proposed legs as two scenarios of one vectorized evaluation, so
+    "margin after adding these legs" costs the same as "margin now".
+    """
+
+    def __init__(self, algorithm):
+        self.algo = algorithm
+        self.stats = {
+            'evaluations': 0,
+            'what_if_checks': 0,
+            'total_ms': 0.0
+        }
+
+    # ================================
+    # INPUTS
+    # ================================
+
+    def futures_margin_per_contract(self, root: str) -> Optional[float]:
+        """Overnight initial margin from FuturesManager specs ('/ES' and 'ES' both resolve)"""
+        futures_manager = getattr(self.algo, 'futures_manager', None)
+        if futures_manager is None:
+            return None
+        specs = futures_manager.get_futures_specs(str(root).lstrip('/'))
+        return float(specs['margin_overnight']) if specs else None
+
+    def portfolio_legs(self) -> List[MarginLeg]:
+        legs = []
+        for holding in self.algo.Portfolio.Values:
+            if not holding.Invested:
+                continue
+            symbol = holding.Symbol
+            security = self.algo.Securities[symbol]
+            multiplier = float(getattr(getattr(security, 'SymbolProperties', None), 'ContractMultiplier', 1) or 1)
+
+            if symbol.SecurityType in OPTION_SECURITY_TYPES:
+                underlying = symbol.Underlying
+                if symbol.SecurityType == SecurityType.FutureOption:
+                    asset_class = 'future'
+                elif symbol.SecurityType == SecurityType.IndexOption or underlying.SecurityType == SecurityType.Index:
+                    asset_class = 'index'
+                else:
+                    asset_class = 'equity'
+                legs.append(MarginLeg(
+                    underlying=str(underlying),
+                    quantity=float(holding.Quantity),
+                    underlying_price=float(self.algo.Securities[underlying].Price),
+                    multiplier=multiplier,
+                    strike=float(symbol.ID.StrikePrice),
+                    expiry=symbol.ID.Date,
+                    is_call=symbol.ID.OptionRight == OptionRight.Call,
+                    premium=float(security.Price),
+                    asset_class=asset_class,
+                    futures_margin=self.futures_margin_per_contract(underlying.ID.Symbol)
+                    if asset_class == 'future' else None
+                ))
+            else:
+                is_future = symbol.SecurityType == SecurityType.Future
+                legs.append(MarginLeg(
+                    underlying=str(symbol),
+                    quantity=float(holding.Quantity),
+                    underlying_price=float(security.Price),
+                    multiplier=multiplier,
+                    asset_class='future' if is_future else 'equity',
+                    futures_margin=self.futures_margin_per_contract(symbol.ID.Symbol) if is_future else None
+                ))
+        return legs
+
+    def _resolve(self, legs: Sequence[MarginLeg]) -> List[MarginLeg]:
+        """Fill per-contract futures margins the caller left out"""
+        resolved = []
+        for leg in legs:
+            if leg.asset_class == 'future' and leg.futures_margin is None:
+                leg = replace(leg, futures_margin=self.futures_margin_per_contract(leg.underlying))
+            resolved.append(leg)
+        return resolved
+
+    # ================================
+    # REQUIREMENTS
+    # ================================
+
+    def requirements(self, books: Sequence[Sequence[MarginLeg]]) -> np.ndarray:
+        """Margin requirement of each book, all books in one vectorized evaluation"""
+        started = time.perf_counter()
+        legs, scenario_ids = [], []
+        for scenario, book in enumerate(books):
+            book = self._resolve(book)
+            legs.extend(book)
+            scenario_ids.extend([scenario] * len(book))
+        result = scenario_requirements(legs, scenario_ids, len(books))
+        self.stats['evaluations'] += 1
+        self.stats['total_ms'] += (time.perf_counter() - started) * 1000
+        return result
+
+    def requirement(self, legs: Sequence[MarginLeg] = None) -> float:
+        """Margin requirement of `legs` (default: the open portfolio)"""
+        return float(self.requirements([self.portfolio_legs() if legs is None else legs])[0])
+
+    def what_if(self, proposed: Sequence[MarginLeg], book: Sequence[MarginLeg] = None) -> Dict[str, float]:
+        """Requirement now, after adding `proposed`, and the difference (can be negative for hedges)"""
+        book = self.portfolio_legs() if book is None else list(book)
+        current, after = self.requirements([book, list(book) + list(proposed)])
+        self.stats['what_if_checks'] += 1
+        return {'current': float(current), 'proposed': float(after), 'delta': float(after - current)}
+
+    def check_margin_available(self, proposed: Sequence[MarginLeg], max_fraction: float):
+        """(ok, margin delta, budget): the order may use at most max_fraction of MarginRemaining"""
+        delta = self.what_if(proposed)['delta']
+        budget = float(self.algo.Portfolio.MarginRemaining) * max_fraction
+        return delta <= budget, delta, budget
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['average_ms'] = stats['total_ms'] / max(1, stats['evaluations'])
+        return stats
+
+
+def get_margin_engine(algorithm) -> MarginEngine:
+    """The algorithm's shared MarginEngine, created on first use"""
+
+    engine = getattr(algorithm, 'margin_engine', None)
+    if not isinstance(engine, MarginEngine):
+        engine = MarginEngine(algorithm)
+        algorithm.margin_engine = engine
+    return engine
@@ -2,8 +2,9 @@
 # Critical for multi-leg strategies (iron condors, strangles, etc.)
 
 from AlgorithmImports import *
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import time
+from risk.validation_pipeline import get_validation_pipeline
 
 class OrderValidationSystem:
     """
@@ -12,6 +13,8 @@ class OrderValidationSystem:
     CRITICAL: Prevents naked positions from incomplete fills
     """
     
+    PRE_ORDER_RULES = ('symbol_exists', 'market_open', 'quote_spread', 'option_volume', 'data_freshness')
+    
     def __init__(self, algorithm):
         self.algorithm = algorithm
         
@@ -35,6 +38,9 @@ class OrderValidationSystem:
         self.abort_on_partial = True  # Abort entire strategy if partial fill
         self.require_all_legs = True  # All legs must fill for multi-leg
         
+        # Market hours are shared per slice and symbol; check outcomes feed the pipeline statistics
+        self.pipeline = get_validation_pipeline(algorithm)
+        
         self.algorithm.Log("[WARNING] ORDER VALIDATION SYSTEM INITIALIZED")
     
     def validate_pre_order(self, symbol, order_type='LIMIT') -> Tuple[bool, str]:
@@ -43,30 +49,35 @@ class OrderValidationSystem:
         Returns: (is_valid, reason)
         """
         try:
-        except Exception as e:
-            security = self.algorithm.Securities.get(symbol)
-            if not security:
-                return False, "Symbol not found"
-            # Check if market is open
-            if not self.algorithm.IsMarketOpen(symbol):
-                return False, "Market closed"
-            # Check bid-ask spread
-            if security.BidPrice > 0 and security.AskPrice > 0:
-                spread = (security.AskPrice - security.BidPrice) / security.BidPrice
-                if spread > self.max_spread_percent:
-                    return False, f"Spread too wide: {spread:.2%}"
-            # Check volume for options
-            if security.Type == SecurityType.Option:
-                if hasattr(security, 'Volume') and security.Volume < self.min_volume_required:
-                    return False, f"Low volume: {security.Volume}"
-            # Check for stale data
-            if hasattr(security, 'LastUpdate'):
-                time_since_update = (self.algorithm.Time - security.LastUpdate).seconds
-                if time_since_update > 60:
-                    return False, f"Stale data: {time_since_update}s old"
-            return True, "Valid"
+            failed_rule, reason = self._first_pre_order_failure(symbol)
         except Exception as e:
             return False, f"Validation error: {str(e)}"
+        self.pipeline.record(self.PRE_ORDER_RULES, failed_rule)
+        return (True, "Valid") if failed_rule is None else (False, reason)
+    
+    def _first_pre_order_failure(self, symbol) -> Tuple[Optional[str], Optional[str]]:
+        """(rule, reason) of the first PRE_ORDER_RULES check that fails, (None, None) when all pass"""
+        security = self.algorithm.Securities.get(symbol)
+        if not security:
+            return 'symbol_exists', "Symbol not found"
+        # Check if market is open
+        if not self.pipeline.value('market_open', {'symbol': symbol}):
+            return 'market_open', "Market closed"
+        # Check bid-ask spread
+        if security.BidPrice > 0 and security.AskPrice > 0:
+            spread = (security.AskPrice - security.BidPrice) / security.BidPrice
+            if spread > self.max_spread_percent:
+                return 'quote_spread', f"Spread too wide: {spread:.2%}"
+        # Check volume for options
+        if security.Type == SecurityType.Option:
+            if hasattr(security, 'Volume') and security.Volume < self.min_volume_required:
+                return 'option_volume', f"Low volume: {security.Volume}"
+        # Check for stale data
+        if hasattr(security, 'LastUpdate'):
+            time_since_update = (self.algorithm.Time - security.LastUpdate).seconds
+            if time_since_update > 60:
+                return 'data_freshness', f"Stale data: {time_since_update}s old"
+        return None, None
     
     def place_multi_leg_order(self, legs: List[Dict], strategy_name: str) -> bool:
         """
@@ -90,16 +101,12 @@ class OrderValidationSystem:
         # Place all legs
         for i, leg in enumerate(legs):
             try:
-                    )
-                    )
-                        'group_id': group_id,
-                    }
-            except Exception as e:
                 if leg.get('order_type') == 'MARKET':
                     order = self.algorithm.MarketOrder(
                         leg['symbol'], 
                         leg['quantity'],
                         asynchronous=False  # Wait for fill
+                    )
                 else:
                     limit_price = leg.get('limit_price', 0)
                     if limit_price <= 0:
@@ -110,6 +117,7 @@ class OrderValidationSystem:
                         leg['quantity'],
                         limit_price,
                         asynchronous=False
+                    )
                 if order:
                     order_ids.append(order.OrderId)
                     self.pending_orders[order.OrderId] = {
@@ -118,7 +126,9 @@ class OrderValidationSystem:
                         'leg_index': i,
                         'strategy': strategy_name,
                         'submit_time': self.algorithm.Time,
-                        'expected_price': limit_price if leg.get('order_type') != 'MARKET' else None
+                        'expected_price': limit_price if leg.get('order_type') != 'MARKET' else None,
+                        'group_id': group_id,
+                    }
                 else:
                     self.algorithm.Error(f"Failed to place order for leg {i}: {leg['symbol']}")
                     # Cancel all previous legs if one fails
@@ -335,9 +345,6 @@ class OrderValidationSystem:
         
         for order_id in order_ids:
             try:
-                pass
-            except Exception as e:
-
                 self.algorithm.Transactions.CancelOrder(order_id)
                 self.algorithm.Log(f"   Cancelled order {order_id}")
             except (RuntimeError, InvalidOperationException, AttributeError) as e:
@@ -6,6 +6,8 @@ from AlgorithmImports import *
 from typing import Dict, List, Optional, Any
 from risk.unified_risk_manager import BaseRiskPlugin, RiskEvent, RiskEventType, RiskLevel
 from config.constants import TradingConstants
+from risk.equity_curve import get_equity_curve
+from risk.rolling_counter import RollingCounter
 from datetime import datetime, timedelta
 
 class CircuitBreakerPlugin(BaseRiskPlugin):
@@ -15,6 +17,9 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
     CRITICAL: Preserves all safety logic from August 5, 2024 disaster lessons.
     """
     
+    INTRADAY_WINDOW = 'intraday'
+    COUNTER_FIELDS = ('trades', 'losses', 'pnl')
+    
     @property
     def plugin_name(self) -> str:
         return "CircuitBreakerPlugin"
@@ -49,13 +54,21 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
             self.daily_start_value = self._algorithm.Portfolio.TotalPortfolioValue
             self.weekly_start_value = self._algorithm.Portfolio.TotalPortfolioValue
             self.monthly_start_value = self._algorithm.Portfolio.TotalPortfolioValue
-            self.intraday_high = self._algorithm.Portfolio.TotalPortfolioValue
             
-            # Trade tracking
+            # Intraday high is a window on the shared equity curve, restarted at each daily reset
+            self.equity_curve = get_equity_curve(self._algorithm)
+            self.equity_curve.update(self._algorithm.Portfolio.TotalPortfolioValue, self._algorithm.Time)
+            self.equity_curve.add_window(self.INTRADAY_WINDOW, timedelta(days=1))
+            self.equity_curve.reset_window(self.INTRADAY_WINDOW)
+            
+            # Trade tracking (reset daily)
             self.trades_today = 0
             self.losses_today = 0
             self.daily_pnl = 0.0
             
+            # Rolling last-hour view of the same events, in per-minute buckets
+            self.hour_counter = RollingCounter(60, self.COUNTER_FIELDS)
+            
             # Recovery requirements
             self.recovery_period_hours = TradingConstants.RECOVERY_PERIOD_HOURS
             self.recovery_threshold = TradingConstants.RECOVERY_THRESHOLD
@@ -77,6 +90,12 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
             self.algo.Error(f"Failed to initialize circuit breaker plugin: {e}")
             return False
     
+    @property
+    def intraday_high(self) -> float:
+        """Highest portfolio value since the daily reset"""
+        high = self.equity_curve.window_high(self.INTRADAY_WINDOW)
+        return high if high is not None else self._algorithm.Portfolio.TotalPortfolioValue
+    
     def can_open_position(self, symbol: str, quantity: int, 
                          context: Dict[str, Any] = None) -> tuple[bool, str]:
         """Check if trading is allowed by circuit breaker"""
@@ -108,6 +127,7 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
         """Track new trade for loss statistics"""
         def _track_trade():
             self.trades_today += 1
+            self.hour_counter.add(self._algorithm.Time, trades=1)
             self._algorithm.Debug(f"[Circuit Breaker Plugin] Trade #{self.trades_today} opened: {symbol}")
         
         self._safe_execute("on_position_opened", _track_trade)
@@ -120,10 +140,12 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
             
             if is_win:
                 self.consecutive_losses = 0
+                self.hour_counter.add(self._algorithm.Time, pnl=pnl)
                 self._algorithm.Debug(f"[Circuit Breaker Plugin] Win recorded, consecutive losses reset")
             else:
                 self.consecutive_losses += 1
                 self.losses_today += 1
+                self.hour_counter.add(self._algorithm.Time, losses=1, pnl=pnl)
                 self._algorithm.Debug(
                     f"[Circuit Breaker Plugin] Loss #{self.consecutive_losses} recorded (${pnl:.2f})"
                 )
@@ -139,7 +161,7 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
             current_value = self._algorithm.Portfolio.TotalPortfolioValue
             
             if current_value > self.intraday_high:
-                self.intraday_high = current_value
+                self.equity_curve.update(current_value, self._algorithm.Time)
                 self.last_portfolio_value = current_value
                 self.last_value_update = self._algorithm.Time
         
@@ -213,6 +235,9 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
                 'trades_today': self.trades_today,
                 'losses_today': self.losses_today,
                 'loss_rate_today': self.losses_today / max(self.trades_today, 1),
+                'trades_last_hour': self.hour_counter.total('trades', self._algorithm.Time),
+                'losses_last_hour': self.hour_counter.total('losses', self._algorithm.Time),
+                'pnl_last_hour': self.hour_counter.total('pnl', self._algorithm.Time),
                 
                 # Limits
                 'daily_limit': self.daily_loss_limit,
@@ -340,9 +365,8 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
         """Update portfolio value tracking"""
         current_value = self._algorithm.Portfolio.TotalPortfolioValue
         
-        # Update intraday high
-        if current_value > self.intraday_high:
-            self.intraday_high = current_value
+        # Record the sample (moves the intraday high)
+        self.equity_curve.update(current_value, self._algorithm.Time)
         
         # Cache for performance
         self.last_portfolio_value = current_value
@@ -360,7 +384,8 @@ class CircuitBreakerPlugin(BaseRiskPlugin):
     def _reset_daily_tracking(self):
         """Reset daily tracking at market open"""
         self.daily_start_value = self._algorithm.Portfolio.TotalPortfolioValue
-        self.intraday_high = self._algorithm.Portfolio.TotalPortfolioValue
+        self.equity_curve.update(self._algorithm.Portfolio.TotalPortfolioValue, self._algorithm.Time)
+        self.equity_curve.reset_window(self.INTRADAY_WINDOW)
         self.trades_today = 0
         self.losses_today = 0
         self.daily_pnl = 0.0
@@ -5,6 +5,7 @@
 from AlgorithmImports import *
 from typing import Dict, List, Optional, Any, Tuple
 from risk.unified_risk_manager import BaseRiskPlugin, RiskEvent, RiskEventType, RiskLevel
+from risk.exposure_ledger import get_exposure_ledger
 from datetime import datetime, timedelta
 
 class ConcentrationPlugin(BaseRiskPlugin):
@@ -12,8 +13,13 @@ class ConcentrationPlugin(BaseRiskPlugin):
     Concentration risk management plugin preventing over-exposure to SPY/ES/related assets.
     Migrated from SPYConcentrationManager with enhanced multi-asset support.
     Preserves Tom King's concentration limits and safety rules.
+    
+    Group delta, notional and strategy counts are running totals in the shared
+    ExposureLedger ('concentration' scheme), so every limit check is O(1).
     """
     
+    LEDGER_SCHEME = 'concentration'
+    
     @property
     def plugin_name(self) -> str:
         return "ConcentrationPlugin"
@@ -25,12 +31,6 @@ class ConcentrationPlugin(BaseRiskPlugin):
     def _plugin_initialize(self) -> bool:
         """Initialize concentration tracking"""
         try:
-            # Track positions by underlying asset groups
-            self.spy_positions = {}    # Strategy -> position details
-            self.es_positions = {}     # ES futures positions
-            self.option_positions = {}  # SPY/SPX options
-            self.other_positions = {}   # Other concentrated positions
-            
             # Maximum exposure limits (Tom King methodology - NEVER CHANGE)
             self.max_spy_delta = 100           # Maximum net delta exposure
             self.max_notional_pct = 0.30       # Max 30% of portfolio in SPY/ES
@@ -55,12 +55,14 @@ class ConcentrationPlugin(BaseRiskPlugin):
                 'DIA_EQUIVALENT': ['DIA', 'YM', 'MYM']          # Dow Jones
             }
             
-            # Track current exposures
-            self.group_exposures = {group: 0.0 for group in self.concentration_groups}
-            self.group_strategy_counts = {group: 0 for group in self.concentration_groups}
+            # Running group exposures live in the shared ledger; the plugin writes
+            # to it only when no UnifiedRiskManager has claimed it
+            self.ledger = get_exposure_ledger(self._algorithm)
+            self.ledger.claim(self)
+            self.ledger.register_scheme(self.LEDGER_SCHEME, self._get_concentration_group,
+                                        self._measure_position)
             
-            # Position tracking for cleanup
-            self.position_timestamps = {}
+            # Reconciliation tracking
             self.allocation_leaks_detected = 0
             self.stale_allocations_cleaned = 0
             
@@ -100,7 +102,7 @@ class ConcentrationPlugin(BaseRiskPlugin):
             estimated_notional = self._estimate_position_notional(symbol, quantity)
             
             # Check group delta limit
-            current_group_exposure = self.group_exposures.get(group, 0.0)
+            current_group_exposure = self.ledger.delta(self.LEDGER_SCHEME, group)
             new_group_exposure = current_group_exposure + abs(estimated_delta)
             
             if new_group_exposure > self._get_group_limit(group):
@@ -108,8 +110,8 @@ class ConcentrationPlugin(BaseRiskPlugin):
                 return False, f"Would exceed {group} delta limit: {new_group_exposure:.1f} > {self._get_group_limit(group)}"
             
             # Check strategy count limit
-            current_strategy_count = self.group_strategy_counts.get(group, 0)
-            if (strategy_name not in self._get_strategies_for_group(group) and 
+            current_strategy_count = self.ledger.strategy_count(self.LEDGER_SCHEME, group)
+            if (not self.ledger.has_strategy(self.LEDGER_SCHEME, group, strategy_name) and 
                 current_strategy_count >= self.max_strategies_per_underlying):
                 self.blocked_concentrations += 1
                 return False, f"Already {current_strategy_count} strategies in {group} (max {self.max_strategies_per_underlying})"
@@ -117,7 +119,7 @@ class ConcentrationPlugin(BaseRiskPlugin):
             # Check portfolio notional limit
             account_value = self._algorithm.Portfolio.TotalPortfolioValue
             max_notional = account_value * self.max_notional_pct
-            current_notional = self._calculate_total_group_notional(group)
+            current_notional = self.ledger.notional(self.LEDGER_SCHEME, group)
             
             if current_notional + estimated_notional > max_notional:
                 self.blocked_concentrations += 1
@@ -137,49 +139,17 @@ class ConcentrationPlugin(BaseRiskPlugin):
                           fill_price: float, context: Dict[str, Any] = None):
         """Register new position in concentration tracking"""
         def _register():
+            strategy_name = context.get('strategy_name', 'unknown') if context else 'unknown'
+            if self.ledger.is_writer(self):
+                self.ledger.open(symbol, quantity, fill_price, strategy_name)
+            
             group = self._get_concentration_group(symbol)
             if not group:
                 return
             
-            strategy_name = context.get('strategy_name', 'unknown') if context else 'unknown'
-            
-            # Calculate actual position metrics
-            delta = self._estimate_position_delta(symbol, quantity)
-            notional = quantity * fill_price * self.multipliers.get(str(symbol)[:3], 1)
-            
-            # Record position
-            position_record = {
-                'symbol': symbol,
-                'quantity': quantity,
-                'fill_price': fill_price,
-                'delta': delta,
-                'notional': notional,
-                'timestamp': self._algorithm.Time,
-                'group': group
-            }
-            
-            # Store in appropriate tracking dict
-            if group == 'SPY_EQUIVALENT':
-                if 'ES' in str(symbol) or 'MES' in str(symbol):
-                    self.es_positions[strategy_name] = position_record
-                elif str(symbol).startswith('SPY') and symbol.SecurityType == SecurityType.Option:
-                    self.option_positions[strategy_name] = position_record
-                else:
-                    self.spy_positions[strategy_name] = position_record
-            else:
-                self.other_positions[f"{strategy_name}_{group}"] = position_record
-            
-            # Update group tracking
-            self.group_exposures[group] = self.group_exposures.get(group, 0) + abs(delta)
-            
-            # Update strategy count for group
-            strategies = self._get_strategies_for_group(group)
-            if strategy_name not in strategies:
-                self.group_strategy_counts[group] = self.group_strategy_counts.get(group, 0) + 1
-            
             self._algorithm.Debug(
                 f"[Concentration Plugin] Position registered: {strategy_name} -> {symbol} "
-                f"(Group: {group}, Delta: {delta:.1f}, Total: {self.group_exposures[group]:.1f})"
+                f"(Group: {group}, Total: {self.ledger.delta(self.LEDGER_SCHEME, group):.1f})"
             )
         
         self._safe_execute("on_position_opened", _register)
@@ -188,39 +158,15 @@ class ConcentrationPlugin(BaseRiskPlugin):
                           fill_price: float, pnl: float, context: Dict[str, Any] = None):
         """Remove position from concentration tracking"""  
         def _unregister():
-            strategy_name = context.get('strategy_name', 'unknown') if context else 'unknown'
-            
-            # Find and remove position record
-            removed_record = None
-            for positions_dict in [self.spy_positions, self.es_positions, 
-                                 self.option_positions, self.other_positions]:
-                if strategy_name in positions_dict:
-                    removed_record = positions_dict[strategy_name]
-                    del positions_dict[strategy_name]
-                    break
-                    
-                # Also check compound keys for other_positions
-                for key in list(positions_dict.keys()):
-                    if key.startswith(f"{strategy_name}_"):
-                        removed_record = positions_dict[key]
-                        del positions_dict[key]
-                        break
+            group = self._get_concentration_group(symbol)
+            strategy_name = context.get('strategy_name') if context else None
+            if self.ledger.is_writer(self) and not self.ledger.close(symbol, strategy_name):
+                return
             
-            if removed_record:
-                group = removed_record['group']
-                delta = removed_record['delta']
-                
-                # Update group tracking
-                self.group_exposures[group] = max(0, self.group_exposures[group] - abs(delta))
-                
-                # Update strategy count if no more positions in group
-                remaining_strategies = self._get_strategies_for_group(group)
-                if strategy_name not in remaining_strategies:
-                    self.group_strategy_counts[group] = max(0, self.group_strategy_counts[group] - 1)
-                
+            if group:
                 self._algorithm.Debug(
-                    f"[Concentration Plugin] Position removed: {strategy_name} -> {symbol} "
-                    f"(Group: {group}, Remaining exposure: {self.group_exposures[group]:.1f})"
+                    f"[Concentration Plugin] Position removed: {strategy_name or 'unknown'} -> {symbol} "
+                    f"(Group: {group}, Remaining exposure: {self.ledger.delta(self.LEDGER_SCHEME, group):.1f})"
                 )
         
         self._safe_execute("on_position_closed", _unregister)
@@ -241,11 +187,8 @@ class ConcentrationPlugin(BaseRiskPlugin):
         def _periodic_check():
             events = []
             
-            # Sync positions with actual portfolio
-            self._sync_positions_with_portfolio()
-            
-            # Clean up stale allocations  
-            cleanup_results = self._cleanup_stale_allocations()
+            # Reconcile the ledger with the portfolio (rate-limited inside the ledger)
+            cleanup_results = self._sync_positions_with_portfolio()
             if cleanup_results['stale_removed']:
                 self.cleanups_performed += 1
                 events.append(RiskEvent(
@@ -256,6 +199,7 @@ class ConcentrationPlugin(BaseRiskPlugin):
                 ))
             
             # Check for dangerous concentrations
+            strategy_counts = self.group_strategy_counts
             for group, exposure in self.group_exposures.items():
                 limit = self._get_group_limit(group)
                 if exposure > limit * 0.8:  # Warning at 80% of limit
@@ -269,7 +213,7 @@ class ConcentrationPlugin(BaseRiskPlugin):
                             'exposure': exposure,
                             'limit': limit,
                             'utilization': exposure / limit,
-                            'strategy_count': self.group_strategy_counts.get(group, 0)
+                            'strategy_count': strategy_counts.get(group, 0)
                         }
                     ))
             
@@ -290,20 +234,18 @@ class ConcentrationPlugin(BaseRiskPlugin):
                 },
                 'strategy_counts': self.group_strategy_counts,
                 'position_counts': {
-                    'spy_positions': len(self.spy_positions),
-                    'es_positions': len(self.es_positions),
-                    'option_positions': len(self.option_positions),
-                    'other_positions': len(self.other_positions)
+                    group: self.ledger.count(self.LEDGER_SCHEME, group)
+                    for group in self.concentration_groups
                 },
-                'total_positions': (len(self.spy_positions) + len(self.es_positions) + 
-                                  len(self.option_positions) + len(self.other_positions)),
+                'total_positions': self.ledger.total_count(self.LEDGER_SCHEME),
                 'performance': {
                     'concentration_checks': self.concentration_checks,
                     'blocked_concentrations': self.blocked_concentrations,
                     'block_rate': (self.blocked_concentrations / max(1, self.concentration_checks)) * 100,
                     'cleanups_performed': self.cleanups_performed,
                     'stale_allocations_cleaned': self.stale_allocations_cleaned,
-                    'allocation_leaks_detected': self.allocation_leaks_detected
+                    'allocation_leaks_detected': self.allocation_leaks_detected,
+                    'ledger': self.ledger.get_statistics()
                 },
                 'limits': {
                     'max_spy_delta': self.max_spy_delta,
@@ -324,6 +266,22 @@ class ConcentrationPlugin(BaseRiskPlugin):
         
         return None
     
+    @property
+    def group_exposures(self) -> Dict[str, float]:
+        """Absolute delta exposure per concentration group"""
+        return {group: self.ledger.delta(self.LEDGER_SCHEME, group) for group in self.concentration_groups}
+    
+    @property
+    def group_strategy_counts(self) -> Dict[str, int]:
+        """Distinct strategies holding positions per concentration group"""
+        return {group: self.ledger.strategy_count(self.LEDGER_SCHEME, group) for group in self.concentration_groups}
+    
+    def _measure_position(self, symbol: Any, quantity: float, fill_price: float) -> Tuple[float, float]:
+        """Ledger measure: (delta, notional) of a lot, fixed at open"""
+        delta = self._estimate_position_delta(symbol, quantity)
+        notional = quantity * fill_price * self.multipliers.get(str(symbol)[:3], 1)
+        return delta, notional
+    
     def _get_group_limit(self, group: str) -> float:
         """Get delta limit for concentration group"""
         # Base limits
@@ -345,12 +303,14 @@ class ConcentrationPlugin(BaseRiskPlugin):
             multiplier = self.multipliers.get(symbol_str[:3], 50)
             return quantity * 1.0 * (multiplier / 50)  # Normalize to ES equivalent
         
+        security_type = getattr(symbol, 'SecurityType', SecurityType.Equity)
+        
         # Stocks have delta of 1.0 per share (in 100-share groups)
-        elif symbol.SecurityType == SecurityType.Equity:
+        if security_type == SecurityType.Equity:
             return quantity / 100.0  # Convert to option-equivalent delta
         
         # Options - estimate based on rough delta (would use Greeks in production)
-        elif symbol.SecurityType == SecurityType.Option:
+        elif security_type == SecurityType.Option:
             return quantity * 0.5  # Rough estimate - ATM options ~0.5 delta
         
         return 0.0
@@ -379,32 +339,8 @@ class ConcentrationPlugin(BaseRiskPlugin):
     
     def _get_strategies_for_group(self, group: str) -> List[str]:
         """Get list of strategies with positions in concentration group"""
-        strategies = set()
-        
-        if group == 'SPY_EQUIVALENT':
-            strategies.update(self.spy_positions.keys())
-            strategies.update(self.es_positions.keys())
-            strategies.update(self.option_positions.keys())
-        else:
-            # Check other_positions for this group
-            for key in self.other_positions.keys():
-                if key.endswith(f"_{group}"):
-                    strategy_name = key.replace(f"_{group}", "")
-                    strategies.add(strategy_name)
-        
-        return list(strategies)
-    
-    def _calculate_total_group_notional(self, group: str) -> float:
-        """Calculate total notional exposure for group"""
-        total = 0.0
-        
-        for positions_dict in [self.spy_positions, self.es_positions, 
-                              self.option_positions, self.other_positions]:
-            for position in positions_dict.values():
-                if position.get('group') == group:
-                    total += abs(position.get('notional', 0))
-        
-        return total
+        exposure = self.ledger.group(self.LEDGER_SCHEME, group)
+        return list(exposure.strategies) if exposure else []
     
     def _check_position_conflicts(self, group: str, estimated_delta: float, 
                                  strategy_name: str) -> Optional[str]:
@@ -413,118 +349,49 @@ class ConcentrationPlugin(BaseRiskPlugin):
             return None
         
         # Check for opposing large positions in same group
-        existing_strategies = self._get_strategies_for_group(group)
-        if len(existing_strategies) >= 2:  # Already have 2+ strategies
+        if self.ledger.strategy_count(self.LEDGER_SCHEME, group) >= 2:  # Already have 2+ strategies
             return "too many strategies in group"
         
         return None
     
-    def _sync_positions_with_portfolio(self):
-        """Sync position tracking with actual portfolio"""
-        try:
-            actual_symbols = set()
-            for holding in self._algorithm.Portfolio.Values:
-                if holding.Invested:
-                    actual_symbols.add(holding.Symbol)
-            
-            # Remove tracking for positions that no longer exist
-            all_position_dicts = [self.spy_positions, self.es_positions, 
-                                self.option_positions, self.other_positions]
-            
-            # Sync tracking with actual positions - systematic cleanup
-            for position_dict in all_position_dicts:
-                symbols_to_remove = []
-                for symbol in position_dict.keys():
-                    if symbol not in actual_symbols:
-                        symbols_to_remove.append(symbol)
-                for symbol in symbols_to_remove:
-                    del position_dict[symbol]
-            
-            # Update group exposures for removed positions
-            for positions_dict in all_position_dicts:
-                for strategy_name, position in list(positions_dict.items()):
-                    if position.get('symbol') not in actual_symbols:
-                        group = position.get('group', 'UNKNOWN')
-                        delta = position.get('delta', 0)
-                        
-                        # Update group tracking
-                        if group in self.group_exposures:
-                            self.group_exposures[group] = max(0, self.group_exposures[group] - abs(delta))
-                        
-                        # Remove position
-                        del positions_dict[strategy_name]
-                        
-                        self._algorithm.Debug(
-                            f"[Concentration Plugin] Synced out stale position: {strategy_name} -> {position.get('symbol', 'UNKNOWN')}"
-                        )
-            
-        except Exception as e:
-            # Log and handle unexpected exception  
-            self.algo.Error(f"Error syncing positions with portfolio: {e}")
-    
-    def _cleanup_stale_allocations(self) -> Dict[str, Any]:
-        """Clean up stale position allocations"""
+    def _sync_positions_with_portfolio(self) -> Dict[str, Any]:
+        """Reconcile the shared ledger with actual portfolio holdings"""
         cleanup_results = {
             'stale_removed': [],
-            'total_delta_recovered': 0.0,
-            'total_notional_recovered': 0.0,
+            'missing_added': [],
             'cleanup_timestamp': self._algorithm.Time
         }
         
         try:
-            cutoff_time = self._algorithm.Time - timedelta(hours=4)
-            
-            all_position_dicts = [
-                ('spy', self.spy_positions),
-                ('es', self.es_positions),
-                ('option', self.option_positions),
-                ('other', self.other_positions)
+            reconciled = self.ledger.reconcile()
+            cleanup_results['stale_removed'] = [
+                symbol for symbol in reconciled['removed'] if self._get_concentration_group(symbol)
+            ]
+            cleanup_results['missing_added'] = [
+                symbol for symbol in reconciled['added'] if self._get_concentration_group(symbol)
             ]
             
-            for dict_name, positions_dict in all_position_dicts:
-                for strategy_name, position in list(positions_dict.items()):
-                    position_age = self._algorithm.Time - position.get('timestamp', self._algorithm.Time)
-                    
-                    if position_age > timedelta(hours=4):
-                        # Remove stale allocation
-                        group = position['group']
-                        delta = position['delta']
-                        notional = position.get('notional', 0)
-                        
-                        cleanup_results['stale_removed'].append({
-                            'strategy': strategy_name,
-                            'symbol': str(position['symbol']),
-                            'type': dict_name,
-                            'delta': delta,
-                            'notional': notional,
-                            'age_hours': position_age.total_seconds() / TradingConstants.SECONDS_PER_HOUR
-                        })
-                        
-                        # Update tracking
-                        self.group_exposures[group] = max(0, self.group_exposures[group] - abs(delta))
-                        cleanup_results['total_delta_recovered'] += abs(delta)
-                        cleanup_results['total_notional_recovered'] += notional
-                        
-                        # Remove position
-                        del positions_dict[strategy_name]
-                        
-                        self.stale_allocations_cleaned += 1
-            
-            return cleanup_results
+            self.stale_allocations_cleaned += len(cleanup_results['stale_removed'])
+            self.allocation_leaks_detected += len(cleanup_results['missing_added'])
+            for symbol in cleanup_results['stale_removed']:
+                self._algorithm.Debug(f"[Concentration Plugin] Synced out stale position: {symbol}")
             
         except Exception as e:
-            self._algorithm.Error(f"[Concentration Plugin] Error in cleanup: {e}")
+            # Log and handle unexpected exception  
+            self._algorithm.Error(f"[Concentration Plugin] Error syncing positions with portfolio: {e}")
             cleanup_results['error'] = str(e)
-            return cleanup_results
+        
+        return cleanup_results
     
     def _calculate_concentration_risk_score(self) -> float:
         """Calculate concentration risk score (0-100)"""
-        if not any(self.group_exposures.values()):
+        group_exposures = self.group_exposures
+        if not any(group_exposures.values()):
             return 0.0
         
         max_risk = 0.0
         
-        for group, exposure in self.group_exposures.items():
+        for group, exposure in group_exposures.items():
             limit = self._get_group_limit(group)
             utilization = exposure / max(limit, 1)
             
@@ -583,8 +450,7 @@ class ConcentrationPlugin(BaseRiskPlugin):
     
     def shutdown(self):
         """Clean shutdown of concentration plugin"""
-        total_positions = (len(self.spy_positions) + len(self.es_positions) + 
-                          len(self.option_positions) + len(self.other_positions))
+        total_positions = self.ledger.total_count(self.LEDGER_SCHEME)
         
         self._algorithm.Log(
             f"[Concentration Plugin] Shutdown: {total_positions} tracked positions, "
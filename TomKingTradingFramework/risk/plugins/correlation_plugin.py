@@ -8,6 +8,8 @@ from risk.unified_risk_manager import BaseRiskPlugin, RiskEvent, RiskEventType,
 from datetime import datetime, timedelta
 from core.unified_vix_manager import UnifiedVIXManager
 from config.constants import TradingConstants
+from optimization.dynamic_correlation_monitor import get_correlation_monitor
+from risk.exposure_ledger import get_exposure_ledger
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -20,8 +22,13 @@ class CorrelationPlugin(BaseRiskPlugin):
     Correlation risk management plugin implementing Tom King's correlation limits.
     Migrated from CorrelationManager and August2024CorrelationLimiter.
     Preserves ALL August 5, 2024 safety lessons while using unified architecture.
+    
+    Open positions per correlation group are counted in the shared
+    ExposureLedger ('correlation' scheme), so group-limit checks are O(1).
     """
     
+    LEDGER_SCHEME = 'correlation'
+    
     @property
     def plugin_name(self) -> str:
         return "CorrelationRiskPlugin"
@@ -59,9 +66,11 @@ class CorrelationPlugin(BaseRiskPlugin):
                 'E': 0.30    # Currencies - Lowest correlation
             }
             
-            # Track active positions by group
-            self.active_positions_by_group = {}
-            self.position_timestamps = {}  # Track when positions were opened
+            # Active positions by group: counts in the shared ledger, which this plugin
+            # writes only when no UnifiedRiskManager has claimed it
+            self.ledger = get_exposure_ledger(self._algorithm)
+            self.ledger.claim(self)
+            self.ledger.register_scheme(self.LEDGER_SCHEME, self._get_correlation_group)
             
             # Phase-based limits (Tom King methodology) - initialization complete  
             self.phase_limits = self._get_phase_limits()
@@ -81,6 +90,14 @@ class CorrelationPlugin(BaseRiskPlugin):
             self.blocked_positions = 0
             self.last_metrics_update = self._algorithm.Time
             
+            # Observed correlation regime (EWMA spike detection in the shared monitor)
+            self.correlation_regime = 'NORMAL'
+            self.observed_correlation = None
+            self._needs_sync = True  # force a ledger reconcile after a regime change or on first check
+            self.tracked_symbols = {s.upper() for symbols in self.correlation_groups.values() for s in symbols}
+            self.correlation_monitor = get_correlation_monitor(self._algorithm)
+            self.correlation_monitor.add_spike_listener(self._on_correlation_spike)
+            
             return True
         except Exception as e:
             # Log and handle unexpected exception
@@ -154,7 +171,7 @@ class CorrelationPlugin(BaseRiskPlugin):
                 return False, f"Symbol {symbol} not in correlation groups - blocked for safety"
             
             # Check group-specific limit
-            current_count = len(self.active_positions_by_group.get(group, []))
+            current_count = self._group_count(group)
             max_allowed = self.phase_limits.get(group, 1)
             
             # VIX-based emergency reduction
@@ -162,14 +179,17 @@ class CorrelationPlugin(BaseRiskPlugin):
                 max_allowed = max(1, max_allowed - 1)
                 self._algorithm.Debug(f"[Correlation Plugin] VIX emergency reduction: {group} limit reduced to {max_allowed}")
             
+            # Observed correlation spike: diversification has failed, tighten further
+            if self.correlation_regime == 'SPIKE':
+                max_allowed = max(1, max_allowed - 1)
+            
             if current_count >= max_allowed:
                 self.blocked_positions += 1
                 return False, f"Group {group} at limit: {current_count}/{max_allowed}"
             
             # Check total equity exposure (A1 + A2 combined - CRITICAL RULE)
             if group in ['A1', 'A2']:
-                total_equity = (len(self.active_positions_by_group.get('A1', [])) + 
-                              len(self.active_positions_by_group.get('A2', [])))
+                total_equity = self._group_count('A1') + self._group_count('A2')
                 
                 if total_equity >= self.max_total_equity_positions:
                     self.blocked_positions += 1
@@ -189,17 +209,15 @@ class CorrelationPlugin(BaseRiskPlugin):
                           fill_price: float, context: Dict[str, Any] = None):
         """Register new position in correlation tracking"""
         def _register():
+            if self.ledger.is_writer(self):
+                strategy_name = context.get('strategy_name') if context else None
+                self.ledger.open(symbol, quantity, fill_price, strategy_name)
+            
             group = self._get_correlation_group(symbol)
             if group:
-                if group not in self.active_positions_by_group:
-                    self.active_positions_by_group[group] = []
-                
-                self.active_positions_by_group[group].append(symbol)
-                self.position_timestamps[str(symbol)] = self._algorithm.Time
-                
                 self._algorithm.Debug(
                     f"[Correlation Plugin] Position registered: {symbol} in group {group} "
-                    f"({len(self.active_positions_by_group[group])}/{self.phase_limits.get(group, 1)})"
+                    f"({self._group_count(group)}/{self.phase_limits.get(group, 1)})"
                 )
                 
                 # Check if we're approaching dangerous concentration
@@ -211,27 +229,29 @@ class CorrelationPlugin(BaseRiskPlugin):
                           fill_price: float, pnl: float, context: Dict[str, Any] = None):
         """Remove position from correlation tracking"""
         def _unregister():
+            if self.ledger.is_writer(self):
+                strategy_name = context.get('strategy_name') if context else None
+                if not self.ledger.close(symbol, strategy_name):
+                    return
+            
             group = self._get_correlation_group(symbol)
-            if group and group in self.active_positions_by_group:
-                if symbol in self.active_positions_by_group[group]:
-                    self.active_positions_by_group[group].remove(symbol)
-                    
-                    if str(symbol) in self.position_timestamps:
-                        del self.position_timestamps[str(symbol)]
-                    
-                    # Clean up empty groups
-                    if not self.active_positions_by_group[group]:
-                        del self.active_positions_by_group[group]
-                    
-                    self._algorithm.Debug(
-                        f"[Correlation Plugin] Position unregistered: {symbol} from group {group}"
-                    )
+            if not group:
+                return
+            self._algorithm.Debug(
+                f"[Correlation Plugin] Position unregistered: {symbol} from group {group}"
+            )
         
         self._safe_execute("on_position_closed", _unregister)
     
     def on_market_data(self, symbol: str, data: Any):
-        """Update VIX data for regime detection"""
+        """Update VIX data for regime detection and feed prices to the correlation monitor"""
         def _update_vix():
+            symbol_str = str(symbol).upper()
+            if symbol_str in self.tracked_symbols or symbol_str == 'VIX':
+                price = data.Price if hasattr(data, 'Price') else data
+                if price:
+                    self.correlation_monitor.update_price_data(symbol_str, float(price))
+            
             if str(symbol) == 'VIX':
                 self.current_vix = data.Price if hasattr(data, 'Price') else data
                 self.last_vix_update = self._algorithm.Time
@@ -260,13 +280,34 @@ class CorrelationPlugin(BaseRiskPlugin):
         
         self._safe_execute("on_market_data", _update_vix)
     
+    def _on_correlation_spike(self, spike: Dict[str, Any]):
+        """Correlation regime transition from the shared monitor"""
+        def _handle_spike():
+            self.correlation_regime = spike['new_regime']
+            self.observed_correlation = spike['average_correlation']
+            self._needs_sync = True
+            
+            level = {'SPIKE': RiskLevel.CRITICAL, 'ELEVATED': RiskLevel.WARNING}.get(
+                self.correlation_regime, RiskLevel.INFO)
+            self._emit_event(
+                RiskEventType.CORRELATION_SPIKE,
+                level,
+                f"Correlation regime change: {spike['old_regime']} -> {spike['new_regime']} "
+                f"(average correlation {self.observed_correlation:.2f})",
+                spike
+            )
+        
+        self._safe_execute("_on_correlation_spike", _handle_spike)
+    
     def periodic_check(self) -> List[RiskEvent]:
         """Perform periodic correlation risk checks"""
         def _periodic_check():
             events = []
             
-            # Update position tracking from portfolio
-            self._sync_positions_with_portfolio()
+            # Position tracking follows fills; the ledger reconciles with the portfolio
+            # on its slow schedule, or immediately when the correlation regime moved
+            self._sync_positions_with_portfolio(force=self._needs_sync)
+            self._needs_sync = False
             
             # Calculate risk score
             risk_score = self._calculate_correlation_risk_score()
@@ -277,7 +318,7 @@ class CorrelationPlugin(BaseRiskPlugin):
                     RiskEventType.CORRELATION_LIMIT_EXCEEDED,
                     RiskLevel.CRITICAL,
                     f"High correlation risk: {risk_score:.1f}/100",
-                    {'risk_score': risk_score, 'active_groups': list(self.active_positions_by_group.keys())}
+                    {'risk_score': risk_score, 'active_groups': list(self.ledger.totals[self.LEDGER_SCHEME])}
                 ))
             elif risk_score > 60:
                 events.append(RiskEvent(
@@ -306,24 +347,25 @@ class CorrelationPlugin(BaseRiskPlugin):
     def get_risk_metrics(self) -> Dict[str, Any]:
         """Get correlation risk metrics"""
         def _get_metrics():
-            total_positions = sum(len(positions) for positions in self.active_positions_by_group.values())
+            group_totals = self.ledger.totals[self.LEDGER_SCHEME]
             
             return {
                 'risk_score': self._calculate_correlation_risk_score(),
-                'active_groups': len(self.active_positions_by_group),
-                'total_positions': total_positions,
+                'active_groups': len(group_totals),
+                'total_positions': self.ledger.total_count(self.LEDGER_SCHEME),
                 'positions_by_group': {
-                    group: len(positions) 
-                    for group, positions in self.active_positions_by_group.items()
+                    group: exposure.count 
+                    for group, exposure in group_totals.items()
                 },
                 'group_limits': self.phase_limits,
                 'vix_regime': self.vix_regime,
                 'current_vix': self.current_vix,
+                'correlation_regime': self.correlation_regime,
+                'observed_correlation': self.observed_correlation,
                 'equity_exposure': {
-                    'A1_positions': len(self.active_positions_by_group.get('A1', [])),
-                    'A2_positions': len(self.active_positions_by_group.get('A2', [])),
-                    'total_equity': (len(self.active_positions_by_group.get('A1', [])) + 
-                                   len(self.active_positions_by_group.get('A2', [])))
+                    'A1_positions': self._group_count('A1'),
+                    'A2_positions': self._group_count('A2'),
+                    'total_equity': self._group_count('A1') + self._group_count('A2')
                 },
                 'performance': {
                     'correlation_checks': self.correlation_checks,
@@ -338,6 +380,14 @@ class CorrelationPlugin(BaseRiskPlugin):
         
         return self._safe_execute("get_risk_metrics", _get_metrics) or {}
     
+    @property
+    def active_positions_by_group(self) -> Dict[str, List[str]]:
+        """Open position symbols per correlation group (reporting view of the ledger)"""
+        return self.ledger.symbols_by_group(self.LEDGER_SCHEME)
+    
+    def _group_count(self, group: str) -> int:
+        return self.ledger.count(self.LEDGER_SCHEME, group)
+    
     def _get_correlation_group(self, symbol: str) -> Optional[str]:
         """Get correlation group for symbol"""
         symbol_str = str(symbol).upper().replace(' ', '')
@@ -354,25 +404,19 @@ class CorrelationPlugin(BaseRiskPlugin):
         if group in ['A1', 'A2'] and quantity != 0:
             # Check if we have opposing positions in equity groups
             for existing_group in ['A1', 'A2']:
-                if existing_group in self.active_positions_by_group:
-                    positions = self.active_positions_by_group[existing_group]
-                    if positions:
-                        # Simplified conflict check - in practice would need position direction info
-                        # For now, just warn about potential conflicts
-                        if len(positions) >= 2:  # If already have 2+ equity positions
-                            return f"Multiple equity positions (potential conflict risk)"
+                # Simplified conflict check - in practice would need position direction info
+                # For now, just warn about potential conflicts
+                if self._group_count(existing_group) >= 2:  # If already have 2+ equity positions
+                    return f"Multiple equity positions (potential conflict risk)"
         
         return None
     
     def _check_concentration_warnings(self):
         """Check for dangerous concentration and emit warnings"""
-        total_positions = sum(len(positions) for positions in self.active_positions_by_group.values())
+        total_positions = self.ledger.total_count(self.LEDGER_SCHEME)
         
         # Warning if >70% in highly correlated groups
-        high_correlation_positions = (
-            len(self.active_positions_by_group.get('A1', [])) + 
-            len(self.active_positions_by_group.get('A2', []))
-        )
+        high_correlation_positions = self._group_count('A1') + self._group_count('A2')
         
         if total_positions > 0 and high_correlation_positions / total_positions > 0.7:
             self._emit_event(
@@ -388,24 +432,26 @@ class CorrelationPlugin(BaseRiskPlugin):
     
     def _calculate_correlation_risk_score(self) -> float:
         """Calculate correlation risk score (0-100)"""
-        if not self.active_positions_by_group:
+        group_totals = self.ledger.totals[self.LEDGER_SCHEME]
+        if not group_totals:
             return 0.0
         
-        total_positions = sum(len(positions) for positions in self.active_positions_by_group.values())
+        total_positions = self.ledger.total_count(self.LEDGER_SCHEME)
         if total_positions == 0:
             return 0.0
         
         risk_score = 0.0
         
         # Concentration risk in high-correlation groups
-        for group, positions in self.active_positions_by_group.items():
+        for group, exposure in group_totals.items():
             group_weight = abs(self.crisis_correlation_weights.get(group, 0.5))
-            group_concentration = len(positions) / total_positions
+            if self.correlation_regime != 'NORMAL' and self.observed_correlation is not None:
+                group_weight = max(group_weight, self.observed_correlation)
+            group_concentration = exposure.count / total_positions
             risk_score += group_concentration * group_weight * 50
         
         # Equity concentration penalty
-        equity_positions = (len(self.active_positions_by_group.get('A1', [])) + 
-                          len(self.active_positions_by_group.get('A2', [])))
+        equity_positions = self._group_count('A1') + self._group_count('A2')
         if total_positions > 0:
             equity_ratio = equity_positions / total_positions
             risk_score += equity_ratio * 30
@@ -421,49 +467,23 @@ class CorrelationPlugin(BaseRiskPlugin):
         risk_score *= vix_multipliers.get(self.vix_regime, 1.0)
         
         # Diversity bonus
-        unique_groups = len(self.active_positions_by_group)
+        unique_groups = len(group_totals)
         if unique_groups > 3:
             risk_score *= 0.8
         
         return min(100.0, max(0.0, risk_score))
     
-    def _sync_positions_with_portfolio(self):
-        """Sync position tracking with actual portfolio positions"""
+    def _sync_positions_with_portfolio(self, force: bool = False):
+        """Reconcile the shared ledger with actual portfolio positions"""
         try:
-            # Get actual positions from portfolio
-            actual_symbols = set()
-            for holding in self._algorithm.Portfolio.Values:
-                if holding.Invested:
-                    actual_symbols.add(holding.Symbol)
-            
-            # Remove tracking for positions that no longer exist
-            for group, positions in list(self.active_positions_by_group.items()):
-                for symbol in list(positions):
-                    if symbol not in actual_symbols:
-                        positions.remove(symbol)
-                        if str(symbol) in self.position_timestamps:
-                            del self.position_timestamps[str(symbol)]
-                        self._algorithm.Debug(
-                            f"[Correlation Plugin] Removed stale position tracking: {symbol}"
-                        )
-                
-                # Clean up empty groups
-                if not positions:
-                    del self.active_positions_by_group[group]
-            
-            # Add tracking for new positions (may have missed during crashes)
-            for symbol in actual_symbols:
-                group = self._get_correlation_group(symbol)
-                if group:
-                    if group not in self.active_positions_by_group:
-                        self.active_positions_by_group[group] = []
-                    
-                    if symbol not in self.active_positions_by_group[group]:
-                        self.active_positions_by_group[group].append(symbol)
-                        self.position_timestamps[str(symbol)] = self._algorithm.Time
-                        self._algorithm.Debug(
-                            f"[Correlation Plugin] Added missing position tracking: {symbol}"
-                        )
+            reconciled = self.ledger.reconcile(force=force)
+            for symbol in reconciled['removed']:
+                if self._get_correlation_group(symbol):
+                    self._algorithm.Debug(f"[Correlation Plugin] Removed stale position tracking: {symbol}")
+            # Positions may have been missed during crashes
+            for symbol in reconciled['added']:
+                if self._get_correlation_group(symbol):
+                    self._algorithm.Debug(f"[Correlation Plugin] Added missing position tracking: {symbol}")
             
         except Exception as e:
             self._algorithm.Error(f"[Correlation Plugin] Error syncing positions: {e}")
@@ -498,5 +518,5 @@ class CorrelationPlugin(BaseRiskPlugin):
         self._algorithm.Log(
             f"[Correlation Plugin] Shutdown: {self.correlation_checks} checks, "
             f"{self.blocked_positions} blocks, "
-            f"{len(self.active_positions_by_group)} active groups"
+            f"{len(self.ledger.totals[self.LEDGER_SCHEME])} active groups"
         )
\ No newline at end of file
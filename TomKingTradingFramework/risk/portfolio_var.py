@@ -0,0 +1,395 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Portfolio VaR / Expected Shortfall Service"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.constants import TradingConstants
+from optimization.batch_pricing import BookLeg, OptionBook
+
+
+OPTION_SECURITY_TYPES = (SecurityType.Option, SecurityType.FutureOption, SecurityType.IndexOption)
+TRADING_DAYS_PER_YEAR = 252.0
+MIN_HISTORY_RETURNS = 20
+DEFAULT_IV = 0.20
+
+
+@dataclass
+class VaRResult:
+    """VaR and ES as positive dollar losses at `confidence` over `horizon_days`"""
+    method: str
+    confidence: float
+    horizon_days: int
+    var: float
+    expected_shortfall: float
+    scenarios: int
+    generation: int
+    computed_at: datetime
+    elapsed_ms: float
+    stale: bool = False
+
+    def to_dict(self) -> Dict:
+        return {
+            'method': self.method,
+            'confidence': self.confidence,
+            'horizon_days': self.horizon_days,
+            'var': self.var,
+            'expected_shortfall': self.expected_shortfall,
+            'scenarios': self.scenarios,
+            'generation': self.generation,
+            'computed_at': self.computed_at,
+            'elapsed_ms': self.elapsed_ms,
+            'stale': self.stale
+        }
+
+
+def simulate_pnl(book: OptionBook, cholesky: np.ndarray, horizon_days: int, paths: int, seed) -> np.ndarray:
+    """Reprice the book over correlated lognormal spot paths (module level so worker processes can run it)"""
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((paths, cholesky.shape[0])) @ cholesky.T * np.sqrt(horizon_days)
+    return book.scenario_pnl(book.spots * np.exp(shocks), horizon_days / TRADING_DAYS_PER_YEAR)
+
+
+def tail_risk(pnl: np.ndarray, confidence: float):
+    """(VaR, ES) as positive losses from a scenario P&L vector"""
+    losses = -np.asarray(pnl, dtype=float)
+    var = float(np.quantile(losses, confidence))
+    tail = losses[losses >= var]
+    return max(0.0, var), max(0.0, float(tail.mean()) if tail.size else var)
+
+
+class PortfolioVaRService:
+    """
+    Full-revaluation VaR and Expected Shortfall for the options book
+
+    The portfolio is flattened into an OptionBook and repriced in one batched
+    call per scenario block: historical simulation applies each of the last
+    `lookback_days` daily log-return vectors to today's spots; Monte Carlo
+    draws correlated lognormal paths from the covariance of the same history.
+    Large Monte Carlo runs are split across a process pool.
+
+    Results are cached per portfolio generation (bumped by invalidate() on
+    fills) and trading day. Pre-trade callers go through pretrade_var(), which
+    never fetches history and never recomputes when the last run of that
+    method took longer than the latency budget; it serves a copy of the
+    cached result flagged stale instead. Cached results are never modified.
+
+    Daily history is loaded by the scheduled refresh() for the book's and the
+    watched underlyings (registered with watch(), plus any underlying a
+    pre-trade check found without history), so order-path checks on new
+    positions find it already in memory.
+    """
+
+    def __init__(self, algorithm, confidence: float = None, horizon_days: int = None,
+                 lookback_days: int = None, monte_carlo_paths: int = None,
+                 process_pool_min_paths: int = None, max_workers: int = None, seed: int = 42):
+        self.algo = algorithm
+        self.confidence = confidence or TradingConstants.VAR_CONFIDENCE
+        self.horizon_days = horizon_days or TradingConstants.VAR_HORIZON_DAYS
+        self.lookback_days = lookback_days or TradingConstants.VAR_LOOKBACK_DAYS
+        self.monte_carlo_paths = monte_carlo_paths or TradingConstants.VAR_MONTE_CARLO_PATHS
+        self.process_pool_min_paths = process_pool_min_paths or TradingConstants.VAR_PROCESS_POOL_MIN_PATHS
+        self.max_workers = max_workers
+        self.pool_timeout = TradingConstants.VAR_POOL_TIMEOUT_SECONDS
+        self.seed = seed
+
+        self.generation = 0
+        self._results: Dict[str, VaRResult] = {}
+        self._result_keys: Dict[str, tuple] = {}
+        self._book: Optional[OptionBook] = None
+        self._book_key = None
+        self._implied_vols: Dict[object, float] = {}  # last chain IV seen per contract
+
+        # Daily log returns per underlying, oldest first, refreshed once per trading day
+        self._returns: Dict[str, np.ndarray] = {}
+        self._returns_day: Dict[str, object] = {}
+        self.watched = set()  # underlyings whose history refresh() loads even when not held
+
+        self._executor = None
+        self._pool_disabled = False
+
+        self.stats = {
+            'computations': 0,
+            'cache_hits': 0,
+            'pretrade_checks': 0,
+            'pretrade_stale': 0,
+            'history_loads': 0,
+            'missing_history': 0,
+            'pool_runs': 0,
+            'pool_timeouts': 0
+        }
+
+    # ================================
+    # INVALIDATION
+    # ================================
+
+    def invalidate(self):
+        """Portfolio changed (fill, open, close): cached results and book are stale"""
+        self.generation += 1
+
+    def on_order_event(self, order_event):
+        if order_event.Status in (OrderStatus.Filled, OrderStatus.PartiallyFilled):
+            self.invalidate()
+
+    # ================================
+    # INPUTS
+    # ================================
+
+    def set_return_history(self, symbol: str, returns):
+        """Supply daily log returns for an underlying directly (skips History requests today)"""
+        self._returns[str(symbol)] = np.asarray(returns, dtype=float)[-self.lookback_days:]
+        self._returns_day[str(symbol)] = self.algo.Time.date()
+
+    def watch(self, *symbols):
+        """Underlyings to keep daily history loaded for (tradable but possibly not held)"""
+        self.watched.update(str(symbol) for symbol in symbols)
+
+    def _load_history(self, symbol: str):
+        self.stats['history_loads'] += 1
+        self._returns_day[symbol] = self.algo.Time.date()
+        try:
+            hist = self.algo.History([symbol], self.lookback_days + 1, Resolution.Daily)
+            if hist.empty or symbol not in hist.index.levels[0]:
+                self._returns[symbol] = np.empty(0)
+                return
+            closes = hist.loc[symbol]['close'].values.astype(float)
+            self._returns[symbol] = np.diff(np.log(closes[closes > 0]))
+        except Exception as e:
+            self.algo.Debug(f"[VaR] History unavailable for {symbol}: {e}")
+            self._returns[symbol] = np.empty(0)
+
+    def _history_matrix(self, underlyings: List[str], load: bool) -> Optional[np.ndarray]:
+        """(days, underlyings) aligned trailing returns; None if any underlying has no usable history"""
+        today = self.algo.Time.date()
+        for symbol in underlyings:
+            if self._returns_day.get(symbol) != today:
+                if not load and symbol not in self._returns:
+                    self.watched.add(symbol)  # loaded by the next scheduled refresh
+                    return None
+                if load:
+                    self._load_history(symbol)
+
+        series = [self._returns.get(symbol, np.empty(0)) for symbol in underlyings]
+        usable = [len(s) for s in series if len(s) >= MIN_HISTORY_RETURNS]
+        if len(usable) < len(series):
+            self.stats['missing_history'] += len(series) - len(usable)
+            return None
+        days = min(usable)
+        return np.column_stack([s[-days:] for s in series])
+
+    def build_book(self, extra_legs: List[BookLeg] = None) -> Optional[OptionBook]:
+        """Current holdings (cached per generation and time) plus any proposed legs"""
+        key = (self.generation, self.algo.Time)
+        if self._book_key != key:
+            legs = self._portfolio_legs()
+            self._book = OptionBook(legs, self._spots(legs), self.algo.Time) if legs else None
+            self._book_key = key
+        if not extra_legs:
+            return self._book
+
+        legs = (self._book.legs if self._book else []) + list(extra_legs)
+        return OptionBook(legs, self._spots(legs), self.algo.Time)
+
+    def _portfolio_legs(self) -> List[BookLeg]:
+        return [self.leg(holding.Symbol, holding.Quantity) for holding in self.algo.Portfolio.Values if holding.Invested]
+
+    def leg(self, symbol, quantity) -> BookLeg:
+        """BookLeg for `quantity` of symbol (a holding or a proposed order leg)"""
+        security = self.algo.Securities[symbol]
+        multiplier = float(getattr(getattr(security, 'SymbolProperties', None), 'ContractMultiplier', 1) or 1)
+        if symbol.SecurityType in OPTION_SECURITY_TYPES:
+            return BookLeg(
+                underlying=str(symbol.Underlying),
+                quantity=float(quantity),
+                multiplier=multiplier,
+                strike=float(symbol.ID.StrikePrice),
+                expiry=symbol.ID.Date,
+                is_call=symbol.ID.OptionRight == OptionRight.Call,
+                iv=self._implied_vol(symbol)
+            )
+        return BookLeg(underlying=str(symbol), quantity=float(quantity), multiplier=multiplier)
+
+    def order_legs(self, orders) -> List[BookLeg]:
+        """BookLegs for proposed (symbol, quantity) order legs, for check_var_limit / context['var_legs']"""
+        return [self.leg(symbol, quantity) for symbol, quantity in orders]
+
+    def _implied_vol(self, symbol) -> float:
+        """Contract IV from the current slice's option chain; the last one seen, else DEFAULT_IV"""
+        chains = getattr(getattr(self.algo, 'CurrentSlice', None), 'OptionChains', None)
+        if chains:
+            chain = chains.get(symbol.Canonical)
+            contract = chain.Contracts.get(symbol) if chain is not None else None
+            iv = float(getattr(contract, 'ImpliedVolatility', 0) or 0)
+            if iv > 0:
+                self._implied_vols[symbol] = iv
+                return iv
+        return self._implied_vols.get(symbol, DEFAULT_IV)
+
+    def _spots(self, legs: List[BookLeg]) -> Dict[str, float]:
+        return {leg.underlying: float(self.algo.Securities[leg.underlying].Price) for leg in legs}
+
+    # ================================
+    # ENGINES
+    # ================================
+
+    def _historical_pnl(self, book: OptionBook, returns: np.ndarray) -> np.ndarray:
+        if self.horizon_days > 1:
+            # Overlapping h-day windows
+            cumulative = np.vstack([np.zeros(returns.shape[1]), np.cumsum(returns, axis=0)])
+            returns = cumulative[self.horizon_days:] - cumulative[:-self.horizon_days]
+        return book.scenario_pnl(book.spots * np.exp(returns), self.horizon_days / TRADING_DAYS_PER_YEAR)
+
+    def _monte_carlo_pnl(self, book: OptionBook, returns: np.ndarray) -> np.ndarray:
+        covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+        cholesky = self._cholesky(covariance)
+        seeds = np.random.SeedSequence([self.seed, self.generation])
+        paths = self.monte_carlo_paths
+
+        if paths >= self.process_pool_min_paths and not self._pool_disabled:
+            executor = self._get_executor()
+            if executor is not None:
+                workers = self.max_workers or os.cpu_count() or 1
+                sizes = [paths // workers + (1 if i < paths % workers else 0) for i in range(workers)]
+                try:
+                    futures = [executor.submit(simulate_pnl, book, cholesky, self.horizon_days, size, child)
+                               for size, child in zip(sizes, seeds.spawn(workers))]
+                    deadline = time.monotonic() + self.pool_timeout
+                    pnl = np.concatenate([future.result(timeout=max(0.0, deadline - time.monotonic()))
+                                          for future in futures])
+                    self.stats['pool_runs'] += 1
+                    return pnl
+                except Exception as e:
+                    if isinstance(e, FuturesTimeoutError):
+                        self.stats['pool_timeouts'] += 1
+                    self.algo.Debug(f"[VaR] Process pool failed, simulating in-process: {e!r}")
+                    self._pool_disabled = True
+                    # A hung worker must not block OnData; abandon the pool without waiting on it
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+
+        return simulate_pnl(book, cholesky, self.horizon_days, paths, seeds)
+
+    @staticmethod
+    def _cholesky(covariance: np.ndarray) -> np.ndarray:
+        jitter = 0.0
+        scale = max(float(np.trace(covariance)) / len(covariance), 1e-12)
+        for _ in range(6):
+            try:
+                return np.linalg.cholesky(covariance + jitter * np.eye(len(covariance)))
+            except np.linalg.LinAlgError:
+                jitter = scale * 1e-8 if jitter == 0.0 else jitter * 100
+        return np.diag(np.sqrt(np.clip(np.diag(covariance), 0.0, None)))
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers or os.cpu_count() or 1)
+            except Exception as e:
+                self.algo.Debug(f"[VaR] Process pool unavailable: {e}")
+                self._pool_disabled = True
+        return self._executor
+
+    # ================================
+    # RESULTS
+    # ================================
+
+    def compute(self, method: str = 'historical', extra_legs: List[BookLeg] = None,
+                load_history: bool = True) -> Optional[VaRResult]:
+        """Run one VaR/ES computation ('historical' or 'monte_carlo'); None without book or history"""
+        start = time.perf_counter()
+        book = self.build_book(extra_legs)
+        if book is None or len(book) == 0:
+            return None
+        returns = self._history_matrix(book.underlyings, load_history)
+        if returns is None:
+            return None
+
+        if method == 'historical':
+            pnl = self._historical_pnl(book, returns)
+        elif method == 'monte_carlo':
+            pnl = self._monte_carlo_pnl(book, returns)
+        else:
+            raise ValueError(f"Unknown VaR method: {method}")
+
+        var, es = tail_risk(pnl, self.confidence)
+        self.stats['computations'] += 1
+        return VaRResult(method, self.confidence, self.horizon_days, var, es, len(pnl), self.generation,
+                         self.algo.Time, (time.perf_counter() - start) * 1000)
+
+    def get_var(self, method: str = 'historical') -> Optional[VaRResult]:
+        """Portfolio VaR for the current generation, computed at most once per generation and day"""
+        key = (self.generation, self.algo.Time.date())
+        if self._result_keys.get(method) == key:
+            self.stats['cache_hits'] += 1
+            return self._results[method]
+
+        result = self.compute(method)
+        if result is not None:
+            self._results[method] = result
+            self._result_keys[method] = key
+        return result
+
+    def get_cached_var(self, method: str = 'historical') -> Optional[VaRResult]:
+        """Last result for method without computing; a stale=True copy when the portfolio has changed since"""
+        result = self._results.get(method)
+        if result is None:
+            return None
+        if self._result_keys.get(method) != (self.generation, self.algo.Time.date()):
+            return replace(result, stale=True)
+        return result
+
+    def refresh(self):
+        """Load today's history for watched underlyings and recompute stale results (scheduled, off the order path)"""
+        today = self.algo.Time.date()
+        for symbol in sorted(self.watched):
+            if self._returns_day.get(symbol) != today:
+                self._load_history(symbol)
+        for method in ('historical', 'monte_carlo'):
+            self.get_var(method)
+
+    def pretrade_var(self, extra_legs: List[BookLeg] = None, budget_ms: float = None) -> Optional[VaRResult]:
+        """
+        Historical VaR of the book (plus proposed legs) for an order-path check
+
+        Recomputes only from already-loaded history and only when the last
+        historical run fit in budget_ms; otherwise returns a stale-flagged
+        copy of the cached portfolio result (None if there is none).
+        """
+        budget_ms = TradingConstants.VAR_PRETRADE_BUDGET_MS if budget_ms is None else budget_ms
+        self.stats['pretrade_checks'] += 1
+        cached = self.get_cached_var('historical')
+        if cached is not None and not cached.stale and not extra_legs:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        if cached is None or cached.elapsed_ms <= budget_ms:
+            result = self.compute('historical', extra_legs, load_history=False)
+            if result is not None:
+                if not extra_legs:
+                    self._results['historical'] = result
+                    self._result_keys['historical'] = (self.generation, self.algo.Time.date())
+                return result
+
+        if cached is None:
+            return None
+        self.stats['pretrade_stale'] += 1
+        return cached if cached.stale else replace(cached, stale=True)
+
+    def get_statistics(self) -> Dict:
+        stats = self.stats.copy()
+        stats['generation'] = self.generation
+        stats['cached_results'] = {method: result.to_dict() for method, result in self._results.items()}
+        return stats
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
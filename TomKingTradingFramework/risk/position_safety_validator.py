@@ -2,6 +2,7 @@
 # Keep it simple, keep it working
 
 from AlgorithmImports import *
+from risk.validation_pipeline import get_validation_pipeline
 
 class PositionSafetyValidator:
     """
@@ -9,6 +10,8 @@ class PositionSafetyValidator:
     No complex logic - just essential protections
     """
     
+    SAFETY_RULES = ('safety.losses_today', 'safety.daily_loss', 'market_open')  # checked in this order
+    
     def __init__(self, algorithm):
         self.algo = algorithm
         
@@ -22,32 +25,39 @@ class PositionSafetyValidator:
         self.losses_today = 0
         self.can_trade = True
         
+        # Market hours are shared per slice; check outcomes feed the pipeline statistics
+        self.pipeline = get_validation_pipeline(algorithm)
+        
         self.algo.Log("[WARNING] Simple Safety Checks Active")
     
     def check_before_trade(self) -> bool:
         """Simple check before any trade - returns True if safe to trade"""
         
-        # Check 1: Daily loss limit
+        # Check 1: Too many losses today
+        if self.losses_today >= 3:
+            return self._reject('safety.losses_today', f"Too many losses today: {self.losses_today}")
+        
+        # Check 2: Daily loss limit (portfolio value read fresh: fills move it within a slice)
         current_value = self.algo.Portfolio.TotalPortfolioValue
         daily_loss = (self.daily_start_value - current_value) / self.daily_start_value
-        
         if daily_loss > self.max_daily_loss:
-            self.algo.Log(f"[WARNING] Daily loss limit hit: {daily_loss:.1%}")
-            self.can_trade = False
-            return False
-        
-        # Check 2: Too many losses today
-        if self.losses_today >= 3:
-            self.algo.Log(f"[WARNING] Too many losses today: {self.losses_today}")
-            self.can_trade = False
-            return False
+            return self._reject('safety.daily_loss', f"Daily loss limit hit: {daily_loss:.1%}")
         
         # Check 3: Market is open
-        if not self.algo.IsMarketOpen("SPY"):
+        if not self.pipeline.value('market_open', {'symbol': "SPY"}):
+            self.pipeline.record(self.SAFETY_RULES, 'market_open')
             return False
         
+        self.pipeline.record(self.SAFETY_RULES)
         return self.can_trade
     
+    def _reject(self, rule: str, reason: str) -> bool:
+        """A halting check failed: stop trading for the day"""
+        self.pipeline.record(self.SAFETY_RULES, rule)
+        self.algo.Log(f"[WARNING] {reason}")
+        self.can_trade = False
+        return False
+    
     def check_position_size(self, proposed_risk: float) -> bool:
         """Check if position size is acceptable"""
         account_value = self.algo.Portfolio.TotalPortfolioValue
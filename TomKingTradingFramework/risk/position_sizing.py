@@ -22,9 +22,9 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from enum import Enum
-from config.constants import AccountPhase
+from config.constants import AccountPhase, TradingConstants
 from core.unified_vix_manager import UnifiedVIXManager
-from risk.kelly_criterion import KellyCriterionCalculator
+from risk.strategy_statistics import get_strategy_statistics
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -64,11 +64,14 @@ class PositionSizer:
     - Special $19k deployment rule for VIX > 35 crisis opportunities
     """
     
-    def __init__(self):
+    def __init__(self, strategy_statistics=None):
         # Import centralized risk parameters for consistency
         from risk.parameters import get_risk_parameters
         self.risk_params = get_risk_parameters()
         
+        # Observed per-strategy trade statistics (StrategyStatisticsBook), when available
+        self.strategy_statistics = strategy_statistics
+        
         # VIX regime thresholds and BP limits - Exact Tom King specifications
         self.vix_regimes = {
             VIXRegime.EXTREMELY_LOW: {
@@ -277,6 +280,11 @@ class PositionSizer:
             max_loss: Maximum loss per trade (default -200%)
             use_micro: Use micro contracts if available
             
+        win_rate and avg_return are replaced by the strategy's observed win rate
+        and average win once it has enough closed trades. max_loss stays the
+        floor: the observed average loss only applies when it is worse, so
+        observed data never makes Kelly more aggressive than the stop allows.
+            
         Returns:
             Position sizing recommendations
         """
@@ -288,6 +296,12 @@ class PositionSizer:
         contract_type = 'micro' if use_micro else 'full'
         strategy_bp_req = self.strategy_bp_requirements[strategy_key][contract_type]
         
+        # Observed trade statistics take over from the assumed figures
+        observed = self.strategy_statistics.kelly_inputs(strategy) if self.strategy_statistics else None
+        if observed is not None:
+            win_rate, avg_return, avg_loss = observed
+            max_loss = min(max_loss, -avg_loss)
+        
         # Calculate Kelly fraction
         kelly_fraction = self._calculate_kelly_fraction(win_rate, avg_return, max_loss)
         
@@ -348,6 +362,7 @@ class PositionSizer:
             'total_bp_usage': actual_bp_percentage,
             'total_bp_amount': actual_bp_percentage * account_value,
             'kelly_fraction': kelly_fraction,
+            'kelly_source': 'observed' if observed else 'assumed',
             'vix_regime': bp_analysis['vix_regime'],
             'account_phase': bp_analysis['account_phase'],
             'risk_metrics': {
@@ -542,7 +557,7 @@ class VIXBasedPositionSizing:
     
     def __init__(self, algorithm):
         self.algorithm = algorithm
-        self.position_sizer = PositionSizer()
+        self.position_sizer = PositionSizer(get_strategy_statistics(algorithm))
         self.current_vix_level = 16.0  # Default normal VIX
         self.current_regime = None
         self.last_regime_update = None
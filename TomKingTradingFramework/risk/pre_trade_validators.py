@@ -2,6 +2,7 @@
 # These are MUST HAVE before any live trading
 
 from AlgorithmImports import *
+from risk.validation_pipeline import get_validation_pipeline
 
 class CriticalValidations:
     """
@@ -9,6 +10,8 @@ class CriticalValidations:
     Simple, robust, no over-engineering
     """
     
+    PRE_TRADE_RULES = ('critical.position_limit', 'critical.margin', 'critical.broker_connection')
+    
     def __init__(self, algorithm):
         self.algo = algorithm
         
@@ -29,19 +32,20 @@ class CriticalValidations:
         self.last_connection_check = None
         self.connection_healthy = True
         
+        # Check outcomes feed the shared pipeline statistics
+        self.pipeline = get_validation_pipeline(algorithm)
+        
         self.algo.Log("[WARNING] Critical Validations Initialized")
         self.algo.Log(f"   Position Limits: {self.MAX_POSITIONS}")
     
     def validate_broker_connection(self) -> bool:
         """Validate broker API connection before trading"""
         try:
-                    if not account:
-                        # Don't fail, just warn
-        except Exception as e:
             if self.algo.LiveMode:
                 # Check TastyTrade connection
                 if hasattr(self.algo, 'tastytrade') and self.algo.tastytrade:
                     account = self.algo.tastytrade.get_account_info()
+                    if not account:
                         self.algo.Error("[WARNING] TastyTrade API not connected")
                         self.connection_healthy = False
                         return False
@@ -67,7 +71,6 @@ class CriticalValidations:
             # Get available margin
             available_margin = self.algo.Portfolio.MarginRemaining
             total_value = self.algo.Portfolio.TotalPortfolioValue
-        except Exception as e:
             
             # Keep 20% buffer for safety
             safety_buffer = total_value * 0.20
@@ -163,16 +166,11 @@ class CriticalValidations:
     def calculate_required_margin(self, symbol, quantity, strategy_name="") -> float:
         """Calculate required margin for a position"""
         try:
-                # Rough margin calculation for options
-                if quantity < 0:  # Short option
-                if "ES" in str(symbol):
-                    margin = abs(quantity) * 13200
-                    margin = abs(quantity) * 1320
-                # Equity margin
-        except Exception as e:
             security = self.algo.Securities[symbol]
             if security.Type == SecurityType.Option:
-                # Short option margin = 20% of underlying + option premium
+                # Rough margin calculation for options
+                if quantity < 0:  # Short option
+                    # Short option margin = 20% of underlying + option premium
                     underlying_price = security.Underlying.Price
                     margin = abs(quantity) * 100 * underlying_price * 0.20
                 else:  # Long option
@@ -180,10 +178,14 @@ class CriticalValidations:
             elif security.Type == SecurityType.Future:
                 # Futures margin (varies by contract)
                 # ES = $13,200, MES = $1,320 approximately
-                elif "MES" in str(symbol):
+                if "MES" in str(symbol):
+                    margin = abs(quantity) * 1320
+                elif "ES" in str(symbol):
+                    margin = abs(quantity) * 13200
                 else:
                     margin = abs(quantity) * security.Price * 100
             else:
+                # Equity margin
                 margin = abs(quantity) * security.Price
             return margin
         except Exception as e:
@@ -193,23 +195,21 @@ class CriticalValidations:
     
     def pre_trade_validation(self, strategy_name: str, symbol, quantity, required_bp: float = None) -> tuple:
         """Complete pre-trade validation check"""
-        
-        # 1. Check connection
-        if not self.validate_broker_connection():
-            return False, "Broker connection failed"
-        
-        # 2. Check position limits
-        if not self.check_position_limit(strategy_name):
-            return False, "Position limit exceeded"
-        
-        # 3. Calculate and check margin
         if required_bp is None:
             required_bp = self.calculate_required_margin(symbol, quantity, strategy_name)
         
-        if not self.validate_margin_requirements(required_bp, strategy_name):
-            return False, "Insufficient margin"
-        
-        return True, "All validations passed"
+        # Local checks first; the broker round trip (live only) runs last
+        if not self.check_position_limit(strategy_name):
+            failed_rule, reason = 'critical.position_limit', "Position limit exceeded"
+        elif not self.validate_margin_requirements(required_bp, strategy_name):
+            failed_rule, reason = 'critical.margin', "Insufficient margin"
+        elif not self.validate_broker_connection():
+            failed_rule, reason = 'critical.broker_connection', "Broker connection failed"
+        else:
+            failed_rule, reason = None, "All validations passed"
+        
+        self.pipeline.record(self.PRE_TRADE_RULES, failed_rule)
+        return failed_rule is None, reason
     
     def get_validation_status(self) -> dict:
         """Get current validation status"""
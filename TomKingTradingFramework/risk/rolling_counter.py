@@ -0,0 +1,71 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Fixed-bucket rolling counters for risk limits"""
+
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+
+class RollingCounter:
+    """
+    Running totals over the last `window_minutes` minutes in per-minute buckets
+
+    Each minute slot holds one amount per field, and each field keeps a
+    running total. Adding touches one slot; moving time forward zeroes the
+    slots that fell out of the window (subtracting them from the totals), at
+    most one per elapsed minute and never more than the window. Queries read
+    the running totals, so order-path limit checks never scan an event history.
+    """
+
+    def __init__(self, window_minutes: int, fields: Sequence[str] = ('count',)):
+        self.window = int(window_minutes)
+        self.fields = tuple(fields)
+        self._index: Dict[str, int] = {field: i for i, field in enumerate(self.fields)}
+        self._slots: List[list] = [[0] * len(self.fields) for _ in range(self.window)]
+        self._totals: list = [0] * len(self.fields)
+        self._minute = None  # absolute minute of the newest slot
+
+    @staticmethod
+    def _minute_of(time: datetime) -> int:
+        return (time.toordinal() * 24 + time.hour) * 60 + time.minute
+
+    def advance(self, time: datetime):
+        """Expire the slots older than the window ending at `time`"""
+        minute = self._minute_of(time)
+        if self._minute is None:
+            self._minute = minute
+            return
+        elapsed = minute - self._minute
+        if elapsed <= 0:
+            return  # same minute, or a timestamp from the past (counted in the newest slot)
+        if elapsed >= self.window:
+            self.clear()
+        else:
+            totals = self._totals
+            for m in range(self._minute + 1, minute + 1):
+                slot = self._slots[m % self.window]
+                if any(slot):
+                    for i, amount in enumerate(slot):
+                        totals[i] -= amount
+                    self._slots[m % self.window] = [0] * len(self.fields)
+        self._minute = minute
+
+    def add(self, time: datetime, **amounts):
+        """Add amounts to the slot of `time`'s minute, e.g. add(t, trades=1, losses=1)"""
+        self.advance(time)
+        slot = self._slots[self._minute % self.window]
+        for field, amount in amounts.items():
+            i = self._index[field]
+            slot[i] += amount
+            self._totals[i] += amount
+
+    def total(self, field: str, time: datetime = None):
+        """Sum of `field` over the window (ending at `time` when given)"""
+        if time is not None:
+            self.advance(time)
+        return self._totals[self._index[field]]
+
+    def clear(self):
+        self._slots = [[0] * len(self.fields) for _ in range(self.window)]
+        self._totals = [0] * len(self.fields)
@@ -0,0 +1,308 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Online per-strategy trade statistics for Kelly sizing"""
+
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config.constants import TradingConstants
+from core.ondata_work_scheduler import WorkPriority
+
+
+# Names the strategies, sizers and reports use for the same strategy
+STRATEGY_ALIASES = {
+    'FRIDAY_0DTE': '0DTE',
+    'LONG_TERM_112': 'LT112',
+    'FUTURES_STRANGLE': 'STRANGLE',
+    'FUTURES_STRANGLES': 'STRANGLE',
+    'FUTURESSTRANGLE': 'STRANGLE',
+    'LEAP_PUT_LADDERS': 'LEAP_PUTS',
+    'LEAP_LADDERS': 'LEAP_PUTS',
+    'LEAPLADDERS': 'LEAP_PUTS'
+}
+
+
+def normalize_strategy(name) -> str:
+    key = str(name).strip().upper()
+    return STRATEGY_ALIASES.get(key, key)
+
+
+def kelly_fraction(win_rate, avg_win, avg_loss):
+    """Full Kelly f = p - q / b with b = avg_win / avg_loss (loss as a positive magnitude); floats or arrays"""
+    p = np.asarray(win_rate, dtype=float)
+    w = np.asarray(avg_win, dtype=float)
+    l = np.asarray(avg_loss, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = np.where(w > 0, (p * w - (1 - p) * l) / w, -(1 - p))
+    return f.item() if f.ndim == 0 else f
+
+
+class _DecayedMoments:
+    """Welford mean/variance with exponentially decayed weights (plain Welford when decay is 1)"""
+
+    __slots__ = ('weight', 'weight_sq', 'mean', 'm2')
+
+    def __init__(self):
+        self.weight = 0.0
+        self.weight_sq = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def decay(self, factor: float):
+        self.weight *= factor
+        self.weight_sq *= factor * factor
+        self.m2 *= factor
+
+    def add(self, value: float):
+        self.weight += 1.0
+        self.weight_sq += 1.0
+        delta = value - self.mean
+        self.mean += delta / self.weight
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Reliability-weighted sample variance (m2 / (n - 1) without decay)"""
+        if self.weight <= 0:
+            return 0.0
+        denominator = self.weight - self.weight_sq / self.weight
+        return self.m2 / denominator if denominator > 0 else 0.0
+
+
+class StrategyStatistics:
+    """
+    Running win rate and win/loss return moments for one strategy
+
+    Each closed trade's return (fraction of capital at risk, 0.5 = +50%)
+    updates the win or loss moments in O(1). With a half-life every earlier
+    trade's weight decays by 0.5 ** (1 / half_life) per new trade, so win
+    rate and averages follow the strategy's recent behaviour. The latest
+    `window` returns are kept for the bootstrap interval of the Kelly
+    fraction, which is recomputed only when asked for after new trades.
+    """
+
+    def __init__(self, name: str, half_life_trades: float = None, window: int = None):
+        self.name = name
+        self.half_life_trades = half_life_trades
+        self.decay = 0.5 ** (1.0 / half_life_trades) if half_life_trades else 1.0
+        self.trades = 0
+        self.wins = 0
+        self._wins = _DecayedMoments()
+        self._losses = _DecayedMoments()
+        self.returns = deque(maxlen=int(window or TradingConstants.STRATEGY_STATS_BOOTSTRAP_WINDOW))
+
+        self.version = 0  # bumped per trade; the interval is current when computed at this version
+        self.interval: Optional[Tuple[float, float]] = None
+        self.interval_version = -1
+
+    def record(self, return_pct: float):
+        return_pct = float(return_pct)
+        if self.decay != 1.0:
+            self._wins.decay(self.decay)
+            self._losses.decay(self.decay)
+        if return_pct > 0:
+            self._wins.add(return_pct)
+            self.wins += 1
+        else:
+            self._losses.add(return_pct)
+        self.trades += 1
+        self.returns.append(return_pct)
+        self.version += 1
+
+    @property
+    def win_rate(self) -> float:
+        total = self._wins.weight + self._losses.weight
+        return self._wins.weight / total if total > 0 else 0.0
+
+    @property
+    def avg_win(self) -> float:
+        return self._wins.mean
+
+    @property
+    def avg_loss(self) -> float:
+        """Average loss as a positive magnitude"""
+        return -self._losses.mean
+
+    @property
+    def win_std(self) -> float:
+        return self._wins.variance ** 0.5
+
+    @property
+    def loss_std(self) -> float:
+        return self._losses.variance ** 0.5
+
+    @property
+    def expectancy(self) -> float:
+        p = self.win_rate
+        return p * self.avg_win - (1 - p) * self.avg_loss
+
+    @property
+    def effective_trades(self) -> float:
+        weight = self._wins.weight + self._losses.weight
+        weight_sq = self._wins.weight_sq + self._losses.weight_sq
+        return weight * weight / weight_sq if weight_sq > 0 else 0.0
+
+    @property
+    def has_wins_and_losses(self) -> bool:
+        return self._wins.weight > 0 and self._losses.weight > 0 and self.avg_loss > 0
+
+    @property
+    def interval_stale(self) -> bool:
+        return self.interval_version != self.version
+
+    def kelly(self) -> float:
+        return kelly_fraction(self.win_rate, self.avg_win, self.avg_loss)
+
+    def bootstrap(self, resamples: int, confidence: float, rng: np.random.Generator) -> Optional[Tuple[float, float]]:
+        """Percentile interval of the full Kelly fraction over resampled recent returns (decay-weighted)"""
+        version = self.version
+        returns = np.fromiter(self.returns, dtype=float, count=len(self.returns))
+        if len(returns) < 2:
+            self.interval, self.interval_version = None, version
+            return None
+
+        weights = None
+        if self.decay != 1.0:
+            weights = self.decay ** np.arange(len(returns) - 1, -1, -1, dtype=float)
+            weights /= weights.sum()
+        sample = returns[rng.choice(len(returns), size=(resamples, len(returns)), p=weights)]
+
+        wins = sample > 0
+        win_count = wins.sum(axis=1)
+        loss_count = len(returns) - win_count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_win = np.where(win_count > 0, np.where(wins, sample, 0.0).sum(axis=1) / win_count, 0.0)
+            avg_loss = np.where(loss_count > 0, -np.where(wins, 0.0, sample).sum(axis=1) / loss_count, 0.0)
+        kelly = kelly_fraction(win_count / len(returns), avg_win, avg_loss)
+
+        tail = (1 - confidence) / 2 * 100
+        low, high = np.percentile(kelly, [tail, 100 - tail])
+        self.interval, self.interval_version = (float(low), float(high)), version
+        return self.interval
+
+    def summary(self) -> Dict:
+        return {
+            'trades': self.trades,
+            'wins': self.wins,
+            'effective_trades': self.effective_trades,
+            'win_rate': self.win_rate,
+            'avg_win': self.avg_win,
+            'avg_loss': self.avg_loss,
+            'win_std': self.win_std,
+            'loss_std': self.loss_std,
+            'expectancy': self.expectancy,
+            'kelly': self.kelly(),
+            'kelly_interval': self.interval,
+            'kelly_interval_stale': self.interval_stale
+        }
+
+
+class StrategyStatisticsBook:
+    """
+    Per-strategy StrategyStatistics shared by the Kelly sizers and validators
+
+    The trade journal records every close here; KellyCriterion, PositionSizer,
+    UnifiedPositionSizer and StrategyValidator read the running figures in
+    O(1) instead of documented constants or a rescan of the journal. Observed
+    figures replace the documented ones once a strategy has `min_trades`
+    closes including at least one win and one loss.
+
+    Bootstrap intervals are lazy: asking for a stale interval returns the
+    last one computed and submits the recompute as DEFERRABLE work on the
+    OnData scheduler (inline when the algorithm has no scheduler).
+    """
+
+    def __init__(self, algorithm, half_life_trades: float = None, window: int = None, resamples: int = None,
+                 confidence: float = None, min_trades: int = None, seed: int = 7):
+        self.algo = algorithm
+        self.half_life_trades = half_life_trades if half_life_trades is not None \
+            else TradingConstants.STRATEGY_STATS_HALF_LIFE_TRADES
+        self.window = window or TradingConstants.STRATEGY_STATS_BOOTSTRAP_WINDOW
+        self.resamples = resamples or TradingConstants.STRATEGY_STATS_BOOTSTRAP_RESAMPLES
+        self.confidence = confidence or TradingConstants.STRATEGY_STATS_CONFIDENCE
+        self.min_trades = TradingConstants.STRATEGY_STATS_MIN_TRADES if min_trades is None else min_trades
+        self._rng = np.random.default_rng(seed)
+
+        self.strategies: Dict[str, StrategyStatistics] = {}
+        self.stats = {
+            'trades_recorded': 0,
+            'intervals_computed': 0,
+            'intervals_scheduled': 0,
+            'interval_ms': 0.0
+        }
+
+    def record(self, strategy: str, return_pct: float) -> StrategyStatistics:
+        """One closed trade of `strategy` returning `return_pct` on capital at risk"""
+        key = normalize_strategy(strategy)
+        stats = self.strategies.get(key)
+        if stats is None:
+            stats = StrategyStatistics(key, self.half_life_trades, self.window)
+            self.strategies[key] = stats
+        stats.record(return_pct)
+        self.stats['trades_recorded'] += 1
+        return stats
+
+    def get(self, strategy: str) -> Optional[StrategyStatistics]:
+        return self.strategies.get(normalize_strategy(strategy))
+
+    def kelly_inputs(self, strategy: str, min_trades: int = None) -> Optional[Tuple[float, float, float]]:
+        """(win_rate, avg_win, avg_loss) once the strategy has enough closes, otherwise None"""
+        stats = self.get(strategy)
+        min_trades = self.min_trades if min_trades is None else min_trades
+        if stats is None or stats.trades < min_trades or not stats.has_wins_and_losses:
+            return None
+        return stats.win_rate, stats.avg_win, stats.avg_loss
+
+    def confidence_interval(self, strategy: str) -> Optional[Tuple[float, float]]:
+        """Last bootstrap interval of the Kelly fraction; schedules a recompute when trades arrived since"""
+        key = normalize_strategy(strategy)
+        stats = self.strategies.get(key)
+        if stats is None:
+            return None
+        if stats.interval_stale:
+            scheduler = getattr(self.algo, 'ondata_scheduler', None)
+            if scheduler is not None:
+                scheduler.submit(f"strategy_stats_interval:{key}", lambda: self._bootstrap(key),
+                                 WorkPriority.DEFERRABLE)
+                self.stats['intervals_scheduled'] += 1
+            else:
+                self._bootstrap(key)
+        return stats.interval
+
+    def refresh_intervals(self):
+        """Recompute every stale interval now (end of day, reports)"""
+        for key, stats in self.strategies.items():
+            if stats.interval_stale:
+                self._bootstrap(key)
+
+    def _bootstrap(self, key: str):
+        stats = self.strategies[key]
+        if not stats.interval_stale:
+            return  # already refreshed by an earlier request
+        started = time.perf_counter()
+        stats.bootstrap(self.resamples, self.confidence, self._rng)
+        self.stats['intervals_computed'] += 1
+        self.stats['interval_ms'] += (time.perf_counter() - started) * 1000
+
+    def get_summary(self, strategy: str) -> Optional[Dict]:
+        stats = self.get(strategy)
+        return stats.summary() if stats is not None else None
+
+    def get_statistics(self) -> Dict:
+        result = self.stats.copy()
+        result['strategies'] = {key: stats.summary() for key, stats in self.strategies.items()}
+        return result
+
+
+def get_strategy_statistics(algorithm) -> StrategyStatisticsBook:
+    """The algorithm's shared StrategyStatisticsBook, created on first use"""
+
+    book = getattr(algorithm, 'strategy_statistics', None)
+    if not isinstance(book, StrategyStatisticsBook):
+        book = StrategyStatisticsBook(algorithm)
+        algorithm.strategy_statistics = book
+    return book
@@ -6,15 +6,20 @@ from AlgorithmImports import *
 from typing import Dict, List, Optional, Any, Protocol
 from abc import ABC, abstractmethod
 from enum import Enum
+import time
 import traceback
 from datetime import datetime, timedelta
 from core.dependency_container import IManager
 from config.constants import TradingConstants
+from core.ondata_work_scheduler import WorkPriority
+from risk.portfolio_var import PortfolioVaRService
+from risk.exposure_ledger import get_exposure_ledger
 
 class RiskEventType(Enum):
     """Types of risk events that can occur"""
     CIRCUIT_BREAKER_TRIGGERED = "circuit_breaker_triggered"
     CORRELATION_LIMIT_EXCEEDED = "correlation_limit_exceeded"
+    CORRELATION_SPIKE = "correlation_spike"
     CONCENTRATION_LIMIT_EXCEEDED = "concentration_limit_exceeded"
     MARGIN_THRESHOLD_EXCEEDED = "margin_threshold_exceeded"
     POSITION_SIZE_VIOLATION = "position_size_violation"
@@ -122,7 +127,6 @@ class BaseRiskPlugin(ABC):
     def initialize(self, algorithm, event_bus) -> bool:
         """Base initialization"""
         try:
-        except Exception as e:
             self._algorithm = algorithm
             self._event_bus = event_bus
             self._initialized = self._plugin_initialize()
@@ -146,10 +150,6 @@ class BaseRiskPlugin(ABC):
             return None
         
         try:
-        
-            pass
-        except Exception as e:
-
             return operation()
         except Exception as e:
             self._error_count += 1
@@ -178,8 +178,18 @@ class UnifiedRiskManager(IManager):
     Unified Risk Management System implementing plugin architecture.
     Replaces separate August2024CorrelationLimiter, SPYConcentrationManager, 
     CircuitBreaker, and other risk components per FRAMEWORK_OPTIMIZATION_PROTOCOL.md
+    
+    Pre-trade checks run plugins cheapest-to-reject first: every
+    REORDER_INTERVAL checks the plugins are re-sorted by measured cost divided
+    by (smoothed) rejection rate, which minimises the expected cost of an
+    all-must-pass chain. Verdicts are memoised per (symbol, quantity, context,
+    portfolio generation) within one slice; fills, position events, periodic
+    checks and emergency changes invalidate them.
     """
     
+    REORDER_INTERVAL = 200  # full checks between plugin re-orderings
+    PERIODIC_CHECK_INTERVAL = timedelta(minutes=5)
+    
     def __init__(self, algorithm):
         self.algorithm = algorithm
         self.plugins: List[IRiskPlugin] = []
@@ -188,6 +198,14 @@ class UnifiedRiskManager(IManager):
         # Event bus for plugin communication
         self.event_bus = RiskEventBus(algorithm)
         
+        # Full-revaluation VaR/ES, cached per portfolio generation
+        self.var_service = PortfolioVaRService(algorithm)
+        
+        # Shared per-group exposure totals; the manager is its single writer so
+        # plugins read O(1) aggregates without double-counting fills
+        self.exposure_ledger = get_exposure_ledger(algorithm)
+        self.exposure_ledger.claim(self)
+        
         # Consolidated risk metrics
         self.risk_metrics = {
             'overall_risk_score': 0.0,
@@ -211,30 +229,43 @@ class UnifiedRiskManager(IManager):
         self.check_count = 0
         self.total_check_time = 0.0
         self.average_check_time_ms = 0.0
+        self.plugin_stats: Dict[str, Dict[str, float]] = {}
+        self._checks_since_reorder = 0
+        
+        # Pre-trade verdict cache: valid for one slice and one portfolio generation
+        self.portfolio_generation = 0
+        self._verdicts: Dict[tuple, tuple] = {}
+        self._verdict_slice = None
+        self.verdict_cache_hits = 0
+        self.verdict_cache_misses = 0
         
         algorithm.Log("[Unified Risk] Risk management system initialized with plugin architecture")
     
     def register_plugin(self, plugin: IRiskPlugin) -> bool:
         """Register a risk plugin"""
         try:
-                )
-                )
-                )
-        except Exception as e:
             if plugin.plugin_name in self.plugin_registry:
                 self.algorithm.Error(
                     f"[Unified Risk] Plugin {plugin.plugin_name} already registered"
+                )
                 return False
+            
             # Initialize plugin
             if plugin.initialize(self.algorithm, self.event_bus):
                 self.plugins.append(plugin)
                 self.plugin_registry[plugin.plugin_name] = plugin
+                self.plugin_stats[plugin.plugin_name] = {
+                    'calls': 0, 'rejects': 0, 'errors': 0, 'total_ms': 0.0
+                }
+                self.invalidate_verdicts()
                 self.algorithm.Log(
                     f"[Unified Risk] Registered plugin: {plugin.plugin_name} v{plugin.plugin_version}"
+                )
                 return True
             else:
                 self.algorithm.Error(
                     f"[Unified Risk] Failed to initialize plugin: {plugin.plugin_name}"
+                )
                 return False
         except Exception as e:
             self.algorithm.Error(f"[Unified Risk] Error registering plugin {plugin.plugin_name}: {e}")
@@ -252,45 +283,162 @@ class UnifiedRiskManager(IManager):
         if self.emergency_mode:
             return False, f"Emergency mode active: {self.emergency_reason}"
         
-        start_time = datetime.now()
+        key = self._verdict_key(symbol, quantity, context)
+        if key is not None:
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self.verdict_cache_hits += 1
+                return verdict
+            self.verdict_cache_misses += 1
         
-        try:
-            # Check each plugin
-            for plugin in self.plugins:
-                try:
-                    can_open, reason = plugin.can_open_position(symbol, quantity, context)
-                    if not can_open:
-                        self.algorithm.Debug(
-                            f"[Unified Risk] Position blocked by {plugin.plugin_name}: {reason}"
-                        )
-                        return False, f"{plugin.plugin_name}: {reason}"
-                
-                except Exception as e:
-                    self.algorithm.Error(
-                        f"[Unified Risk] Error in {plugin.plugin_name}.can_open_position: {e}"
-                    )
-                    # Fail safe - block position on plugin error
-                    return False, f"{plugin.plugin_name}: Plugin error"
-            
-            # All plugins approved
-            return True, "All risk checks passed"
+        start = time.perf_counter()
+        verdict = self._run_checks(symbol, quantity, context)
+        check_time_ms = (time.perf_counter() - start) * 1000
+        
+        self.check_count += 1
+        self.total_check_time += check_time_ms
+        self.average_check_time_ms = self.total_check_time / self.check_count
+        
+        self._checks_since_reorder += 1
+        if self._checks_since_reorder >= self.REORDER_INTERVAL:
+            self._reorder_plugins()
+        
+        if key is not None:
+            self._verdicts[key] = verdict
+        return verdict
+    
+    def _run_checks(self, symbol: str, quantity: int, context: Dict[str, Any]) -> tuple[bool, str]:
+        """Run plugins in the current cost order, stopping at the first rejection"""
+        for plugin in self.plugins:
+            stats = self.plugin_stats[plugin.plugin_name]
+            start = time.perf_counter()
+            try:
+                can_open, reason = plugin.can_open_position(symbol, quantity, context)
+            except Exception as e:
+                self.algorithm.Error(
+                    f"[Unified Risk] Error in {plugin.plugin_name}.can_open_position: {e}"
+                )
+                stats['errors'] += 1
+                can_open, reason = False, "Plugin error"  # Fail safe - block position on plugin error
+            finally:
+                stats['calls'] += 1
+                stats['total_ms'] += (time.perf_counter() - start) * 1000
             
-        finally:
-            # Track performance
-            end_time = datetime.now()
-            check_time_ms = (end_time - start_time).total_seconds() * 1000
-            self.check_count += 1
-            self.total_check_time += check_time_ms
-            self.average_check_time_ms = self.total_check_time / self.check_count
+            if not can_open:
+                stats['rejects'] += 1
+                self.algorithm.Debug(
+                    f"[Unified Risk] Position blocked by {plugin.plugin_name}: {reason}"
+                )
+                return False, f"{plugin.plugin_name}: {reason}"
+        
+        # Proposed legs supplied: incremental VaR within the pre-trade latency budget
+        if context and context.get('var_legs'):
+            can_open, reason = self.check_var_limit(context['var_legs'])
+            if not can_open:
+                return False, reason
+        
+        # All plugins approved
+        return True, "All risk checks passed"
+    
+    def _verdict_key(self, symbol: str, quantity: int, context: Dict[str, Any]) -> Optional[tuple]:
+        """
+        Cache key for a pre-trade verdict, or None when the context is not
+        hashable. Quantity is kept exact (signed): bucketing sizes would let an
+        approval for 2 contracts stand in for 3.
+        """
+        if self._verdict_slice != self.algorithm.Time:
+            self._verdicts.clear()
+            self._verdict_slice = self.algorithm.Time
+        
+        context_key = None
+        if context:
+            try:
+                context_key = tuple(sorted(context.items()))
+                hash(context_key)
+            except TypeError:
+                return None
+        return (str(symbol), quantity, context_key, self.portfolio_generation)
+    
+    def invalidate_verdicts(self):
+        """Drop memoised pre-trade verdicts (portfolio or risk state changed)"""
+        self.portfolio_generation += 1
+        self._verdicts.clear()
+        # Validation pipeline inputs cached for this slice are stale as well
+        pipeline = getattr(self.algorithm, 'validation_pipeline', None)
+        if pipeline is not None:
+            pipeline.invalidate()
+    
+    def on_order_event(self, order_event):
+        """
+        Fills change the portfolio: invalidate verdicts and VaR, and turn a
+        fill that takes a symbol from flat to held (or back) into the
+        position opened/closed notification the plugins and ledger expect.
+        Fills that only resize a held position re-measure its ledger lots
+        for the new quantity.
+        """
+        if order_event.Status not in (OrderStatus.Filled, OrderStatus.PartiallyFilled):
+            return
+        self.invalidate_verdicts()
+        self.var_service.invalidate()
+        
+        fill_quantity = order_event.FillQuantity
+        if not fill_quantity:
+            return
+        symbol = order_event.Symbol
+        holding = self.algorithm.Portfolio[symbol]
+        after = holding.Quantity  # LEAN applies the fill before OnOrderEvent
+        before = after - fill_quantity
+        self.exposure_ledger.note_fill(before, after)
+        context = {'order_id': order_event.OrderId}
+        
+        if before and (not after or (before > 0) != (after > 0)):
+            pnl = float(getattr(holding, 'LastTradeProfit', 0.0) or 0.0)
+            self.on_position_closed(symbol, before, order_event.FillPrice, pnl, context)
+            if after:  # flipped through flat
+                self.on_position_opened(symbol, after, order_event.FillPrice, context)
+        elif not before:
+            self.on_position_opened(symbol, after, order_event.FillPrice, context)
+        else:
+            self.exposure_ledger.resize(symbol, after)
+    
+    def _reorder_plugins(self):
+        """Sort plugins by expected cost per rejection (cheap, frequently-failing checks first)"""
+        def expected_cost(plugin):
+            stats = self.plugin_stats[plugin.plugin_name]
+            calls = stats['calls']
+            avg_ms = stats['total_ms'] / calls if calls else 0.0
+            reject_rate = (stats['rejects'] + 1) / (calls + 2)  # Laplace smoothing for unseen plugins
+            return avg_ms / reject_rate
+        
+        self.plugins.sort(key=expected_cost)  # stable: ties keep registration order
+        self._checks_since_reorder = 0
+    
+    def get_plugin_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-plugin pre-trade timing and rejection statistics, in current check order"""
+        result = {}
+        for position, plugin in enumerate(self.plugins):
+            stats = self.plugin_stats[plugin.plugin_name]
+            calls = stats['calls']
+            result[plugin.plugin_name] = {
+                'order': position,
+                'calls': calls,
+                'rejects': stats['rejects'],
+                'errors': stats['errors'],
+                'reject_rate': stats['rejects'] / calls if calls else 0.0,
+                'average_ms': stats['total_ms'] / calls if calls else 0.0,
+                'total_ms': stats['total_ms']
+            }
+        return result
     
     def on_position_opened(self, symbol: str, quantity: int, 
                           fill_price: float, context: Dict[str, Any] = None):
         """Notify all plugins that a position was opened"""
+        self.invalidate_verdicts()
+        self.var_service.invalidate()
+        strategy_name = context.get('strategy_name') if context else None
+        self.exposure_ledger.open(symbol, quantity, fill_price, strategy_name)
         for plugin in self.plugins:
             try:
-                pass
-            except Exception as e:
-
                 plugin.on_position_opened(symbol, quantity, fill_price, context)
             except Exception as e:
                 self.algorithm.Error(
@@ -300,11 +448,12 @@ class UnifiedRiskManager(IManager):
     def on_position_closed(self, symbol: str, quantity: int, 
                           fill_price: float, pnl: float, context: Dict[str, Any] = None):
         """Notify all plugins that a position was closed"""
+        self.invalidate_verdicts()
+        self.var_service.invalidate()
+        strategy_name = context.get('strategy_name') if context else None
+        self.exposure_ledger.close(symbol, strategy_name)
         for plugin in self.plugins:
             try:
-                pass
-            except Exception as e:
-
                 plugin.on_position_closed(symbol, quantity, fill_price, pnl, context)
             except Exception as e:
                 self.algorithm.Error(
@@ -315,22 +464,44 @@ class UnifiedRiskManager(IManager):
         """Forward market data to all plugins"""
         for plugin in self.plugins:
             try:
-                pass
-            except Exception as e:
-
                 plugin.on_market_data(symbol, data)
             except Exception as e:
                 self.algorithm.Debug(
                     f"[Unified Risk] Error in {plugin.plugin_name}.on_market_data: {e}"
                 )
     
+    def on_slice_prices(self, prices: Dict[str, float]):
+        """Forward one slice of prices (str(Symbol) -> price); option contracts carry no plugin state"""
+        for symbol, price in prices.items():
+            if ' ' not in symbol:  # OSI option tickers, e.g. 'SPY   240816P00540000'
+                self.on_market_data(symbol, price)
+    
+    def register_scheduled_jobs(self, wheel):
+        """
+        Put the plugins' periodic checks (limits, daily resets, correlation
+        regime sync) and the portfolio VaR refresh on the schedule wheel. The
+        VaR history loads right after the open; later refreshes only recompute
+        results the fills made stale.
+        """
+        wheel.every('risk_periodic_checks', self.PERIODIC_CHECK_INTERVAL, self.perform_periodic_checks,
+                    WorkPriority.CRITICAL)
+        wheel.at_market_open('portfolio_var_history', self.refresh_var, minutes_after=1)
+        wheel.every('portfolio_var_refresh', timedelta(minutes=TradingConstants.VAR_REFRESH_INTERVAL_MINUTES),
+                    self.refresh_var, WorkPriority.DEFERRABLE, jitter_minutes=3)
+    
+    def refresh_var(self):
+        """Scheduled VaR/ES recompute (loads the day's history on first run)"""
+        try:
+            self.var_service.refresh()
+        except Exception as e:
+            self.algorithm.Error(f"[Unified Risk] Error refreshing portfolio VaR: {e}")
+    
     def perform_periodic_checks(self) -> List[RiskEvent]:
         """Perform periodic risk checks across all plugins"""
         all_events = []
         
         for plugin in self.plugins:
             try:
-            except Exception as e:
                 events = plugin.periodic_check()
                 if events:
                     all_events.extend(events)
@@ -345,16 +516,44 @@ class UnifiedRiskManager(IManager):
                     f"[Unified Risk] Error in {plugin.plugin_name}.periodic_check: {e}"
                 )
         
+        # Plugin state may have moved (limits, triggered breakers)
+        self.invalidate_verdicts()
+        
         # Update consolidated risk metrics
         self._update_risk_metrics()
         
         return all_events
     
+    def get_portfolio_var(self, method: str = 'historical', budget_ms: float = None):
+        """
+        Portfolio VaR/ES result for pre-trade use. Historical results are
+        served within budget_ms (possibly stale); Monte Carlo is cache-only.
+        """
+        if method == 'historical':
+            return self.var_service.pretrade_var(budget_ms=budget_ms)
+        return self.var_service.get_cached_var(method)
+    
+    def check_var_limit(self, proposed_legs, budget_ms: float = None) -> tuple[bool, str]:
+        """Block proposed legs that raise 1-day VaR above MAX_PORTFOLIO_VAR_PCT of portfolio value"""
+        result = self.var_service.pretrade_var(proposed_legs, budget_ms)
+        if result is None:
+            return True, "VaR unavailable"
+        if result.stale:
+            return True, f"VaR check skipped (latency budget), cached VaR ${result.var:,.0f}"
+        
+        limit = TradingConstants.MAX_PORTFOLIO_VAR_PCT * float(self.algorithm.Portfolio.TotalPortfolioValue)
+        base = self.var_service.get_cached_var('historical')
+        base_var = base.var if base is not None else 0.0
+        if result.var > limit and result.var > base_var:
+            return False, f"Portfolio VaR ${result.var:,.0f} would exceed limit ${limit:,.0f}"
+        return True, f"Portfolio VaR ${result.var:,.0f} within limit ${limit:,.0f}"
+    
     def _handle_emergency_event(self, event: RiskEvent):
         """Handle emergency risk event"""
         self.emergency_mode = True
         self.emergency_reason = event.message
         self.last_emergency_time = self.algorithm.Time
+        self.invalidate_verdicts()
         
         self.algorithm.Error(f"[Unified Risk] EMERGENCY: {event.message}")
         
@@ -378,7 +577,6 @@ class UnifiedRiskManager(IManager):
     def _cancel_all_orders(self):
         """Cancel all pending orders"""
         try:
-        except Exception as e:
             open_orders = self.algorithm.Transactions.GetOpenOrders()
             for order in open_orders:
                 self.algorithm.Transactions.CancelOrder(order.Id)
@@ -389,12 +587,11 @@ class UnifiedRiskManager(IManager):
     def _close_risky_positions(self):
         """Close positions deemed risky during emergency"""
         try:
-                        holding.IsShort):
-        except Exception as e:
             for symbol, holding in self.algorithm.Portfolio.items():
                 if holding.Invested:
                     # Close short options (unlimited risk)
                     if (holding.Type == SecurityType.Option and 
+                        holding.IsShort):
                         self.algorithm.Liquidate(symbol, "EMERGENCY_RISK_CLOSURE")
                         self.algorithm.Log(f"[Unified Risk] Emergency closure: {symbol}")
         except Exception as e:
@@ -403,10 +600,6 @@ class UnifiedRiskManager(IManager):
     def _update_risk_metrics(self):
         """Update consolidated risk metrics from all plugins"""
         try:
-            }
-                try:
-                    )
-        except Exception as e:
             consolidated_metrics = {
                 'overall_risk_score': 0.0,
                 'position_count': len([h for h in self.algorithm.Portfolio.Values if h.Invested]),
@@ -414,16 +607,20 @@ class UnifiedRiskManager(IManager):
                 'margin_utilization': (self.algorithm.Portfolio.TotalMarginUsed / 
                                      max(self.algorithm.Portfolio.TotalPortfolioValue, 1)),
                 'last_update': self.algorithm.Time
+            }
+            
             # Collect metrics from all plugins
             plugin_metrics = {}
             for plugin in self.plugins:
-                except Exception as e:
+                try:
                     metrics = plugin.get_risk_metrics()
                     if metrics:
                         plugin_metrics[plugin.plugin_name] = metrics
                 except Exception as e:
                     self.algorithm.Debug(
                         f"[Unified Risk] Error getting metrics from {plugin.plugin_name}: {e}"
+                    )
+            
             consolidated_metrics['plugin_metrics'] = plugin_metrics
             # Calculate overall risk score
             risk_scores = []
@@ -432,6 +629,11 @@ class UnifiedRiskManager(IManager):
                     risk_scores.append(metrics['risk_score'])
             if risk_scores:
                 consolidated_metrics['overall_risk_score'] = max(risk_scores)
+            
+            for method in ('historical', 'monte_carlo'):
+                result = self.var_service.get_cached_var(method)
+                if result is not None:
+                    consolidated_metrics[f'var_{method}'] = result.to_dict()
             self.risk_metrics = consolidated_metrics
         except Exception as e:
             self.algorithm.Error(f"[Unified Risk] Error updating risk metrics: {e}")
@@ -441,11 +643,10 @@ class UnifiedRiskManager(IManager):
         plugin_status = {}
         for plugin in self.plugins:
             try:
-                }
-            except Exception as e:
                 plugin_status[plugin.plugin_name] = {
                     'version': plugin.plugin_version,
                     'metrics': plugin.get_risk_metrics()
+                }
             except Exception as e:
                 plugin_status[plugin.plugin_name] = {
                     'error': str(e)
@@ -459,7 +660,10 @@ class UnifiedRiskManager(IManager):
             'plugins': plugin_status,
             'performance': {
                 'check_count': self.check_count,
-                'average_check_time_ms': round(self.average_check_time_ms, 2)
+                'average_check_time_ms': round(self.average_check_time_ms, 2),
+                'verdict_cache_hits': self.verdict_cache_hits,
+                'verdict_cache_misses': self.verdict_cache_misses,
+                'plugins': self.get_plugin_statistics()
             },
             'consolidated_metrics': self.risk_metrics
         }
@@ -468,6 +672,7 @@ class UnifiedRiskManager(IManager):
         """Reset emergency mode (use with caution)"""
         self.emergency_mode = False
         self.emergency_reason = ""
+        self.invalidate_verdicts()
         
         # Emit recovery event
         recovery_event = RiskEvent(
@@ -529,11 +734,9 @@ class UnifiedRiskManager(IManager):
     
     def shutdown(self):
         """Shutdown all plugins"""
+        self.var_service.shutdown()
         for plugin in self.plugins:
             try:
-                pass
-            except Exception as e:
-
                 plugin.shutdown()
             except Exception as e:
                 self.algorithm.Error(
@@ -541,6 +744,30 @@ class UnifiedRiskManager(IManager):
                 )
         
         self.algorithm.Log("[Unified Risk] Risk management system shutdown")
+    
+    # IManager Interface Implementation
+    
+    def handle_event(self, event) -> bool:
+        """Handle incoming events from the event bus"""
+        try:
+            # Risk manager processes position updates, market events, etc.
+            # Could trigger risk checks based on event type
+            return True
+        except Exception as e:
+            self.algorithm.Error(f"[UnifiedRiskManager] Error handling event: {e}")
+            return False
+    
+    def get_dependencies(self) -> List[str]:
+        """Return list of manager names this manager depends on"""
+        return ['vix_manager', 'greeks_monitor']  # Depends on market data
+    
+    def can_initialize_without_dependencies(self) -> bool:
+        """Return True if this manager can initialize before its dependencies are ready"""
+        return False  # Risk manager needs market data to function
+    
+    def get_manager_name(self) -> str:
+        """Return unique name for this manager"""
+        return "unified_risk_manager"
 
 class RiskEventBus:
     """Event bus for risk plugin communication"""
@@ -562,9 +789,6 @@ class RiskEventBus:
         if event.event_type in self.subscribers:
             for callback in self.subscribers[event.event_type]:
                 try:
-                    pass
-                except Exception as e:
-
                     callback(event)
                 except Exception as e:
                     self.algorithm.Error(f"[Risk Event Bus] Error in event callback: {e}")
@@ -584,27 +808,3 @@ class RiskEventBus:
             events = [e for e in events if e.event_type == event_type]
         
         return events[-limit:]
-    
-    # IManager Interface Implementation
-    
-    def handle_event(self, event) -> bool:
-        """Handle incoming events from the event bus"""
-        try:
-            # Risk manager processes position updates, market events, etc.
-            # Could trigger risk checks based on event type
-            return True
-        except Exception as e:
-            self.algo.Error(f"[UnifiedRiskManager] Error handling event: {e}")
-            return False
-    
-    def get_dependencies(self) -> List[str]:
-        """Return list of manager names this manager depends on"""
-        return ['vix_manager', 'greeks_monitor']  # Depends on market data
-    
-    def can_initialize_without_dependencies(self) -> bool:
-        """Return True if this manager can initialize before its dependencies are ready"""
-        return False  # Risk manager needs market data to function
-    
-    def get_manager_name(self) -> str:
-        """Return unique name for this manager"""
-        return "unified_risk_manager"
\ No newline at end of file
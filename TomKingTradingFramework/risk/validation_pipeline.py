@@ -0,0 +1,136 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""Shared pre-trade validation inputs and per-rule outcome counters"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+_NO_REQUEST: Dict[str, Any] = {}
+
+
+@dataclass
+class ValidationInput:
+    """A value validators read; computed at most once per scope and shared by every validator"""
+    name: str
+    provider: Callable[[Any, Dict[str, Any]], Any]  # (algorithm, request) -> value
+    scope: str = 'slice'  # 'slice': per algorithm.Time, 'symbol': per slice and symbol, 'request': every read
+
+
+class ValidationPipeline:
+    """
+    Shared pre-trade input cache and per-rule outcome counters
+
+    Inputs such as VIX or market hours are resolved at most once per slice
+    (or per slice and symbol) and shared by every validator through value().
+    The order-path validators (OrderValidationSystem, StrategyValidator,
+    PositionSafetyValidator, CriticalValidations) run their checks as direct
+    calls, cheapest first, and report each outcome with record(), which
+    keeps how often each check ran and rejected. No timings are kept.
+    """
+
+    def __init__(self, algorithm):
+        self.algo = algorithm
+        self.inputs: Dict[str, ValidationInput] = {}
+
+        self._cache: Dict[tuple, Any] = {}
+        self._cache_slice = None
+
+        self._outcomes: Dict[Tuple[str, ...], list] = {}  # rule order -> stops per rule, passes last
+        self.input_stats: Dict[str, Dict[str, float]] = {}
+        self.stats = {
+            'validations': 0,
+            'rejections': 0
+        }
+        self._register_standard()
+
+    def add_input(self, name: str, provider: Callable, scope: str = 'slice'):
+        self.inputs[name] = ValidationInput(name, provider, scope)
+        self.input_stats.setdefault(name, {'computed': 0, 'reused': 0, 'errors': 0})
+        self._cache.clear()
+
+    def value(self, name: str, request: Dict[str, Any] = None) -> Any:
+        """A registered input, computed at most once in its scope"""
+        if self._cache_slice != self.algo.Time:
+            self._cache.clear()
+            self._cache_slice = self.algo.Time
+        spec, stats = self.inputs[name], self.input_stats[name]
+        request = request or _NO_REQUEST
+
+        key = None
+        if spec.scope != 'request':
+            key = (spec.name, str(request.get('symbol'))) if spec.scope == 'symbol' else spec.name
+            if key in self._cache:
+                stats['reused'] += 1
+                return self._cache[key]
+        try:
+            value = spec.provider(self.algo, request)
+        except Exception:
+            stats['errors'] += 1
+            raise
+        stats['computed'] += 1
+        if key is not None:
+            self._cache[key] = value
+        return value
+
+    def record(self, rule_names: Tuple[str, ...], failed_rule: Optional[str] = None):
+        """Outcome of checks a validator ran directly in `rule_names` order, stopping at `failed_rule`"""
+        counts = self._outcomes.get(rule_names)
+        if counts is None:
+            counts = self._outcomes[rule_names] = [0] * (len(rule_names) + 1)
+        self.stats['validations'] += 1
+        if failed_rule is None:
+            counts[-1] += 1
+        else:
+            counts[rule_names.index(failed_rule)] += 1
+            self.stats['rejections'] += 1
+
+    def invalidate(self):
+        """Drop cached inputs (fills change portfolio values within a slice)"""
+        self._cache.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        merged: Dict[str, Dict[str, int]] = {}
+        for rule_names, counts in self._outcomes.items():
+            reached = sum(counts)
+            for name, stopped in zip(rule_names, counts):
+                stats = merged.setdefault(name, {'calls': 0, 'failures': 0})
+                stats['calls'] += reached
+                stats['failures'] += stopped
+                reached -= stopped
+
+        rules = {}
+        for name, stats in merged.items():
+            calls = stats['calls']
+            rules[name] = dict(stats, fail_rate=stats['failures'] / calls if calls else 0.0)
+        result = self.stats.copy()
+        result['rules'] = rules
+        result['inputs'] = {name: stats.copy() for name, stats in self.input_stats.items()}
+        return result
+
+    def _register_standard(self):
+        self.add_input('vix', _current_vix)
+        # Fills and equity moves change the drawdown gate within a slice: read it fresh
+        self.add_input('drawdown_gate', _drawdown_gate, scope='request')
+        self.add_input('market_open', lambda algo, r: algo.IsMarketOpen(r['symbol']), scope='symbol')
+
+
+def _current_vix(algo, request) -> Optional[float]:
+    return algo.vix_manager.get_current_vix() if hasattr(algo, 'vix_manager') else None
+
+
+def _drawdown_gate(algo, request) -> Tuple[bool, str]:
+    if hasattr(algo, 'drawdown_manager'):
+        return algo.drawdown_manager.should_allow_new_position()
+    return True, "No drawdown manager"
+
+
+def get_validation_pipeline(algorithm) -> ValidationPipeline:
+    """The algorithm's shared ValidationPipeline, created on first use"""
+
+    pipeline = getattr(algorithm, 'validation_pipeline', None)
+    if not isinstance(pipeline, ValidationPipeline):
+        pipeline = ValidationPipeline(algorithm)
+        algorithm.validation_pipeline = pipeline
+    return pipeline
@@ -2,7 +2,9 @@
 # PHASE 3 OPTIMIZATION: Integrated with UnifiedStateManager coordination
 
 from AlgorithmImports import *
-from core.state_machine import StrategyStateMachine, StrategyState, TransitionTrigger
+from core.state_machine import StrategyStateMachine, StrategyState, TransitionTrigger, STATE_COUNT, state_index
+from core.log_pipeline import get_log_pipeline
+from risk.strategy_statistics import get_strategy_statistics
 from config.constants import TradingConstants
 from typing import Dict, Optional, Any
 from datetime import time, timedelta
@@ -15,9 +17,13 @@ class BaseStrategyWithState(ABC):
     Each strategy maintains its own StrategyStateMachine (CRITICAL_DO_NOT_CHANGE.md compliance)
     """
     
+    # current_position keys that hold traded option legs
+    LEG_KEY_PREFIXES = ('short_', 'long_')
+    
     def __init__(self, algorithm, strategy_name: str):
         self.algo = algorithm
         self.strategy_name = strategy_name
+        self.log = get_log_pipeline(algorithm).bind(strategy_name)
         
         # CREATE INDIVIDUAL STATE MACHINE (CRITICAL_DO_NOT_CHANGE.md compliance)
         # Each strategy gets its own state machine for unique lifecycle management  
@@ -35,12 +41,18 @@ class BaseStrategyWithState(ABC):
         # Setup state callbacks
         self._setup_state_callbacks()
         
+        # Per-slice dispatch: state index -> bound handler (replaces an if/elif chain)
+        self._state_handlers = self._build_state_handlers()
+        
         # Strategy-specific configuration (override in subclasses)
         self.entry_time = None
         self.exit_time = None
         self.target_profit = TradingConstants.FRIDAY_0DTE_PROFIT_TARGET  # Tom King standard 50%
         self.stop_loss = TradingConstants.FRIDAY_0DTE_STOP_LOSS     # Tom King standard -200%
         
+        # Per-slice MarketContext handed in by StrategyCoordinator (None when called directly)
+        self.market_context = None
+        
         # Position tracking
         self.current_position = None
         self.entry_price = 0
@@ -53,6 +65,28 @@ class BaseStrategyWithState(ABC):
         
         self.algo.Debug(f"[{strategy_name}] Initialized with state machine")
     
+    def _build_state_handlers(self) -> list:
+        """Dispatch array indexed by state_index(); None for states with no per-slice work"""
+        handlers = {
+            StrategyState.INITIALIZING: self._check_initialization,
+            StrategyState.READY: self._check_entry_window,
+            StrategyState.ANALYZING: self._analyze_market,
+            StrategyState.PENDING_ENTRY: self._prepare_entry,
+            StrategyState.ENTERING: self._execute_entry,
+            StrategyState.POSITION_OPEN: self._check_position_status,
+            StrategyState.MANAGING: self._manage_position,
+            StrategyState.ADJUSTING: self._adjust_position,
+            StrategyState.PENDING_EXIT: self._prepare_exit,
+            StrategyState.EXITING: self._execute_exit,
+            StrategyState.CLOSED: self._cleanup_after_close,
+            StrategyState.ERROR: self._handle_error_state,
+            StrategyState.SUSPENDED: self._check_suspension_conditions
+        }
+        table = [None] * STATE_COUNT
+        for state, handler in handlers.items():
+            table[state_index(state)] = handler
+        return table
+    
     def _setup_state_callbacks(self):
         """Setup callbacks for state entry/exit with individual state machine"""
         
@@ -113,70 +147,46 @@ class BaseStrategyWithState(ABC):
         
         self.algo.Debug(f"[{self.strategy_name}] Basic transitions setup completed")
     
-    def execute(self):
-        """Main execution method called by algorithm"""
+    def execute(self, market_context=None):
+        """Main execution method called by algorithm
+
+        Args:
+            market_context: Shared immutable MarketContext for this slice
+        """
+
+        self.market_context = market_context
 
         try:
             # Get current state from individual state machine
             state = self.state_machine.current_state
+            self.log.trace("State: %s", state.name if state else 'None')
 
-            # Track state execution (only in backtest mode)
-            if not self.algo.LiveMode:
-                self.algo.Debug(f"[{self.strategy_name}] State: {state.name if state else 'None'}")
-
-            if state == StrategyState.INITIALIZING:
-                self._check_initialization()
-
-            elif state == StrategyState.READY:
-                self._check_entry_window()
-
-            elif state == StrategyState.ANALYZING:
-                self._analyze_market()
-
-            elif state == StrategyState.PENDING_ENTRY:
-                self._prepare_entry()
-
-            elif state == StrategyState.ENTERING:
-                self._execute_entry()
-
-            elif state == StrategyState.POSITION_OPEN:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Checking position status...")
-                self._check_position_status()
-
-            elif state == StrategyState.MANAGING:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Managing position...")
-                self._manage_position()
-
-            elif state == StrategyState.ADJUSTING:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Adjusting position...")
-                self._adjust_position()
-
-            elif state == StrategyState.PENDING_EXIT:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Preparing exit...")
-                self._prepare_exit()
-
-            elif state == StrategyState.EXITING:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Executing exit...")
-                self._execute_exit()
-
-            elif state == StrategyState.CLOSED:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Cleaning up after close...")
-                self._cleanup_after_close()
-
-            elif state == StrategyState.ERROR:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Handling error state...")
-                self._handle_error_state()
-
-            elif state == StrategyState.SUSPENDED:
-                self.algo.Debug(f"[{self.strategy_name}] TRACE: Checking suspension conditions...")
-                self._check_suspension_conditions()
-
+            handler = self._state_handlers[state_index(state)]
+            if handler is None:
+                self.log.error("UNKNOWN STATE: %s", state.name)
             else:
-                self.algo.Error(f"[{self.strategy_name}] UNKNOWN STATE: {state.name}")
+                handler()
 
         except Exception as e:
-            self.algo.Error(f"[{self.strategy_name}] Execution error: {e}")
+            self.log.error("Execution error: %s", e)
             self.state_machine.trigger(TransitionTrigger.SYSTEM_ERROR, {'error': str(e)})
+        finally:
+            # The snapshot belongs to this slice; later direct calls must read live data
+            self.market_context = None
+    
+    # Shared slice inputs (MarketContext first, direct lookup when executed standalone)
+    
+    def _current_vix(self) -> float:
+        """VIX for this slice"""
+        if self.market_context is not None and self.market_context.vix > 0:
+            return self.market_context.vix
+        return self.algo.vix_manager.get_current_vix()
+    
+    def _get_price(self, symbol) -> float:
+        """Underlying/security price for this slice"""
+        if self.market_context is not None:
+            return self.market_context.price(symbol)
+        return self.algo.Securities[symbol].Price
     
     # State transition methods (override in subclasses)
     
@@ -184,40 +194,40 @@ class BaseStrategyWithState(ABC):
         """Check if strategy is ready to start"""
         # Market open check
         market_open = self.algo.IsMarketOpen(self.algo.spy)
-        self.algo.Debug(f"[{self.strategy_name}] INIT CHECK: Market open = {market_open}, SPY = {self.algo.spy}")
+        self.log.trace("INIT CHECK: Market open = %s, SPY = %s", market_open, self.algo.spy)
         
         if market_open:
-            self.algo.Debug(f"[{self.strategy_name}] INIT TRIGGER: Market is open, triggering MARKET_OPEN")
+            self.log.debug("INIT TRIGGER: Market is open, triggering MARKET_OPEN")
             self.state_machine.trigger(TransitionTrigger.MARKET_OPEN)
         else:
-            self.algo.Debug(f"[{self.strategy_name}] INIT WAIT: Market is closed, staying in INITIALIZING")
+            self.log.trace("INIT WAIT: Market is closed, staying in INITIALIZING")
     
     def _check_entry_window(self):
         """Check if we're in the entry time window"""
         current_time = self.algo.Time.time()
         
-        self.algo.Debug(f"[{self.strategy_name}] ENTRY WINDOW CHECK: Current time = {current_time}, Entry time = {self.entry_time}")
+        self.log.trace("ENTRY WINDOW CHECK: Current time = %s, Entry time = %s", current_time, self.entry_time)
         
         if self.entry_time and current_time >= self.entry_time:
-            self.algo.Debug(f"[{self.strategy_name}] ENTRY TRIGGER: Entry window open, triggering TIME_WINDOW_START")
+            self.log.debug("ENTRY TRIGGER: Entry window open, triggering TIME_WINDOW_START")
             self.state_machine.trigger(TransitionTrigger.TIME_WINDOW_START)
         else:
             if not self.entry_time:
-                self.algo.Debug(f"[{self.strategy_name}] ENTRY WAIT: No entry time configured")
+                self.log.trace("ENTRY WAIT: No entry time configured")
             else:
-                self.algo.Debug(f"[{self.strategy_name}] ENTRY WAIT: Current time {current_time} < entry time {self.entry_time}")
+                self.log.trace("ENTRY WAIT: Current time %s < entry time %s", current_time, self.entry_time)
     
     def _analyze_market(self):
         """Analyze market conditions for entry (OVERRIDE IN SUBCLASS)"""
         # This is where strategy-specific analysis goes
         # Example structure:
-        self.algo.Debug(f"[{self.strategy_name}] ANALYSIS: Checking entry conditions...")
+        self.log.trace("ANALYSIS: Checking entry conditions...")
         conditions_met = self._check_entry_conditions()
         
-        self.algo.Debug(f"[{self.strategy_name}] ANALYSIS RESULT: Entry conditions met = {conditions_met}")
+        self.log.trace("ANALYSIS RESULT: Entry conditions met = %s", conditions_met)
         
         if conditions_met:
-            self.algo.Debug(f"[{self.strategy_name}] ANALYSIS TRIGGER: Entry conditions met, triggering ENTRY_CONDITIONS_MET")
+            self.log.debug("ANALYSIS TRIGGER: Entry conditions met, triggering ENTRY_CONDITIONS_MET")
             self.state_machine.trigger(
                 TransitionTrigger.ENTRY_CONDITIONS_MET,
                 {'analysis': self._get_analysis_data()}
@@ -225,13 +235,13 @@ class BaseStrategyWithState(ABC):
         else:
             # Check if window expired
             window_expired = self._is_entry_window_expired()
-            self.algo.Debug(f"[{self.strategy_name}] ANALYSIS CHECK: Entry window expired = {window_expired}")
+            self.log.trace("ANALYSIS CHECK: Entry window expired = %s", window_expired)
             
             if window_expired:
-                self.algo.Debug(f"[{self.strategy_name}] ANALYSIS TRIGGER: Entry window expired, triggering ENTRY_CONDITIONS_FAILED")
+                self.log.debug("ANALYSIS TRIGGER: Entry window expired, triggering ENTRY_CONDITIONS_FAILED")
                 self.state_machine.trigger(TransitionTrigger.ENTRY_CONDITIONS_FAILED)
             else:
-                self.algo.Debug(f"[{self.strategy_name}] ANALYSIS WAIT: Conditions not met, waiting...")
+                self.log.trace("ANALYSIS WAIT: Conditions not met, waiting...")
     
     def _prepare_entry(self):
         """Prepare to enter position"""
@@ -349,17 +359,26 @@ class BaseStrategyWithState(ABC):
     
     def _on_position_closed(self, context):
         """Called when position closed"""
-        # Update win/loss stats
-        if self.position_pnl > 0:
-            self.wins += 1
-            self.algo.Debug(f"[{self.strategy_name}] WIN - P&L: ${self.position_pnl:.2f}")
-        else:
-            self.losses += 1
-            self.algo.Debug(f"[{self.strategy_name}] LOSS - P&L: ${self.position_pnl:.2f}")
+        # Single-position strategies close here; multi-position strategies
+        # record each position from their own exit handlers (entry_price stays 0)
+        if self.entry_price:
+            self.position_pnl = self._realized_pnl()
+            self._record_closed_trade(self.position_pnl, self.entry_price)
+            self.algo.Debug(f"[{self.strategy_name}] {'WIN' if self.position_pnl > 0 else 'LOSS'} - "
+                            f"P&L: ${self.position_pnl:.2f}")
         
         win_rate = self.wins / max(1, self.wins + self.losses)
         self.algo.Debug(f"[{self.strategy_name}] Win rate: {win_rate:.1%}")
     
+    def _record_closed_trade(self, pnl: float, basis: float):
+        """Count a closed trade and feed its return on `basis` (entry credit/debit, $) to the Kelly statistics"""
+        if pnl > 0:
+            self.wins += 1
+        else:
+            self.losses += 1
+        if basis:
+            get_strategy_statistics(self.algo).record(self.strategy_name, pnl / abs(basis))
+    
     def _on_error(self, context):
         """Called when entering error state"""
         self.algo.Error(f"[{self.strategy_name}] ERROR: {context.message}")
@@ -452,6 +471,23 @@ class BaseStrategyWithState(ABC):
         """Check if suspension conditions cleared"""
         return False
     
+    def _realized_pnl(self) -> float:
+        """Realized P&L of the position just closed, summed over its legs"""
+        if not isinstance(self.current_position, dict):
+            return self.position_pnl
+        
+        pnl = 0.0
+        for symbol in self._position_legs():
+            if symbol in self.algo.Securities:
+                pnl += self.algo.Portfolio[symbol].LastTradeProfit
+        return pnl
+    
+    def _position_legs(self) -> list:
+        """Option leg symbols of the current position ('short_put', 'long_call', ...), skipping
+        bookkeeping entries such as 'contracts', 'entry_time' and the 'underlying'"""
+        return [symbol for key, symbol in self.current_position.items()
+                if symbol and key.startswith(self.LEG_KEY_PREFIXES)]
+    
     def _get_position_value(self) -> float:
         """Get current value of position for P&L calculations"""
         if not self.current_position:
@@ -461,8 +497,8 @@ class BaseStrategyWithState(ABC):
         
         # Sum up all option positions
         if hasattr(self, 'current_position') and isinstance(self.current_position, dict):
-            for key, symbol in self.current_position.items():
-                if symbol and symbol in self.algo.Securities:
+            for symbol in self._position_legs():
+                if symbol in self.algo.Securities:
                     quantity = self.algo.Securities[symbol].Holdings.Quantity
                     price = self.algo.Securities[symbol].Price
                     # Options have 100 multiplier
@@ -5,6 +5,8 @@ from AlgorithmImports import *
 from strategies.base_strategy_with_state import BaseStrategyWithState
 from core.state_machine import StrategyState, TransitionTrigger
 from core.unified_intelligent_cache import UnifiedIntelligentCache, CacheType
+from helpers.spread_construction import ChainSnapshot, SpreadConstructionEngine
+from config.constants import TradingConstants
 from datetime import time, timedelta
 import numpy as np
 
@@ -62,6 +64,17 @@ class Friday0DTEWithState(BaseStrategyWithState):
         self.target_delta = 0.16  # 1 standard deviation
         self.protective_delta = 0.05  # 2 standard deviations
         
+        # Strike selection over the indexed 0DTE chain
+        self.wing_width = TradingConstants.FRIDAY_0DTE_WING_WIDTH
+        self.spread_engine = SpreadConstructionEngine(
+            algorithm,
+            wing_width=self.wing_width,
+            search_width=TradingConstants.STRIKE_SEARCH_WIDTH,
+            min_credit=TradingConstants.MIN_CREDIT_IRON_CONDOR,
+            delta_band=TradingConstants.STRIKE_DELTA_BAND
+        )
+        self.selected_structure = None  # SpreadCandidate chosen at entry (None = legacy strikes)
+        
         # Position details
         self.entry_strikes = {}
         self.position_type = None  # 'iron_condor', 'put_spread', 'call_spread'
@@ -187,7 +200,7 @@ class Friday0DTEWithState(BaseStrategyWithState):
             # CRITICAL FIX #3: Enhanced market open price capture with robust timing windows
             # and comprehensive fallback mechanisms per audit documentation
             if not self.market_open_price:
-                current_spy_price = self.algo.Securities[spy].Price
+                current_spy_price = self._get_price(spy)
                 
                 # Primary capture window: 9:30-9:40 AM (extended from 9:35 for robustness)
                 if current_time.hour == 9 and current_time.minute >= 30 and current_time.minute <= 40:
@@ -263,7 +276,7 @@ class Friday0DTEWithState(BaseStrategyWithState):
                         return self.analyze_move_from_open(spy)  # Recursive call to recapture
             
             # Calculate move from open to now
-            current_price = self.algo.Securities[spy].Price
+            current_price = self._get_price(spy)
             self.pre_entry_move = (current_price - self.market_open_price) / self.market_open_price
             
             # Determine direction
@@ -411,18 +424,23 @@ class Friday0DTEWithState(BaseStrategyWithState):
                 self.algo.Error("[0DTE] No 0DTE options available")
                 return False
             
+            # Index the chain once; every strike lookup below is a binary search
+            snapshot = self._build_chain_snapshot(zero_dte_chain)
+            self.selected_structure = None
+            
             # Select strikes based on position type
             if self.position_type == "iron_condor":
-                success = self._enter_iron_condor(zero_dte_chain)
+                success = self._enter_iron_condor(snapshot)
             elif self.position_type == "put_spread":
-                success = self._enter_put_spread(zero_dte_chain)
+                success = self._enter_put_spread(snapshot)
             elif self.position_type == "call_spread":
-                success = self._enter_call_spread(zero_dte_chain)
+                success = self._enter_call_spread(snapshot)
             else:
                 return False
             
             if success:
-                self.current_position = self.position_type
+                if not self.current_position:
+                    self.current_position = self.position_type  # entry handler did not record its legs
                 self.entry_price = self._calculate_entry_credit()
                 
                 # Transition to POSITION_OPEN will happen when orders fill
@@ -434,35 +452,53 @@ class Friday0DTEWithState(BaseStrategyWithState):
             self.algo.Error(f"[0DTE] Order placement error: {e}")
             return False
     
-    def _enter_iron_condor(self, chain) -> bool:
+    def _build_chain_snapshot(self, chain) -> ChainSnapshot:
+        """Strike-sorted quote/delta arrays for today's 0DTE contracts"""
+        
+        close = self.algo.Time.replace(hour=TradingConstants.MARKET_CLOSE_HOUR,
+                                       minute=TradingConstants.MARKET_CLOSE_MINUTE, second=0, microsecond=0)
+        minutes_left = max((close - self.algo.Time).total_seconds() / 60, 1.0)
+        years_to_expiry = minutes_left / (TradingConstants.MINUTES_PER_SESSION * TradingConstants.TRADING_DAYS_PER_YEAR)
+        
+        return ChainSnapshot.from_contracts(
+            self.algo, chain,
+            underlying_price=self._get_price(self.algo.spy),
+            volatility=self._get_vix_value() / 100,
+            years_to_expiry=years_to_expiry
+        )
+    
+    def _enter_iron_condor(self, snapshot: ChainSnapshot) -> bool:
         """Enter iron condor position"""
         
-        # Get current price
-        spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
-        
-        # Calculate expected move
-        vix = self._get_vix_value()
-        expected_move = current_price * (vix / 100) * np.sqrt(1/252)
+        # Rank condors around the target delta by credit/risk on live quotes
+        candidates = self.spread_engine.iron_condors(snapshot, self.target_delta, self.target_delta)
         
-        # Select strikes
-        short_put_strike = current_price - expected_move
-        long_put_strike = short_put_strike - 5  # $5 wide
-        short_call_strike = current_price + expected_move
-        long_call_strike = short_call_strike + 5  # $5 wide
+        if candidates:
+            self.selected_structure = candidates[0]
+            legs, strikes = self.selected_structure.legs, self.selected_structure.strikes
+            short_put, long_put = legs['short_put'], legs['long_put']
+            short_call, long_call = legs['short_call'], legs['long_call']
+            short_put_strike, long_put_strike = strikes['short_put'], strikes['long_put']
+            short_call_strike, long_call_strike = strikes['short_call'], strikes['long_call']
+        else:
+            # No quotes yet (contracts not subscribed): expected-move strikes
+            current_price = snapshot.underlying_price
+            vix = self._get_vix_value()
+            expected_move = current_price * (vix / 100) * np.sqrt(1/252)
+            
+            short_put_strike = current_price - expected_move
+            long_put_strike = short_put_strike - self.wing_width
+            short_call_strike = current_price + expected_move
+            long_call_strike = short_call_strike + self.wing_width
+            
+            short_put = self._get_option_contract(snapshot.puts, short_put_strike)
+            long_put = self._get_option_contract(snapshot.puts, long_put_strike)
+            short_call = self._get_option_contract(snapshot.calls, short_call_strike)
+            long_call = self._get_option_contract(snapshot.calls, long_call_strike)
         
         # Get option contracts from chain
         contracts_per_side = self._calculate_position_size()
         
-        # Find 0DTE expiry (should be today)
-        expiry = self.algo.Time.date()
-        
-        # Get actual option contracts
-        short_put = self._get_option_contract(chain, short_put_strike, OptionRight.Put, expiry)
-        long_put = self._get_option_contract(chain, long_put_strike, OptionRight.Put, expiry)
-        short_call = self._get_option_contract(chain, short_call_strike, OptionRight.Call, expiry)
-        long_call = self._get_option_contract(chain, long_call_strike, OptionRight.Call, expiry)
-        
         if not all([short_put, long_put, short_call, long_call]):
             self.algo.Error("[0DTE] Could not find all required contracts")
             return False
@@ -514,15 +550,20 @@ class Friday0DTEWithState(BaseStrategyWithState):
         
         return success
     
-    def _enter_put_spread(self, chain) -> bool:
+    def _enter_put_spread(self, snapshot: ChainSnapshot) -> bool:
         """Enter put spread to fade bullish move"""
         
-        spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
+        current_price = snapshot.underlying_price
         
         # Fade the move - sell put spread below market
         short_put_strike = current_price * 0.98  # 2% OTM
-        long_put_strike = short_put_strike - 5
+        long_put_strike = short_put_strike - self.wing_width
+        
+        candidates = self.spread_engine.put_spreads(snapshot, target_strike=short_put_strike)
+        if candidates:
+            self.selected_structure = candidates[0]
+            short_put_strike = self.selected_structure.strikes['short_put']
+            long_put_strike = self.selected_structure.strikes['long_put']
         
         contracts = self._calculate_position_size()
         
@@ -533,15 +574,20 @@ class Friday0DTEWithState(BaseStrategyWithState):
         
         return True
     
-    def _enter_call_spread(self, chain) -> bool:
+    def _enter_call_spread(self, snapshot: ChainSnapshot) -> bool:
         """Enter call spread to fade bearish move"""
         
-        spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
+        current_price = snapshot.underlying_price
         
         # Fade the move - sell call spread above market
         short_call_strike = current_price * 1.02  # 2% OTM
-        long_call_strike = short_call_strike + 5
+        long_call_strike = short_call_strike + self.wing_width
+        
+        candidates = self.spread_engine.call_spreads(snapshot, target_strike=short_call_strike)
+        if candidates:
+            self.selected_structure = candidates[0]
+            short_call_strike = self.selected_structure.strikes['short_call']
+            long_call_strike = self.selected_structure.strikes['long_call']
         
         contracts = self._calculate_position_size()
         
@@ -573,7 +619,7 @@ class Friday0DTEWithState(BaseStrategyWithState):
         
         # Check if any short strike is breached
         spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
+        current_price = self._get_price(spy)
         
         if 'short_put' in self.entry_strikes:
             if current_price <= self.entry_strikes['short_put']:
@@ -614,39 +660,40 @@ class Friday0DTEWithState(BaseStrategyWithState):
         
         return 0.0
     
-    def _get_option_contract(self, chain, strike: float, right: OptionRight, expiry):
-        """Get option contract closest to target strike"""
-        
-        contracts = [x for x in chain if x.ID.OptionRight == right and x.ID.Date.date() == expiry]
+    def _get_option_contract(self, side, strike: float):
+        """Get option contract closest to target strike from one side of the chain snapshot"""
         
-        if not contracts:
-            return None
-        
-        # Find closest strike
-        return min(contracts, key=lambda x: abs(x.ID.StrikePrice - strike))
+        index = side.nearest(strike)
+        return side.symbols[index] if index is not None else None
     
     def _calculate_entry_credit(self) -> float:
-        """Calculate actual entry credit from filled orders"""
+        """
+        Entry credit ($) from the filled legs: average fill price x filled quantity
         
-        if not self.current_position:
+        Right after placement, before any leg has filled, this is the quoted
+        credit of the selected structure for the contracts actually placed;
+        _on_position_opened() recomputes it once the entry orders have filled.
+        """
+        
+        if not isinstance(self.current_position, dict):
             return 0.0
         
         total_credit = 0.0
+        filled = False
         
         try:
-            # Get credits from actual positions
+            # Portfolio AveragePrice/Quantity are the fill price and size of each leg
             for contract_type, contract in self.current_position.items():
                 if contract_type == 'contracts' or contract_type == 'entry_time':
                     continue
                     
                 if contract in self.algo.Securities:
                     position = self.algo.Portfolio[contract]
-                    if position.Quantity < 0:  # Short position (credit)
-                        total_credit += abs(position.AveragePrice * position.Quantity * 100)
-                    else:  # Long position (debit)
-                        total_credit -= abs(position.AveragePrice * position.Quantity * 100)
-            
-            return total_credit
+                    if position.Quantity == 0:
+                        continue
+                    filled = True
+                    # Short legs (negative quantity) add credit, long legs are debits
+                    total_credit -= position.AveragePrice * position.Quantity * 100
             
         except Exception as e:
             self.algo.Error(f"[0DTE] Error calculating entry credit: {e}")
@@ -656,6 +703,10 @@ class Friday0DTEWithState(BaseStrategyWithState):
                 return 100  # $1.00 typical credit per IC
             else:
                 return 50  # $0.50 typical credit per spread
+        
+        if not filled and self.selected_structure is not None:
+            return self.selected_structure.credit * 100 * self.current_position.get('contracts', 0)
+        return total_credit
     
     def _get_vix_value(self) -> float:
         """Get current VIX value from UnifiedVIXManager
@@ -665,7 +716,7 @@ class Friday0DTEWithState(BaseStrategyWithState):
         self.algo.Debug(f"[0DTE] VIX RETRIEVAL: Requesting VIX from unified manager...")
         
         try:
-            vix = self.algo.vix_manager.get_current_vix()
+            vix = self._current_vix()
             self.algo.Debug(f"[0DTE] VIX RETRIEVED: Raw value = {vix}")
             if not vix or vix <= 0:
                 # DIAGNOSTIC: More detailed error logging
@@ -738,6 +789,11 @@ class Friday0DTEWithState(BaseStrategyWithState):
             current_value = self.algo.position_sizer.get_portfolio_value()
             return current_value - self.daily_start_value
     
+    def _on_position_opened(self, context):
+        """Entry orders filled: replace the quoted credit with the credit actually received"""
+        super()._on_position_opened(context)
+        self.entry_price = self._calculate_entry_credit()
+    
     def on_order_event(self, order_event):
         """Handle order events for state transitions"""
         
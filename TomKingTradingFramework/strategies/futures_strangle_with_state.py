@@ -5,6 +5,8 @@ from AlgorithmImports import *
 from strategies.base_strategy_with_state import BaseStrategyWithState
 from core.state_machine import StrategyState, TransitionTrigger
 from config.constants import TradingConstants
+from helpers.futures_option_chain_store import get_futures_option_chain_store
+from risk.margin_engine import MarginLeg, get_margin_engine
 from datetime import time, timedelta
 from typing import Dict, List, Optional
 
@@ -41,6 +43,9 @@ class FuturesStrangleWithState(BaseStrategyWithState):
         self.futures_symbols = ['/ES', '/NQ', '/RTY']  # E-mini S&P, NASDAQ, Russell
         self.active_future = '/ES'      # Primary focus on /ES
         
+        # Option chains cached per contract month (refreshed on roll / new listing)
+        self.option_chains = get_futures_option_chain_store(algorithm)
+        
         # Add strangle-specific transitions
         self._setup_strangle_transitions()
     
@@ -100,21 +105,15 @@ class FuturesStrangleWithState(BaseStrategyWithState):
 
             # Get futures contract (use cached if available)
             
-            current_price = self.algo.Securities[future].Price
-            
-            # Find options on futures
-            contracts = self._find_futures_options(future)
-            if not contracts:
-                self.algo.Debug(f"[Strangle] No suitable options for {self.active_future}")
-                return False
+            current_price = self._get_price(future)
             
             # Calculate strangle strikes
             call_strike = round(current_price * (1 + self.strangle_width), 0)
             put_strike = round(current_price * (1 - self.strangle_width), 0)
             
-            # Find best contracts
-            call_contract = self._find_closest_strike(contracts, call_strike, "call")
-            put_contract = self._find_closest_strike(contracts, put_strike, "put")
+            # Find best contracts on the cached futures option chain
+            call_contract = self._find_closest_strike(future, call_strike, "call")
+            put_contract = self._find_closest_strike(future, put_strike, "put")
             
             if not call_contract or not put_contract:
                 self.algo.Debug("[Strangle] Could not find suitable strikes")
@@ -227,7 +226,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
         
         try:
             future = position_to_adjust['underlying']
-            current_price = self.algo.Securities[future].Price
+            current_price = self._get_price(future)
 
             # Determine which side is tested
             call_strike = position_to_adjust['short_call'].ID.StrikePrice
@@ -241,8 +240,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
 
                 # Find new call further OTM
                 new_call_strike = round(current_price * 1.20, 0)  # 20% OTM
-                contracts = self._find_futures_options(future)
-                new_call = self._find_closest_strike(contracts, new_call_strike, "call")
+                new_call = self._find_closest_strike(future, new_call_strike, "call")
 
                 if new_call:
                     # Sell new call
@@ -262,8 +260,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
 
                 # Find new put further OTM
                 new_put_strike = round(current_price * 0.80, 0)  # 20% OTM
-                contracts = self._find_futures_options(future)
-                new_put = self._find_closest_strike(contracts, new_put_strike, "put")
+                new_put = self._find_closest_strike(future, new_put_strike, "put")
 
                 if new_put:
                     # Sell new put
@@ -311,12 +308,28 @@ class FuturesStrangleWithState(BaseStrategyWithState):
     def _check_margin_available(self) -> bool:
         """Check if enough margin for strangle"""
         
-        # Estimate margin for futures strangle
-        # Rough estimate: $5000 per /ES strangle
-        required_margin = 5000 * self._calculate_strangle_size()
-        available_margin = self.algo.Portfolio.MarginRemaining
+        # What-if margin of the short strangle against the whole book
+        contracts = self._calculate_strangle_size()
+        future = getattr(self.algo, 'symbols', {}).get(self.active_future)
+        current_price = self._get_price(future) if future is not None else 0
+        if current_price > 0:
+            expiry = self.algo.Time + timedelta(days=self.max_dte)
+            proposed = [
+                MarginLeg(self.active_future, -contracts, current_price, multiplier=50, expiry=expiry,
+                          strike=round(current_price * (1 + self.strangle_width), 0), is_call=True,
+                          asset_class='future'),
+                MarginLeg(self.active_future, -contracts, current_price, multiplier=50, expiry=expiry,
+                          strike=round(current_price * (1 - self.strangle_width), 0), is_call=False,
+                          asset_class='future')
+            ]
+            # Use max 30% of available
+            ok, required_margin, _ = get_margin_engine(self.algo).check_margin_available(proposed, 0.3)
+        else:
+            # No futures price yet: rough estimate of $5000 per /ES strangle
+            required_margin = 5000 * contracts
+            ok = required_margin <= self.algo.Portfolio.MarginRemaining * 0.3
         
-        if required_margin > available_margin * 0.3:  # Use max 30% of available
+        if not ok:
             self.algo.Debug(f"[Strangle] Insufficient margin: need ${required_margin:.0f}")
             return False
         
@@ -325,37 +338,14 @@ class FuturesStrangleWithState(BaseStrategyWithState):
     def _find_futures_options(self, future_symbol) -> List:
         """Find options on futures contract"""
         
-        target_expiry = self.algo.Time + timedelta(days=(self.min_dte + self.max_dte) / 2)
-        min_expiry = self.algo.Time + timedelta(days=self.min_dte)
-        max_expiry = self.algo.Time + timedelta(days=self.max_dte)
-        
-        # Get futures option chain
-        # Using QuantConnect's futures option chain provider
-        chain = self.algo.OptionChainProvider.GetOptionContractList(future_symbol, self.algo.Time)
-        
-        # Filter by DTE range
-        filtered = [
-            c for c in chain
-            if min_expiry <= c.ID.Date <= max_expiry
-        ]
-        
-        return filtered
+        return self.option_chains.contracts_in_band(future_symbol, self.min_dte, self.max_dte)
     
-    def _find_closest_strike(self, contracts, target_strike, option_type):
-        """Find closest strike to target"""
-        
-        # Filter by type
-        if option_type == "put":
-            typed_contracts = [c for c in contracts if c.ID.OptionRight == OptionRight.Put]
-        else:
-            typed_contracts = [c for c in contracts if c.ID.OptionRight == OptionRight.Call]
+    def _find_closest_strike(self, future_symbol, target_strike, option_type):
+        """Find closest strike to target within the DTE band"""
         
-        if not typed_contracts:
-            return None
-        
-        # Find closest strike
-        closest = min(typed_contracts, key=lambda c: abs(c.ID.StrikePrice - target_strike))
-        return closest
+        right = OptionRight.Put if option_type == "put" else OptionRight.Call
+        return self.option_chains.closest_contract(future_symbol, right, target_strike,
+                                                   self.min_dte, self.max_dte)
     
     def _calculate_strangle_size(self) -> int:
         """Calculate position size for strangle using unified position sizer"""
@@ -397,7 +387,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
         """Check if either side of strangle is tested"""
         
         future = position['underlying']
-        current_price = self.algo.Securities[future].Price
+        current_price = self._get_price(future)
         
         call_strike = position['short_call'].ID.StrikePrice
         put_strike = position['short_put'].ID.StrikePrice
@@ -443,10 +433,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
             pnl = position['entry_credit'] - final_value
             
             # Update statistics
-            if pnl > 0:
-                self.wins += 1
-            else:
-                self.losses += 1
+            self._record_closed_trade(pnl, position['entry_credit'])
             
             self.algo.Debug(f"[Strangle] Closed position, P&L: ${pnl:.2f}")
             
@@ -471,7 +458,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
         
         # Use central VIX manager - single source of truth
         if hasattr(self.algo, 'vix_manager'):
-            vix = self.algo.vix_manager.get_current_vix()
+            vix = self._current_vix()
             if vix and vix > 0:
                 return vix
         
@@ -547,10 +534,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
                     position['final_pnl'] = final_pnl
                     
                     # Update strategy statistics
-                    if final_pnl > 0:
-                        self.wins += 1
-                    else:
-                        self.losses += 1
+                    self._record_closed_trade(final_pnl, entry_credit)
                     
                     # Log exit details
                     self.algo.Log(
@@ -631,7 +615,7 @@ class FuturesStrangleWithState(BaseStrategyWithState):
         
         try:
             future = position['underlying']
-            current_price = self.algo.Securities[future].Price
+            current_price = self._get_price(future)
             call_strike = position['short_call'].ID.StrikePrice
             put_strike = position['short_put'].ID.StrikePrice
 
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from core.unified_vix_manager import UnifiedVIXManager
 from core.unified_position_sizer import UnifiedPositionSizer
+from helpers.expiration_calendar import get_expiration_calendar
 
 
 # SYSTEM LEVERAGE OPPORTUNITY:
@@ -30,6 +31,7 @@ class FixedIPMCCExecution:
     def __init__(self, algorithm, position_state_manager):
         self.algo = algorithm
         self.psm = position_state_manager  # Position State Manager
+        self.expirations = get_expiration_calendar(algorithm)
         
     def execute_ipmcc_strategy(self, symbol: str, account_value: float, vix_level: float = None) -> Tuple[bool, str]:
         """
@@ -41,10 +43,8 @@ class FixedIPMCCExecution:
         3. If NO: Create new LEAP + weekly call position
         """
         try:
-            existing_leap = self.psm.has_active_leap(symbol)
-        except Exception as e:
-
             # CRITICAL CHECK: Do we already have an active LEAP for this symbol?
+            existing_leap = self.psm.has_active_leap(symbol)
             
             if existing_leap:
                 # SCENARIO 1: We have an active LEAP - only add weekly call
@@ -63,16 +63,14 @@ class FixedIPMCCExecution:
     def _add_weekly_call_to_existing_leap(self, symbol: str, existing_leap) -> Tuple[bool, str]:
         """Add weekly call to existing LEAP position"""
         try:
-            current_price = float(self.algo.Securities[symbol].Price)
-        except Exception as e:
-
             # Get current price and calculate weekly call strike
+            current_price = float(self.algo.Securities[symbol].Price)
             
             # Calculate weekly call strike (typically 2-5% OTM)
             weekly_strike = self._calculate_weekly_call_strike(current_price, existing_leap.strike)
             
             # Get option chain for weekly options
-            weekly_expiry = self._get_next_weekly_expiry()
+            weekly_expiry = self._get_next_weekly_expiry(symbol)
             option_chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
             
             # Find suitable weekly call contract
@@ -117,13 +115,6 @@ class FixedIPMCCExecution:
     def _create_new_ipmcc_position(self, symbol: str, account_value: float, vix_level: float) -> Tuple[bool, str]:
         """Create brand new IPMCC position (LEAP + weekly call)"""
         try:
-                    position_id=position_id,
-                    quantity=quantity,
-                )
-                    symbol=symbol,
-                    quantity=quantity,
-                )
-        except Exception as e:
             current_price = float(self.algo.Securities[symbol].Price)
             # Find suitable LEAP (365 DTE, ~80 delta)
             leap_contract, leap_analysis = self._find_suitable_leap(symbol, current_price)
@@ -146,14 +137,20 @@ class FixedIPMCCExecution:
                 position_id = self.psm.create_ipmcc_position(symbol)
                 # Add LEAP component
                 self.psm.add_ipmcc_leap(
+                    position_id=position_id,
                     leap_contract=str(leap_contract),
+                    quantity=quantity,
                     strike=leap_contract.ID.StrikePrice,
                     expiry=leap_contract.ID.Date
+                )
                 # Add weekly call component
                 self.psm.add_ipmcc_weekly_call(
+                    symbol=symbol,
                     weekly_contract=str(weekly_call),
+                    quantity=quantity,
                     strike=weekly_call.ID.StrikePrice,
                     expiry=weekly_call.ID.Date
+                )
                 self.algo.Log(f"[WARNING] NEW IPMCC Created: {symbol} LEAP@{leap_contract.ID.StrikePrice} + Weekly@{weekly_call.ID.StrikePrice}")
                 return True, f"New IPMCC position created successfully"
             else:
@@ -165,25 +162,18 @@ class FixedIPMCCExecution:
     def _find_suitable_leap(self, symbol: str, current_price: float) -> Tuple[Optional[object], Optional[Dict]]:
         """Find suitable LEAP contract (365+ DTE, ~80 delta)"""
         try:
-                             if c.ID.OptionRight == OptionRight.Call and 
-            analysis = {
-            }
-        except Exception as e:
-            option_chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
-            # Filter for LEAP calls (300+ DTE)
-            target_expiry = self.algo.Time + timedelta(days=365)
-            leap_candidates = [c for c in option_chain 
-                             (c.ID.Date - self.algo.Time).days >= 300]
-            if not leap_candidates:
+            # Find ~80 delta strike (roughly 15-20% OTM) among LEAP calls (300+ DTE)
+            target_leap_strike = current_price * 0.82  # Rough 80 delta approximation
+            best_leap = self.expirations.closest_contract(symbol, OptionRight.Call, target_leap_strike, 300)
+            if best_leap is None:
                 self.algo.Debug(f"No LEAP candidates found for {symbol} with 300+ DTE")
                 return None, None
-            # Find ~80 delta strike (roughly 15-20% OTM)
-            target_leap_strike = current_price * 0.82  # Rough 80 delta approximation
-            best_leap = min(leap_candidates, key=lambda c: abs(c.ID.StrikePrice - target_leap_strike))
+            analysis = {
                 'strike': best_leap.ID.StrikePrice,
                 'dte': (best_leap.ID.Date - self.algo.Time).days,
                 'estimated_delta': 0.80,
                 'moneyness': best_leap.ID.StrikePrice / current_price
+            }
             return best_leap, analysis
         except Exception as e:
             self.algo.Error(f"Error finding LEAP: {str(e)}")
@@ -192,24 +182,20 @@ class FixedIPMCCExecution:
     def _find_suitable_weekly_call(self, symbol: str, current_price: float, leap_strike: float) -> Tuple[Optional[object], Optional[Dict]]:
         """Find suitable weekly call contract"""
         try:
-                               if c.ID.OptionRight == OptionRight.Call and 
-            analysis = {
-            }
-        except Exception as e:
-            option_chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
-            # Find weekly expiry (7 DTE)
-            weekly_expiry = self._get_next_weekly_expiry()
-            weekly_candidates = [c for c in option_chain 
-                               abs((c.ID.Date - weekly_expiry).days) <= 3]
-            if not weekly_candidates:
-                self.algo.Debug(f"No weekly call candidates found for {symbol} near {weekly_expiry}")
-                return None, None
+            # Find weekly expiry (7 DTE) listed for this symbol
+            weekly_expiry = self.expirations.next_weekly_expiry(symbol)
             # Calculate weekly strike (above current price, below LEAP strike for safety)
             weekly_strike = self._calculate_weekly_call_strike(current_price, leap_strike)
-            best_weekly = min(weekly_candidates, key=lambda c: abs(c.ID.StrikePrice - weekly_strike))
+            found = self.expirations.index(symbol).closest_strike(weekly_expiry, OptionRight.Call, weekly_strike)
+            if found is None:
+                self.algo.Debug(f"No weekly call candidates found for {symbol} near {weekly_expiry}")
+                return None, None
+            best_weekly = found[1]
+            analysis = {
                 'strike': best_weekly.ID.StrikePrice,
                 'dte': (best_weekly.ID.Date - self.algo.Time).days,
                 'moneyness': best_weekly.ID.StrikePrice / current_price
+            }
             return best_weekly, analysis
         except Exception as e:
             self.algo.Error(f"Error finding weekly call: {str(e)}")
@@ -227,15 +213,9 @@ class FixedIPMCCExecution:
         
         return min(otm_target, safety_max)
         
-    def _get_next_weekly_expiry(self) -> datetime:
-        """Get next Friday expiry date"""
-        current = self.algo.Time
-        days_until_friday = (4 - current.weekday()) % 7
-        if days_until_friday == 0 and current.hour >= 16:  # After market close on Friday
-            days_until_friday = 7
-            
-        next_friday = current + timedelta(days=days_until_friday)
-        return next_friday
+    def _get_next_weekly_expiry(self, symbol: str = None) -> datetime:
+        """Get next Friday expiry date (the listed expiry when the symbol's chain is known)"""
+        return self.expirations.next_weekly_expiry(symbol)
         
     def _calculate_position_size(self, account_value: float, current_price: float, leap_strike: float) -> int:
         """Calculate appropriate position size for IPMCC"""
@@ -258,7 +238,6 @@ class FixedIPMCCExecution:
             success = self.psm.close_ipmcc_weekly_call(symbol, component_id)
             if not success:
                 return False, "Failed to close existing weekly call"
-        except Exception as e:
                 
             # Add new weekly call for next week
             existing_leap = self.psm.has_active_leap(symbol)
@@ -4,6 +4,7 @@
 from AlgorithmImports import *
 from strategies.base_strategy_with_state import BaseStrategyWithState
 from core.state_machine import StrategyState, TransitionTrigger
+from helpers.expiration_calendar import get_expiration_calendar
 from datetime import time, timedelta
 from typing import Dict, List, Optional
 from core.unified_vix_manager import UnifiedVIXManager
@@ -36,6 +37,9 @@ class IPMCCWithState(BaseStrategyWithState):
         # Strike selection
         self.call_delta = 0.30           # 30 delta calls (OTM)
         
+        # Expiration index shared with the other option strategies
+        self.expirations = get_expiration_calendar(algorithm)
+        
         # Position tracking
         self.covered_positions = []
         self.underlying_shares = {}      # Track shares we're covering
@@ -232,7 +236,7 @@ class IPMCCWithState(BaseStrategyWithState):
         if spy in self.algo.Securities:
             sma20 = self.algo.Indicators.SMA(spy, 20)
             if sma20.IsReady:
-                current_price = self.algo.Securities[spy].Price
+                current_price = self._get_price(spy)
                 # Don't sell calls if more than 2% above 20-day MA
                 if current_price > sma20.Current.Value * 1.02:
                     self.algo.Debug("[IPMCC] Market too bullish for calls")
@@ -243,19 +247,7 @@ class IPMCCWithState(BaseStrategyWithState):
     def _find_target_dte_options(self, symbol) -> List:
         """Find options with target DTE"""
         
-        min_expiry = self.algo.Time + timedelta(days=self.min_dte)
-        max_expiry = self.algo.Time + timedelta(days=self.max_dte)
-        
-        # Get option chain
-        chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
-        
-        # Filter by DTE range
-        filtered = [
-            c for c in chain
-            if min_expiry <= c.ID.Date <= max_expiry
-        ]
-        
-        return filtered
+        return self.expirations.contracts_in_band(symbol, self.min_dte, self.max_dte)
     
     def _find_delta_strike(self, contracts, target_delta, option_type):
         """Find option closest to target delta"""
@@ -357,10 +349,7 @@ class IPMCCWithState(BaseStrategyWithState):
                 pnl = (position['entry_premium'] - exit_price) * 100 * position['contracts']
 
                 # Update statistics
-                if pnl > 0:
-                    self.wins += 1
-                else:
-                    self.losses += 1
+                self._record_closed_trade(pnl, position['entry_premium'] * 100 * position['contracts'])
 
                 self.algo.Debug(f"[IPMCC] Closed {position['underlying']}, P&L: ${pnl:.2f}")
             else:
@@ -413,10 +402,7 @@ class IPMCCWithState(BaseStrategyWithState):
                     position['final_pnl'] = pnl
 
                     # Update strategy statistics
-                    if pnl > 0:
-                        self.wins += 1
-                    else:
-                        self.losses += 1
+                    self._record_closed_trade(pnl, entry_premium * 100 * contracts)
 
                     # Log exit details
                     self.algo.Log(
@@ -514,7 +500,7 @@ class IPMCCWithState(BaseStrategyWithState):
 
             # Get current price
             if underlying in self.algo.Securities:
-                current_price = self.algo.Securities[underlying].Price
+                current_price = self._get_price(underlying)
             else:
                 return False
 
@@ -546,7 +532,7 @@ class IPMCCWithState(BaseStrategyWithState):
             # If VIX spikes above 40, close calls to preserve upside
             vix = 20.0  # Default
             if hasattr(self.algo, 'vix_manager'):
-                vix_val = self.algo.vix_manager.get_current_vix()
+                vix_val = self._current_vix()
                 if vix_val and vix_val > 0:
                     vix = vix_val
 
@@ -564,7 +550,7 @@ class IPMCCWithState(BaseStrategyWithState):
             # Check if underlying has run up significantly
             underlying = position['underlying']
             if underlying in self.algo.Securities:
-                current_price = self.algo.Securities[underlying].Price
+                current_price = self._get_price(underlying)
                 
                 # If we have SMA data, check for strong uptrend
                 if hasattr(self.algo, 'Indicators'):
@@ -617,7 +603,7 @@ class IPMCCWithState(BaseStrategyWithState):
             # Check emergency conditions
             vix = 20.0
             if hasattr(self.algo, 'vix_manager'):
-                vix_val = self.algo.vix_manager.get_current_vix()
+                vix_val = self._current_vix()
                 if vix_val and vix_val > 0:
                     vix = vix_val
             
@@ -627,7 +613,7 @@ class IPMCCWithState(BaseStrategyWithState):
             # Check strong uptrend
             underlying = position['underlying']
             if underlying in self.algo.Securities:
-                current_price = self.algo.Securities[underlying].Price
+                current_price = self._get_price(underlying)
                 
                 if hasattr(self.algo, 'Indicators'):
                     try:
@@ -863,20 +849,8 @@ class IPMCCWithState(BaseStrategyWithState):
         """Find LEAP options (365+ days to expiration)"""
 
         try:
-            min_expiry = self.algo.Time + timedelta(days=365)
-            max_expiry = self.algo.Time + timedelta(days=730)  # Up to 2 years
-
-            # Get option chain
-            chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
-
-            # Filter for LEAP calls
-            leap_contracts = [
-                c for c in chain
-                if (min_expiry <= c.ID.Date <= max_expiry and
-                    c.ID.OptionRight == OptionRight.Call)
-            ]
-
-            return leap_contracts
+            # LEAP calls up to 2 years out
+            return self.expirations.contracts_in_band(symbol, 365, 730, OptionRight.Call)
 
         except Exception as e:
             self.algo.Debug(f"[IPMCC] Error finding LEAP options: {e}")
@@ -886,20 +860,7 @@ class IPMCCWithState(BaseStrategyWithState):
         """Find weekly options (7-14 days to expiration)"""
 
         try:
-            min_expiry = self.algo.Time + timedelta(days=7)
-            max_expiry = self.algo.Time + timedelta(days=14)
-
-            # Get option chain
-            chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
-
-            # Filter for weekly calls
-            weekly_contracts = [
-                c for c in chain
-                if (min_expiry <= c.ID.Date <= max_expiry and
-                    c.ID.OptionRight == OptionRight.Call)
-            ]
-
-            return weekly_contracts
+            return self.expirations.contracts_in_band(symbol, 7, 14, OptionRight.Call)
 
         except Exception as e:
             self.algo.Debug(f"[IPMCC] Error finding weekly options: {e}")
@@ -922,7 +883,7 @@ class IPMCCWithState(BaseStrategyWithState):
             if hasattr(self.algo, 'Securities'):
                 underlying = safe_calls[0].ID.Underlying
                 if underlying in self.algo.Securities:
-                    current_price = self.algo.Securities[underlying].Price
+                    current_price = self._get_price(underlying)
                     target_strike = current_price * 1.03  # 3% OTM
 
                     # Find closest to target
@@ -973,7 +934,7 @@ class IPMCCWithState(BaseStrategyWithState):
             underlying = leap_call.ID.Underlying if hasattr(leap_call, 'ID') else None
             if underlying and underlying in self.algo.Securities:
                 # LEAP calls are typically expensive, estimate based on intrinsic + time value
-                current_price = self.algo.Securities[underlying].Price
+                current_price = self._get_price(underlying)
                 strike = self._extract_strike_from_contract(leap_call)
 
                 if current_price > strike:
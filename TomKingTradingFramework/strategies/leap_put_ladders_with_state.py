@@ -4,6 +4,8 @@
 from AlgorithmImports import *
 from strategies.base_strategy_with_state import BaseStrategyWithState
 from core.state_machine import StrategyState, TransitionTrigger
+from config.constants import TradingConstants
+from helpers.expiration_calendar import get_expiration_calendar
 from datetime import time, timedelta
 from typing import Dict, List, Optional
 
@@ -35,6 +37,9 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
             0.90   # 10% OTM
         ]
         
+        # Expiration index shared with the other option strategies
+        self.expirations = get_expiration_calendar(algorithm)
+        
         # Position tracking
         self.ladder_positions = []
         self.target_allocation = 0.05    # 5% of portfolio for protection
@@ -95,7 +100,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
 
         try:
             spy = self.algo.spy
-            current_price = self.algo.Securities[spy].Price
+            current_price = self._get_price(spy)
             
             # Calculate allocation per rung using centralized portfolio access
             portfolio_value = self.algo.position_sizer.get_portfolio_value()
@@ -114,15 +119,10 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
                 # Calculate target strike
                 target_strike = round(current_price * strike_pct, 0)
 
-                # Find LEAP options
-                contracts = self._find_leap_options(spy)
-                if not contracts:
-                    self.algo.Debug(f"[Ladder] No LEAP options found for rung {i}")
-                    continue
-
-                # Find best put contract
-                put_contract = self._find_closest_strike(contracts, target_strike, "put")
+                # Find best LEAP put in the DTE band
+                put_contract = self._find_leap_put(spy, target_strike)
                 if not put_contract:
+                    self.algo.Debug(f"[Ladder] No LEAP put found for rung {i}")
                     continue
 
                 # Calculate contracts to buy
@@ -263,7 +263,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
         
         success = True
         spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
+        current_price = self._get_price(spy)
         
         for position in positions:
             try:
@@ -274,8 +274,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
                 
                 # Find new LEAP put
                 target_strike = round(current_price * position['target_strike_pct'], 0)
-                contracts = self._find_leap_options(spy)
-                new_put = self._find_closest_strike(contracts, target_strike, "put")
+                new_put = self._find_leap_put(spy, target_strike)
                 
                 if new_put:
                     # Buy new put
@@ -405,35 +404,13 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
     def _find_leap_options(self, symbol) -> List:
         """Find LEAP options with 1-2 year expiration"""
         
-        min_expiry = self.algo.Time + timedelta(days=self.min_dte)
-        max_expiry = self.algo.Time + timedelta(days=self.max_dte)
-        
-        # Get option chain
-        chain = self.algo.OptionChainProvider.GetOptionContractList(symbol, self.algo.Time)
-        
-        # Filter by DTE range
-        filtered = [
-            c for c in chain
-            if min_expiry <= c.ID.Date <= max_expiry
-        ]
-        
-        return filtered
+        return self.expirations.contracts_in_band(symbol, self.min_dte, self.max_dte)
     
-    def _find_closest_strike(self, contracts, target_strike, option_type):
-        """Find closest strike to target"""
-        
-        # Filter by type
-        if option_type == "put":
-            typed_contracts = [c for c in contracts if c.ID.OptionRight == OptionRight.Put]
-        else:
-            typed_contracts = [c for c in contracts if c.ID.OptionRight == OptionRight.Call]
+    def _find_leap_put(self, symbol, target_strike: float):
+        """LEAP put in the DTE band with the strike closest to target"""
         
-        if not typed_contracts:
-            return None
-        
-        # Find closest strike
-        closest = min(typed_contracts, key=lambda c: abs(c.ID.StrikePrice - target_strike))
-        return closest
+        return self.expirations.closest_contract(symbol, OptionRight.Put, target_strike,
+                                                 self.min_dte, self.max_dte)
     
     def _check_needs_rolling(self, position) -> bool:
         """Check if position needs rolling"""
@@ -447,7 +424,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
         """Check if position is deep in the money"""
         
         spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
+        current_price = self._get_price(spy)
         strike = position['put_contract'].ID.StrikePrice
         
         # Deep ITM if more than 10% ITM
@@ -469,6 +446,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
             # Mark as closed
             position['status'] = 'closed'
             position['exit_time'] = self.algo.Time
+            self._record_closed_trade(pnl, position['entry_price'] * 100 * position['contracts'])
             
             self.algo.Debug(f"[Ladder] Took profit on rung {position['rung_index']}, P&L: ${pnl:.2f}")
             
@@ -502,7 +480,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
         
         # Use central VIX manager - single source of truth
         if hasattr(self.algo, 'vix_manager'):
-            vix = self.algo.vix_manager.get_current_vix()
+            vix = self._current_vix()
             if vix and vix > 0:
                 return vix
         
@@ -554,10 +532,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
                     position['final_pnl'] = pnl
                     
                     # Update strategy statistics
-                    if pnl > 0:
-                        self.wins += 1
-                    else:
-                        self.losses += 1
+                    self._record_closed_trade(pnl, entry_price * 100 * contracts)
                     
                     # Log exit details
                     self.algo.Log(
@@ -623,10 +598,9 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
             days_to_expiry = (put_contract.ID.Date - self.algo.Time).days
             if days_to_expiry <= self.roll_dte:
                 spy = self.algo.spy
-                current_price = self.algo.Securities[spy].Price
+                current_price = self._get_price(spy)
                 target_strike = round(current_price * position.get('target_strike_pct', 0.85), 0)
-                contracts = self._find_leap_options(spy)
-                new_put = self._find_closest_strike(contracts, target_strike, "put")
+                new_put = self._find_leap_put(spy, target_strike)
                 if not new_put:
                     # Can't roll, must exit
                     return True
@@ -634,7 +608,7 @@ class LEAPPutLaddersWithState(BaseStrategyWithState):
             # Check if deep ITM - take profit opportunity
             if self._check_deep_itm(position):
                 spy = self.algo.spy
-                current_price = self.algo.Securities[spy].Price
+                current_price = self._get_price(spy)
                 strike = position['put_contract'].ID.StrikePrice
 
                 # Deep ITM with significant profit - Tom King rule for protection ladders
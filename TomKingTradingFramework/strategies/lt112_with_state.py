@@ -4,6 +4,7 @@
 from AlgorithmImports import *
 from strategies.base_strategy_with_state import BaseStrategyWithState
 from core.state_machine import StrategyState, TransitionTrigger
+from risk.margin_engine import MarginLeg, get_margin_engine
 from datetime import time, timedelta
 from typing import Dict, List, Optional
 
@@ -33,6 +34,10 @@ class LT112WithState(BaseStrategyWithState):
         self.put_1_otm = 0.05           # 5% OTM for first put
         self.put_2_otm = 0.10           # 10% OTM for second put
         
+        # VIX band for entry
+        self.min_vix = 12
+        self.max_vix = 35
+        
         # Position tracking
         self.lt112_positions = []
         self.max_positions = self._get_max_positions()
@@ -90,7 +95,7 @@ class LT112WithState(BaseStrategyWithState):
 
         try:
             spy = self.algo.spy
-            current_price = self.algo.Securities[spy].Price
+            current_price = self._get_price(spy)
 
             # Find options with target DTE
             contracts = self._find_target_dte_options(spy)
@@ -224,7 +229,7 @@ class LT112WithState(BaseStrategyWithState):
             
             # Open new position at further strikes
             spy = self.algo.spy
-            current_price = self.algo.Securities[spy].Price
+            current_price = self._get_price(spy)
             
             # Roll to 15% and 20% OTM
             new_put_1_strike = round(current_price * 0.85, 0)
@@ -285,10 +290,10 @@ class LT112WithState(BaseStrategyWithState):
         
         # Check VIX range (not too low, not too high)
         vix = self._get_vix_value()
-        if vix < 12:
+        if vix < self.min_vix:
             self.algo.Debug(f"[LT112] VIX too low ({vix:.2f})")
             return False
-        if vix > 35:
+        if vix > self.max_vix:
             self.algo.Debug(f"[LT112] VIX too high ({vix:.2f})")
             return False
         
@@ -305,17 +310,21 @@ class LT112WithState(BaseStrategyWithState):
     def _check_margin_available(self) -> bool:
         """Check if enough margin for new position"""
         
-        # Estimate margin for 1 put spread
+        # What-if margin of the put spread against the whole book
         spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
-        spread_width = current_price * (self.put_2_otm - self.put_1_otm)
-        
+        current_price = self._get_price(spy)
         contracts = self._calculate_lt112_size()
-        required_margin = spread_width * contracts * 100
-        
-        available_margin = self.algo.Portfolio.MarginRemaining
+        expiry = self.algo.Time + timedelta(days=self.target_dte)
+        proposed = [
+            MarginLeg(str(spy), -contracts, current_price, expiry=expiry, is_call=False,
+                      strike=round(current_price * (1 - self.put_1_otm), 0)),
+            MarginLeg(str(spy), contracts, current_price, expiry=expiry, is_call=False,
+                      strike=round(current_price * (1 - self.put_2_otm), 0))
+        ]
         
-        if required_margin > available_margin * 0.5:  # Use max 50% of available
+        # Use max 50% of available
+        ok, required_margin, _ = get_margin_engine(self.algo).check_margin_available(proposed, 0.5)
+        if not ok:
             self.algo.Debug(f"[LT112] Insufficient margin: need ${required_margin:.0f}")
             return False
         
@@ -423,7 +432,7 @@ class LT112WithState(BaseStrategyWithState):
         
         short_put = position['short_put']
         spy = self.algo.spy
-        current_price = self.algo.Securities[spy].Price
+        current_price = self._get_price(spy)
         
         # Position is tested if price within 5% of short strike
         distance_to_strike = (short_put.ID.StrikePrice - current_price) / current_price
@@ -460,10 +469,7 @@ class LT112WithState(BaseStrategyWithState):
             pnl = position['entry_credit'] - final_value
             
             # Update statistics
-            if pnl > 0:
-                self.wins += 1
-            else:
-                self.losses += 1
+            self._record_closed_trade(pnl, position['entry_credit'])
             
             self.algo.Debug(f"[LT112] Closed position, P&L: ${pnl:.2f}")
             
@@ -474,7 +480,7 @@ class LT112WithState(BaseStrategyWithState):
         """Get current VIX value from UnifiedVIXManager"""
         
         # UnifiedVIXManager is always initialized in main.py
-        return self.algo.vix_manager.get_current_vix()
+        return self._current_vix()
     
     def _can_trade_again_today(self) -> bool:
         """LT112 only enters once per Wednesday"""
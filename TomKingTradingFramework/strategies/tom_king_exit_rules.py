@@ -4,8 +4,68 @@
 from AlgorithmImports import *
 from config.constants import TradingConstants
 from datetime import timedelta
+from typing import Dict, List, Optional
+import numpy as np
 from helpers.timezone_handler import TimezoneHandler
 
+
+class ExitBook:
+    """
+    Column-oriented snapshot of the open position book for batch exit evaluation
+
+    One row per open (multi-leg) position. Marks and credits are per-position
+    totals, DTE is the nearest short-leg expiry, tested_distance is the
+    underlying's fractional distance to the nearest short strike (NaN when not
+    applicable) and strategy_id indexes TomKingExitRules.strategy_names
+    (-1 for strategies without exit rules).
+    """
+
+    __slots__ = ('position_ids', 'strategy_id', 'entry_credit', 'current_value',
+                 'dte', 'tested_distance', 'unrealized_pnl')
+
+    def __init__(self, position_ids: List, strategy_id, entry_credit, current_value,
+                 dte, tested_distance=None, unrealized_pnl=None):
+        count = len(position_ids)
+        self.position_ids = position_ids
+        self.strategy_id = np.asarray(strategy_id, dtype=np.int16)
+        self.entry_credit = np.asarray(entry_credit, dtype=np.float64)
+        self.current_value = np.asarray(current_value, dtype=np.float64)
+        self.dte = np.asarray(dte, dtype=np.int32)
+        self.tested_distance = (np.full(count, np.nan) if tested_distance is None
+                                else np.asarray(tested_distance, dtype=np.float64))
+        self.unrealized_pnl = (np.zeros(count) if unrealized_pnl is None
+                               else np.asarray(unrealized_pnl, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.position_ids)
+
+    @classmethod
+    def from_positions(cls, positions: List[Dict], strategy_index: Dict[str, int]) -> 'ExitBook':
+        """Build from the position dicts accepted by TomKingExitRules.check_exits"""
+
+        count = len(positions)
+        strategy_id = np.empty(count, dtype=np.int16)
+        entry_credit = np.empty(count)
+        current_value = np.empty(count)
+        dte = np.empty(count, dtype=np.int32)
+        tested_distance = np.empty(count)
+        unrealized_pnl = np.empty(count)
+        position_ids = []
+
+        for i, position in enumerate(positions):
+            position_ids.append(position.get('position_id', i))
+            strategy_id[i] = strategy_index.get(position.get('strategy', ''), -1)
+            entry_credit[i] = position.get('entry_credit', 0)
+            current_value[i] = position.get('current_value', 0)
+            dte[i] = position.get('dte', 999)
+            tested = position.get('tested_distance')
+            tested_distance[i] = np.nan if tested is None else tested
+            unrealized_pnl[i] = position.get('unrealized_pnl', 0)
+
+        return cls(position_ids, strategy_id, entry_credit, current_value,
+                   dte, tested_distance, unrealized_pnl)
+
+
 class TomKingExitRules:
     """
     Manages exits for all strategies based on Tom King's rules:
@@ -55,6 +115,53 @@ class TomKingExitRules:
             '0DTE': (15, 0),        # 3:00 PM EST exit
             'defensive': (15, 30)    # 3:30 PM defensive exit
         }
+        
+        # Short strike within 5% of the underlying = tested side (adjust, don't exit)
+        self.tested_side_threshold = 0.05
+        
+        self._build_rule_tables()
+    
+    def _build_rule_tables(self):
+        """
+        Per-strategy rule parameters as arrays indexed by strategy id, for
+        check_exits_batch. The extra trailing row (id -1) is the no-rules strategy.
+        Call again after changing profit_targets/stop_loss_multiples/dte_rules.
+        """
+        self.strategy_names = list(self.profit_targets.keys())
+        for name in list(self.stop_loss_multiples) + list(self.dte_rules):
+            if name not in self.strategy_names:
+                self.strategy_names.append(name)
+        self.strategy_index = {name: i for i, name in enumerate(self.strategy_names)}
+        
+        rows = len(self.strategy_names) + 1
+        self._profit_table = np.full(rows, np.nan)
+        self._stop_table = np.full(rows, np.nan)
+        self._dte_table = np.full(rows, -1, dtype=np.int32)
+        self._roll_table = np.zeros(rows, dtype=bool)
+        self._zero_dte_table = np.zeros(rows, dtype=bool)
+        self._strangle_table = np.zeros(rows, dtype=bool)
+        self._leap_table = np.zeros(rows, dtype=bool)
+        
+        for name, i in self.strategy_index.items():
+            if name in self.profit_targets:
+                self._profit_table[i] = self.profit_targets[name]
+            if self.stop_loss_multiples.get(name) is not None:
+                self._stop_table[i] = self.stop_loss_multiples[name]
+            if name in self.dte_rules:
+                self._dte_table[i] = self.dte_rules[name]
+            self._roll_table[i] = name in ('IPMCC', 'LEAP')
+            self._zero_dte_table[i] = name == '0DTE'
+            self._strangle_table[i] = name in ('Strangle', 'Futures_Strangle')
+            self._leap_table[i] = name == 'LEAP'
+        
+        # Reasons match the per-position checks exactly
+        self._profit_reasons = {name: f"Profit target {target*TradingConstants.FULL_PERCENTAGE:.0f}%"
+                                for name, target in self.profit_targets.items()}
+        self._stop_reasons = {name: f"Stop loss at {multiple}x credit"
+                              for name, multiple in self.stop_loss_multiples.items() if multiple is not None}
+        self._dte_reasons = {name: (f"Roll at {threshold} DTE" if name in ('IPMCC', 'LEAP')
+                                    else f"{TradingConstants.DEFENSIVE_EXIT_DTE} DTE rule")
+                             for name, threshold in self.dte_rules.items()}
     
     def check_exits(self, position) -> tuple:
         """
@@ -229,6 +336,105 @@ class TomKingExitRules:
         
         return (False, None, None)
     
+    def check_exits_batch(self, positions: List[Dict]) -> List[Dict]:
+        """
+        Evaluate every open position in one vectorized pass
+        
+        Accepts the same position dicts as check_exits (plus optional
+        'position_id' and 'tested_distance') and applies the same rules in the
+        same precedence. Returns exit actions for positions that need one:
+        {'position_id', 'index', 'strategy', 'reason', 'action'}.
+        """
+        if not positions:
+            return []
+        return self.evaluate_book(ExitBook.from_positions(positions, self.strategy_index))
+    
+    def evaluate_book(self, book: ExitBook) -> List[Dict]:
+        """Vectorized exit evaluation over an ExitBook - see check_exits_batch"""
+        
+        if len(book) == 0:
+            return []
+        
+        sid = book.strategy_id
+        credit = book.entry_credit
+        mark = book.current_value
+        dte = book.dte
+        has_credit = credit > 0
+        safe_credit = np.where(has_credit, credit, 1.0)
+        
+        # Profit target: (credit - mark) / credit >= target
+        target = self._profit_table[sid]
+        profit_hit = has_credit & ((credit - mark) / safe_credit >= target)
+        
+        # Stop loss: mark >= credit * (1 + multiple)
+        stop_hit = has_credit & (mark >= credit * (1.0 + self._stop_table[sid]))
+        
+        # DTE rule: 0 < dte <= threshold
+        dte_hit = (dte > 0) & (dte <= self._dte_table[sid])
+        
+        # 0DTE time exit - one clock read per batch
+        exit_hour, exit_minute = self.time_exits['0DTE']
+        time_hit = self._zero_dte_table[sid] & self.timezone_handler.is_past_time(exit_hour, exit_minute)
+        
+        # Defensive: scalar market/portfolio conditions evaluated once per batch
+        vix = self.algo.Securities["VIX"].Price if "VIX" in self.algo.Securities else 16
+        loss_pct = (mark - credit) / safe_credit * 100
+        vix_hit = (vix > 30) & self._strangle_table[sid] & has_credit & (loss_pct > 200)
+        
+        correlation_breach = False
+        if hasattr(self.algo, 'correlation_manager'):
+            correlation_breach = bool(self.algo.correlation_manager.check_correlation_breach())
+        correlation_hit = correlation_breach & ~self._leap_table[sid]
+        
+        portfolio = self.algo.Portfolio
+        margin_pressure = portfolio.TotalMarginUsed > portfolio.TotalPortfolioValue * 0.85
+        margin_hit = margin_pressure & (book.unrealized_pnl < 0)
+        
+        # Tested side: adjust rather than exit (only if nothing above fired)
+        tested_hit = book.tested_distance < self.tested_side_threshold
+        
+        # First matching rule wins, same order as check_exits
+        rule = np.select(
+            [profit_hit, stop_hit, dte_hit, time_hit, vix_hit, correlation_hit, margin_hit, tested_hit],
+            [1, 2, 3, 4, 5, 6, 7, 8],
+            default=0
+        )
+        
+        actions = []
+        for i in np.flatnonzero(rule):
+            code = rule[i]
+            strategy = self.strategy_names[sid[i]] if sid[i] >= 0 else None
+            if code == 1:
+                reason, action = self._profit_reasons[strategy], 'close'
+            elif code == 2:
+                reason, action = self._stop_reasons[strategy], 'close'
+            elif code == 3:
+                reason = self._dte_reasons[strategy]
+                action = 'roll' if self._roll_table[sid[i]] else 'close'
+            elif code == 4:
+                reason, action = "3:00 PM ET time exit", 'close'
+            elif code == 5:
+                reason, action = "Defensive VIX exit", 'close'
+            elif code == 6:
+                reason, action = "Correlation breach", 'close'
+            elif code == 7:
+                reason, action = "Margin pressure", 'close'
+            else:
+                reason, action = "Tested side", 'adjust'
+            
+            actions.append({
+                'position_id': book.position_ids[i],
+                'index': int(i),
+                'strategy': strategy,
+                'reason': reason,
+                'action': action
+            })
+        
+        if actions:
+            self.algo.Log(f"[EXIT] Batch: {len(actions)}/{len(book)} positions need action")
+        
+        return actions
+    
     def get_exit_summary(self) -> str:
         """
         Get summary of exit rules for logging
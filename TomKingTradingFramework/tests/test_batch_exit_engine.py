@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Batch Exit Engine Tests
+Differential test: TomKingExitRules.check_exits_batch must return the same
+exit decisions as check_exits applied position by position
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime
+from unittest.mock import Mock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies.tom_king_exit_rules import TomKingExitRules, ExitBook
+
+
+class MockAlgorithm:
+    def __init__(self, vix=18.5, margin_used=50000.0, hour=10):
+        self.Time = datetime(2024, 8, 5, hour, 30)
+        self.LiveMode = False
+        self.Securities = {'VIX': Mock(Price=vix)}
+        self.Portfolio = Mock()
+        self.Portfolio.TotalPortfolioValue = 100000.0
+        self.Portfolio.TotalMarginUsed = margin_used
+
+    def Log(self, message):
+        pass
+
+    def Debug(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def random_book(count, seed):
+    rng = random.Random(seed)
+    strategies = ['0DTE', 'Strangle', 'Futures_Strangle', 'LT112', 'IPMCC', 'LEAP', 'Unknown']
+    positions = []
+    for i in range(count):
+        credit = rng.choice([0.0, rng.uniform(50, 500)])
+        positions.append({
+            'position_id': f"POS_{i}",
+            'strategy': rng.choice(strategies),
+            'entry_credit': credit,
+            'current_value': credit * rng.uniform(0.0, 4.0) if credit else rng.uniform(0, 100),
+            'dte': rng.choice([0, 1, 7, 21, 22, 45, 120, 150, 200, 999]),
+            'unrealized_pnl': rng.uniform(-500, 500)
+        })
+    return positions
+
+
+class TestBatchExitEngine(unittest.TestCase):
+
+    def assert_matches_scalar(self, algo, positions):
+        rules = TomKingExitRules(algo)
+        batch = {a['position_id']: (a['reason'], a['action']) for a in rules.check_exits_batch(positions)}
+
+        for position in positions:
+            should_exit, reason, action = rules.check_exits(position)
+            if should_exit:
+                self.assertEqual(batch.get(position['position_id']), (reason, action), position)
+            else:
+                self.assertNotIn(position['position_id'], batch, position)
+
+    def test_matches_scalar_rules_normal_market(self):
+        self.assert_matches_scalar(MockAlgorithm(), random_book(500, seed=1))
+
+    def test_matches_scalar_rules_defensive_conditions(self):
+        # VIX spike, margin pressure and past the 0DTE time exit
+        self.assert_matches_scalar(MockAlgorithm(vix=35.0, margin_used=90000.0, hour=15), random_book(500, seed=2))
+
+    def test_tested_side_returns_adjust(self):
+        rules = TomKingExitRules(MockAlgorithm())
+        book = ExitBook(['A', 'B'], [rules.strategy_index['Strangle']] * 2,
+                        entry_credit=[100.0, 100.0], current_value=[90.0, 90.0],
+                        dte=[45, 45], tested_distance=[0.03, 0.10])
+        actions = rules.evaluate_book(book)
+        self.assertEqual([(a['position_id'], a['action']) for a in actions], [('A', 'adjust')])
+
+    def test_batch_faster_than_scalar_for_large_book(self):
+        algo = MockAlgorithm()
+        rules = TomKingExitRules(algo)
+        positions = random_book(2000, seed=3)
+
+        start = time.perf_counter()
+        for position in positions:
+            rules.check_exits(position)
+        scalar_s = time.perf_counter() - start
+
+        book = ExitBook.from_positions(positions, rules.strategy_index)
+        start = time.perf_counter()
+        rules.evaluate_book(book)
+        batch_s = time.perf_counter() - start
+
+        self.assertLess(batch_s, scalar_s)
+
+
+if __name__ == '__main__':
+    unittest.main()
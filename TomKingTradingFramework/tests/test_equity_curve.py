@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Equity Curve Tests
+Differential test: the streaming peak, current and maximum drawdown and the
+rolling window highs must equal a brute-force recompute over every sample,
+the ring buffer must keep exactly the latest samples, and DrawdownManager and
+CircuitBreakerPlugin must read one shared curve, and DrawdownManager must
+read open P&L from the position book's running aggregates
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk.equity_curve import EquityCurve, get_equity_curve
+from risk.drawdown_manager import DrawdownManager, DrawdownLevel
+from risk.unified_risk_manager import RiskEventBus
+from risk.plugins.circuit_breaker_plugin import CircuitBreakerPlugin
+from position_state_manager import PositionStateManagerQC
+
+
+class MockAlgorithm:
+    def __init__(self, value=100000.0):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 9, 30)
+        self.Portfolio = SimpleNamespace(TotalPortfolioValue=value)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def brute_force(samples):
+    """(peak, current drawdown, max drawdown) recomputed from the full list"""
+    peak, current, worst = samples[0][1], 0.0, 0.0
+    for _, value in samples:
+        peak = max(peak, value)
+        current = (peak - value) / peak if peak > 0 else 0.0
+        worst = max(worst, current)
+    return peak, current, worst
+
+
+class TestEquityCurve(unittest.TestCase):
+
+    def test_streaming_matches_brute_force(self):
+        rng = random.Random(3)
+        curve = EquityCurve(capacity=64)
+        curve.add_window('hour', timedelta(hours=1))
+        curve.add_window('session', timedelta(days=1))
+
+        samples, session_start = [], 0
+        now, value = datetime(2024, 1, 2, 9, 30), 100000.0
+        for step in range(1500):
+            now += timedelta(minutes=rng.choice([1, 1, 1, 5, 30]))
+            value = max(1.0, value * (1 + rng.gauss(0.0, 0.004)))
+            curve.update(value, now)
+            samples.append((now, value))
+            if rng.random() < 0.01:
+                curve.reset_window('session')
+                session_start = len(samples) - 1
+
+            peak, current, worst = brute_force(samples)
+            self.assertAlmostEqual(curve.peak, peak, places=9, msg=f"step {step}")
+            self.assertAlmostEqual(curve.current_drawdown, current, places=12, msg=f"step {step}")
+            self.assertAlmostEqual(curve.max_drawdown, worst, places=12, msg=f"step {step}")
+
+            hour = max(v for t, v in samples if now - t <= timedelta(hours=1))
+            self.assertEqual(curve.window_high('hour'), hour, f"step {step}")
+            session = max(v for t, v in samples[session_start:] if now - t <= timedelta(days=1))
+            self.assertEqual(curve.window_high('session'), session, f"step {step}")
+
+        self.assertEqual(len(curve), 64)
+        self.assertEqual(curve.samples, 1500)
+        self.assertEqual(list(curve.values()), [v for _, v in samples[-64:]])
+        self.assertEqual(curve.times()[-1], samples[-1][0])
+
+    def test_repeated_sample_is_recorded_once(self):
+        curve = EquityCurve(capacity=8)
+        now = datetime(2024, 1, 2, 10, 0)
+        curve.update(100.0, now)
+        curve.update(100.0, now)
+        curve.update(90.0, now)
+        self.assertEqual(curve.samples, 2)
+        self.assertAlmostEqual(curve.current_drawdown, 0.10)
+
+
+class TestSharedCurve(unittest.TestCase):
+
+    def test_drawdown_manager_and_circuit_breaker_share_one_curve(self):
+        algo = MockAlgorithm()
+        manager = DrawdownManager(algo)
+        breaker = CircuitBreakerPlugin()
+        self.assertTrue(breaker.initialize(algo, RiskEventBus(algo)))
+        curve = get_equity_curve(algo)
+        self.assertIs(manager.equity_curve, curve)
+        self.assertIs(breaker.equity_curve, curve)
+
+        for value in (101000.0, 104000.0, 102000.0):
+            algo.Time += timedelta(minutes=1)
+            algo.Portfolio.TotalPortfolioValue = value
+            manager.update_drawdown()
+        # The breaker sees the high the drawdown manager recorded
+        self.assertEqual(breaker.intraday_high, 104000.0)
+        self.assertEqual(manager.peak_value, 104000.0)
+
+        algo.Time += timedelta(minutes=1)
+        algo.Portfolio.TotalPortfolioValue = 92000.0
+        self.assertEqual(manager.update_drawdown()['level'], DrawdownLevel.WARNING)
+        self.assertEqual(len(manager.drawdown_history), 1)
+        self.assertAlmostEqual(breaker.get_risk_metrics()['intraday_drawdown_pct'], 12000.0 / 104000.0)
+
+        # Next session: the intraday high restarts, the running peak does not
+        algo.Time = datetime(2024, 8, 6, 9, 30)
+        breaker._check_daily_reset()
+        self.assertEqual(breaker.intraday_high, 92000.0)
+        self.assertAlmostEqual(manager.get_drawdown_report()['max_historical'], 12000.0 / 104000.0)
+        self.assertEqual(curve.samples, 6)
+
+
+class TestDrawdownReadsPositionBook(unittest.TestCase):
+
+    def test_emergency_close_and_report_use_book_aggregates(self):
+        algo = MockAlgorithm()
+        algo.Liquidate = lambda symbol, tag="": None
+        algo.position_state_manager = PositionStateManagerQC(algo)
+        psm = algo.position_state_manager
+        manager = DrawdownManager(algo)
+
+        losing = psm.create_ipmcc_position('SPY')
+        psm.add_ipmcc_leap(losing, 'SPY_LEAP', 1, 400.0, datetime(2026, 1, 16))
+        algo.Time += timedelta(minutes=1)
+        winning = psm.create_ipmcc_position('QQQ')
+        psm.add_ipmcc_leap(winning, 'QQQ_LEAP', 1, 350.0, datetime(2026, 1, 16))
+        for position_id, entry_price in ((losing, 2.0), (winning, 5.0)):
+            psm.positions[position_id].components[f"{position_id}_LEAP"].entry_price = entry_price
+        # Long premium cannot lose more than it cost, so mark a loss beyond entry directly
+        leg = psm.positions[losing].components[f"{losing}_LEAP"]
+        psm.book.set_pnl(psm.positions[losing], leg, -250.0)
+        psm.update_component_prices({'QQQ_LEAP': 6.0})
+
+        report = manager.get_drawdown_report()
+        self.assertAlmostEqual(report['open_pnl_by_strategy']['IPMCC'], -250.0 + 100.0)
+
+        self.assertEqual(manager._close_losing_positions(), 1)
+        self.assertNotIn(losing, psm.positions)
+        self.assertIn(winning, psm.positions)
+
+
+def run_benchmark(samples=500000):
+    """Streaming update vs recomputing drawdown over a growing list every sample"""
+    rng = random.Random(1)
+    values = [100000.0]
+    for _ in range(samples - 1):
+        values.append(values[-1] * (1 + rng.gauss(0.0, 0.001)))
+    start = datetime(2020, 1, 2)
+
+    curve = EquityCurve()
+    curve.add_window('intraday', timedelta(days=1))
+    started = time.perf_counter()
+    for i, value in enumerate(values):
+        curve.update(value, start + timedelta(minutes=i))
+    streaming_us = (time.perf_counter() - started) * 1e6 / samples
+
+    history = values[:5000]
+    started = time.perf_counter()
+    for i in range(1, len(history) + 1):
+        brute_force([(None, v) for v in history[:i]])
+    rescan_us = (time.perf_counter() - started) * 1e6 / len(history)
+
+    print(f"{samples:,} samples: streaming {streaming_us:.2f}us/sample "
+          f"(max dd {curve.max_drawdown:.2%}, {len(curve):,} buffered); "
+          f"list rescan {rescan_us:.0f}us/sample at only {len(history):,} samples")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        run_benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+EventBus Loop Detection Tests and Stress Benchmark
+Verifies interned-bitset chain tracking and amortised cleanup in publish_with_loop_detection
+
+Run directly for the benchmark report:
+    python tests/test_event_bus_loop_detection.py --benchmark
+"""
+
+import unittest
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_bus import EventBus, EventType, Event
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 30)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+# Request/response ring - the last hop re-publishes the first (type, source) and must be blocked
+CHAIN_RING = [
+    (EventType.POSITION_SIZE_REQUEST, "strategy"),
+    (EventType.POSITION_SIZE_RESPONSE, "position_sizer"),
+    (EventType.VIX_LEVEL_REQUEST, "position_sizer"),
+    (EventType.VIX_LEVEL_RESPONSE, "vix_manager"),
+    (EventType.MARGIN_REQUIREMENT_REQUEST, "position_sizer"),
+    (EventType.MARGIN_REQUIREMENT_RESPONSE, "margin_manager"),
+    (EventType.GREEKS_CALCULATION_REQUEST, "risk_manager"),
+    (EventType.GREEKS_CALCULATION_RESPONSE, "greeks_service"),
+]
+
+
+def wire_chain_ring(event_bus):
+    """Each hop republishes the next ring entry with its parent event"""
+
+    for index, (event_type, _) in enumerate(CHAIN_RING):
+        next_type, next_source = CHAIN_RING[(index + 1) % len(CHAIN_RING)]
+
+        def handler(event, next_type=next_type, next_source=next_source):
+            event_bus.publish_with_loop_detection(next_type, {'hop': event.hop_count}, next_source,
+                                                  parent_event=event)
+
+        event_bus.subscribe(event_type, handler, source=f"ring_{index}")
+
+
+def run_chain_benchmark(chains: int = 2000):
+    """Publish `chains` deep request/response chains; returns throughput statistics"""
+
+    event_bus = EventBus(MockAlgorithm())
+    wire_chain_ring(event_bus)
+    first_type, first_source = CHAIN_RING[0]
+
+    start = time.perf_counter()
+    for i in range(chains):
+        event_bus.publish_with_loop_detection(first_type, {'request': i}, first_source)
+    elapsed = time.perf_counter() - start
+
+    published = event_bus.stats['events_published']
+    return {
+        'chains': chains,
+        'events_published': published,
+        'loops_prevented': event_bus.stats['circular_loops_prevented'],
+        'elapsed_seconds': elapsed,
+        'events_per_second': published / elapsed if elapsed > 0 else 0.0,
+        'active_chains_after': len(event_bus.active_event_chains)
+    }
+
+
+class TestLoopDetection(unittest.TestCase):
+
+    def test_repeated_type_source_is_blocked(self):
+        root = Event(EventType.VIX_LEVEL_REQUEST, {}, "a")
+        root.add_to_chain(EventType.VIX_LEVEL_REQUEST, "a")
+        root.add_to_chain(EventType.VIX_LEVEL_RESPONSE, "b")
+
+        self.assertTrue(root.would_create_loop(EventType.VIX_LEVEL_REQUEST, "a"))
+        self.assertFalse(root.would_create_loop(EventType.VIX_LEVEL_REQUEST, "c"))
+        self.assertEqual(root.event_chain, [("vix_level_request", "a"), ("vix_level_response", "b")])
+
+    def test_child_chain_does_not_mutate_parent(self):
+        parent = Event(EventType.VIX_LEVEL_REQUEST, {}, "a")
+        parent.add_to_chain(EventType.VIX_LEVEL_REQUEST, "a")
+
+        child = Event(EventType.VIX_LEVEL_RESPONSE, {}, "b")
+        child.inherit_chain(parent)
+        child.add_to_chain(EventType.VIX_LEVEL_RESPONSE, "b")
+
+        self.assertEqual(len(parent.event_chain), 1)
+        self.assertEqual(parent.hop_count, 1)
+        self.assertFalse(parent.would_create_loop(EventType.VIX_LEVEL_RESPONSE, "b"))
+        self.assertTrue(child.would_create_loop(EventType.VIX_LEVEL_RESPONSE, "b"))
+
+    def test_max_hops_enforced(self):
+        event = Event(EventType.POSITION_UPDATED, {}, "s")
+        for i in range(event.max_hops):
+            event.add_to_chain(EventType.POSITION_UPDATED, f"source_{i}")
+        self.assertTrue(event.would_create_loop(EventType.POSITION_UPDATED, "fresh_source"))
+
+    def test_ring_chains_blocked_once_each(self):
+        result = run_chain_benchmark(chains=50)
+
+        # Every chain walks the full ring, then the repeat of the first hop is blocked
+        self.assertEqual(result['loops_prevented'], 50)
+        self.assertEqual(result['active_chains_after'], 0)
+
+    def test_cleanup_is_amortised(self):
+        event_bus = EventBus(MockAlgorithm())
+        calls = []
+        original_cleanup = event_bus._cleanup_stale_chains
+        event_bus._cleanup_stale_chains = lambda: (calls.append(1), original_cleanup())
+
+        for i in range(event_bus.chain_cleanup_interval * 3):
+            event_bus.publish_with_loop_detection(EventType.POSITION_UPDATED, {'i': i}, "s")
+
+        self.assertEqual(len(calls), 3)
+
+    def test_stress_throughput(self):
+        result = run_chain_benchmark(chains=500)
+        self.assertEqual(result['loops_prevented'], 500)
+        self.assertGreater(result['events_per_second'], 0)
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        for chains in (1000, 5000, 20000):
+            stats = run_chain_benchmark(chains)
+            print(f"[BENCH] {stats['chains']} chains: {stats['events_published']} events in "
+                  f"{stats['elapsed_seconds']:.3f}s ({stats['events_per_second']:,.0f} events/s), "
+                  f"{stats['loops_prevented']} loops prevented")
+    else:
+        unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Event Journal Tests
+Verifies binary journal round-trip, segment rotation and deterministic replay,
+and that ObjectStore saves stay bounded by the store's segment size
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_bus import EventBus, EventType
+from core.event_journal import EventJournalCodec, FileSegmentStore, ObjectStoreSegmentStore, EventReplayDriver
+
+
+class MockObjectStore:
+    """Key/value store recording the size of every Save"""
+
+    def __init__(self):
+        self.values = {}
+        self.save_sizes = []
+
+    def ContainsKey(self, key):
+        return key in self.values
+
+    def Read(self, key):
+        return self.values[key]
+
+    def Save(self, key, value):
+        self.values[key] = value
+        self.save_sizes.append(len(value))
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 30)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class TestEventJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.algorithm = MockAlgorithm()
+        self.event_bus = EventBus(self.algorithm)
+        self.journal = self.event_bus.enable_journal(
+            store=FileSegmentStore(self.directory), max_segment_bytes=2048, flush_every=8
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _publish_minutes(self, count):
+        for i in range(count):
+            self.event_bus.publish(EventType.MARKET_DATA_UPDATED,
+                                   {'symbol': 'SPY', 'price': 500.0 + i, 'at': self.algorithm.Time},
+                                   source="market_data")
+            self.algorithm.Time += timedelta(minutes=1)
+
+    def test_round_trip_preserves_event_fields(self):
+        self._publish_minutes(50)
+        records = list(self.journal.read_records())
+
+        self.assertEqual(len(records), 50)
+        self.assertEqual(records[0].event_type, EventType.MARKET_DATA_UPDATED.value)
+        self.assertEqual(records[0].source, "market_data")
+        self.assertEqual(records[0].timestamp, datetime(2024, 8, 5, 10, 30))
+        self.assertEqual(records[49].data['price'], 549.0)
+        self.assertEqual(records[49].data['at'], datetime(2024, 8, 5, 11, 19))
+        self.assertEqual(records[0].correlation_id, self.event_bus.event_history[0].correlation_id)
+
+    def test_segments_rotate_and_are_self_contained(self):
+        self._publish_minutes(200)
+        self.journal.flush()
+        segments = self.journal.store.segments()
+
+        self.assertGreater(len(segments), 1)
+        # Any single segment decodes on its own (per-segment string table)
+        last = list(EventJournalCodec.decode_segment(self.journal.store.read(segments[-1])))
+        self.assertTrue(last)
+        self.assertEqual(last[-1].data['price'], 699.0)
+
+    def test_truncated_tail_is_ignored(self):
+        self._publish_minutes(10)
+        self.journal.flush()
+        blob = self.journal.store.read(self.journal.store.segments()[0])
+
+        self.assertEqual(len(list(EventJournalCodec.decode_segment(blob))), 10)
+        self.assertEqual(len(list(EventJournalCodec.decode_segment(blob[:-3]))), 9)
+
+    def test_replay_through_fresh_bus(self):
+        self._publish_minutes(30)
+        records = list(self.journal.read_records())
+
+        replay_algorithm = MockAlgorithm()
+        replay_bus = EventBus(replay_algorithm)
+        seen = []
+        replay_bus.subscribe(EventType.MARKET_DATA_UPDATED,
+                             lambda e: seen.append((replay_algorithm.Time, e.data['price'], e.correlation_id)),
+                             source="subscriber_under_test")
+
+        result = EventReplayDriver(replay_bus, advance_clock=True).replay(records)
+
+        self.assertEqual(result['events_replayed'], 30)
+        self.assertEqual(result['handler_errors'], 0)
+        self.assertEqual(seen[0], (records[0].timestamp, 500.0, records[0].correlation_id))
+        self.assertEqual([s[1] for s in seen], [r.data['price'] for r in records])
+
+    def test_rerun_with_same_time_replays_both_sessions(self):
+        self._publish_minutes(20)
+        self.journal.close()
+
+        # A rerun of the same backtest starts at the same algorithm Time
+        for session_id in (None, self.journal.session_id):
+            rerun_algorithm = MockAlgorithm()
+            rerun_bus = EventBus(rerun_algorithm)
+            rerun_bus.enable_journal(store=FileSegmentStore(self.directory), max_segment_bytes=2048,
+                                     flush_every=8, session_id=session_id)
+            for i in range(20):
+                rerun_bus.publish(EventType.MARKET_DATA_UPDATED, {'symbol': 'SPY', 'price': 600.0 + i},
+                                  source="market_data")
+            rerun_bus.journal.close()
+
+        store = FileSegmentStore(self.directory)
+        records = [r for name in store.segments() for r in EventJournalCodec.decode_segment(store.read(name))]
+        self.assertEqual(len(records), 60)
+
+        result = EventReplayDriver(EventBus(MockAlgorithm())).replay(records)
+        self.assertEqual(result['events_replayed'], 60)
+
+
+    def test_object_store_saves_bounded_by_segment_size(self):
+        self.algorithm.ObjectStore = MockObjectStore()
+        bus = EventBus(self.algorithm)
+        journal = bus.enable_journal(flush_every=64)
+        self.assertIsInstance(journal.store, ObjectStoreSegmentStore)
+        self.assertEqual(journal.max_segment_bytes, ObjectStoreSegmentStore.MAX_SEGMENT_BYTES)
+
+        for i in range(20000):
+            bus.publish(EventType.MARKET_DATA_UPDATED, {'symbol': 'SPY', 'price': 500.0 + i}, source="market_data")
+        bus.disable_journal()  # as OnEndOfAlgorithm does
+
+        # No save rewrites more than one bounded segment (base64 of MAX_SEGMENT_BYTES)
+        self.assertGreater(len(journal.store.segments()), 1)
+        self.assertLessEqual(max(journal.algo.ObjectStore.save_sizes),
+                             (ObjectStoreSegmentStore.MAX_SEGMENT_BYTES + 2) // 3 * 4)
+
+        reloaded = ObjectStoreSegmentStore(self.algorithm)
+        records = [r for name in reloaded.segments() for r in EventJournalCodec.decode_segment(reloaded.read(name))]
+        self.assertEqual(len(records), 20000)
+        self.assertEqual(records[-1].data['price'], 20499.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+EWMA Correlation Tests
+Differential test: the in-place EWMA covariance must equal the brute-force
+exponentially weighted sum of return outer products, and a synthetic jump in
+cross-asset correlation must walk the spike detector through its regimes and
+reach CorrelationPlugin as CORRELATION_SPIKE risk events, both from direct
+price feeds and from OnData slices with the risk manager's periodic checks
+running off the schedule wheel
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimization.streaming_correlation import EWMACovarianceEstimator, CorrelationSpikeDetector
+from optimization.dynamic_correlation_monitor import DynamicCorrelationMonitor, get_correlation_monitor
+from risk.unified_risk_manager import RiskEventBus, RiskEventType, RiskLevel, UnifiedRiskManager
+from risk.plugins.correlation_plugin import CorrelationPlugin
+from core.event_bus import EventBus
+from core.event_driven_ondata import EventDrivenOnData
+from core.schedule_wheel import ScheduleWheel
+from core.slice_ingestion import SliceIngestor
+
+
+SYMBOLS = ['ES', 'NQ', 'RTY', 'GC', 'CL', 'ZB']
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 1, 9, 30)
+        self.Portfolio = SimpleNamespace(TotalPortfolioValue=100000, Values=[])
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def regime_returns(bars, correlated_from, seed=2):
+    """Independent returns, then a common factor dominates from bar `correlated_from` on"""
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 0.01, (bars, len(SYMBOLS)))
+    factor = rng.normal(0, 0.02, bars)
+    weight = (np.arange(bars) >= correlated_from).astype(float)
+    return noise + (weight * factor)[:, None]
+
+
+class TestEWMACovariance(unittest.TestCase):
+
+    def test_matches_weighted_outer_product_sum(self):
+        returns = regime_returns(120, 60)
+        estimator = EWMACovarianceEstimator((5, 30), min_observations=10, initial_capacity=2)
+        joined_at = {symbol: 15 * (i % 3) for i, symbol in enumerate(SYMBOLS)}
+
+        for bar in range(len(returns)):
+            estimator.update({s: returns[bar, k] for k, s in enumerate(SYMBOLS) if bar >= joined_at[s]})
+
+        columns = [SYMBOLS.index(s) for s in estimator.symbols]
+        for k, half_life in enumerate((5, 30)):
+            decay = 0.5 ** (1.0 / half_life)
+            expected = np.zeros((len(columns), len(columns)))
+            for bar in range(len(returns)):
+                r = np.array([returns[bar, c] if bar >= joined_at[SYMBOLS[c]] else 0.0 for c in columns])
+                expected = decay * expected + (1 - decay) * np.outer(r, r)
+            n = len(columns)
+            np.testing.assert_allclose(estimator.cov[k, :n, :n], expected, atol=1e-15)
+
+            symbols, corr = estimator.correlation_matrix(half_life)
+            std = np.sqrt(np.diag(expected))
+            np.testing.assert_allclose(corr, expected / np.outer(std, std), atol=1e-9)
+            self.assertAlmostEqual(estimator.correlation(symbols[0], symbols[1], half_life), corr[0, 1], places=9)
+
+        self.assertGreaterEqual(estimator.capacity, len(SYMBOLS))
+
+    def test_symbols_not_ready_are_excluded(self):
+        estimator = EWMACovarianceEstimator((10,), min_observations=5)
+        for bar in range(4):
+            estimator.update({'ES': 0.01 * (-1) ** bar, 'NQ': 0.012 * (-1) ** bar})
+        self.assertIsNone(estimator.average_correlation())
+        estimator.update({'ES': 0.01, 'NQ': 0.012})
+        self.assertAlmostEqual(estimator.average_correlation(), 1.0, places=6)
+        self.assertIsNone(estimator.correlation('ES', 'GC'))
+
+    def test_missing_symbol_is_skipped_not_zero(self):
+        returns = regime_returns(80, 0)
+        masked = EWMACovarianceEstimator((5,), min_observations=5)
+        for bar in range(len(returns)):
+            bar_returns = {s: returns[bar, k] for k, s in enumerate(SYMBOLS)}
+            if bar % 4 == 3:
+                del bar_returns['GC']  # GC has no price this bar
+            masked.update(bar_returns)
+
+        # Reference: each pair decays only over the bars where both symbols were observed
+        decay = 0.5 ** (1.0 / 5)
+        expected = np.zeros((len(SYMBOLS), len(SYMBOLS)))
+        for bar in range(len(returns)):
+            present = [k for k, s in enumerate(SYMBOLS) if not (s == 'GC' and bar % 4 == 3)]
+            block = np.ix_(present, present)
+            expected[block] = decay * expected[block] + (1 - decay) * np.outer(returns[bar, present], returns[bar, present])
+        np.testing.assert_allclose(masked.cov[0, :len(SYMBOLS), :len(SYMBOLS)], expected, atol=1e-15)
+        self.assertEqual(masked.observations[masked.slot_by_symbol['GC']], 60)
+
+
+class TestCorrelationSpikeDetector(unittest.TestCase):
+
+    def test_regimes_with_hysteresis(self):
+        detector = CorrelationSpikeDetector(0.6, 0.8, hysteresis=0.05)
+        path = [0.3, 0.62, 0.58, 0.81, 0.77, 0.74, 0.56, 0.54]
+        transitions = [detector.update(value) for value in path]
+        self.assertEqual(transitions, [
+            None, ('NORMAL', 'ELEVATED'), None, ('ELEVATED', 'SPIKE'), None,
+            ('SPIKE', 'ELEVATED'), None, ('ELEVATED', 'NORMAL')])
+        self.assertEqual(detector.transitions, 4)
+        self.assertIsNone(detector.update(None))
+
+
+class TestCorrelationSpikeEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.returns = regime_returns(160, 80)
+        self.prices = 100.0 * np.cumprod(1.0 + self.returns, axis=0)
+
+    def _feed(self, consumer):
+        for bar in range(len(self.prices)):
+            self.algo.Time += timedelta(minutes=1)
+            for k, symbol in enumerate(SYMBOLS):
+                consumer(symbol, self.prices[bar, k])
+
+    def test_monitor_notifies_listeners_on_spike(self):
+        monitor = DynamicCorrelationMonitor(self.algo)
+        spikes = []
+        monitor.add_spike_listener(spikes.append)
+        self._feed(monitor.update_price_data)
+
+        regimes = [spike['new_regime'] for spike in spikes]
+        self.assertIn('SPIKE', regimes)
+        self.assertEqual(monitor.spike_detector.regime, 'SPIKE')
+        # Nothing before the factor switches on at bar 80
+        self.assertGreater(spikes[0]['timestamp'], datetime(2024, 8, 1, 9, 30) + timedelta(minutes=80))
+        self.assertGreaterEqual(spikes[-1]['average_correlation'], 0.8)
+
+    def test_equity_convergence_spikes_while_vix_is_tracked(self):
+        rng = np.random.default_rng(8)
+        symbols = ['ES', 'NQ', 'SPY', 'QQQ', 'VIX']
+        factor = rng.normal(0, 0.02, 160) * (np.arange(160) >= 80)
+        returns = rng.normal(0, 0.01, (160, len(symbols))) + factor[:, None]
+        returns[:, -1] = rng.normal(0, 0.01, 160) - 3 * factor  # VIX jumps as equities sell off together
+        prices = 100.0 * np.cumprod(1.0 + returns, axis=0)
+
+        monitors = {'equities': DynamicCorrelationMonitor(self.algo), 'everything': DynamicCorrelationMonitor(self.algo)}
+        monitors['everything'].spike_universe = None
+        for bar in range(len(prices)):
+            self.algo.Time += timedelta(minutes=1)
+            for monitor in monitors.values():
+                monitor.update_prices(dict(zip(symbols, prices[bar])))
+
+        self.assertEqual(monitors['equities']._spike_symbol_list(), ['ES', 'NQ', 'SPY', 'QQQ'])
+        self.assertEqual(monitors['equities'].spike_detector.regime, 'SPIKE')
+        # Averaging VIX in with the equities hides the convergence
+        self.assertEqual(monitors['everything'].spike_detector.regime, 'NORMAL')
+
+    def test_plugin_emits_correlation_spike_events(self):
+        bus = RiskEventBus(self.algo)
+        received = []
+        bus.subscribe(RiskEventType.CORRELATION_SPIKE, received.append)
+        plugin = CorrelationPlugin()
+        self.assertTrue(plugin.initialize(self.algo, bus))
+        self.assertIs(plugin.correlation_monitor, get_correlation_monitor(self.algo))
+
+        plugin.periodic_check()
+        self.assertFalse(plugin._needs_sync)
+        self._feed(lambda symbol, price: plugin.on_market_data(symbol, SimpleNamespace(Price=price)))
+
+        self.assertEqual(plugin.correlation_regime, 'SPIKE')
+        self.assertTrue(plugin._needs_sync)
+        self.assertEqual(received[-1].level, RiskLevel.CRITICAL)
+        self.assertEqual(received[-1].data['new_regime'], 'SPIKE')
+
+        # The A1 limit tightens while observed correlation is in the SPIKE regime
+        plugin.on_position_opened('ES', 1, 5000.0)
+        plugin.on_position_opened('NQ', 1, 18000.0)
+        can_open, reason = plugin.can_open_position('RTY', 1)
+        self.assertFalse(can_open)
+        self.assertIn('A1', reason)
+
+    def test_ondata_slices_drive_spike_and_scheduled_checks(self):
+        self.algo.IsWarmingUp = False
+        manager = UnifiedRiskManager(self.algo)
+        self.algo.unified_risk_manager = manager
+        plugin = CorrelationPlugin()
+        self.assertTrue(manager.register_plugin(plugin))
+        received = []
+        manager.event_bus.subscribe(RiskEventType.CORRELATION_SPIKE, received.append)
+        wheel = ScheduleWheel(self.algo)
+        manager.register_scheduled_jobs(wheel)
+        optimizer = SimpleNamespace(slice_ingestor=SliceIngestor(self.algo),
+                                    optimize_ondata_performance=lambda data: {'optimizations': []})
+        ondata = EventDrivenOnData(self.algo, EventBus(self.algo), optimizer)
+        ondata.performance_log_interval = timedelta(days=1)
+
+        fired = []
+        for bar in range(len(self.prices)):
+            self.algo.Time += timedelta(minutes=1)
+            bars = {symbol: SimpleNamespace(Open=price, Close=price, Volume=0)
+                    for symbol, price in zip(SYMBOLS, self.prices[bar])}
+            ondata.process_ondata(SimpleNamespace(Time=self.algo.Time, Bars=bars, QuoteBars={}, Ticks={}))
+            fired.extend(wheel.tick())  # OnData's finally block
+
+        self.assertEqual(plugin.correlation_regime, 'SPIKE')
+        self.assertEqual(received[-1].data['new_regime'], 'SPIKE')
+        self.assertEqual(fired.count('risk_periodic_checks'), len(self.prices) // 5)
+        self.assertFalse(plugin._needs_sync)  # the scheduled check reconciled after the regime change
+
+        manager.on_position_opened('ES', 1, 5000.0)
+        manager.on_position_opened('NQ', 1, 18000.0)
+        allowed, reason = manager.can_open_position('RTY', 1)
+        self.assertFalse(allowed)
+        self.assertIn('A1', reason)
+
+
+if __name__ == '__main__':
+    unittest.main()
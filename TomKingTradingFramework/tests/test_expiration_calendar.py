@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Expiration Calendar Tests
+Differential test: band and closest-strike queries on the ExpirationCalendar
+must match the linear chain scans the LEAP ladder and IPMCC strategies used,
+and FixedIPMCCExecution must open and extend positions through it
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, date
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlgorithmImports import OptionRight
+from helpers.expiration_calendar import ExpirationCalendar, ExpiryClass, get_expiration_calendar
+from strategies.ipmcc_execution_manager import FixedIPMCCExecution
+
+
+class MockID:
+    def __init__(self, expiry, strike, right):
+        self.Date = expiry
+        self.StrikePrice = strike
+        self.OptionRight = right
+
+
+class MockSymbol:
+    def __init__(self, expiry, strike, right):
+        self.ID = MockID(expiry, strike, right)
+
+
+class MockChainProvider:
+    def __init__(self, contracts):
+        self.contracts = contracts
+        self.calls = 0
+
+    def GetOptionContractList(self, symbol, time):
+        self.calls += 1
+        return self.contracts
+
+
+class MockAlgorithm:
+    def __init__(self, contracts, now=datetime(2024, 8, 5, 10, 30)):
+        self.LiveMode = False
+        self.Time = now
+        self.OptionChainProvider = MockChainProvider(contracts)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def third_friday(year, month):
+    first = date(year, month, 1)
+    return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+
+def synthetic_chain(start=date(2024, 8, 5), holiday=date(2024, 8, 30)):
+    """Weeklies for 10 weeks, monthlies for 30 months; a Friday holiday shifts that weekly to Thursday"""
+
+    expiries = set()
+    friday = start + timedelta(days=(4 - start.weekday()) % 7)
+    for week in range(10):
+        day = friday + timedelta(weeks=week)
+        expiries.add(day - timedelta(days=1) if day == holiday else day)
+    for offset in range(30):
+        year, month = start.year + (start.month - 1 + offset) // 12, (start.month - 1 + offset) % 12 + 1
+        expiries.add(third_friday(year, month))
+
+    contracts = []
+    for expiry in expiries:
+        for strike in range(300, 701, 5):
+            for right in (OptionRight.Put, OptionRight.Call):
+                contracts.append(MockSymbol(datetime(expiry.year, expiry.month, expiry.day), float(strike), right))
+    return contracts
+
+
+def linear_band(contracts, now, min_dte, max_dte, right=None):
+    return [c for c in contracts
+            if now + timedelta(days=min_dte) <= c.ID.Date <= now + timedelta(days=max_dte)
+            and (right is None or c.ID.OptionRight == right)]
+
+
+class TestExpirationCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.contracts = synthetic_chain()
+        self.algo = MockAlgorithm(self.contracts)
+        self.calendar = ExpirationCalendar(self.algo)
+
+    def test_band_queries_match_linear_scan(self):
+        for min_dte, max_dte, right in ((365, 730, None), (365, 730, OptionRight.Call),
+                                        (7, 14, OptionRight.Call), (30, 45, None), (0, 0, None)):
+            expected = linear_band(self.contracts, self.algo.Time, min_dte, max_dte, right)
+            actual = self.calendar.contracts_in_band('SPY', min_dte, max_dte, right)
+            self.assertEqual(set(map(id, actual)), set(map(id, expected)), (min_dte, max_dte, right))
+
+    def test_closest_contract_matches_linear_scan(self):
+        for target in (371.0, 412.5, 455.0, 499.9, 640.0):
+            band = linear_band(self.contracts, self.algo.Time, 365, 730, OptionRight.Put)
+            best_distance = min(abs(c.ID.StrikePrice - target) for c in band)
+            found = self.calendar.closest_contract('SPY', OptionRight.Put, target, 365, 730)
+            self.assertEqual(abs(found.ID.StrikePrice - target), best_distance)
+            self.assertEqual(found.ID.OptionRight, OptionRight.Put)
+            self.assertEqual(found.ID.Date, min(c.ID.Date for c in band))
+
+    def test_nearest_expiry_and_classification(self):
+        expiry = self.calendar.nearest_expiry('SPY', 45, min_dte=30, max_dte=60)
+        self.assertEqual(expiry, datetime(2024, 9, 20))
+        self.assertEqual(self.calendar.classify('SPY', expiry), ExpiryClass.MONTHLY)
+        self.assertEqual(self.calendar.classify('SPY', datetime(2024, 8, 9)), ExpiryClass.WEEKLY)
+        self.assertEqual(self.calendar.classify('SPY', datetime(2025, 12, 19)), ExpiryClass.LEAP)
+        self.assertEqual(self.calendar.listing_date('SPY', expiry), date(2024, 8, 5))
+
+    def test_next_weekly_expiry_uses_listed_holiday_thursday(self):
+        self.assertEqual(self.calendar.next_weekly_expiry('SPY'), datetime(2024, 8, 9))
+
+        self.algo.Time = datetime(2024, 8, 26, 10, 0)
+        self.assertEqual(self.calendar.next_weekly_expiry('SPY'), datetime(2024, 8, 29))
+
+        # After Friday's close the following week is next; no chain falls back to the calendar
+        self.algo.Time = datetime(2024, 8, 9, 16, 30)
+        self.assertEqual(self.calendar.next_weekly_expiry('SPY'), datetime(2024, 8, 16))
+        self.assertEqual(self.calendar.next_weekly_expiry().date(), date(2024, 8, 16))
+
+    def test_index_refreshed_once_per_day(self):
+        for _ in range(50):
+            self.calendar.contracts_in_band('SPY', 365, 730)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 1)
+
+        self.algo.Time += timedelta(days=1)
+        self.calendar.contracts_in_band('SPY', 365, 730)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 2)
+        self.assertEqual(self.calendar.listing_date('SPY', datetime(2024, 9, 20)), date(2024, 8, 5))
+
+    def test_shared_calendar_attached_to_algorithm(self):
+        calendar = get_expiration_calendar(self.algo)
+        self.assertIs(get_expiration_calendar(self.algo), calendar)
+        self.assertIs(self.algo.expiration_calendar, calendar)
+
+
+class RecordingPositionStateManager:
+    """Records the IPMCC components FixedIPMCCExecution books"""
+
+    def __init__(self):
+        self.leap = None
+        self.components = []
+
+    def has_active_leap(self, symbol):
+        return self.leap
+
+    def create_ipmcc_position(self, symbol):
+        return f"IPMCC_{symbol}"
+
+    def add_ipmcc_leap(self, position_id, leap_contract, quantity, strike, expiry):
+        self.components.append(('LEAP', position_id, quantity, strike))
+        self.leap = type('Leap', (), {'strike': strike, 'quantity': quantity})()
+        return f"{position_id}_LEAP"
+
+    def add_ipmcc_weekly_call(self, symbol, weekly_contract, quantity, strike, expiry):
+        self.components.append(('WEEKLY', symbol, quantity, strike))
+        return f"IPMCC_{symbol}_WEEKLY"
+
+
+class TestFixedIPMCCExecution(unittest.TestCase):
+
+    def test_new_position_then_weekly_against_existing_leap(self):
+        algo = MockAlgorithm(synthetic_chain())
+        algo.Securities = {'SPY': type('Security', (), {'Price': 500.0})()}
+        algo.orders = []
+        algo.AddOptionContract = lambda contract: None
+        algo.MarketOrder = lambda contract, quantity: algo.orders.append((contract, quantity)) or True
+        psm = RecordingPositionStateManager()
+        execution = FixedIPMCCExecution(algo, psm)
+
+        self.assertEqual(execution.execute_ipmcc_strategy('SPY', 100000.0),
+                         (True, "New IPMCC position created successfully"))
+        (leap, bought), (weekly, sold) = algo.orders
+        self.assertGreaterEqual((leap.ID.Date - algo.Time).days, 300)
+        self.assertEqual(leap.ID.StrikePrice, 410.0)  # closest to 82% of spot
+        self.assertEqual(weekly.ID.Date, datetime(2024, 8, 9))
+        self.assertEqual((bought, sold), (psm.leap.quantity, -psm.leap.quantity))
+
+        # Second run finds the LEAP and only sells another weekly against it
+        self.assertEqual(execution.execute_ipmcc_strategy('SPY', 100000.0),
+                         (True, "Weekly call added to existing IPMCC position"))
+        self.assertEqual([kind for kind, *_ in psm.components], ['LEAP', 'WEEKLY', 'WEEKLY'])
+        self.assertEqual(len(algo.orders), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
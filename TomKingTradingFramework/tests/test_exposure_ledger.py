@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Exposure Ledger Tests
+Differential test: the running per-group totals in ExposureLedger must equal a
+brute-force recompute over the open lots after random opens, closes, external
+fills, resizes and reconciliations, and the Concentration/Correlation plugins
+must see each fill exactly once when UnifiedRiskManager feeds the shared ledger
+"""
+
+import unittest
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from AlgorithmImports import OrderStatus
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk.exposure_ledger import ExposureLedger, get_exposure_ledger
+from risk.unified_risk_manager import UnifiedRiskManager, RiskEventBus
+from risk.plugins.concentration_plugin import ConcentrationPlugin
+from risk.plugins.correlation_plugin import CorrelationPlugin
+
+
+SYMBOLS = ['SPY', 'QQQ', 'IWM', 'ES', 'NQ', 'GC', 'CL', 'XYZ']
+STRATEGIES = ['0DTE', 'LT112', 'IPMCC', 'FuturesStrangle']
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.holdings = {}  # symbol -> quantity
+        self.Portfolio = SimpleNamespace(TotalPortfolioValue=100000.0, TotalMarginUsed=0.0)
+
+    def sync_portfolio(self):
+        self.Portfolio.Values = [SimpleNamespace(Symbol=symbol, Invested=True, Quantity=quantity, AveragePrice=10.0)
+                                 for symbol, quantity in self.holdings.items()]
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        raise AssertionError(message)
+
+
+class IndexedPortfolio(SimpleNamespace):
+    """Portfolio[symbol] holdings, created flat on first access"""
+
+    def __getitem__(self, symbol):
+        holdings = self.__dict__.setdefault('holdings', {})
+        return holdings.setdefault(symbol, SimpleNamespace(Quantity=0, LastTradeProfit=0.0))
+
+
+def brute_force_totals(lots, classify, measure):
+    """group -> (count, |delta| sum, |notional| sum, strategies) recomputed from every open lot"""
+    totals = {}
+    for strategy, symbol, quantity, price in lots:
+        group = classify(symbol)
+        if group is None:
+            continue
+        delta, notional = measure(symbol, quantity, price) if measure else (0.0, 0.0)
+        count, delta_sum, notional_sum, strategies = totals.get(group, (0, 0.0, 0.0, set()))
+        totals[group] = (count + 1, delta_sum + abs(delta), notional_sum + abs(notional), strategies | {strategy})
+    return totals
+
+
+def rescale(lots, symbol, quantity):
+    """The symbol's lots re-measured for a new total quantity, as ExposureLedger.resize does"""
+    mine = [lot for lot in lots if lot[1] == symbol]
+    total = sum(lot[2] for lot in mine)
+    return [(strategy, sym, (q * quantity / total if total else quantity / len(mine)) if sym == symbol else q, price)
+            for strategy, sym, q, price in lots]
+
+
+class TestExposureLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.algo.sync_portfolio()
+        bus = RiskEventBus(self.algo)
+        self.concentration = ConcentrationPlugin()
+        self.correlation = CorrelationPlugin()
+        self.assertTrue(self.concentration.initialize(self.algo, bus))
+        self.assertTrue(self.correlation.initialize(self.algo, bus))
+        self.ledger = get_exposure_ledger(self.algo)
+
+    def assert_matches_brute_force(self, lots, step):
+        schemes = {
+            'concentration': (self.concentration._get_concentration_group, self.concentration._measure_position),
+            'correlation': (self.correlation._get_correlation_group, None),
+        }
+        for scheme, (classify, measure) in schemes.items():
+            expected = brute_force_totals(lots, classify, measure)
+            self.assertEqual(set(self.ledger.totals[scheme]), set(expected), f"step {step} {scheme}")
+            for group, (count, delta, notional, strategies) in expected.items():
+                exposure = self.ledger.group(scheme, group)
+                self.assertEqual(exposure.count, count, f"step {step} {scheme}/{group}")
+                self.assertAlmostEqual(exposure.delta, delta, places=6)
+                self.assertAlmostEqual(exposure.notional, notional, places=6)
+                self.assertEqual(set(exposure.strategies), strategies, f"step {step} {scheme}/{group}")
+
+    def test_running_totals_match_brute_force(self):
+        rng = random.Random(11)
+        lots = []  # (strategy, symbol, quantity, price), oldest first
+
+        for step in range(1500):
+            roll = rng.random()
+            if roll < 0.45:
+                strategy, symbol = rng.choice(STRATEGIES), rng.choice(SYMBOLS)
+                quantity, price = rng.choice([-3, -1, 1, 2, 5, 100]), round(rng.uniform(1, 500), 2)
+                self.concentration.on_position_opened(symbol, quantity, price, {'strategy_name': strategy})
+                self.correlation.on_position_opened(symbol, quantity, price, {'strategy_name': strategy})
+                lots.append((strategy, symbol, quantity, price))
+                self.algo.holdings[symbol] = (self.algo.holdings.get(symbol, 0) + quantity) or 1
+            elif roll < 0.80 and lots:
+                strategy, symbol, _, _ = lots[rng.randrange(len(lots))]
+                holders = {lot[0] for lot in lots if lot[1] == symbol}
+                # Strategy-less closes only where the retired lot is unambiguous
+                context = None if len(holders) == 1 and rng.random() < 0.3 else {'strategy_name': strategy}
+                self.concentration.on_position_closed(symbol, 1, 1.0, 0.0, context)
+                self.correlation.on_position_closed(symbol, 1, 1.0, 0.0, context)
+                lots.remove(next(lot for lot in lots if lot[:2] == (strategy, symbol)))
+                if not any(lot[1] == symbol for lot in lots) and rng.random() < 0.8:
+                    self.algo.holdings.pop(symbol, None)
+            elif roll < 0.88:
+                # Fill the ledger never saw, or a liquidation outside the strategies
+                symbol = rng.choice(SYMBOLS)
+                if symbol in self.algo.holdings and rng.random() < 0.5:
+                    del self.algo.holdings[symbol]
+                else:
+                    self.algo.holdings[symbol] = rng.choice([1, 2, -4])
+            else:
+                self.algo.Time += timedelta(minutes=20)
+                self.algo.sync_portfolio()
+                self.correlation.periodic_check()
+                self.concentration.periodic_check()
+                held = self.algo.holdings
+                lots = [lot for lot in lots if lot[1] in held]
+                known = {lot[1] for lot in lots}
+                for symbol in known:
+                    if abs(sum(lot[2] for lot in lots if lot[1] == symbol) - held[symbol]) > 1e-9:
+                        lots = rescale(lots, symbol, held[symbol])
+                lots += [(ExposureLedger.UNKNOWN_STRATEGY, symbol, quantity, 10.0)
+                         for symbol, quantity in held.items() if symbol not in known]
+
+            self.assert_matches_brute_force(lots, step)
+
+        stats = self.ledger.get_statistics()
+        self.assertEqual(stats['open_lots'], len(lots))
+        self.assertGreater(stats['reconcile_added'], 0)
+        self.assertGreater(stats['reconcile_removed'], 0)
+        self.assertGreater(stats['reconcile_resized'], 0)
+
+    def test_close_falls_back_to_other_strategy_and_reconcile_is_rate_limited(self):
+        self.ledger.open('SPY', 1, 400.0, 'LT112')
+        self.assertTrue(self.ledger.close('SPY', 'IPMCC'))
+        self.assertEqual(self.ledger.count('correlation', 'A2'), 0)
+        self.assertFalse(self.ledger.close('SPY'))
+
+        self.algo.holdings = {'QQQ': 1}
+        self.algo.sync_portfolio()
+        self.assertEqual(self.ledger.reconcile()['added'], ['QQQ'])
+        self.algo.holdings = {'IWM': 1}
+        self.algo.sync_portfolio()
+        # Same held count per fills, inside the interval: no Portfolio scan
+        self.assertEqual(self.ledger.reconcile(), {'removed': [], 'added': [], 'resized': []})
+        self.ledger.mark_stale()
+        self.assertEqual(self.ledger.reconcile(), {'removed': ['QQQ'], 'added': ['IWM'], 'resized': []})
+
+        # A fill taking a symbol flat is reconciled inside the interval
+        self.algo.Time += timedelta(minutes=1)
+        self.algo.holdings = {}
+        self.algo.sync_portfolio()
+        self.ledger.note_fill(1, 0)
+        self.assertEqual(self.ledger.reconcile()['removed'], ['IWM'])
+
+    def test_reconcile_remeasures_resized_holdings(self):
+        self.ledger.open('SPY', 100, 450.0, 'IPMCC')
+        self.ledger.open('SPY', 100, 452.0, 'LT112')
+        self.algo.holdings = {'SPY': 300}
+        self.algo.sync_portfolio()
+        self.assertEqual(self.ledger.reconcile(force=True), {'removed': [], 'added': [], 'resized': ['SPY']})
+        self.assertAlmostEqual(self.ledger.lot_quantity('SPY'), 300.0)
+        self.assertEqual(self.ledger.count('concentration', 'SPY_EQUIVALENT'), 2)
+        self.assertAlmostEqual(self.ledger.notional('concentration', 'SPY_EQUIVALENT'), 150 * 450.0 + 150 * 452.0)
+        self.assert_matches_brute_force([('IPMCC', 'SPY', 150.0, 450.0), ('LT112', 'SPY', 150.0, 452.0)], 'resize')
+
+
+class TestLedgerWithRiskManager(unittest.TestCase):
+
+    def test_resize_fill_remeasures_lot(self):
+        algo = MockAlgorithm()
+        algo.Portfolio = IndexedPortfolio(TotalPortfolioValue=100000.0, TotalMarginUsed=0.0, Values=[])
+        manager = UnifiedRiskManager(algo)
+        concentration = ConcentrationPlugin()
+        self.assertTrue(manager.register_plugin(concentration))
+        ledger = algo.exposure_ledger
+
+        def fill(quantity, price):
+            algo.Portfolio['SPY'].Quantity += quantity
+            manager.on_order_event(SimpleNamespace(Status=OrderStatus.Filled, Symbol='SPY', OrderId=1,
+                                                   FillQuantity=quantity, FillPrice=price))
+
+        fill(100, 450.0)
+        opened_delta = ledger.delta('concentration', 'SPY_EQUIVALENT')
+        fill(200, 455.0)  # same lot, three times the size
+        self.assertEqual(ledger.count('concentration', 'SPY_EQUIVALENT'), 1)
+        self.assertAlmostEqual(ledger.delta('concentration', 'SPY_EQUIVALENT'), 3 * opened_delta)
+        self.assertAlmostEqual(ledger.notional('concentration', 'SPY_EQUIVALENT'), 300 * 450.0)
+        fill(-250, 460.0)
+        self.assertAlmostEqual(ledger.delta('concentration', 'SPY_EQUIVALENT'), 0.5 * opened_delta)
+        self.assertEqual(ledger.lot_quantity('SPY'), 50)
+
+    def test_plugins_see_each_fill_once(self):
+        algo = MockAlgorithm()
+        algo.sync_portfolio()
+        manager = UnifiedRiskManager(algo)
+        concentration, correlation = ConcentrationPlugin(), CorrelationPlugin()
+        self.assertTrue(manager.register_plugin(concentration))
+        self.assertTrue(manager.register_plugin(correlation))
+        ledger = algo.exposure_ledger
+        self.assertTrue(ledger.is_writer(manager))
+
+        # B1 (safe haven) allows two positions at this account size
+        self.assertTrue(manager.can_open_position('GC', 1)[0])
+        manager.on_position_opened('GC', 1, 2400.0, {'strategy_name': 'FuturesStrangle'})
+        self.assertTrue(manager.can_open_position('GC', 1)[0])
+        manager.on_position_opened('GC', 1, 2410.0, {'strategy_name': 'FuturesStrangle'})
+        allowed, reason = manager.can_open_position('GC', 1)
+        self.assertFalse(allowed)
+        self.assertIn('2/2', reason)
+
+        manager.on_position_opened('SPY', 100, 450.0, {'strategy_name': 'IPMCC'})
+        self.assertEqual(ledger.count('correlation', 'B1'), 2)
+        self.assertEqual(ledger.count('concentration', 'SPY_EQUIVALENT'), 1)
+        self.assertAlmostEqual(concentration.group_exposures['SPY_EQUIVALENT'], 1.0)
+        self.assertEqual(concentration.group_strategy_counts['SPY_EQUIVALENT'], 1)
+        self.assertEqual(correlation.get_risk_metrics()['positions_by_group'], {'B1': 2, 'A2': 1})
+
+        manager.on_position_closed('GC', 1, 2420.0, 20.0, {'strategy_name': 'FuturesStrangle'})
+        self.assertTrue(manager.can_open_position('GC', 1)[0])
+        self.assertEqual(correlation.active_positions_by_group, {'B1': ['GC'], 'A2': ['SPY']})
+
+    def test_order_fills_open_and_close_positions(self):
+        algo = MockAlgorithm()
+        algo.Portfolio = IndexedPortfolio(TotalPortfolioValue=100000.0, TotalMarginUsed=0.0, Values=[])
+        manager = UnifiedRiskManager(algo)
+        correlation = CorrelationPlugin()
+        self.assertTrue(manager.register_plugin(correlation))
+        ledger = algo.exposure_ledger
+
+        def fill(symbol, quantity, price, profit=0.0):
+            holding = algo.Portfolio[symbol]
+            holding.Quantity += quantity  # LEAN updates holdings before OnOrderEvent
+            holding.LastTradeProfit = profit
+            manager.on_order_event(SimpleNamespace(Status=OrderStatus.Filled, Symbol=symbol, OrderId=1,
+                                                   FillQuantity=quantity, FillPrice=price))
+
+        # Two GC fills in the same slice: the second order sees the first fill
+        self.assertTrue(manager.can_open_position('GC', 1)[0])
+        fill('GC', 1, 2400.0)
+        self.assertEqual(ledger.count('correlation', 'B1'), 1)
+        fill('GLD', 10, 220.0)
+        self.assertFalse(manager.can_open_position('GC', 1)[0])
+
+        fill('GC', 1, 2405.0)  # resizing a held position is not a new position
+        self.assertEqual(ledger.count('correlation', 'B1'), 2)
+        self.assertEqual((ledger.lot_quantity('GC'), ledger.stats['resizes']), (2, 1))
+        fill('GC', -2, 2420.0, profit=40.0)
+        self.assertEqual(ledger.count('correlation', 'B1'), 1)
+        self.assertTrue(manager.can_open_position('GC', 1)[0])
+        fill('GLD', -10, 218.0, profit=-20.0)
+        self.assertEqual(ledger.count('correlation', 'B1'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Futures Option Chain Store Tests
+Validates that futures-option chains are fetched once per contract month and
+refreshed only on a roll or a newly listed expiry, with query results matching
+the linear chain scans FuturesStrangleWithState used
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlgorithmImports import OptionRight, SecurityType
+from helpers.futures_option_chain_store import FuturesOptionChainStore, get_futures_option_chain_store
+from helpers.future_options_manager import FutureOptionsManager, FutureOptionStatus
+from trading.futures_manager import FuturesManager
+
+
+class MockSymbol:
+    def __init__(self, ticker, expiry=None, strike=None, right=None, underlying=None,
+                 security_type=SecurityType.Future):
+        self.ID = SimpleNamespace(Symbol=ticker, Date=expiry, StrikePrice=strike, OptionRight=right)
+        self.Underlying = underlying
+        self.SecurityType = security_type
+
+    def __repr__(self):
+        return f"{self.ID.Symbol} {self.ID.Date:%Y%m%d}" if self.ID.Date else self.ID.Symbol
+
+
+def option_chain(future_contract, expiries, strikes=range(4800, 5601, 25)):
+    return [MockSymbol('ES', expiry, float(strike), right, future_contract, SecurityType.FutureOption)
+            for expiry in expiries for strike in strikes for right in (OptionRight.Put, OptionRight.Call)]
+
+
+class MockChainProvider:
+    def __init__(self):
+        self.chains = {}
+        self.calls = 0
+
+    def GetOptionContractList(self, symbol, time):
+        self.calls += 1
+        return self.chains.get(symbol, [])
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.Securities = {}
+        self.OptionChainProvider = MockChainProvider()
+        self.future_options_added = []
+
+    def AddFutureOption(self, future_symbol, resolution):
+        self.future_options_added.append(future_symbol)
+        underlying = MockSymbol(future_symbol)
+        return SimpleNamespace(Symbol=SimpleNamespace(Underlying=underlying), SetFilter=lambda f: None)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class TestFuturesOptionChainStore(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.es = MockSymbol('ES')
+        self.sep = MockSymbol('ES', datetime(2024, 9, 20))
+        self.dec = MockSymbol('ES', datetime(2024, 12, 20))
+        self.sep_expiries = [datetime(2024, 9, 20), datetime(2024, 9, 30), datetime(2024, 10, 18)]
+        self.algo.OptionChainProvider.chains[self.sep] = option_chain(self.sep, self.sep_expiries)
+        self.algo.OptionChainProvider.chains[self.dec] = option_chain(
+            self.dec, [datetime(2024, 11, 15), datetime(2024, 12, 20)])
+        self.algo.Securities[self.es] = SimpleNamespace(Mapped=self.sep)
+        self.store = FuturesOptionChainStore(self.algo)
+
+    def test_queries_match_linear_scan_and_fetch_once(self):
+        chain = self.algo.OptionChainProvider.chains[self.sep]
+        lo, hi = self.algo.Time + timedelta(days=45), self.algo.Time + timedelta(days=75)
+
+        for _ in range(20):
+            band = self.store.contracts_in_band(self.es, 45, 75)
+            put = self.store.closest_contract(self.es, OptionRight.Put, 4412.0, 45, 75)
+
+        self.assertEqual(set(map(id, band)), {id(c) for c in chain if lo <= c.ID.Date <= hi})
+        expected = min((c for c in chain if lo <= c.ID.Date <= hi and c.ID.OptionRight == OptionRight.Put),
+                       key=lambda c: (abs(c.ID.StrikePrice - 4412.0), c.ID.Date))
+        self.assertIs(put, expected)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 1)
+        self.assertEqual(self.store.get_statistics()['hits'], 39)
+
+    def test_roll_refreshes_to_new_contract_month(self):
+        self.store.get_index(self.es)
+        self.algo.Time += timedelta(days=30)
+        self.store.get_index(self.es)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 1)  # time alone never invalidates
+
+        self.algo.Securities[self.es].Mapped = self.dec
+        index = self.store.get_index(self.es)
+        self.assertEqual(index.expiries, [datetime(2024, 11, 15), datetime(2024, 12, 20)])
+        self.assertEqual(self.store.get_statistics()['roll_invalidations'], 1)
+
+    def test_new_listing_invalidates_only_unseen_expiries(self):
+        self.store.get_index(self.es)
+
+        known = option_chain(self.sep, [datetime(2024, 9, 30)], strikes=[5000])[0]
+        self.store.on_securities_changed(SimpleNamespace(AddedSecurities=[SimpleNamespace(Symbol=known)]))
+        self.store.get_index(self.es)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 1)
+
+        listed = option_chain(self.sep, [datetime(2024, 11, 15)], strikes=[5000])
+        self.algo.OptionChainProvider.chains[self.sep] += listed
+        self.store.on_securities_changed(SimpleNamespace(AddedSecurities=[SimpleNamespace(Symbol=listed[0])]))
+        self.assertIn(datetime(2024, 11, 15), self.store.get_index(self.es).expiries)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 2)
+        self.assertEqual(self.store.get_statistics()['listing_invalidations'], 1)
+
+    def test_prewarm_registered_roots_only(self):
+        self.store.register_future('ES', self.es)
+        self.assertEqual(self.store.prewarm(), 1)
+        self.assertEqual(self.store.prewarm(['ES', 'CL']), 1)  # CL not subscribed
+        self.store.contracts_in_band(self.es, 45, 75)
+        self.assertEqual(self.algo.OptionChainProvider.calls, 1)
+
+    def test_shared_store_attached_to_algorithm(self):
+        store = get_futures_option_chain_store(self.algo)
+        self.assertIs(get_futures_option_chain_store(self.algo), store)
+        self.assertIs(self.algo.futures_option_chains, store)
+
+    def test_contract_month_symbol_memoized_per_month(self):
+        manager = FuturesManager(self.algo)
+        self.assertEqual(manager.get_contract_month_symbol('MES'), 'MESU24')
+        self.assertEqual(manager.get_contract_month_symbol('MES'), 'MESU24')
+        self.assertEqual(len(manager._contract_month_cache), 1)
+
+        self.algo.Time = datetime(2024, 10, 1, 10, 0)
+        self.assertEqual(manager.get_contract_month_symbol('MES'), 'MESZ24')
+
+
+    def test_future_option_universe_added_once(self):
+        manager = FutureOptionsManager(self.algo)
+        self.assertIs(manager.chain_store, get_futures_option_chain_store(self.algo))
+
+        info = manager.add_future_option_safely('ES', lambda u: u)
+        self.assertEqual(info.status, FutureOptionStatus.SUPPORTED)
+        self.assertIs(manager.add_future_option_safely('ES'), info)
+        self.assertEqual(self.algo.future_options_added, ['ES'])
+
+
+if __name__ == '__main__':
+    unittest.main()
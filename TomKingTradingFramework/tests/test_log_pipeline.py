@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Log Pipeline Tests
+Validates level gating without string work, per-component rate limits and the
+flight recorder dump on errors
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_pipeline import LogPipeline, LogLevel, get_log_pipeline
+
+
+class MockAlgorithm:
+    def __init__(self, live=False):
+        self.LiveMode = live
+        self.Time = datetime(2024, 8, 5, 10, 30)
+        self.debug_messages = []
+        self.log_messages = []
+        self.error_messages = []
+
+    def Debug(self, message):
+        self.debug_messages.append(message)
+
+    def Log(self, message):
+        self.log_messages.append(message)
+
+    def Error(self, message):
+        self.error_messages.append(message)
+
+
+class CountingArg:
+    """Records whether the pipeline ever formatted it"""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return 'arg'
+
+
+class TestLogPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.pipeline = LogPipeline(self.algo, recorder_size=8, dump_lines=5, rate_limit_per_minute=3)
+
+    def test_backtest_defaults_quiet_and_gated_records_are_not_formatted(self):
+        self.assertEqual(self.pipeline.level, LogLevel.WARNING)
+        self.assertEqual(LogPipeline(MockAlgorithm(live=True)).level, LogLevel.INFO)
+
+        arg = CountingArg()
+        log = self.pipeline.bind('COORDINATOR')
+        for _ in range(100):
+            log.debug("state %s", arg)
+            log.trace("trace %s", arg)
+
+        self.assertEqual(arg.formatted, 0)
+        self.assertEqual(self.algo.debug_messages, [])
+        self.assertEqual(self.pipeline.get_statistics()['gated'], 200)
+
+    def test_component_level_override(self):
+        self.pipeline.set_level(LogLevel.DEBUG, 'COORDINATOR')
+        self.pipeline.debug('COORDINATOR', "visible %d", 1)
+        self.pipeline.debug('StateMachine', "hidden %d", 2)
+        self.assertEqual(self.algo.debug_messages, ["[COORDINATOR] visible 1"])
+
+    def test_rate_limit_per_component_per_minute(self):
+        for i in range(10):
+            self.pipeline.warning('COORDINATOR', "warn %d", i)
+        self.pipeline.warning('StateMachine', "other component")
+        self.assertEqual(len(self.algo.log_messages), 4)
+
+        # Window rolls over: suppressed count is reported and logging resumes
+        self.algo.Time += timedelta(minutes=1)
+        self.pipeline.warning('COORDINATOR', "next minute")
+        self.assertIn("[COORDINATOR] 7 log lines suppressed by rate limit", self.algo.debug_messages)
+        self.assertEqual(self.algo.log_messages[-1], "[COORDINATOR] next minute")
+
+    def test_errors_bypass_rate_limit_and_dump_flight_recorder(self):
+        for i in range(20):
+            self.pipeline.trace('Friday0DTE', "step %d", i)
+
+        self.pipeline.error('Friday0DTE', "Execution error: %s", "boom")
+
+        self.assertEqual(self.algo.error_messages, ["[Friday0DTE] Execution error: boom"])
+        dumped = [m for m in self.algo.log_messages if 'TRACE' in m]
+        self.assertEqual(len(dumped), 5)
+        self.assertTrue(dumped[-1].endswith("[Friday0DTE] step 19"))
+
+        # Recorder is cleared so the next error only dumps what happened since
+        self.pipeline.error('Friday0DTE', "again")
+        self.assertEqual(self.pipeline.get_statistics()['recorder_dumps'], 1)
+
+    def test_shared_pipeline_attached_to_algorithm(self):
+        pipeline = get_log_pipeline(self.algo)
+        self.assertIs(get_log_pipeline(self.algo), pipeline)
+        self.assertIs(self.algo.log_pipeline, pipeline)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Margin Engine Tests
+Differential test: the vectorized scenario margin kernel must agree with a
+plain-Python per-bucket reference (spread pairing, strangle rule, naked
+formula, bounded max loss) on random books, and the what-if delta must equal
+the requirement after minus the requirement before
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlgorithmImports import SecurityType, OptionRight
+from config.constants import TradingConstants
+from risk.margin_engine import MarginLeg, MarginEngine, scenario_requirements, get_margin_engine
+
+
+EXPIRIES = [datetime(2024, 9, 20), datetime(2024, 12, 20)]
+UNDERLYINGS = {
+    # name: (price, multiplier, asset class, futures margin)
+    'SPY': (450.0, 100.0, 'equity', None),
+    'SPX': (4500.0, 100.0, 'index', None),
+    'ES': (4500.0, 50.0, 'future', 16000.0),
+}
+
+
+def naked_requirement(leg):
+    price, strike = leg.underlying_price, leg.strike
+    if leg.asset_class == 'future':
+        base = leg.futures_margin / (price * leg.multiplier)
+        floor = base * TradingConstants.MARGIN_NAKED_MIN_PCT / TradingConstants.MARGIN_NAKED_EQUITY_PCT
+    else:
+        base = TradingConstants.MARGIN_NAKED_INDEX_PCT if leg.asset_class == 'index' \
+            else TradingConstants.MARGIN_NAKED_EQUITY_PCT
+        floor = TradingConstants.MARGIN_NAKED_MIN_PCT
+    otm = max(strike - price, 0.0) if leg.is_call else max(price - strike, 0.0)
+    return (max(base * price - otm, floor * (price if leg.is_call else strike)) + leg.premium) * leg.multiplier
+
+
+def reference_requirement(legs):
+    """One book, leg by leg in plain Python"""
+    net, sample = defaultdict(float), {}
+    for leg in legs:
+        key = (leg.underlying, leg.expiry, leg.strike, leg.is_call) if leg.is_option else (leg.underlying,)
+        net[key] += leg.quantity
+        sample.setdefault(key, leg)
+
+    total = 0.0
+    buckets = defaultdict(list)
+    for key, quantity in net.items():
+        quantity = round(quantity)
+        if quantity == 0:
+            continue
+        leg = sample[key]
+        if not leg.is_option:
+            if leg.asset_class == 'future':
+                total += leg.futures_margin * abs(quantity)
+            else:
+                total += TradingConstants.MARGIN_EQUITY_REG_T * abs(quantity) * leg.underlying_price * leg.multiplier
+        else:
+            buckets[(leg.underlying, leg.expiry)].append((leg, quantity))
+
+    for contracts in buckets.values():
+        strategy_based = 0.0
+        naked = {True: [], False: []}
+        for right in (True, False):
+            shorts = sorted((leg for leg, q in contracts if leg.is_call == right and q < 0
+                             for _ in range(-q)), key=lambda l: l.strike, reverse=not right)
+            longs = sorted((leg for leg, q in contracts if leg.is_call == right and q > 0
+                            for _ in range(q)), key=lambda l: l.strike, reverse=not right)
+            for short, long in zip(shorts, longs):
+                width = long.strike - short.strike if right else short.strike - long.strike
+                strategy_based += max(width, 0.0) * short.multiplier
+            naked[right] = sorted(((naked_requirement(leg), leg.premium * leg.multiplier)
+                                   for leg in shorts[len(longs):]), reverse=True)
+        puts, calls = naked[False], naked[True]
+        for i in range(max(len(puts), len(calls))):
+            if i < len(puts) and i < len(calls):
+                (put_req, put_prem), (call_req, call_prem) = puts[i], calls[i]
+                strategy_based += put_req + call_prem if put_req >= call_req else call_req + put_prem
+            else:
+                strategy_based += (puts[i] if i < len(puts) else calls[i])[0]
+
+        if sum(q for leg, q in contracts if leg.is_call) < 0:
+            max_loss = float('inf')
+        else:
+            points = [0.0] + [leg.strike for leg, _ in contracts]
+            max_loss = -min(0.0, min(
+                sum(q * leg.multiplier * (max(s - leg.strike, 0.0) if leg.is_call else max(leg.strike - s, 0.0))
+                    for leg, q in contracts)
+                for s in points))
+        total += min(strategy_based, max_loss)
+    return total
+
+
+def random_leg(rng):
+    name = rng.choice(list(UNDERLYINGS))
+    price, multiplier, asset_class, futures_margin = UNDERLYINGS[name]
+    if rng.random() < 0.15:
+        quantity = rng.choice([-3, -1, 2, 5]) * (1 if asset_class == 'future' else 100)
+        return MarginLeg(name, quantity, price, multiplier=1.0 if asset_class != 'future' else multiplier,
+                         asset_class=asset_class, futures_margin=futures_margin)
+    return MarginLeg(
+        name, rng.choice([-3, -2, -1, -1, 1, 2]), price, multiplier=multiplier,
+        strike=round(price * rng.uniform(0.8, 1.2) / 5) * 5, expiry=rng.choice(EXPIRIES),
+        is_call=rng.random() < 0.5, premium=round(rng.uniform(0, 0.02) * price, 2),
+        asset_class=asset_class, futures_margin=futures_margin
+    )
+
+
+class OptionSymbol:
+    def __init__(self, underlying, strike, expiry, is_call, security_type=SecurityType.Option):
+        self.SecurityType = security_type
+        self.Underlying = underlying
+        self.ID = SimpleNamespace(StrikePrice=strike, Date=expiry,
+                                  OptionRight=OptionRight.Call if is_call else OptionRight.Put)
+
+    def __str__(self):
+        return f"{self.Underlying} {self.ID.Date:%y%m%d}{'C' if self.ID.OptionRight == OptionRight.Call else 'P'}{self.ID.StrikePrice}"
+
+
+class EquitySymbol:
+    def __init__(self, ticker):
+        self.SecurityType = SecurityType.Equity
+        self.ID = SimpleNamespace(Symbol=ticker)
+        self.ticker = ticker
+
+    def __str__(self):
+        return self.ticker
+
+
+class MockAlgorithm:
+    def __init__(self, holdings, prices, margin_remaining=50000.0):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.Portfolio = SimpleNamespace(
+            Values=[SimpleNamespace(Symbol=symbol, Invested=True, Quantity=quantity) for symbol, quantity in holdings],
+            MarginRemaining=margin_remaining)
+        self.Securities = _Securities(prices)
+
+    def Debug(self, message):
+        pass
+
+
+class _Securities(dict):
+    def __getitem__(self, symbol):
+        return SimpleNamespace(Price=dict.__getitem__(self, str(symbol)),
+                               SymbolProperties=SimpleNamespace(ContractMultiplier=100 if ' ' in str(symbol) else 1))
+
+
+class TestMarginEngine(unittest.TestCase):
+
+    def test_kernel_matches_reference_on_random_books(self):
+        rng = random.Random(5)
+        books = [[random_leg(rng) for _ in range(rng.randint(0, 14))] for _ in range(300)]
+        legs, scenario_ids = [], []
+        for scenario, book in enumerate(books):
+            legs.extend(book)
+            scenario_ids.extend([scenario] * len(book))
+
+        vectorized = scenario_requirements(legs, scenario_ids, len(books))
+        for scenario, book in enumerate(books):
+            self.assertAlmostEqual(vectorized[scenario], reference_requirement(book), places=6, msg=f"book {scenario}")
+
+    def test_known_structures(self):
+        expiry = EXPIRIES[0]
+        put_spread = [MarginLeg('SPY', -2, 450.0, strike=430.0, expiry=expiry, is_call=False),
+                      MarginLeg('SPY', 2, 450.0, strike=420.0, expiry=expiry, is_call=False)]
+        call_spread = [MarginLeg('SPY', -2, 450.0, strike=470.0, expiry=expiry, is_call=True),
+                       MarginLeg('SPY', 2, 450.0, strike=480.0, expiry=expiry, is_call=True)]
+        self.assertAlmostEqual(scenario_requirements(put_spread, [0, 0], 1)[0], 2000.0)
+        # Iron condor: only one side can lose at expiry
+        self.assertAlmostEqual(scenario_requirements(put_spread + call_spread, [0] * 4, 1)[0], 2000.0)
+        # Closing order nets the position away
+        closing = [MarginLeg('SPY', 2, 450.0, strike=430.0, expiry=expiry, is_call=False),
+                   MarginLeg('SPY', -2, 450.0, strike=420.0, expiry=expiry, is_call=False)]
+        self.assertAlmostEqual(scenario_requirements(put_spread + closing, [0] * 4, 1)[0], 0.0)
+
+    def test_what_if_against_portfolio(self):
+        expiry = EXPIRIES[1]
+        spy = EquitySymbol('SPY')
+        short_put = OptionSymbol(spy, 400.0, expiry, False)
+        algo = MockAlgorithm([(short_put, -2), (spy, 100)], {'SPY': 450.0, str(short_put): 3.0})
+        engine = get_margin_engine(algo)
+        self.assertIs(get_margin_engine(algo), engine)
+
+        book = engine.portfolio_legs()
+        self.assertEqual(len(book), 2)
+        current = engine.requirement()
+        self.assertAlmostEqual(current, 0.5 * 100 * 450.0 + 2 * (max(0.2 * 450 - 50, 40.0) + 3.0) * 100)
+
+        # Buying the 390 puts turns the naked puts into spreads
+        hedge = [MarginLeg('SPY', 2, 450.0, strike=390.0, expiry=expiry, is_call=False)]
+        result = engine.what_if(hedge)
+        self.assertAlmostEqual(result['current'], current)
+        self.assertAlmostEqual(result['proposed'], 0.5 * 100 * 450.0 + 2 * 10 * 100)
+        self.assertLess(result['delta'], 0)
+
+        ok, delta, budget = engine.check_margin_available(
+            [MarginLeg('SPY', -10, 450.0, strike=440.0, expiry=expiry, is_call=False)], 0.3)
+        self.assertFalse(ok)
+        self.assertAlmostEqual(budget, 15000.0)
+        self.assertAlmostEqual(delta, engine.requirement(book + [
+            MarginLeg('SPY', -10, 450.0, strike=440.0, expiry=expiry, is_call=False)]) - current)
+
+
+def run_benchmark(legs_per_book=400, books=2):
+    """Vectorized what-if vs the per-leg reference on a large book"""
+    rng = random.Random(9)
+    book = [random_leg(rng) for _ in range(legs_per_book)]
+    proposed = [random_leg(rng) for _ in range(4)]
+    engine = MarginEngine(SimpleNamespace())
+
+    started = time.perf_counter()
+    for _ in range(books):
+        vectorized = engine.what_if(proposed, book)
+    vectorized_ms = (time.perf_counter() - started) * 1000 / books
+
+    started = time.perf_counter()
+    for _ in range(books):
+        reference = reference_requirement(book + proposed) - reference_requirement(book)
+    reference_ms = (time.perf_counter() - started) * 1000 / books
+
+    print(f"what-if on {legs_per_book} legs: vectorized {vectorized_ms:.1f}ms "
+          f"(delta {vectorized['delta']:,.0f}), reference {reference_ms:.1f}ms (delta {reference:,.0f})")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        run_benchmark()
+    else:
+        unittest.main()
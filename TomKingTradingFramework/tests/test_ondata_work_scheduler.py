@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+OnData Work Scheduler Tests
+Verifies priority ordering, budget deferral, coalescing and starvation guarantees
+"""
+
+import unittest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ondata_work_scheduler import OnDataWorkScheduler, WorkPriority
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 30)
+        self.errors = []
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        self.errors.append(message)
+
+
+def busy(ms):
+    def work():
+        end = time.perf_counter() + ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+    return work
+
+
+class TestOnDataWorkScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.algorithm = MockAlgorithm()
+        self.scheduler = OnDataWorkScheduler(self.algorithm, budget_ms=5,
+                                             max_deferral_slices=3, max_deferral_time=timedelta(hours=1))
+
+    def test_critical_runs_first_and_even_over_budget(self):
+        order = []
+        self.scheduler.submit('maintenance', lambda: order.append('maintenance'), WorkPriority.DEFERRABLE)
+        self.scheduler.submit('breakers', lambda: (order.append('breakers'), busy(10)()), WorkPriority.CRITICAL)
+        self.scheduler.submit('greeks', lambda: order.append('greeks'), WorkPriority.NORMAL)
+
+        result = self.scheduler.run_slice()
+
+        self.assertEqual(order, ['breakers'])
+        self.assertEqual(result['deferred'], ['greeks', 'maintenance'])
+        self.assertEqual(self.scheduler.get_pending_work_report()['pending_tasks'], 2)
+
+    def test_budget_counts_from_start_of_ondata(self):
+        ran = []
+        self.scheduler.submit('greeks', lambda: ran.append('greeks'), WorkPriority.NORMAL)
+
+        self.scheduler.begin_slice()
+        busy(8)()  # strategy execution before the queued work gets its turn
+        result = self.scheduler.run_slice()
+
+        self.assertEqual(ran, [])
+        self.assertEqual(result['deferred'], ['greeks'])
+        self.assertGreaterEqual(result['elapsed_ms'], 8)
+        self.assertEqual(self.scheduler.stats['budget_overruns'], 1)
+
+        # Without begin_slice the clock starts at run_slice
+        self.assertEqual(self.scheduler.run_slice()['ran'], ['greeks'])
+
+    def test_deferred_work_runs_on_quiet_slice(self):
+        ran = []
+        self.scheduler.submit('breakers', busy(10), WorkPriority.CRITICAL)
+        self.scheduler.submit('maintenance', lambda: ran.append(1), WorkPriority.DEFERRABLE)
+        self.scheduler.run_slice()
+        self.assertEqual(ran, [])
+
+        self.scheduler.run_slice()
+        self.assertEqual(ran, [1])
+        self.assertEqual(self.scheduler.get_statistics()['pending_tasks'], 0)
+
+    def test_starved_task_is_forced(self):
+        ran = []
+        self.scheduler.submit('maintenance', lambda: ran.append(self.scheduler.slice_number), WorkPriority.DEFERRABLE)
+        for _ in range(5):
+            self.scheduler.submit('breakers', busy(8), WorkPriority.CRITICAL)
+            self.scheduler.run_slice()
+
+        # Deferred three times, then forced on the fourth busy slice
+        self.assertEqual(ran, [4])
+        self.assertEqual(self.scheduler.stats['tasks_forced'], 1)
+
+    def test_resubmission_coalesces_and_keeps_wait_time(self):
+        self.scheduler.submit('maintenance', lambda: None, WorkPriority.DEFERRABLE)
+        self.algorithm.Time += timedelta(minutes=5)
+        self.assertFalse(self.scheduler.submit('maintenance', lambda: None, WorkPriority.DEFERRABLE))
+
+        report = self.scheduler.get_pending_work_report()
+        self.assertEqual(report['pending_tasks'], 1)
+        self.assertEqual(report['oldest_waiting_seconds'], 300)
+
+    def test_task_errors_are_contained(self):
+        ran = []
+        self.scheduler.submit('bad', lambda: 1 / 0, WorkPriority.CRITICAL)
+        self.scheduler.submit('good', lambda: ran.append(1), WorkPriority.NORMAL)
+        self.scheduler.run_slice()
+
+        self.assertEqual(ran, [1])
+        self.assertEqual(self.scheduler.stats['task_errors'], 1)
+        self.assertTrue(self.algorithm.errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
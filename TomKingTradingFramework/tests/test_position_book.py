@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Position Book Tests
+Differential tests: after a random sequence of opens, partial closes and full
+closes, the PositionBook indexes must agree with linear scans of the positions,
+and streamed marks must leave running P&L totals equal to a full recompute
+"""
+
+import unittest
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlgorithmImports import OrderStatus
+from position_state_manager import PositionStateManagerQC, PositionComponent, MultiLegPosition
+from optimization.fast_position_lookup import FastPositionLookup, BatchOperationOptimizer
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.liquidated = []
+        self.Securities = CountingSecurities()
+
+    def Liquidate(self, symbol, tag=""):
+        self.liquidated.append(symbol)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class CountingSecurities(dict):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def __getitem__(self, key):
+        self.lookups += 1
+        return super().__getitem__(key)
+
+
+def full_pnl(component, price):
+    """Legacy per-leg formula from update_component_prices"""
+    if component.quantity > 0:
+        return (price - component.entry_price) * component.quantity * 100
+    return (component.entry_price - price) * abs(component.quantity) * 100
+
+
+def all_components(manager):
+    return [(pid, c) for pid, p in manager.positions.items() for c in p.components.values()]
+
+
+class TestPositionBook(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.manager = PositionStateManagerQC(self.algo)
+        self.book = self.manager.book
+
+    def _random_book(self, seed=7, steps=400):
+        rng = random.Random(seed)
+        symbols = ['SPY', 'QQQ', 'IWM', 'GLD']
+        for step in range(steps):
+            self.algo.Time += timedelta(minutes=1)
+            roll = rng.random()
+            if roll < 0.35:
+                symbol = rng.choice(symbols)
+                expiry = datetime(2024, 9, 20) + timedelta(weeks=rng.randrange(12))
+                strike = float(rng.randrange(380, 460, 5))
+                self.manager.create_lt112_position(symbol, {
+                    'debit_spread_long': strike, 'debit_spread_short': strike - 10,
+                    'naked_puts': strike - 20, 'expiry_date': expiry}, rng.randint(1, 3))
+            elif roll < 0.55:
+                symbol = rng.choice(symbols)
+                position_id = self.manager.create_ipmcc_position(symbol)
+                self.manager.add_ipmcc_leap(position_id, f"{symbol}_LEAP_{step}", 1,
+                                            float(rng.randrange(300, 400, 5)), datetime(2026, 1, 16))
+                self.manager.add_ipmcc_weekly_call(symbol, f"{symbol}_WK_{step}", 1,
+                                                   float(rng.randrange(420, 480, 5)),
+                                                   self.algo.Time + timedelta(days=rng.randrange(1, 8)))
+            elif roll < 0.8 and self.manager.positions:
+                position_id = rng.choice(list(self.manager.positions))
+                if position_id.startswith('LT112'):
+                    self.manager.close_lt112_naked_puts_only(position_id)
+                else:
+                    position = self.manager.positions[position_id]
+                    weeklies = [c for c in position.components if 'WEEKLY' in c]
+                    if weeklies:
+                        self.manager.close_ipmcc_weekly_call(position.symbol, weeklies[0])
+            elif self.manager.positions:
+                self.manager.close_position(rng.choice(list(self.manager.positions)))
+
+            for position_id, component in all_components(self.manager):
+                self.book.set_pnl(self.manager.positions[position_id], component, rng.uniform(-500, 500))
+
+    def test_indexes_match_linear_scans(self):
+        self._random_book()
+        self.assertGreater(len(self.manager.positions), 10)
+
+        for symbol in ('SPY', 'QQQ', 'IWM', 'GLD', 'TLT'):
+            for strategy in (None, 'LT112', 'IPMCC'):
+                expected = [p for p in self.manager.positions.values()
+                            if p.symbol == symbol and (strategy is None or p.strategy == strategy)]
+                self.assertEqual(self.manager.get_positions_for_symbol(symbol, strategy), expected)
+                self.assertAlmostEqual(self.book.total_pnl(symbol, strategy),
+                                       sum(c.pnl for p in expected for c in p.components.values()))
+
+        earliest, latest = datetime(2024, 10, 1), datetime(2024, 11, 1)
+        expected = {(pid, c.component_id) for pid, c in all_components(self.manager)
+                    if earliest <= c.expiry <= latest}
+        self.assertEqual(set(self.book.components_expiring_between(earliest, latest, refs=True)), expected)
+        found = self.book.components_expiring_between(earliest, latest)
+        self.assertEqual([c.expiry for c in found], sorted(c.expiry for c in found))
+
+        expected = {(pid, c.component_id) for pid, c in all_components(self.manager)
+                    if 400 <= c.strike <= 430}
+        self.assertEqual(set(self.book.components_in_strike_range(400, 430, refs=True)), expected)
+
+        for pid, component in all_components(self.manager):
+            self.assertIn(component, self.book.components_for_contract(component.contract_symbol))
+
+    def test_removed_components_leave_no_index_entries(self):
+        self._random_book(seed=11)
+        for position_id in list(self.manager.positions):
+            self.manager.close_position(position_id)
+
+        self.assertEqual(self.book.positions_by_symbol, {})
+        self.assertEqual(self.book.components_by_contract, {})
+        self.assertEqual(self.book.components_by_expiry, {})
+        self.assertEqual(self.book.components_in_strike_range(0, 10000), [])
+        self.assertEqual(self.book.total_pnl(), 0)
+
+    def test_deserialized_positions_are_indexed(self):
+        self._random_book(seed=3, steps=120)
+        state = self.manager.serialize_state()
+
+        restored = PositionStateManagerQC(self.algo)
+        restored.deserialize_state(state)
+        self.assertEqual(set(restored.positions), set(self.manager.positions))
+        for symbol in ('SPY', 'QQQ'):
+            self.assertEqual([p.position_id for p in restored.get_positions_for_symbol(symbol)],
+                             [p.position_id for p in self.manager.get_positions_for_symbol(symbol)])
+
+    def test_has_active_leap_uses_leg_type(self):
+        position_id = self.manager.create_ipmcc_position('SPY')
+        self.assertIsNone(self.manager.has_active_leap('SPY'))
+        self.manager.add_ipmcc_leap(position_id, 'SPY_LEAP', 1, 350.0, datetime(2026, 1, 16))
+        self.assertEqual(self.manager.has_active_leap('SPY').leg_type, 'LEAP_CALL')
+        self.assertIsNone(self.manager.has_active_leap('QQQ'))
+
+    def test_fast_lookup_reads_live_book(self):
+        lookup = FastPositionLookup(self.algo, self.book)
+        position_id = self.manager.create_ipmcc_position('SPY')
+        self.manager.add_ipmcc_leap(position_id, 'SPY_LEAP', 1, 350.0, datetime(2026, 1, 16))
+        self.manager.add_ipmcc_weekly_call('SPY', 'SPY_WK', 1, 450.0, datetime(2024, 8, 9))
+
+        self.assertEqual(lookup.find_positions_by_symbol('SPY'), {position_id})
+        self.assertEqual(lookup.find_positions_expiring_soon(7), {position_id})
+        self.assertEqual(lookup.find_components_by_strike_range(340, 360), [(position_id, f"{position_id}_LEAP")])
+
+        self.manager.close_position(position_id)
+        self.assertEqual(lookup.find_positions_by_symbol('SPY'), set())
+
+    def test_streamed_marks_match_full_recompute(self):
+        rng = random.Random(5)
+        self._random_book(seed=5, steps=200)
+        for _, component in all_components(self.manager):
+            component.entry_price = rng.uniform(1, 20)
+        contracts = sorted({str(c.contract_symbol) for _, c in all_components(self.manager)})
+        prices = {contract: rng.uniform(1, 20) for contract in contracts}
+        self.manager.update_component_prices(prices)
+
+        for tick in range(300):
+            moved = {contract: rng.uniform(1, 20) for contract in rng.sample(contracts, 5)}
+            prices.update(moved)
+            resent = {contract: prices[contract] for contract in rng.sample(contracts, 5)}
+            expected_legs = sum(len(self.book.components_for_contract(c)) for c in moved)
+            revalued = self.manager.update_component_prices({**resent, **moved})
+            self.assertEqual(revalued, expected_legs)  # re-sent prices revalue nothing
+
+            if tick % 50 == 0:
+                # New legs on an already marked contract are valued on entry
+                self.algo.Time += timedelta(minutes=1)
+                position_id = self.manager.create_ipmcc_position('TLT')
+                self.manager.add_ipmcc_leap(position_id, contracts[0], 1, 90.0, datetime(2026, 1, 16))
+
+        for position_id, position in self.manager.positions.items():
+            for component in position.components.values():
+                self.assertAlmostEqual(component.pnl, full_pnl(component, prices[str(component.contract_symbol)]))
+            self.assertAlmostEqual(self.manager.get_position_pnl(position_id),
+                                   sum(c.pnl for c in position.components.values()), places=6)
+        for strategy in ('LT112', 'IPMCC'):
+            expected = sum(c.pnl for p in self.manager.positions.values() if p.strategy == strategy
+                           for c in p.components.values())
+            self.assertAlmostEqual(self.manager.get_strategy_pnl(strategy), expected, places=6)
+        self.assertAlmostEqual(self.manager.get_strategy_pnl(),
+                               sum(c.pnl for _, c in all_components(self.manager)), places=6)
+        self.assertGreater(self.book.get_statistics()['marks_unchanged'], 0)
+
+    def test_fill_and_portfolio_sync_keep_totals(self):
+        position_id = self.manager.create_ipmcc_position('SPY')
+        self.manager.add_ipmcc_leap(position_id, 'SPY_LEAP', 2, 350.0, datetime(2026, 1, 16))
+        component = self.manager.positions[position_id].components[f"{position_id}_LEAP"]
+        self.manager.update_component_prices({'SPY_LEAP': 60.0})
+        self.assertEqual(self.manager.get_position_pnl(position_id), 60.0 * 2 * 100)
+
+        component.entry_price = 55.0
+        self.book.revalue(self.manager.positions[position_id], component)
+        self.assertAlmostEqual(self.manager.get_position_pnl(position_id), 5.0 * 2 * 100)
+
+        self.book.set_pnl(self.manager.positions[position_id], component, 1234.0)
+        self.assertEqual(self.manager.get_strategy_pnl('IPMCC'), 1234.0)
+        self.assertEqual(self.manager.positions[position_id].calculate_total_pnl(), 1234.0)
+
+        self.manager._on_market_data(SimpleNamespace(data={'symbol': 'SPY_LEAP', 'price': 57.5}))
+        self.assertAlmostEqual(self.manager.get_strategy_pnl('IPMCC'), 2.5 * 2 * 100)
+
+        # Batched events from the event-driven optimizer carry (symbol, price) pairs
+        self.manager._on_market_data(SimpleNamespace(data={
+            'underlying': 'SPY', 'updates': [('SPY_LEAP', 58.5), ('SPY_OTHER', 1.0)], 'batch_size': 2}))
+        self.assertAlmostEqual(self.manager.get_strategy_pnl('IPMCC'), 3.5 * 2 * 100)
+
+    def test_linked_fill_revalues_leg(self):
+        position_id = self.manager.create_ipmcc_position('SPY')
+        self.manager.add_ipmcc_leap(position_id, 'SPY_LEAP', 2, 350.0, datetime(2026, 1, 16))
+        self.manager.update_component_prices({'SPY_LEAP': 60.0})
+
+        ticket = SimpleNamespace(Symbol='SPY_LEAP', Status=OrderStatus.Filled, AverageFillPrice=58.0, Quantity=2)
+        self.assertTrue(self.manager.link_order_to_component(ticket, position_id, f"{position_id}_LEAP"))
+        self.assertAlmostEqual(self.manager.get_position_pnl(position_id), 2.0 * 2 * 100)
+        self.assertAlmostEqual(self.manager.get_strategy_pnl('IPMCC'), 2.0 * 2 * 100)
+
+    def test_batch_pnl_matches_legacy_and_resolves_securities_once(self):
+        self._random_book(seed=9, steps=150)
+        rng = random.Random(9)
+        for _, component in all_components(self.manager):
+            component.entry_price = rng.uniform(1, 20)
+            self.algo.Securities.setdefault(component.contract_symbol, SimpleNamespace(Price=rng.uniform(1, 20)))
+
+        optimizer = BatchOperationOptimizer(self.algo)
+        self.algo.Securities.lookups = 0
+        for _ in range(3):
+            pnl = optimizer.batch_calculate_pnl(self.manager.positions)
+        # Security objects are resolved once per contract, not once per call
+        contracts = {c.contract_symbol for _, c in all_components(self.manager)}
+        self.assertEqual(self.algo.Securities.lookups, len(contracts))
+
+        for position_id, position in self.manager.positions.items():
+            expected = sum(full_pnl(c, self.algo.Securities[c.contract_symbol].Price)
+                           for c in position.components.values())
+            self.assertAlmostEqual(pnl[position_id], expected, places=6)
+
+    def test_batch_pnl_keeps_last_mark_for_missing_security(self):
+        position_id = self.manager.create_ipmcc_position('SPY')
+        self.manager.add_ipmcc_leap(position_id, 'SPY_LEAP', 2, 350.0, datetime(2026, 1, 16))
+        self.manager.update_component_prices({'SPY_LEAP': 60.0})
+
+        # Contract no longer in Securities: its leg is not marked to 0.0
+        pnl = BatchOperationOptimizer(self.algo).batch_calculate_pnl(self.manager.positions)
+        self.assertEqual(pnl[position_id], 60.0 * 2 * 100)
+        self.assertEqual(self.manager.get_strategy_pnl('IPMCC'), 60.0 * 2 * 100)
+
+    def test_component_slots(self):
+        component = PositionComponent('c1', 'LT112', 'SPY', 'NAKED_PUT', 'SPY_PUT', -2, 400.0,
+                                      datetime(2024, 9, 20))
+        self.assertFalse(hasattr(component, '__dict__'))
+        with self.assertRaises(AttributeError):
+            component.unknown_field = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Risk Verdict Cache Tests
+Differential test: with verdict memoisation and cost-ordered plugins,
+UnifiedRiskManager.can_open_position must return the same allow/block
+decisions as running every plugin in registration order, across repeated
+probes, fills and slice changes
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk.unified_risk_manager import UnifiedRiskManager, BaseRiskPlugin
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.Portfolio = SimpleNamespace(Values=[], TotalPortfolioValue=100000.0, TotalMarginUsed=0.0)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class ProbePlugin(BaseRiskPlugin):
+    """Blocks per `rule(symbol, quantity, open_positions)`, spending `cost_ms` per call"""
+
+    def __init__(self, name, rule, cost_ms=0.0):
+        super().__init__()
+        self._name = name
+        self.rule = rule
+        self.cost_ms = cost_ms
+        self.open_positions = 0
+        self.calls = 0
+
+    @property
+    def plugin_name(self):
+        return self._name
+
+    @property
+    def plugin_version(self):
+        return "1.0.0"
+
+    def _plugin_initialize(self):
+        return True
+
+    def can_open_position(self, symbol, quantity, context=None):
+        self.calls += 1
+        if self.cost_ms:
+            deadline = time.perf_counter() + self.cost_ms / 1000
+            while time.perf_counter() < deadline:
+                pass
+        if self.rule(symbol, quantity, self.open_positions):
+            return False, f"{symbol} x{quantity} blocked"
+        return True, "ok"
+
+    def on_position_opened(self, symbol, quantity, fill_price, context=None):
+        self.open_positions += 1
+
+    def on_position_closed(self, symbol, quantity, fill_price, pnl, context=None):
+        self.open_positions -= 1
+
+    def on_market_data(self, symbol, data):
+        pass
+
+    def periodic_check(self):
+        return []
+
+    def get_risk_metrics(self):
+        return {}
+
+    def shutdown(self):
+        pass
+
+
+def build_plugins():
+    return [
+        ProbePlugin('SlowRarelyBlocks', lambda s, q, n: abs(q) > 9, cost_ms=0.2),
+        ProbePlugin('PositionLimit', lambda s, q, n: n >= 3),
+        ProbePlugin('CheapOftenBlocks', lambda s, q, n: s in ('IWM', 'GLD') or q < 0),
+    ]
+
+
+class TestRiskVerdictCache(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.manager = UnifiedRiskManager(self.algo)
+        self.manager.REORDER_INTERVAL = 50
+        self.plugins = build_plugins()
+        for plugin in self.plugins:
+            self.assertTrue(self.manager.register_plugin(plugin))
+
+    def test_verdicts_match_uncached_registration_order(self):
+        rng = random.Random(3)
+        reference = build_plugins()
+        symbols = ['SPY', 'QQQ', 'IWM', 'GLD']
+
+        for step in range(600):
+            roll = rng.random()
+            if roll < 0.05:
+                self.algo.Time += timedelta(minutes=1)
+            elif roll < 0.10:
+                self.manager.on_position_opened('SPY', 1, 5.0)
+                for plugin in reference:
+                    plugin.on_position_opened('SPY', 1, 5.0)
+            elif roll < 0.13 and reference[1].open_positions:
+                self.manager.on_position_closed('SPY', 1, 5.0, 0.0)
+                for plugin in reference:
+                    plugin.on_position_closed('SPY', 1, 5.0, 0.0)
+
+            symbol, quantity = rng.choice(symbols), rng.choice([-2, 1, 2, 3, 12])
+            expected = all(plugin.can_open_position(symbol, quantity)[0] for plugin in reference)
+            self.assertEqual(self.manager.can_open_position(symbol, quantity)[0], expected, f"step {step}")
+
+        self.assertGreater(self.manager.verdict_cache_hits, 100)
+
+    def test_cheap_frequent_rejecter_moves_first(self):
+        for step in range(120):
+            self.algo.Time += timedelta(minutes=1)
+            self.manager.can_open_position(['SPY', 'IWM', 'GLD'][step % 3], 1)
+
+        order = [plugin.plugin_name for plugin in self.manager.plugins]
+        self.assertEqual(order[0], 'CheapOftenBlocks')
+        self.assertEqual(order[-1], 'SlowRarelyBlocks')
+
+        stats = self.manager.get_plugin_statistics()
+        self.assertEqual(stats['CheapOftenBlocks']['order'], 0)
+        self.assertGreater(stats['CheapOftenBlocks']['reject_rate'], 0.5)
+        self.assertGreater(stats['SlowRarelyBlocks']['average_ms'], stats['CheapOftenBlocks']['average_ms'])
+        # After the reorder, blocked symbols never reach the slow plugin
+        self.assertLess(self.plugins[0].calls, 120 - 30)
+
+    def test_fills_and_unhashable_context_bypass_cache(self):
+        self.assertTrue(self.manager.can_open_position('SPY', 1)[0])
+        self.assertTrue(self.manager.can_open_position('SPY', 1)[0])
+        self.assertEqual(self.plugins[1].calls, 1)
+
+        for _ in range(3):
+            self.manager.on_position_opened('QQQ', 1, 5.0)
+        self.assertFalse(self.manager.can_open_position('SPY', 1)[0])
+
+        self.manager.on_position_closed('QQQ', 1, 5.0, 0.0)
+        self.assertTrue(self.manager.can_open_position('SPY', 1)[0])
+
+        calls = self.plugins[1].calls
+        for _ in range(3):
+            self.manager.can_open_position('SPY', 1, {'legs': [1, 2]})
+        self.assertEqual(self.plugins[1].calls, calls + 3)
+        self.assertIn('plugins', self.manager.get_risk_status()['performance'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Rolling Counter Tests
+Differential test: per-minute bucket totals must equal a scan of the raw
+event list over the same window, CircuitBreakerPlugin's trade limits must
+trigger exactly as a history scan since the daily reset would, and its
+last-hour metrics must match a scan of the last hour
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.constants import TradingConstants
+from risk.rolling_counter import RollingCounter
+from risk.unified_risk_manager import RiskEventBus
+from risk.plugins.circuit_breaker_plugin import CircuitBreakerPlugin
+
+
+def minute_of(t):
+    return RollingCounter._minute_of(t)
+
+
+def scan(events, now, window, field):
+    """Sum of field over events whose minute is inside the window ending at now"""
+    newest = minute_of(now)
+    return sum(amounts.get(field, 0) for t, amounts in events if minute_of(t) > newest - window)
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 9, 30)
+        self.Portfolio = SimpleNamespace(TotalPortfolioValue=100000.0)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def reference_limits(history, consecutive_losses):
+    """Trade-driven breaches recomputed from the stored event list (the pre-bucket behaviour)"""
+    if consecutive_losses >= TradingConstants.MAX_CONSECUTIVE_LOSSES:
+        return f"Consecutive loss limit exceeded: {consecutive_losses} >= {TradingConstants.MAX_CONSECUTIVE_LOSSES}"
+    trades = sum(1 for kind, _ in history if kind == 'open')
+    losses = sum(1 for kind, pnl in history if kind == 'close' and pnl <= 0)
+    if trades > 0:
+        loss_rate = losses / trades
+        if loss_rate > TradingConstants.MAX_DAILY_LOSS_RATE and losses >= TradingConstants.MIN_TRADES_FOR_LOSS_RATE:
+            return f"High loss rate: {loss_rate:.1%} ({losses}/{trades} losses)"
+    return None
+
+
+class TestRollingCounter(unittest.TestCase):
+
+    def test_bucket_totals_match_event_scan(self):
+        rng = random.Random(8)
+        for window in (1, 5, 60):
+            counter = RollingCounter(window, ('trades', 'pnl'))
+            now, events = datetime(2024, 1, 2, 9, 30), []
+            for step in range(2000):
+                now += timedelta(seconds=rng.choice([0, 5, 30, 60, 61, 300, 3600, 7200]))
+                if rng.random() < 0.6:
+                    amounts = {'trades': 1, 'pnl': rng.choice([-250, -75, 40, 125])}
+                    counter.add(now, **amounts)
+                    events.append((now, amounts))
+                for field in ('trades', 'pnl'):
+                    self.assertEqual(counter.total(field, now), scan(events, now, window, field),
+                                     f"window {window} step {step} {field}")
+
+    def test_circuit_breaker_matches_history_scan(self):
+        rng = random.Random(21)
+        algo = MockAlgorithm()
+        breaker = CircuitBreakerPlugin()
+        self.assertTrue(breaker.initialize(algo, RiskEventBus(algo)))
+        breaker._check_daily_reset()
+
+        history, hour_events, consecutive, triggered = [], [], 0, 0
+        for step in range(2500):
+            algo.Time += timedelta(minutes=rng.choice([0, 1, 1, 3, 20, 600, 3000]))
+            roll = rng.random()
+            if roll < 0.45:
+                breaker.on_position_opened('SPY', 1, 1.0)
+                history.append(('open', 0.0))
+                hour_events.append((algo.Time, {'trades': 1}))
+            elif roll < 0.9:
+                pnl = rng.choice([-300.0, -50.0, 0.0, 80.0, 200.0])
+                breaker.on_position_closed('SPY', 1, 1.0, pnl)
+                history.append(('close', pnl))
+                consecutive = 0 if pnl > 0 else consecutive + 1
+                hour_events.append((algo.Time, {'losses': 0 if pnl > 0 else 1, 'pnl': pnl}))
+            else:
+                if breaker._last_reset_date != algo.Time.date():
+                    history = []
+                breaker._check_daily_reset()
+                if rng.random() < 0.3:
+                    breaker.consecutive_losses = consecutive = 0
+
+            hour_events = hour_events[-200:]  # far more than an hour's worth at these step sizes
+            expected = reference_limits(history, consecutive)
+            self.assertEqual(breaker._check_all_limits(), expected, f"step {step}")
+            triggered += expected is not None
+
+            metrics = breaker.get_risk_metrics()
+            self.assertEqual(metrics['trades_today'], sum(1 for kind, _ in history if kind == 'open'))
+            self.assertAlmostEqual(breaker.daily_pnl, sum(pnl for _, pnl in history), places=6)
+            self.assertEqual(metrics['losses_last_hour'], scan(hour_events, algo.Time, 60, 'losses'))
+            self.assertAlmostEqual(metrics['pnl_last_hour'], scan(hour_events, algo.Time, 60, 'pnl'), places=6)
+
+        self.assertGreater(triggered, 0)
+
+    def test_day_counts_kept_until_daily_reset(self):
+        algo = MockAlgorithm()
+        breaker = CircuitBreakerPlugin()
+        self.assertTrue(breaker.initialize(algo, RiskEventBus(algo)))
+        breaker._check_daily_reset()
+        breaker.on_position_opened('SPY', 1, 1.0)
+        breaker.on_position_closed('SPY', 1, 1.0, -50.0)
+
+        # Nothing ages out of the day counts on its own, however long the reset is late
+        algo.Time += timedelta(days=10)
+        metrics = breaker.get_risk_metrics()
+        self.assertEqual((metrics['trades_today'], metrics['losses_today'], breaker.daily_pnl), (1, 1, -50.0))
+        self.assertEqual((metrics['trades_last_hour'], metrics['losses_last_hour']), (0, 0))
+
+        breaker._check_daily_reset()
+        self.assertEqual((breaker.trades_today, breaker.losses_today, breaker.daily_pnl), (0, 0, 0.0))
+
+
+def run_benchmark(events=20000):
+    """Order-path limit query: bucket totals vs scanning the day's event list"""
+    rng = random.Random(2)
+    counter = RollingCounter(24 * 60, ('trades', 'losses'))
+    history = []
+    now = datetime(2024, 1, 2, 0, 0)
+    times = [now + timedelta(seconds=3 * i) for i in range(events)]
+    for t in times:
+        loss = rng.random() < 0.3
+        counter.add(t, trades=1, losses=int(loss))
+        history.append((t, loss))
+
+    started = time.perf_counter()
+    for t in times[-2000:]:
+        counter.total('trades', t), counter.total('losses', t)
+    bucket_us = (time.perf_counter() - started) * 1e6 / 2000
+
+    started = time.perf_counter()
+    for t in times[-200:]:
+        cutoff = t - timedelta(days=1)
+        sum(1 for when, _ in history if when > cutoff), sum(1 for when, loss in history if when > cutoff and loss)
+    scan_us = (time.perf_counter() - started) * 1e6 / 200
+
+    print(f"{len(history):,} events in the window: bucket query {bucket_us:.2f}us, list scan {scan_us:.0f}us")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        run_benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Schedule Wheel Tests
+Verifies interval/cron/market-relative firing, jitter spreading and gap coalescing,
+and that market-relative jobs follow the exchange calendar (holidays, early closes)
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.schedule_wheel import ScheduleWheel
+from core.ondata_work_scheduler import OnDataWorkScheduler, WorkPriority
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 9, 30)  # Monday
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class MockExchangeHours:
+    """SecurityExchangeHours stand-in: regular 9:30-16:00 sessions with holidays and early closes"""
+
+    def __init__(self, holidays=(), early_closes=()):
+        self.holidays = set(holidays)
+        self.early_closes = set(early_closes)
+
+    def IsDateOpen(self, local_date_time):
+        day = local_date_time.date()
+        return day.weekday() < 5 and day not in self.holidays
+
+    def GetNextMarketOpen(self, local_date_time, extended_market_hours):
+        day = local_date_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        while True:
+            candidate = day.replace(hour=9, minute=30)
+            if self.IsDateOpen(day) and candidate >= local_date_time:
+                return candidate
+            day += timedelta(days=1)
+
+    def GetNextMarketClose(self, local_date_time, extended_market_hours):
+        day = local_date_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        while True:
+            candidate = day.replace(hour=13 if day.date() in self.early_closes else 16, minute=0)
+            if self.IsDateOpen(day) and candidate > local_date_time:
+                return candidate
+            day += timedelta(days=1)
+
+
+class TestScheduleWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.algorithm = MockAlgorithm()
+        self.wheel = ScheduleWheel(self.algorithm)
+        self.fired = []
+
+    def _recorder(self, name):
+        return lambda: self.fired.append((name, self.algorithm.Time))
+
+    def _run_minutes(self, minutes):
+        for _ in range(minutes):
+            self.algorithm.Time += timedelta(minutes=1)
+            self.wheel.tick()
+            self.wheel.tick()  # second slice in the same minute is free
+
+    def test_every_matches_minute_modulo(self):
+        self.wheel.every('corr', timedelta(minutes=30), self._recorder('corr'))
+        self._run_minutes(90)
+
+        self.assertEqual([t.strftime('%H:%M') for _, t in self.fired], ['10:00', '10:30', '11:00'])
+        self.assertEqual(self.wheel.stats['ticks_same_minute'], 90)
+
+    def test_jitter_moves_jobs_off_busy_minutes(self):
+        self.wheel.every('corr', timedelta(minutes=30), self._recorder('corr'))
+        greeks = self.wheel.every('greeks', timedelta(minutes=15), self._recorder('greeks'), jitter_minutes=2)
+        cache = self.wheel.every('cache', timedelta(minutes=15), self._recorder('cache'), jitter_minutes=2)
+
+        self.assertEqual(greeks.offset_minutes, 1)
+        self.assertEqual(cache.offset_minutes, 2)
+
+        self._run_minutes(30)
+        minutes = {}
+        for name, at in self.fired:
+            minutes.setdefault(at, []).append(name)
+        self.assertTrue(all(len(names) == 1 for names in minutes.values()))
+
+    def test_market_relative_jobs(self):
+        self.wheel.at_market_open('open_plus_15', self._recorder('open'), minutes_after=15)
+        self.wheel.before_market_close('pre_close', self._recorder('close'), minutes_before=15)
+        self._run_minutes(7 * 60)
+
+        self.assertEqual(self.fired, [('open', datetime(2024, 8, 5, 9, 45)),
+                                      ('close', datetime(2024, 8, 5, 15, 45))])
+
+    def test_market_jobs_follow_exchange_calendar(self):
+        # Thanksgiving week 2024: Thursday closed, Friday closes at 1:00 PM
+        hours = MockExchangeHours(holidays={datetime(2024, 11, 28).date()},
+                                  early_closes={datetime(2024, 11, 29).date()})
+        self.algorithm.Time = datetime(2024, 11, 27, 0, 0)
+        self.algorithm.spy = SimpleNamespace(Exchange=SimpleNamespace(Hours=hours))
+        wheel = ScheduleWheel(self.algorithm)
+        wheel.at_market_open('open_plus_15', self._recorder('open'), minutes_after=15)
+        wheel.before_market_close('pre_close', self._recorder('close'), minutes_before=15)
+
+        while self.algorithm.Time < datetime(2024, 12, 3):
+            self.algorithm.Time += timedelta(minutes=1)
+            wheel.tick()
+
+        self.assertEqual(self.fired, [
+            ('open', datetime(2024, 11, 27, 9, 45)), ('close', datetime(2024, 11, 27, 15, 45)),
+            ('open', datetime(2024, 11, 29, 9, 45)), ('close', datetime(2024, 11, 29, 12, 45)),
+            ('open', datetime(2024, 12, 2, 9, 45)), ('close', datetime(2024, 12, 2, 15, 45))
+        ])
+
+    def test_market_session_falls_back_to_holiday_table(self):
+        self.assertIsNone(self.wheel.market_session(datetime(2025, 11, 27)))  # Thanksgiving
+        self.assertIsNone(self.wheel.market_session(datetime(2025, 11, 29)))  # Saturday
+        self.assertEqual(self.wheel.market_session(datetime(2025, 11, 28, 11, 0)),
+                         (datetime(2025, 11, 28, 9, 30), datetime(2025, 11, 28, 13, 0)))
+
+        self.algorithm.Time = datetime(2025, 11, 26, 16, 0)
+        wheel = ScheduleWheel(self.algorithm)
+        job = wheel.before_market_close('pre_close', self._recorder('close'), minutes_before=15)
+        self.assertEqual(job.due, datetime(2025, 11, 28, 12, 45))
+
+    def test_data_gap_fires_once_and_reschedules(self):
+        job = self.wheel.every('corr', timedelta(minutes=30), self._recorder('corr'))
+        self.algorithm.Time = datetime(2024, 8, 6, 9, 31)  # overnight gap
+        self.wheel.tick()
+
+        self.assertEqual(len(self.fired), 1)
+        self.assertGreater(job.coalesced_count, 40)
+        self.assertEqual(job.due, datetime(2024, 8, 6, 10, 0))
+
+    def test_cron_weekday_filter(self):
+        self.wheel.cron('friday_only', self._recorder('fri'), minutes=[0], hours=[10], weekdays=[4])
+        for day in range(6, 11):
+            self.algorithm.Time = datetime(2024, 8, day, 10, 0)
+            self.wheel.tick()
+
+        self.assertEqual([t.weekday() for _, t in self.fired], [4])
+
+    def test_dispatches_through_work_scheduler(self):
+        self.algorithm.ondata_scheduler = OnDataWorkScheduler(self.algorithm)
+        wheel = ScheduleWheel(self.algorithm)
+        wheel.every('maintenance', timedelta(minutes=5), self._recorder('maint'), WorkPriority.DEFERRABLE)
+
+        self.algorithm.Time += timedelta(minutes=5)
+        wheel.tick()
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.algorithm.ondata_scheduler.get_pending_work_report()['pending_tasks'], 1)
+
+        self.algorithm.ondata_scheduler.run_slice()
+        self.assertEqual(len(self.fired), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
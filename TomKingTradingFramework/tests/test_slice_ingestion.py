@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Slice Ingestion Tests
+Verifies single-pass Slice -> vector ingestion used by the event-driven OnData path
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.slice_ingestion import SliceIngestor
+
+
+class MockBar:
+    def __init__(self, open_price, close, volume=0):
+        self.Open = open_price
+        self.Close = close
+        self.Volume = volume
+
+
+class MockTick:
+    def __init__(self, price, quantity=0):
+        self.Price = price
+        self.Quantity = quantity
+
+
+class MockSlice:
+    def __init__(self, time, bars=None, quote_bars=None, ticks=None):
+        self.Time = time
+        self.Bars = bars or {}
+        self.QuoteBars = quote_bars or {}
+        self.Ticks = ticks or {}
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 30)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class TestSliceIngestor(unittest.TestCase):
+
+    def setUp(self):
+        self.time = datetime(2024, 8, 5, 10, 30)
+        self.ingestor = SliceIngestor(MockAlgorithm(), initial_capacity=2)
+
+    def _slice(self, **kwargs):
+        self.time += timedelta(minutes=1)
+        return MockSlice(self.time, **kwargs)
+
+    def test_first_source_wins_and_strings_cached(self):
+        data = self._slice(bars={'SPY': MockBar(500.0, 501.0, 1000)},
+                           quote_bars={'SPY': MockBar(0, 999.0), 'QQQ': MockBar(0, 430.0)},
+                           ticks={'IWM': [MockTick(200.0), MockTick(201.0, 5)], 'VIX': []})
+
+        self.assertTrue(self.ingestor.ingest(data))
+        self.assertFalse(self.ingestor.ingest(data))
+        self.assertEqual(self.ingestor.prices_by_symbol(), {'SPY': 501.0, 'QQQ': 430.0, 'IWM': 201.0})
+        self.assertEqual(self.ingestor.symbol_strs, ['SPY', 'QQQ', 'IWM'])
+        self.assertEqual(self.ingestor.first_seen_mask().tolist(), [True, True, True])
+        # Capacity doubled from 2 to fit the third symbol
+        self.assertEqual(self.ingestor.capacity, 4)
+
+    def test_change_against_last_observed_price(self):
+        self.ingestor.ingest(self._slice(bars={'SPY': MockBar(500.0, 500.0), 'QQQ': MockBar(400.0, 400.0)}))
+        # QQQ absent this slice - its previous price must survive until it reappears
+        self.ingestor.ingest(self._slice(bars={'SPY': MockBar(500.0, 500.2)}))
+        self.ingestor.ingest(self._slice(bars={'SPY': MockBar(500.2, 500.3), 'QQQ': MockBar(400.0, 404.0)}))
+
+        change = self.ingestor.change_pct()
+        self.assertAlmostEqual(change[self.ingestor.slot_for_symbol_str('QQQ')], 0.01)
+        significant = self.ingestor.significant_slots(0.001)
+        self.assertEqual([self.ingestor.symbol_strs[s] for s in significant], ['QQQ'])
+
+    def test_intrabar_change_only_for_trade_bars(self):
+        self.ingestor.ingest(self._slice(bars={'SPY': MockBar(100.0, 101.0)},
+                                         quote_bars={'QQQ': MockBar(0, 50.0)}))
+        intrabar = self.ingestor.intrabar_change_pct()
+        self.assertAlmostEqual(intrabar[0], 0.01)
+        self.assertEqual(intrabar[1], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
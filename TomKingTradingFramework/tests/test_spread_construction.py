@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Spread Construction Tests
+Differential test: SpreadConstructionEngine must pick the same best spreads and
+condors as a brute-force search over the same short-strike candidates, and
+never rank a short strike outside the delta band around the target
+
+Run directly for the strike-selection benchmark (engine vs brute-force search):
+    python tests/test_spread_construction.py --benchmark
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlgorithmImports import OptionRight
+from helpers.spread_construction import ChainSnapshot, SpreadConstructionEngine
+
+
+EXPIRY = datetime(2024, 8, 9, 16, 0)
+
+
+class MockID:
+    def __init__(self, strike, right):
+        self.StrikePrice = strike
+        self.OptionRight = right
+        self.Date = EXPIRY
+
+
+class MockSymbol:
+    def __init__(self, strike, right):
+        self.ID = MockID(strike, right)
+
+    def __repr__(self):
+        return f"{'C' if self.ID.OptionRight == OptionRight.Call else 'P'}{self.ID.StrikePrice:g}"
+
+
+class MockSecurity:
+    def __init__(self, bid, ask):
+        self.BidPrice = bid
+        self.AskPrice = ask
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 9, 10, 30)
+        self.Securities = {}
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def synthetic_chain(algo, spot=550.0, strikes_each_side=60, seed=7, quoted=True):
+    """$1-strike 0DTE chain with noisy, decaying OTM premiums quoted in algo.Securities"""
+
+    rng = random.Random(seed)
+    contracts = []
+    for offset in range(-strikes_each_side, strikes_each_side + 1):
+        strike = spot + offset
+        for right in (OptionRight.Put, OptionRight.Call):
+            symbol = MockSymbol(strike, right)
+            contracts.append(symbol)
+            if not quoted:
+                continue
+            otm = (spot - strike) if right == OptionRight.Put else (strike - spot)
+            mid = max(0.01, 4.0 * 0.9 ** max(otm, 0) - min(otm, 0)) * rng.uniform(0.9, 1.1)
+            half_spread = max(0.01, mid * rng.uniform(0.01, 0.05))
+            algo.Securities[symbol] = MockSecurity(round(mid - half_spread, 2), round(mid + half_spread, 2))
+    rng.shuffle(contracts)
+    return contracts
+
+
+def build_snapshot(algo, contracts, spot=550.0):
+    return ChainSnapshot.from_contracts(algo, contracts, underlying_price=spot, volatility=0.25,
+                                        years_to_expiry=330 / (390 * 252))
+
+
+def brute_force_vertical(side, direction, target_delta, width, search_width, min_credit, delta_band=0.05):
+    """Best (credit/risk, short strike, long strike) scanning the same short candidates leg by leg"""
+
+    shorts = sorted(range(len(side)), key=lambda i: (abs(side.deltas[i] - target_delta), i))[:search_width]
+    band = max(delta_band, abs(side.deltas[shorts[0]] - target_delta))
+    shorts = [i for i in shorts if abs(side.deltas[i] - target_delta) <= band]
+    best = []
+    for s in shorts:
+        target = side.strikes[s] + direction * width
+        l = min(range(len(side)), key=lambda i: (abs(side.strikes[i] - target), i))
+        wing = (side.strikes[l] - side.strikes[s]) * direction
+        credit = side.bids[s] - side.asks[l]
+        if wing > 0 and credit >= min_credit and wing - credit > 0:
+            best.append((credit / (wing - credit), side.strikes[s], side.strikes[l], credit, wing))
+    return best
+
+
+class TestSpreadConstruction(unittest.TestCase):
+
+    def setUp(self):
+        self.algo = MockAlgorithm()
+        self.snapshot = build_snapshot(self.algo, synthetic_chain(self.algo))
+        self.engine = SpreadConstructionEngine(self.algo, wing_width=5.0, search_width=7, min_credit=0.05)
+
+    def test_snapshot_sorted_with_monotone_deltas(self):
+        for side in (self.snapshot.puts, self.snapshot.calls):
+            self.assertEqual(list(side.strikes), sorted(side.strikes))
+            self.assertEqual([s.ID.StrikePrice for s in side.symbols], list(side.strikes))
+        self.assertTrue((self.snapshot.puts.deltas[1:] >= self.snapshot.puts.deltas[:-1]).all())
+        self.assertTrue((self.snapshot.calls.deltas[1:] <= self.snapshot.calls.deltas[:-1]).all())
+        atm = self.snapshot.calls.nearest(550.0)
+        self.assertAlmostEqual(self.snapshot.calls.deltas[atm], 0.5, places=2)
+
+    def test_verticals_match_brute_force(self):
+        for side, direction, rank in ((self.snapshot.puts, -1.0, self.engine.put_spreads),
+                                      (self.snapshot.calls, 1.0, self.engine.call_spreads)):
+            expected = brute_force_vertical(side, direction, 0.16, 5.0, 7, 0.05)
+            best = max(expected)
+            candidate = rank(self.snapshot, target_delta=0.16)[0]
+
+            prefix = 'put' if direction < 0 else 'call'
+            self.assertAlmostEqual(candidate.credit_to_risk, best[0])
+            self.assertEqual(candidate.strikes[f'short_{prefix}'], best[1])
+            self.assertEqual(candidate.strikes[f'long_{prefix}'], best[2])
+            self.assertEqual(candidate.strikes[f'long_{prefix}'] - candidate.strikes[f'short_{prefix}'],
+                             direction * 5.0)
+
+    def test_iron_condor_matches_brute_force(self):
+        puts = brute_force_vertical(self.snapshot.puts, -1.0, 0.16, 5.0, 7, 0.0)
+        calls = brute_force_vertical(self.snapshot.calls, 1.0, 0.16, 5.0, 7, 0.0)
+        best = max(((p[3] + c[3]) / (max(p[4], c[4]) - p[3] - c[3]), p[1], c[1]) for p in puts for c in calls)
+
+        condor = self.engine.iron_condors(self.snapshot, 0.16, 0.16)[0]
+        self.assertAlmostEqual(condor.credit_to_risk, best[0])
+        self.assertEqual((condor.strikes['short_put'], condor.strikes['short_call']), best[1:])
+        self.assertLess(condor.strikes['long_put'], condor.strikes['short_put'])
+        self.assertGreater(condor.strikes['long_call'], condor.strikes['short_call'])
+        self.assertAlmostEqual(condor.short_deltas['put'], 0.16, delta=0.05)
+
+    def test_rich_short_outside_delta_band_not_selected(self):
+        # A near-the-money put quoted rich enough to top the credit/risk ranking
+        puts = self.snapshot.puts
+        rich = min(range(len(puts)), key=lambda i: abs(puts.deltas[i] - 0.22))
+        self.assertGreater(abs(puts.deltas[rich] - 0.16), 0.05)
+        puts.bids[rich] += 2.0
+
+        unbanded = SpreadConstructionEngine(self.algo, wing_width=5.0, search_width=7, min_credit=0.05,
+                                            delta_band=None)
+        self.assertEqual(unbanded.put_spreads(self.snapshot, target_delta=0.16)[0].strikes['short_put'],
+                         puts.strikes[rich])
+
+        candidates = self.engine.put_spreads(self.snapshot, target_delta=0.16)
+        self.assertTrue(candidates)
+        for candidate in candidates:
+            self.assertLessEqual(abs(candidate.short_deltas['put'] - 0.16), 0.05)
+        self.assertLessEqual(abs(self.engine.iron_condors(self.snapshot, 0.16, 0.16)[0].short_deltas['put'] - 0.16),
+                             0.05)
+
+    def test_target_strike_overrides_delta(self):
+        candidate = self.engine.put_spreads(self.snapshot, target_strike=539.0)[0]
+        self.assertLessEqual(abs(candidate.strikes['short_put'] - 539.0), 3)
+
+    def test_unquoted_chain_returns_no_candidates(self):
+        algo = MockAlgorithm()
+        snapshot = build_snapshot(algo, synthetic_chain(algo, quoted=False))
+        self.assertEqual(self.engine.iron_condors(snapshot, 0.16, 0.16), [])
+        self.assertEqual(snapshot.puts.symbols[snapshot.puts.nearest(541.6)].ID.StrikePrice, 542.0)
+
+
+def run_benchmark(strikes_each_side=150, rounds=200):
+    """Condor ranking time: engine (including building the index) vs the brute-force leg-by-leg search"""
+
+    algo = MockAlgorithm()
+    contracts = synthetic_chain(algo, strikes_each_side=strikes_each_side)
+    engine = SpreadConstructionEngine(algo)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        snapshot = build_snapshot(algo, contracts)
+        puts = brute_force_vertical(snapshot.puts, -1.0, 0.16, 5.0, engine.search_width, 0.0)
+        calls = brute_force_vertical(snapshot.calls, 1.0, 0.16, 5.0, engine.search_width, 0.0)
+        max(((p[3] + c[3]) / (max(p[4], c[4]) - p[3] - c[3]), p[1], c[1]) for p in puts for c in calls)
+    brute_ms = (time.perf_counter() - start) / rounds * 1000
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        engine.iron_condors(build_snapshot(algo, contracts), 0.16, 0.16)
+    engine_ms = (time.perf_counter() - start) / rounds * 1000
+
+    return {'contracts': len(contracts), 'brute_ms': brute_ms, 'engine_ms': engine_ms}
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        for width in (60, 150, 400):
+            stats = run_benchmark(strikes_each_side=width)
+            print(f"[BENCH] {stats['contracts']} contracts: engine {stats['engine_ms']:.3f}ms, "
+                  f"brute force {stats['brute_ms']:.3f}ms per condor selection")
+    else:
+        unittest.main()
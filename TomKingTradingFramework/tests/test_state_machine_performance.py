@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+State Machine Performance Tests
+Validates the compiled transition table, bounded state history and the
+per-slice handler dispatch array.
+
+Run directly for the microbenchmark report (trigger throughput and per-slice
+dispatch cost for all five strategies):
+    python tests/test_state_machine_performance.py --benchmark
+"""
+
+import unittest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.state_machine import (StrategyStateMachine, StrategyState, TransitionTrigger,
+                                STATE_COUNT, TRIGGER_COUNT, state_index)
+from strategies.base_strategy_with_state import BaseStrategyWithState
+from config.constants import TradingConstants
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 30)
+        self.spy = 'SPY'
+
+    def IsMarketOpen(self, symbol):
+        return True
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class RecordingStrategy(BaseStrategyWithState):
+    """Minimal concrete strategy recording which handler ran"""
+
+    def __init__(self, algorithm):
+        self.calls = []
+        super().__init__(algorithm, "Recording")
+
+    def _check_entry_conditions(self) -> bool:
+        return False
+
+    def _place_entry_orders(self) -> bool:
+        return True
+
+    def _place_exit_orders(self) -> bool:
+        return True
+
+    def _manage_position(self):
+        self.calls.append('manage')
+
+    def _execute_exit(self):
+        self.calls.append('exit')
+
+
+# Full lifecycle through the standard transitions
+LIFECYCLE = [
+    TransitionTrigger.MARKET_OPEN,           # INITIALIZING -> READY
+    TransitionTrigger.TIME_WINDOW_START,     # READY -> ANALYZING
+    TransitionTrigger.ENTRY_CONDITIONS_MET,  # ANALYZING -> PENDING_ENTRY
+    TransitionTrigger.MARKET_OPEN,           # PENDING_ENTRY -> ENTERING
+    TransitionTrigger.ORDER_FILLED,          # ENTERING -> POSITION_OPEN
+    TransitionTrigger.MARKET_OPEN,           # POSITION_OPEN -> MANAGING
+    TransitionTrigger.PROFIT_TARGET_HIT,     # MANAGING -> PENDING_EXIT
+    TransitionTrigger.MARKET_OPEN,           # PENDING_EXIT -> EXITING
+    TransitionTrigger.ORDER_FILLED,          # EXITING -> CLOSED
+]
+
+
+def run_trigger_benchmark(cycles: int = 2000):
+    """Drive `cycles` full lifecycles through a state machine; returns throughput statistics"""
+
+    machine = StrategyStateMachine(MockAlgorithm(), "Benchmark")
+
+    start = time.perf_counter()
+    for _ in range(cycles):
+        machine.current_state = StrategyState.INITIALIZING
+        for trigger in LIFECYCLE:
+            machine.trigger(trigger)
+        machine.trigger(TransitionTrigger.FOMC_MEETING)  # unmapped: rejected via the table
+    elapsed = time.perf_counter() - start
+
+    triggers = cycles * (len(LIFECYCLE) + 1)
+    return {
+        'triggers': triggers,
+        'elapsed_seconds': elapsed,
+        'triggers_per_second': triggers / elapsed if elapsed > 0 else 0.0,
+        'history_depth': len(machine.state_history)
+    }
+
+
+def legacy_dispatch(strategy, state):
+    """Reference: the if/elif chain execute() used before the dispatch array"""
+    if state == StrategyState.INITIALIZING: return strategy._check_initialization
+    elif state == StrategyState.READY: return strategy._check_entry_window
+    elif state == StrategyState.ANALYZING: return strategy._analyze_market
+    elif state == StrategyState.PENDING_ENTRY: return strategy._prepare_entry
+    elif state == StrategyState.ENTERING: return strategy._execute_entry
+    elif state == StrategyState.POSITION_OPEN: return strategy._check_position_status
+    elif state == StrategyState.MANAGING: return strategy._manage_position
+    elif state == StrategyState.ADJUSTING: return strategy._adjust_position
+    elif state == StrategyState.PENDING_EXIT: return strategy._prepare_exit
+    elif state == StrategyState.EXITING: return strategy._execute_exit
+    elif state == StrategyState.CLOSED: return strategy._cleanup_after_close
+    elif state == StrategyState.ERROR: return strategy._handle_error_state
+    elif state == StrategyState.SUSPENDED: return strategy._check_suspension_conditions
+    return None
+
+
+def run_dispatch_benchmark(strategy, slices: int = 20000):
+    """Per-slice handler lookup cost, table vs legacy chain, averaged over every dispatched state"""
+
+    states = [s for s in StrategyState if strategy._state_handlers[state_index(s)] is not None]
+
+    start = time.perf_counter()
+    for i in range(slices):
+        strategy._state_handlers[state_index(states[i % len(states)])]
+    table_ns = (time.perf_counter() - start) / slices * 1e9
+
+    start = time.perf_counter()
+    for i in range(slices):
+        legacy_dispatch(strategy, states[i % len(states)])
+    legacy_ns = (time.perf_counter() - start) / slices * 1e9
+
+    return {'table_ns': table_ns, 'legacy_ns': legacy_ns}
+
+
+def build_all_strategies():
+    """The five production strategies on a mocked algorithm (benchmark only)"""
+
+    from strategies.friday_0dte_with_state import Friday0DTEWithState
+    from strategies.lt112_with_state import LT112WithState
+    from strategies.ipmcc_with_state import IPMCCWithState
+    from strategies.futures_strangle_with_state import FuturesStrangleWithState
+    from strategies.leap_put_ladders_with_state import LEAPPutLaddersWithState
+
+    strategies = []
+    for strategy_class in (Friday0DTEWithState, LT112WithState, IPMCCWithState,
+                           FuturesStrangleWithState, LEAPPutLaddersWithState):
+        algorithm = MagicMock()
+        algorithm.Time = datetime(2024, 8, 5, 10, 30)
+        algorithm.LiveMode = False
+        algorithm.position_sizer.get_portfolio_value.return_value = 100000.0
+        strategies.append(strategy_class(algorithm))
+    return strategies
+
+
+class TestStateMachinePerformance(unittest.TestCase):
+
+    def setUp(self):
+        self.machine = StrategyStateMachine(MockAlgorithm(), "Test")
+
+    def test_compiled_table_matches_transition_map(self):
+        self.machine.add_transition(StrategyState.MANAGING, StrategyState.EXITING, TransitionTrigger.VIX_SPIKE)
+
+        for state in StrategyState:
+            for trigger in TransitionTrigger:
+                self.machine.current_state = state
+                self.assertEqual(self.machine.can_transition(trigger),
+                                 (state, trigger) in self.machine.transitions)
+        self.assertEqual(len(self.machine._table), STATE_COUNT * TRIGGER_COUNT)
+
+    def test_full_lifecycle(self):
+        for trigger in LIFECYCLE:
+            self.assertTrue(self.machine.trigger(trigger), trigger)
+        self.assertEqual(self.machine.current_state, StrategyState.CLOSED)
+        self.assertFalse(self.machine.trigger(TransitionTrigger.FOMC_MEETING))
+
+    def test_conditions_and_callbacks_still_apply(self):
+        entered = []
+        self.machine.set_on_enter(StrategyState.READY, lambda ctx: entered.append(ctx.previous_state))
+        self.machine.add_transition(StrategyState.READY, StrategyState.SUSPENDED, TransitionTrigger.VIX_SPIKE,
+                                    condition=lambda data: data and data.get('vix', 0) > 30)
+
+        self.machine.trigger(TransitionTrigger.MARKET_OPEN)
+        self.assertEqual(entered, [StrategyState.INITIALIZING])
+        self.assertFalse(self.machine.trigger(TransitionTrigger.VIX_SPIKE, {'vix': 20}))
+        self.assertTrue(self.machine.trigger(TransitionTrigger.VIX_SPIKE, {'vix': 35}))
+
+    def test_history_is_bounded_ring(self):
+        result = run_trigger_benchmark(cycles=100)
+        self.assertEqual(result['history_depth'], TradingConstants.STATE_HISTORY_SIZE)
+
+        stats = self.machine.get_statistics()
+        self.assertEqual(stats['total_transitions'], 0)
+
+    def test_error_recovery_returns_to_ready(self):
+        self.machine.trigger(TransitionTrigger.SYSTEM_ERROR)
+        self.machine.error_state_entry_time = self.machine.algorithm.Time
+        self.machine.algorithm.Time += timedelta(minutes=31)
+
+        self.assertTrue(self.machine.check_error_recovery())
+        self.assertEqual(self.machine.current_state, StrategyState.READY)
+
+    def test_dispatch_array_routes_to_state_handler(self):
+        strategy = RecordingStrategy(MockAlgorithm())
+
+        strategy.state_machine.current_state = StrategyState.MANAGING
+        strategy.execute()
+        strategy.state_machine.current_state = StrategyState.EXITING
+        strategy.execute()
+        self.assertEqual(strategy.calls, ['manage', 'exit'])
+
+        for state in StrategyState:
+            self.assertEqual(strategy._state_handlers[state_index(state)], legacy_dispatch(strategy, state))
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        for cycles in (1000, 10000):
+            stats = run_trigger_benchmark(cycles)
+            print(f"[BENCH] trigger: {stats['triggers']} triggers in {stats['elapsed_seconds']:.3f}s "
+                  f"({stats['triggers_per_second']:,.0f}/s), history depth {stats['history_depth']}")
+        for strategy in build_all_strategies():
+            stats = run_dispatch_benchmark(strategy)
+            print(f"[BENCH] dispatch {strategy.strategy_name}: table {stats['table_ns']:.0f}ns/slice, "
+                  f"legacy if/elif {stats['legacy_ns']:.0f}ns/slice")
+    else:
+        unittest.main()
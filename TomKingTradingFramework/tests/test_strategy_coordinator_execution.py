@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Strategy Coordinator Execution Tests
+Strategies run in priority order against one shared MarketContext per slice,
+and the snapshot never outlives the slice it was built for
+"""
+
+import unittest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.strategy_coordinator import StrategyCoordinator, StrategyPriority
+from core.state_machine import StrategyState
+from strategies.lt112_with_state import LT112WithState
+
+
+class MockTransactions:
+    def __init__(self):
+        self.LastOrderId = 0
+
+
+class MockPortfolio:
+    TotalPortfolioValue = 100000.0
+    MarginRemaining = 50000.0
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.IsWarmingUp = False
+        self.Time = datetime(2024, 8, 5, 10, 30)
+        self.Transactions = MockTransactions()
+        self.Portfolio = MockPortfolio()
+        self.strategies = {}
+        self.orders = []
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class MockSlice:
+    def __init__(self, time, price):
+        self.Time = time
+        self.Bars = {'SPY': type('Bar', (), {'Close': price, 'Open': price})()}
+        self.QuoteBars = {}
+        self.Ticks = {}
+
+
+class AnalyzingStrategy:
+    """
+    Minimal strategy: entry analysis depends on the slice price and on the
+    shared order book, so an earlier commit in the same slice changes the
+    decision of later strategies.
+    """
+
+    def __init__(self, algorithm, name, threshold):
+        self.algo = algorithm
+        self.strategy_name = name
+        self.threshold = threshold
+        self.state_machine = type('SM', (), {'current_state': 'ANALYZING'})()
+        self.decisions = []
+
+    def execute(self, market_context=None):
+        open_orders = len(self.algo.orders)
+        conditions_met = market_context.price('SPY') > self.threshold and open_orders < 2
+
+        self.decisions.append((self.algo.Time, conditions_met))
+        if conditions_met:
+            self.algo.Transactions.LastOrderId += 1
+            self.algo.orders.append((self.algo.Time, self.strategy_name))
+
+
+class RecordingLT112(LT112WithState):
+    """The real LT112 entry logic; order placement only records the slice"""
+
+    def __init__(self, algorithm):
+        super().__init__(algorithm)
+        self.full_checks = 0
+        self.entries = []
+
+    def _check_entry_conditions(self) -> bool:
+        self.full_checks += 1
+        return super()._check_entry_conditions()
+
+    def _place_entry_orders(self) -> bool:
+        self.entries.append(self.algo.Time)
+        self.algo.Transactions.LastOrderId += 1
+        return True
+
+
+def lt112_algorithm():
+    algorithm = MockAlgorithm()
+    algorithm.Time = datetime(2024, 8, 5, 9, 0)  # Monday
+    algorithm.spy = 'SPY'
+    algorithm.Securities = {'SPY': SimpleNamespace(Price=500.0)}
+    algorithm.Portfolio.Values = []
+    algorithm.vix_manager = SimpleNamespace(get_current_vix=lambda: 18.0)
+    algorithm.position_sizer = SimpleNamespace(calculate_lt112_size=lambda: 1)
+    return algorithm
+
+
+def run_lt112_session():
+    """A week of 30-minute slices: LT112 waits in ANALYZING until a Wednesday with VIX in its band"""
+    algorithm = lt112_algorithm()
+    coordinator = StrategyCoordinator(algorithm)
+    coordinator.execution_windows = {}
+    coordinator.register_strategy('lt112_management', StrategyPriority.MEDIUM)
+    strategy = RecordingLT112(algorithm)
+    strategy.state_machine.current_state = StrategyState.ANALYZING
+    algorithm.strategies['lt112_management'] = strategy
+
+    states = []
+    for step in range(7 * 48):
+        algorithm.Time += timedelta(minutes=30)
+        vix = 40.0 if algorithm.Time.day == 7 and algorithm.Time.hour < 12 else 18.0  # Wednesday morning spike
+        coordinator.execute_strategies(MockSlice(algorithm.Time, 500.0), {'vix': vix, 'regime': 'NORMAL'})
+        states.append(strategy.state_machine.current_state)
+    return strategy, states, coordinator
+
+
+def run_session(slices=40):
+    algorithm = MockAlgorithm()
+    coordinator = StrategyCoordinator(algorithm)
+    coordinator.execution_windows = {}
+
+    specs = [('zero_day_theta', StrategyPriority.HIGH, 500.5),
+             ('lt112_management', StrategyPriority.MEDIUM, 500.2),
+             ('futures_strangle', StrategyPriority.MEDIUM, 500.8),
+             ('leap_ladder', StrategyPriority.LOW, 500.1)]
+    for name, priority, threshold in specs:
+        coordinator.register_strategy(name, priority)
+        algorithm.strategies[name] = AnalyzingStrategy(algorithm, name, threshold)
+
+    start = time.perf_counter()
+    for i in range(slices):
+        algorithm.Time += timedelta(minutes=5)
+        if i % 10 == 0:
+            algorithm.orders.clear()  # positions closed overnight
+        price = 500.0 + (i % 7) * 0.2
+        coordinator.execute_strategies(MockSlice(algorithm.Time, price), {'vix': 18.0, 'regime': 'NORMAL'})
+    elapsed = time.perf_counter() - start
+
+    decisions = {name: strategy.decisions for name, strategy in algorithm.strategies.items()}
+    return decisions, list(algorithm.orders), coordinator, elapsed
+
+
+class TestStrategyCoordinatorExecution(unittest.TestCase):
+
+    def test_commit_order_follows_priority(self):
+        _, orders, coordinator, _ = run_session()
+        self.assertTrue(orders)
+        rank = {name: i for i, name in enumerate(coordinator.get_execution_order())}
+        for at in {at for at, _ in orders}:
+            committed = [rank[name] for slice_time, name in orders if slice_time == at]
+            self.assertEqual(committed, sorted(committed))
+
+    def test_earlier_commit_visible_to_later_strategies(self):
+        decisions, orders, _, _ = run_session()
+        # Once two orders are open in a slice, lower-priority strategies see them and stand down
+        for at in {at for at, _ in orders}:
+            self.assertLessEqual(len([name for slice_time, name in orders if slice_time == at]), 2)
+        self.assertTrue(any(not met for name in decisions for _, met in decisions[name]))
+
+
+class TestRealStrategyExecution(unittest.TestCase):
+
+    def test_lt112_enters_on_first_wednesday_in_band(self):
+        strategy, states, _ = run_lt112_session()
+        # Conditions met on the first Wednesday slice with VIX in band (12:00), orders placed once ENTERING
+        self.assertEqual(strategy.entries[0], datetime(2024, 8, 7, 13, 0))
+        self.assertIn(StrategyState.ANALYZING, states)
+
+    def test_snapshot_cleared_after_execute(self):
+        algorithm = lt112_algorithm()
+        strategy = RecordingLT112(algorithm)
+        context = StrategyCoordinator(algorithm).context_builder.build(MockSlice(algorithm.Time, 500.0), vix=18.0)
+        strategy.execute(context)
+        self.assertIsNone(strategy.market_context)
+
+        # Direct calls after the slice read live data, not the last snapshot
+        algorithm.Securities['SPY'].Price = 505.0
+        algorithm.vix_manager = SimpleNamespace(get_current_vix=lambda: 22.0)
+        self.assertEqual((strategy._get_price('SPY'), strategy._current_vix()), (505.0, 22.0))
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        _, _, _, elapsed = run_session(slices=200)
+        print(f"[BENCH] serial: {elapsed * 1000:.1f}ms for 200 slices")
+    else:
+        unittest.main()
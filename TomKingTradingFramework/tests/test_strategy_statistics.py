@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Strategy Statistics Tests
+Differential test: the online win rate and win/loss moments (with and without
+decay) must equal a weighted recompute over every recorded return, bootstrap
+intervals must be deferred to the OnData scheduler and computed once per
+change, and the Kelly sizers must switch from documented to observed figures
+once a strategy has enough closed trades
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.constants import TradingConstants
+from risk.strategy_statistics import StrategyStatisticsBook, get_strategy_statistics, kelly_fraction
+from risk.kelly_criterion import KellyCriterion
+from core.unified_position_sizer import UnifiedPositionSizer
+from config.strategy_validator import StrategyValidator
+from reporting.performance_tracker import PerformanceTracker
+from core.state_machine import StrategyState, TransitionTrigger
+from strategies.base_strategy_with_state import BaseStrategyWithState
+
+
+class MockScheduler:
+    def __init__(self):
+        self.pending = {}
+
+    def submit(self, name, callback, priority):
+        self.pending[name] = callback
+
+    def run_slice(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.Portfolio = SimpleNamespace(TotalPortfolioValue=100000.0, MarginRemaining=60000.0, Cash=40000.0)
+        self.Securities = {"VIX": SimpleNamespace(Price=18.0)}
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class MockPortfolio(SimpleNamespace):
+    def __getitem__(self, symbol):
+        return self.holdings[symbol]
+
+
+class ClosingStrategy(BaseStrategyWithState):
+    """Single-position credit strategy driven through the standard lifecycle"""
+
+    def _check_entry_conditions(self) -> bool:
+        return True
+
+    def _place_entry_orders(self) -> bool:
+        return True
+
+    def _place_exit_orders(self) -> bool:
+        return True
+
+
+OPEN_AND_CLOSE = [
+    TransitionTrigger.MARKET_OPEN, TransitionTrigger.TIME_WINDOW_START, TransitionTrigger.ENTRY_CONDITIONS_MET,
+    TransitionTrigger.MARKET_OPEN, TransitionTrigger.ORDER_FILLED, TransitionTrigger.MARKET_OPEN,
+    TransitionTrigger.PROFIT_TARGET_HIT, TransitionTrigger.MARKET_OPEN, TransitionTrigger.ORDER_FILLED
+]
+
+
+def weighted_reference(returns, decay):
+    """(win rate, avg win, avg loss, win std, loss std) recomputed with weight decay ** age"""
+    values = np.array(returns)
+    weights = decay ** np.arange(len(values) - 1, -1, -1, dtype=float)
+
+    def moments(mask):
+        w, x = weights[mask], values[mask]
+        mean = (w * x).sum() / w.sum()
+        denominator = w.sum() - (w * w).sum() / w.sum()
+        variance = (w * (x - mean) ** 2).sum() / denominator if denominator > 0 else 0.0
+        return mean, variance ** 0.5
+
+    wins = values > 0
+    win_mean, win_std = moments(wins)
+    loss_mean, loss_std = moments(~wins)
+    return weights[wins].sum() / weights.sum(), win_mean, -loss_mean, win_std, loss_std
+
+
+class TestStrategyStatistics(unittest.TestCase):
+
+    def test_online_moments_match_recompute(self):
+        rng = random.Random(5)
+        for half_life in (None, 25.0):
+            book = StrategyStatisticsBook(MockAlgorithm(), half_life_trades=half_life)
+            decay = 0.5 ** (1 / half_life) if half_life else 1.0
+            history = {'0DTE': [], 'LT112': []}
+            for step in range(1200):
+                # Journal and sizer names for the same strategy land in one series
+                name = rng.choice(['0DTE', 'FRIDAY_0DTE', 'LT112', 'LONG_TERM_112'])
+                key = '0DTE' if '0DTE' in name else 'LT112'
+                value = rng.uniform(0.1, 0.6) if rng.random() < 0.8 else -rng.uniform(0.2, 2.0)
+                book.record(name, value)
+                history[key].append(value)
+
+                if step % 50 == 49:
+                    for strategy, returns in history.items():
+                        stats = book.get(strategy)
+                        expected = weighted_reference(returns, decay)
+                        actual = (stats.win_rate, stats.avg_win, stats.avg_loss, stats.win_std, stats.loss_std)
+                        for a, e in zip(actual, expected):
+                            self.assertAlmostEqual(a, e, places=9, msg=f"half-life {half_life} step {step}")
+                        self.assertAlmostEqual(stats.kelly(), kelly_fraction(*expected[:3]), places=9)
+
+            self.assertEqual(set(book.strategies), {'0DTE', 'LT112'})
+            self.assertEqual(sum(s.trades for s in book.strategies.values()), 1200)
+        # Without decay the moments are plain Welford: sample std of the raw lists
+        self.assertAlmostEqual(weighted_reference([1.0, 2.0, -1.0, 4.0], 1.0)[3], np.std([1.0, 2.0, 4.0], ddof=1))
+
+    def test_bootstrap_interval_is_deferred_and_cached(self):
+        algo = MockAlgorithm()
+        algo.ondata_scheduler = MockScheduler()
+        book = get_strategy_statistics(algo)
+        rng = random.Random(9)
+        for _ in range(300):
+            book.record('STRANGLE', rng.uniform(0.2, 0.5) if rng.random() < 0.75 else -rng.uniform(0.3, 1.0))
+
+        self.assertIsNone(book.confidence_interval('STRANGLE'))  # nothing computed yet; scheduled
+        self.assertEqual(book.stats['intervals_computed'], 0)
+        algo.ondata_scheduler.run_slice()
+        low, high = book.confidence_interval('STRANGLE')
+        self.assertLess(low, book.get('STRANGLE').kelly())
+        self.assertGreater(high, book.get('STRANGLE').kelly())
+        self.assertEqual(book.stats['intervals_computed'], 1)
+        self.assertEqual(algo.ondata_scheduler.pending, {})  # current interval: nothing rescheduled
+
+        book.record('STRANGLE', -0.8)
+        self.assertEqual(book.confidence_interval('STRANGLE'), (low, high))  # stale value served meanwhile
+        self.assertTrue(book.get('STRANGLE').interval_stale)
+        book.refresh_intervals()
+        algo.ondata_scheduler.run_slice()  # already refreshed: the queued job does nothing
+        self.assertEqual(book.stats['intervals_computed'], 2)
+        self.assertFalse(book.get('STRANGLE').interval_stale)
+
+
+class TestObservedSizing(unittest.TestCase):
+
+    def test_sizers_switch_to_observed_statistics(self):
+        algo = MockAlgorithm()
+        tracker = PerformanceTracker(algo)
+        kelly = KellyCriterion(algo)
+        sizer = UnifiedPositionSizer(algo)
+        validator = StrategyValidator(algo)
+        self.assertIs(kelly.strategy_statistics, tracker.strategy_statistics)
+
+        documented = kelly.calculate_position_sizes_for_strategies()['LT112']
+        self.assertEqual(documented['source'], 'documented')
+        self.assertIsNone(validator.get_strategy_performance_metrics('LT112')['observed'])
+
+        rng = random.Random(2)
+        for _ in range(TradingConstants.STRATEGY_STATS_MIN_TRADES):
+            pnl_pct = 0.5 if rng.random() < 0.6 else -1.0
+            tracker.RecordTrade({'strategy': 'LONG_TERM_112', 'pnl': pnl_pct * 1000, 'pnl_pct': pnl_pct})
+        tracker.RecordTrade({'strategy': 'LONG_TERM_112', 'pnl': 50.0})  # no return: not counted
+
+        stats = tracker.strategy_statistics.get('LT112')
+        self.assertEqual(stats.trades, TradingConstants.STRATEGY_STATS_MIN_TRADES)
+        observed = kelly.calculate_position_sizes_for_strategies()['LT112']
+        self.assertEqual(observed['source'], 'observed')
+        self.assertAlmostEqual(observed['percentage'],
+                               kelly.calculate_kelly_size(stats.win_rate, stats.avg_win, stats.avg_loss, 0.90))
+        self.assertIsNotNone(observed['kelly_interval'])  # computed inline without a scheduler
+
+        expected = sizer._calculate_kelly_size(100000.0, stats.win_rate, stats.avg_win, stats.avg_loss, None)
+        self.assertEqual(sizer.calculate_position_size('LT112', win_rate=0.99, avg_win=5.0, avg_loss=0.1),
+                         min(expected, TradingConstants.MAX_CONTRACTS_LT112))
+
+        metrics = validator.get_strategy_performance_metrics('LT112')
+        self.assertEqual(metrics['win_rate_target'], 0.95)
+        self.assertAlmostEqual(metrics['observed']['win_rate'], stats.win_rate)
+
+
+class TestClosePathFeedsStatistics(unittest.TestCase):
+
+    def test_strategy_close_records_return_on_entry_credit(self):
+        algo = MockAlgorithm()
+        algo.Securities.update({'SPX_P5400': SimpleNamespace(Price=1.0), 'SPX_P5350': SimpleNamespace(Price=0.5),
+                                'SPX': SimpleNamespace(Price=5450.0)})
+        algo.Portfolio = MockPortfolio(TotalPortfolioValue=100000.0, holdings={
+            'SPX_P5400': SimpleNamespace(LastTradeProfit=250.0),
+            'SPX_P5350': SimpleNamespace(LastTradeProfit=-150.0),
+            'SPX': SimpleNamespace(LastTradeProfit=9999.0)
+        })
+        strategy = ClosingStrategy(algo, "FRIDAY_0DTE")
+
+        for profit in (100.0, -300.0):
+            algo.Portfolio.holdings['SPX_P5400'].LastTradeProfit = profit + 150.0
+            strategy.state_machine.current_state = StrategyState.INITIALIZING
+            for trigger in OPEN_AND_CLOSE:
+                if trigger is TransitionTrigger.ORDER_FILLED and strategy.current_position is None:
+                    # Only the legs are summed, not the underlying or bookkeeping entries
+                    strategy.current_position = {'short_put': 'SPX_P5400', 'long_put': 'SPX_P5350', 'contracts': 2,
+                                                 'underlying': 'SPX', 'entry_time': algo.Time}
+                    strategy.entry_price = 200.0  # credit received, $
+                strategy.state_machine.trigger(trigger)
+            self.assertEqual(strategy.state_machine.current_state, StrategyState.CLOSED)
+            strategy._cleanup_after_close()
+
+        stats = get_strategy_statistics(algo).get('0DTE')
+        self.assertEqual(stats.trades, 2)
+        self.assertEqual(list(stats.returns), [0.5, -1.5])
+        self.assertEqual((strategy.wins, strategy.losses), (1, 1))
+
+        # Multi-position strategies record from their exit handlers; the CLOSED hook adds nothing
+        strategy.state_machine.current_state = StrategyState.EXITING
+        strategy.state_machine.trigger(TransitionTrigger.ORDER_FILLED)
+        self.assertEqual(stats.trades, 2)
+
+
+def run_benchmark(trades=50000, queries=2000):
+    """Kelly inputs read from the running statistics vs recomputed from the trade journal"""
+    rng = random.Random(4)
+    book = StrategyStatisticsBook(MockAlgorithm())
+    journal = []
+    for _ in range(trades):
+        value = rng.uniform(0.1, 0.6) if rng.random() < 0.8 else -rng.uniform(0.2, 2.0)
+        book.record('0DTE', value)
+        journal.append({'strategy': '0DTE', 'pnl_pct': value})
+
+    started = time.perf_counter()
+    for _ in range(queries):
+        book.kelly_inputs('0DTE')
+    online_us = (time.perf_counter() - started) * 1e6 / queries
+
+    started = time.perf_counter()
+    for _ in range(20):
+        returns = [t['pnl_pct'] for t in journal if t['strategy'] == '0DTE']
+        wins = [r for r in returns if r > 0]
+        losses = [-r for r in returns if r <= 0]
+        (len(wins) / len(returns), sum(wins) / len(wins), sum(losses) / len(losses))
+    rescan_us = (time.perf_counter() - started) * 1e6 / 20
+
+    started = time.perf_counter()
+    book.confidence_interval('0DTE')
+    bootstrap_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{trades:,} closed trades: running stats {online_us:.2f}us/query, journal rescan {rescan_us:.0f}us/query; "
+          f"bootstrap interval {bootstrap_ms:.1f}ms (off the order path)")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        run_benchmark()
+    else:
+        unittest.main()
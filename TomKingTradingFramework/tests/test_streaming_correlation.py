@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Streaming Correlation Tests
+Differential test: the StreamingCorrelationEngine's rolling matrix must match
+np.corrcoef over the same trailing return windows, and DynamicCorrelationMonitor
+must report the same pairs it did with per-pair deque/corrcoef computation.
+Slices processed by EventDrivenOnData must reach the monitor through the
+unified risk manager's correlation plugin, skipped slices included
+
+Run directly for the per-bar benchmark (engine vs per-pair corrcoef):
+    python tests/test_streaming_correlation.py --benchmark
+"""
+
+import unittest
+import sys
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimization.streaming_correlation import StreamingCorrelationEngine
+from optimization.dynamic_correlation_monitor import DynamicCorrelationMonitor
+from core.event_bus import EventBus
+from core.event_driven_ondata import EventDrivenOnData
+from core.slice_ingestion import SliceIngestor
+from risk.unified_risk_manager import UnifiedRiskManager
+from risk.plugins.correlation_plugin import CorrelationPlugin
+
+
+UNIVERSE = ['SPY', 'QQQ', 'IWM', 'DIA', 'TLT', 'GLD', 'SLV', 'USO', 'UNG',
+            'ES', 'NQ', 'RTY', 'CL', 'GC', 'SI', 'ZB', 'ZN', 'ZF',
+            'MES', 'MNQ', 'MYM', 'MCL', 'MGC', 'SIL', 'M2K', 'VIX']
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 9, 30)
+
+    def Debug(self, message):
+        pass
+
+    def Log(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+class MockBar:
+    def __init__(self, price):
+        self.Open = price
+        self.Close = price
+        self.Volume = 0
+
+
+def correlated_paths(symbols, bars, seed=1):
+    """Prices driven by a common factor plus noise, so correlations are non-trivial"""
+    rng = np.random.default_rng(seed)
+    betas = rng.uniform(-1.0, 1.5, len(symbols))
+    factor = rng.normal(0, 0.01, bars)
+    noise = rng.normal(0, 0.01, (bars, len(symbols)))
+    returns = factor[:, None] * betas[None, :] + noise
+    return 100.0 * np.cumprod(1.0 + returns, axis=0)
+
+
+class LegacyCorrelations:
+    """Per-symbol deques and pairwise corrcoef, as DynamicCorrelationMonitor computed them"""
+
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.prices = {}
+        self.returns = {}
+
+    def update(self, symbol, price):
+        if symbol not in self.prices:
+            self.prices[symbol] = deque(maxlen=self.window_size + 1)
+            self.returns[symbol] = deque(maxlen=self.window_size)
+        self.prices[symbol].append(price)
+        if len(self.prices[symbol]) >= 2:
+            self.returns[symbol].append(self.prices[symbol][-1] / self.prices[symbol][-2] - 1)
+
+    def matrix(self):
+        ready = [s for s in self.returns if len(self.returns[s]) >= self.window_size]
+        result = {}
+        for i, s1 in enumerate(ready):
+            for s2 in ready[i + 1:]:
+                corr = np.corrcoef(np.array(list(self.returns[s1])), np.array(list(self.returns[s2])))[0, 1]
+                result[(s1, s2)] = result[(s2, s1)] = corr
+        return result
+
+
+class TestStreamingCorrelation(unittest.TestCase):
+
+    def test_matrix_matches_corrcoef_with_late_joiners_and_growth(self):
+        window = 20
+        prices = correlated_paths(UNIVERSE, 400)
+        engine = StreamingCorrelationEngine(window, initial_capacity=4, resync_interval=37)
+        joined_at = {symbol: (i % 5) * 30 for i, symbol in enumerate(UNIVERSE)}
+
+        for bar in range(len(prices)):
+            engine.update_bar({s: prices[bar, k] for k, s in enumerate(UNIVERSE) if bar >= joined_at[s]})
+            if bar < 150 or bar % 23:
+                continue
+            symbols, matrix = engine.correlation_matrix()
+            self.assertEqual(sorted(symbols), sorted(s for s in UNIVERSE if bar - joined_at[s] >= window))
+            columns = [UNIVERSE.index(s) for s in symbols]
+            window_returns = prices[bar - window:bar + 1, columns]
+            expected = np.corrcoef((window_returns[1:] / window_returns[:-1] - 1).T)
+            np.testing.assert_allclose(matrix, expected, atol=1e-9)
+            self.assertAlmostEqual(engine.correlation(symbols[0], symbols[-1]), expected[0, -1], places=9)
+
+        self.assertGreater(engine.get_statistics()['resyncs'], 0)
+        self.assertGreaterEqual(engine.capacity, len(UNIVERSE))
+
+    def test_monitor_matches_legacy_pairs(self):
+        algo = MockAlgorithm()
+        monitor = DynamicCorrelationMonitor(algo, window_size=20, update_frequency=0)
+        legacy = LegacyCorrelations(20)
+        symbols = UNIVERSE[:8]
+        prices = correlated_paths(symbols, 60, seed=3)
+
+        for bar in range(len(prices)):
+            algo.Time += timedelta(minutes=1)
+            for k, symbol in enumerate(symbols):
+                monitor.update_price_data(symbol, prices[bar, k])
+                legacy.update(symbol, prices[bar, k])
+        # The last bar closes once the next timestamp arrives
+        algo.Time += timedelta(minutes=1)
+        monitor.update_price_data(symbols[0], prices[-1, 0])
+
+        actual = monitor.calculate_correlations()
+        expected = legacy.matrix()
+        self.assertEqual(set(actual), set(expected))
+        for pair, corr in expected.items():
+            self.assertAlmostEqual(actual[pair], corr, places=9)
+
+    def test_pairs_undefined_until_both_windows_full(self):
+        engine = StreamingCorrelationEngine(5)
+        for bar, price in enumerate([100, 101, 99, 102, 103, 101, 104]):
+            engine.update_bar({'SPY': price, **({'QQQ': price * 2 + bar} if bar >= 3 else {})})
+        self.assertEqual(engine.ready_symbols(), ['SPY'])
+        self.assertIsNone(engine.correlation('SPY', 'QQQ'))
+
+        engine.update_bar({'SPY': 105, 'QQQ': 215})
+        engine.update_bar({'SPY': 104, 'QQQ': 214})
+        self.assertEqual(engine.ready_symbols(), ['SPY', 'QQQ'])
+        self.assertIsNotNone(engine.correlation('SPY', 'QQQ'))
+
+    def test_missing_prices_are_masked_not_zero_returns(self):
+        window = 20
+        symbols = UNIVERSE[:6]
+        prices = correlated_paths(symbols, 300, seed=5)
+        rng = np.random.default_rng(8)
+        quoted = rng.random(prices.shape) > 0.15  # ~15% of bars without a price per symbol
+        quoted[0] = True
+        engine = StreamingCorrelationEngine(window, initial_capacity=2, resync_interval=41, min_periods=8)
+
+        # Reference: each return spans back to the symbol's previous price; missing bars are NaN
+        returns = np.full(prices.shape, np.nan)
+        last = prices[0].copy()
+        for bar in range(1, len(prices)):
+            returns[bar, quoted[bar]] = prices[bar, quoted[bar]] / last[quoted[bar]] - 1
+            last[quoted[bar]] = prices[bar, quoted[bar]]
+
+        checked = 0
+        for bar in range(len(prices)):
+            engine.update_bar({s: prices[bar, k] for k, s in enumerate(symbols) if quoted[bar, k]})
+            if bar < window or bar % 7:
+                continue
+            names, matrix = engine.correlation_matrix()
+            self.assertEqual(names, symbols)
+            rows = returns[bar - window + 1:bar + 1]
+            for i in range(len(symbols)):
+                for j in range(i + 1, len(symbols)):
+                    both = ~np.isnan(rows[:, i]) & ~np.isnan(rows[:, j])
+                    if both.sum() < 8:
+                        self.assertTrue(np.isnan(matrix[i, j]))
+                        self.assertIsNone(engine.correlation(symbols[i], symbols[j]))
+                        continue
+                    expected = np.corrcoef(rows[both, i], rows[both, j])[0, 1]
+                    self.assertAlmostEqual(matrix[i, j], expected, places=9)
+                    self.assertAlmostEqual(engine.correlation(symbols[i], symbols[j]), expected, places=9)
+                    checked += 1
+        self.assertGreater(checked, 100)
+        self.assertGreater(engine.get_statistics()['masked_returns'], 0)
+        self.assertEqual(set(engine.last_returns()), {s for k, s in enumerate(symbols) if quoted[-1, k]})
+
+
+class TestOnDataFeedsCorrelation(unittest.TestCase):
+
+    def test_slices_reach_monitor_through_risk_manager(self):
+        algo = MockAlgorithm()
+        algo.IsWarmingUp = False
+        algo.Portfolio = SimpleNamespace(TotalPortfolioValue=100000.0, Values=[])
+        manager = UnifiedRiskManager(algo)
+        algo.unified_risk_manager = manager
+        self.assertTrue(manager.register_plugin(CorrelationPlugin()))
+        optimizer = SimpleNamespace(slice_ingestor=SliceIngestor(algo),
+                                    optimize_ondata_performance=lambda data: {'optimizations': []})
+        ondata = EventDrivenOnData(algo, EventBus(algo), optimizer)
+        ondata.performance_log_interval = timedelta(days=1)
+
+        symbols = ['SPY', 'QQQ', 'IWM']
+        prices = correlated_paths(symbols, 60, seed=7)
+        prices[5::10] = prices[4::10][:len(prices[5::10])]  # unchanged slices are skipped by OnData
+        reference = DynamicCorrelationMonitor(algo, window_size=20)
+
+        for bar in range(len(prices)):
+            algo.Time += timedelta(minutes=1)
+            bars = {symbol: MockBar(prices[bar, k]) for k, symbol in enumerate(symbols)}
+            bars['SPY   240816P00540000'] = MockBar(5.0)
+            ondata.process_ondata(SimpleNamespace(Time=algo.Time, Bars=bars, QuoteBars={}, Ticks={}))
+            for k, symbol in enumerate(symbols):
+                reference.update_price_data(symbol, prices[bar, k])
+        algo.Time += timedelta(minutes=1)
+        for monitor in (algo.correlation_monitor, reference):
+            monitor.update_price_data('SPY', prices[-1, 0])
+
+        self.assertGreater(ondata.skipped_calls, 0)
+        self.assertEqual(algo.correlation_monitor.engine.ready_symbols(), symbols)  # option contract not fed
+        actual = algo.correlation_monitor.calculate_correlations()
+        expected = reference.calculate_correlations()
+        self.assertEqual(set(actual), set(expected))
+        self.assertEqual(len(expected), 6)  # both orderings of each pair
+        for pair, corr in expected.items():
+            self.assertAlmostEqual(actual[pair], corr, places=12)
+
+
+def run_benchmark(symbols=26, bars=500, window=20):
+    """Per-bar cost of refreshing the full matrix: streaming engine vs per-pair corrcoef"""
+
+    names = [f"S{i}" for i in range(symbols)]
+    prices = correlated_paths(names, bars)
+
+    legacy = LegacyCorrelations(window)
+    start = time.perf_counter()
+    for bar in range(bars):
+        for k, name in enumerate(names):
+            legacy.update(name, prices[bar, k])
+        legacy.matrix()
+    legacy_ms = (time.perf_counter() - start) / bars * 1000
+
+    engine = StreamingCorrelationEngine(window)
+    start = time.perf_counter()
+    for bar in range(bars):
+        engine.update_bar({name: prices[bar, k] for k, name in enumerate(names)})
+        engine.correlation_matrix()
+    engine_ms = (time.perf_counter() - start) / bars * 1000
+
+    return {'symbols': symbols, 'legacy_ms': legacy_ms, 'engine_ms': engine_ms}
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        for count in (10, 26, 60):
+            stats = run_benchmark(symbols=count)
+            print(f"[BENCH] {stats['symbols']} symbols: engine {stats['engine_ms']:.3f}ms, "
+                  f"per-pair corrcoef {stats['legacy_ms']:.3f}ms per bar")
+    else:
+        unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Validation Pipeline Tests
+Differential test: StrategyValidator and OrderValidationSystem must accept
+exactly what the original sequential checks accepted (and reject with one of
+their reasons), shared slice inputs must be computed once per slice while
+portfolio and drawdown inputs are read per validation, and validators sharing
+the pipeline must not see each other's state
+"""
+
+import unittest
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AlgorithmImports import SecurityType
+from config.strategy_validator import StrategyValidator
+from risk.order_validation import OrderValidationSystem
+from risk.position_safety_validator import PositionSafetyValidator
+from risk.pre_trade_validators import CriticalValidations
+from risk.validation_pipeline import ValidationPipeline, get_validation_pipeline
+
+
+STRATEGIES = ['0DTE', 'LT112', 'STRANGLE', 'IPMCC', 'BEAR_TRAP', 'ADVANCED']
+
+
+class MockAlgorithm:
+    def __init__(self):
+        self.LiveMode = False
+        self.Time = datetime(2024, 8, 5, 10, 0)
+        self.Portfolio = SimpleNamespace(TotalPortfolioValue=100000.0, MarginRemaining=60000.0)
+        self.Securities = {}
+        self.market_open = True
+        self.vix = 20.0
+        self.drawdown = (True, "Drawdown normal")
+        self.vix_manager = SimpleNamespace(get_current_vix=lambda: self.vix)
+        self.drawdown_manager = SimpleNamespace(should_allow_new_position=lambda: self.drawdown)
+        self.position_sizer = SimpleNamespace(
+            phase_limits={1: {'max_bp_limit': 0.5}, 2: {'max_bp_limit': 0.6},
+                          3: {'max_bp_limit': 0.7}, 4: {'max_bp_limit': 0.8}},
+            get_account_phase=lambda value: 1 if value < 55000 else 2 if value < 75000 else 3 if value < 95000 else 4)
+
+    def IsMarketOpen(self, symbol):
+        return self.market_open
+
+    def Log(self, message):
+        pass
+
+    def Debug(self, message):
+        pass
+
+    def Error(self, message):
+        pass
+
+
+def reference_strategy_reasons(validator, algo, strategy, phase, account_value, positions):
+    """Every reason the original sequential can_execute_strategy checks would give, in its order"""
+    reasons = []
+    min_phase = validator.strategy_phase_requirements.get(strategy, 1)
+    if phase < min_phase:
+        reasons.append(f"{strategy} requires Phase {min_phase} (current: Phase {phase})")
+    if not algo.drawdown[0]:
+        reasons.append(f"Drawdown restriction: {algo.drawdown[1]}")
+    limits = validator.max_positions_per_strategy.get(f'phase{phase}', {})
+    count = sum(1 for p in positions.values() if getattr(p, 'strategy', None) == strategy)
+    if count >= limits.get(strategy, 0):
+        reasons.append(f"{strategy} position limit reached ({count}/{limits.get(strategy, 0)})")
+    if len(positions) >= limits.get('TOTAL', 5):
+        reasons.append(f"Total position limit reached ({len(positions)}/{limits.get('TOTAL', 5)})")
+    ok, reason = validator._check_bp_utilization(strategy, f'phase{phase}', account_value, positions)
+    if not ok:
+        reasons.append(reason)
+    ok, reason = validator._check_vix_conditions(strategy)
+    if not ok:
+        reasons.append(reason)
+    return reasons
+
+
+def reference_pre_order_reasons(algo, symbol):
+    security = algo.Securities.get(symbol)
+    if not security:
+        return ["Symbol not found"]
+    reasons = []
+    if not algo.market_open:
+        reasons.append("Market closed")
+    if security.BidPrice > 0 and security.AskPrice > 0:
+        spread = (security.AskPrice - security.BidPrice) / security.BidPrice
+        if spread > 0.10:
+            reasons.append(f"Spread too wide: {spread:.2%}")
+    if security.Type == SecurityType.Option and security.Volume < 10:
+        reasons.append(f"Low volume: {security.Volume}")
+    seconds = (algo.Time - security.LastUpdate).seconds
+    if seconds > 60:
+        reasons.append(f"Stale data: {seconds}s old")
+    return reasons
+
+
+class TestValidationPipeline(unittest.TestCase):
+
+    def test_strategy_validator_matches_sequential_checks(self):
+        rng = random.Random(4)
+        algo = MockAlgorithm()
+        validator = StrategyValidator(algo)
+        rejected = 0
+        for step in range(1500):
+            if rng.random() < 0.5:
+                # VIX and drawdown are slice inputs: they only change when time moves
+                algo.Time += timedelta(minutes=1)
+                algo.vix = rng.choice([10.0, 15.0, 25.0, 40.0])
+                algo.drawdown = rng.choice([(True, "Drawdown normal")] * 4 + [(False, "Drawdown critical (16.0%)")])
+            strategy, phase = rng.choice(STRATEGIES), rng.randint(1, 4)
+            account_value = rng.choice([40000.0, 60000.0, 90000.0, 150000.0])
+            positions = {i: SimpleNamespace(strategy=rng.choice(STRATEGIES),
+                                            buying_power_used=rng.uniform(0, 0.1) * account_value)
+                         for i in range(rng.randint(0, 12))}
+
+            expected = reference_strategy_reasons(validator, algo, strategy, phase, account_value, positions)
+            ok, reason = validator.can_execute_strategy(strategy, phase, account_value, positions)
+            self.assertEqual(ok, not expected, f"step {step}: {reason} vs {expected}")
+            if expected:
+                self.assertIn(reason, expected, f"step {step}")
+                rejected += 1
+        self.assertGreater(rejected, 100)
+
+        stats = algo.validation_pipeline.get_statistics()
+        self.assertEqual(stats['validations'], 1500)
+        self.assertEqual(stats['rejections'], rejected)
+        rules = [stats['rules'][name] for name in StrategyValidator.STRATEGY_RULES]
+        self.assertEqual(rules[0]['calls'], 1500)
+        self.assertEqual(sum(rule['failures'] for rule in rules), rejected)
+        for earlier, later in zip(rules, rules[1:]):  # each check runs only when the earlier ones passed
+            self.assertEqual(later['calls'], earlier['calls'] - earlier['failures'])
+        # VIX is read at most once per slice, however many validations ran in it
+        self.assertLess(stats['inputs']['vix']['computed'], 1500)
+
+    def test_pre_order_matches_sequential_checks(self):
+        rng = random.Random(6)
+        algo = MockAlgorithm()
+        system = OrderValidationSystem(algo)
+        for step in range(800):
+            algo.Time += timedelta(seconds=rng.choice([0, 30, 90]))
+            algo.market_open = rng.random() < 0.9
+            symbol = rng.choice(['SPY', 'QQQ', 'SPY 240920P00430000', 'MISSING'])
+            if symbol != 'MISSING':
+                bid = rng.uniform(1, 10)
+                algo.Securities[symbol] = SimpleNamespace(
+                    BidPrice=bid, AskPrice=bid * rng.choice([1.01, 1.05, 1.2]), Volume=rng.choice([0, 5, 50]),
+                    Type=SecurityType.Option if ' ' in symbol else SecurityType.Equity,
+                    LastUpdate=algo.Time - timedelta(seconds=rng.choice([0, 30, 120])))
+            expected = reference_pre_order_reasons(algo, symbol)
+            ok, reason = system.validate_pre_order(symbol)
+            self.assertEqual(ok, not expected, f"step {step}: {reason} vs {expected}")
+            if expected:
+                self.assertIn(reason, expected)
+            algo.validation_pipeline.invalidate()  # quotes changed within the slice
+
+    def test_slice_inputs_computed_once_per_slice(self):
+        algo = MockAlgorithm()
+        pipeline = ValidationPipeline(algo)
+        calls = []
+        pipeline.add_input('shared', lambda algo, request: calls.append(1) or len(calls))
+
+        self.assertEqual((pipeline.value('shared'), pipeline.value('shared')), (1, 1))
+        algo.Time += timedelta(minutes=1)
+        self.assertEqual(pipeline.value('shared'), 2)
+        pipeline.invalidate()
+        self.assertEqual(pipeline.value('shared'), 3)
+        self.assertEqual(pipeline.get_statistics()['inputs']['shared'], {'computed': 3, 'reused': 1, 'errors': 0})
+
+    def test_safety_validator_halts_on_daily_loss_only(self):
+        algo = MockAlgorithm()
+        safety = PositionSafetyValidator(algo)
+        self.assertIs(safety.pipeline, get_validation_pipeline(algo))
+        algo.market_open = False
+        self.assertFalse(safety.check_before_trade())
+        self.assertTrue(safety.can_trade)  # closed market does not halt for the day
+
+        algo.market_open = True
+        algo.Time += timedelta(minutes=1)
+        algo.Portfolio.TotalPortfolioValue = 94000.0
+        self.assertFalse(safety.check_before_trade())
+        self.assertFalse(safety.can_trade)
+
+
+class TestSharedPipelineState(unittest.TestCase):
+
+    def test_validators_sharing_the_pipeline_keep_their_own_state(self):
+        algo = MockAlgorithm()
+        strict, lenient = StrategyValidator(algo), StrategyValidator(algo)
+        strict.strategy_phase_requirements = dict(strict.strategy_phase_requirements, IPMCC=4)
+        lenient.strategy_phase_requirements = dict(lenient.strategy_phase_requirements, IPMCC=1)
+        self.assertFalse(strict.can_execute_strategy('IPMCC', 2, 60000.0, {})[0])
+        self.assertTrue(lenient.can_execute_strategy('IPMCC', 2, 60000.0, {})[0])
+
+        first, second = PositionSafetyValidator(algo), PositionSafetyValidator(algo)
+        second.losses_today = 3
+        self.assertTrue(first.check_before_trade())
+        self.assertFalse(second.check_before_trade())
+        self.assertTrue(first.can_trade)
+
+    def test_portfolio_inputs_follow_fills_within_a_slice(self):
+        algo = MockAlgorithm()
+        pipeline = get_validation_pipeline(algo)
+        critical = CriticalValidations(algo)
+        safety = PositionSafetyValidator(algo)
+        self.assertTrue(critical.pre_trade_validation('LT112', 'SPY', 1, required_bp=30000.0)[0])
+        self.assertTrue(safety.check_before_trade())
+
+        # A fill in the same slice (Time unchanged) uses up margin and books a loss
+        algo.Portfolio.MarginRemaining = 40000.0
+        algo.Portfolio.TotalPortfolioValue = 94000.0
+        self.assertEqual(critical.pre_trade_validation('LT112', 'SPY', 1, required_bp=30000.0),
+                         (False, "Insufficient margin"))
+        self.assertFalse(safety.check_before_trade())
+        self.assertFalse(safety.can_trade)
+
+    def test_drawdown_gate_read_fresh_within_a_slice(self):
+        algo = MockAlgorithm()
+        validator = StrategyValidator(algo)
+        self.assertTrue(validator.can_execute_strategy('LT112', 4, 150000.0, {})[0])
+
+        # The drawdown manager closes the gate after a fill in the same slice (Time unchanged)
+        algo.drawdown = (False, "Drawdown critical (16.0%)")
+        self.assertEqual(validator.can_execute_strategy('LT112', 4, 150000.0, {}),
+                         (False, "Drawdown restriction: Drawdown critical (16.0%)"))
+
+
+def run_benchmark(orders=20000):
+    """Pipeline vs the original sequential checks for orders arriving within the same slices"""
+    rng = random.Random(3)
+    algo = MockAlgorithm()
+    validator = StrategyValidator(algo)
+    positions = {i: SimpleNamespace(strategy=rng.choice(STRATEGIES), buying_power_used=1500.0) for i in range(8)}
+    requests = [(datetime(2024, 8, 5, 10, 0) + timedelta(minutes=i // 20), rng.choice(STRATEGIES), 4, 150000.0)
+                for i in range(orders)]
+
+    # Both loops pay the same clock update so only the checks differ
+    started = time.perf_counter()
+    for now, strategy, phase, value in requests:
+        algo.Time = now
+        validator.can_execute_strategy(strategy, phase, value, positions)
+    pipeline_us = (time.perf_counter() - started) * 1e6 / orders
+
+    started = time.perf_counter()
+    for now, strategy, phase, value in requests:
+        algo.Time = now
+        reference_strategy_reasons(validator, algo, strategy, phase, value, positions)
+    sequential_us = (time.perf_counter() - started) * 1e6 / orders
+
+    pipeline = algo.validation_pipeline
+    print(f"can_execute_strategy: direct short-circuit {pipeline_us:.1f}us/order, "
+          f"all sequential checks {sequential_us:.1f}us/order")
+    for name in StrategyValidator.STRATEGY_RULES:
+        stats = pipeline.get_statistics()['rules'][name]
+        print(f"  {name:28s} calls {stats['calls']:6d} fail {stats['fail_rate']:.1%}")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        run_benchmark()
+    else:
+        unittest.main()
@@ -214,6 +214,9 @@ class FuturesManager:
             'currency': 'front_month'      # 6E, 6B - front month
         }
         
+        # Contract month symbols only change with the calendar month
+        self._contract_month_cache = {}  # (base_symbol, target_month, year, month) -> symbol
+        
         # Risk management
         self.risk_parameters = {
             'max_margin_usage': 0.15,      # 15% of account for futures margin
@@ -284,6 +287,14 @@ class FuturesManager:
         Get appropriate contract month symbol for trading
         Returns: contract symbol with month code
         """
+        cache_key = (base_symbol, target_month, self.algorithm.Time.year, self.algorithm.Time.month)
+        cached = self._contract_month_cache.get(cache_key)
+        if cached is None:
+            cached = self._contract_month_cache[cache_key] = self._resolve_contract_month_symbol(base_symbol)
+        return cached
+    
+    def _resolve_contract_month_symbol(self, base_symbol):
+        """Contract month symbol for the current calendar month"""
         specs = self.get_futures_specs(base_symbol)
         if not specs:
             return base_symbol